@@ -50,7 +50,7 @@ log_step "Creando estructura de directorios"
 mkdir -p data  # Almacenamiento de datos JSON (fallback)
 mkdir -p logs  # Logs de la aplicación
 
-log_step "Configurando base de datos en PostgreSQL"
+log_step "Configurando base de datos en PostgreSQL (migraciones + datos base)"
 # Ejecutar setup desde raíz de backend
 if [ -f "setup_postgres.py" ]; then
   python setup_postgres.py
@@ -10,7 +10,7 @@ def configure_cloudinary():
         secure=True  # Usar HTTPS para todas las URLs
     )
 
-async def upload_image(image_data, public_id=None):
+def upload_image(image_data, public_id=None):
     """Sube una imagen a Cloudinary y devuelve la URL segura.
     
     Esta función maneja la subida de imágenes a Cloudinary con opciones
@@ -43,7 +43,7 @@ async def upload_image(image_data, public_id=None):
             # Es un objeto UploadFile de FastAPI
             print(f"Procesando objeto UploadFile: {image_data.filename}")
             # Leer el contenido del archivo
-            contents = await image_data.read()
+            contents = image_data.file.read()
             upload_data = contents
             print(f"Contenido leído: {len(contents)} bytes")
         
@@ -1,8 +1,10 @@
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from fastapi import Request
 import os
 from dotenv import load_dotenv
+from core.metricas import QueuePoolMedido
 
 # Cargar variables de entorno desde .env
 load_dotenv()
@@ -14,215 +16,75 @@ load_dotenv()
 # Obtener la URL de la base de datos desde las variables de entorno
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-# Configurar la URL de la base de datos según el entorno
-if DATABASE_URL and "postgres" in DATABASE_URL:
-    # Configuración para PostgreSQL en producción
-    engine = create_engine(
-        DATABASE_URL,
-        pool_size=5,
-        max_overflow=10,
-        pool_timeout=30,
-        pool_recycle=1800
-    )
-else:
+# URL opcional de una réplica de solo lectura (ver get_read_db). En pruebas locales sirve un
+# archivo SQLite abierto en modo solo lectura: sqlite:///file:/ruta/ferreteria.db?mode=ro&uri=true
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL") or None
+
+# Segundos que un cliente sigue leyendo de la base principal después de una escritura propia.
+# Debe superar el desfase habitual de la réplica
+LECTURA_PEGAJOSA_SEGUNDOS = float(os.getenv("LECTURA_PEGAJOSA_SEGUNDOS", "5"))
+
+# Cookie que marca a un cliente que acaba de escribir (la pone core.replica.MiddlewareLecturaPegajosa)
+COOKIE_LECTURA_PRIMARIA = "lectura_primaria"
+
+
+def _crear_engine(url):
+    """Crea el engine de `url` (PostgreSQL o SQLite); sin URL usa el ferreteria.db del backend"""
+    # Configurar la URL de la base de datos según el entorno
+    if url and "postgres" in url:
+        # Configuración para PostgreSQL en producción. QueuePoolMedido es el QueuePool de siempre
+        # más la espera de cada checkout para /api/metrics (core/metricas.py)
+        return create_engine(
+            url,
+            poolclass=QueuePoolMedido,
+            pool_size=5,
+            max_overflow=10,
+            pool_timeout=30,
+            pool_recycle=1800
+        )
     # Configuración para SQLite en desarrollo local
+    # SQLite admite un solo escritor: cada conexión espera hasta SQLITE_BUSY_TIMEOUT segundos
+    # por el bloqueo de escritura antes de fallar con "database is locked"
+    _sqlite_connect_args = {
+        "check_same_thread": False,
+        "timeout": float(os.getenv("SQLITE_BUSY_TIMEOUT", "30")),
+    }
     # Usar la URL del .env si está disponible, sino usar ruta por defecto
-    if DATABASE_URL and DATABASE_URL.startswith('sqlite:///'):
+    if url and url.startswith('sqlite:///'):
         # Usar la URL del .env tal como está configurada
-        engine = create_engine(
-            DATABASE_URL,
-            connect_args={"check_same_thread": False}
-        )
-    else:
-        # Fallback a la ruta por defecto en la raíz del backend
-        import os
-        # Usar la raíz del proyecto backend en lugar de la carpeta config
-        backend_root = os.path.dirname(os.path.dirname(__file__))
-        db_path = os.path.join(backend_root, 'ferreteria.db')
-        engine = create_engine(
-            f"sqlite:///{db_path}",
-            connect_args={"check_same_thread": False}
+        return create_engine(
+            url,
+            connect_args=_sqlite_connect_args
         )
+    # Fallback a la ruta por defecto en la raíz del backend
+    # Usar la raíz del proyecto backend en lugar de la carpeta config
+    backend_root = os.path.dirname(os.path.dirname(__file__))
+    db_path = os.path.join(backend_root, 'ferreteria.db')
+    return create_engine(
+        f"sqlite:///{db_path}",
+        connect_args=_sqlite_connect_args
+    )
+
+
+engine = _crear_engine(DATABASE_URL)
+
+# Réplica de lectura: sin DATABASE_READ_URL las lecturas usan el mismo engine
+engine_lectura = _crear_engine(DATABASE_READ_URL) if DATABASE_READ_URL else engine
 
 # Configurar la fábrica de sesiones
 # - autocommit=False: Las transacciones deben confirmarse explícitamente
 # - autoflush=False: Los cambios no se envían automáticamente a la BD
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLectura = sessionmaker(autocommit=False, autoflush=False, bind=engine_lectura) if DATABASE_READ_URL else SessionLocal
 
 # Importar la clase base desde models.base para mantener consistencia
 from models.base import Base
 
-# Migración automática de columnas nuevas en SQLite
-# -----------------------------------------------
-# Asegura que la tabla 'usuarios' tenga columnas agregadas recientemente
-# cuando se usa SQLite en desarrollo, sin requerir una herramienta de migraciones.
+# Esquema de la base
+# ------------------
+# Importar este módulo no ejecuta DDL: el esquema se mantiene con migraciones versionadas
+# (migrations/versions, ver config/migraciones.py y scripts/migrar.py).
 
-def _ensure_usuario_extra_columns_sqlite():
-    try:
-        if engine.dialect.name != 'sqlite':
-            return
-        with engine.begin() as conn:
-            cols = [row[1] for row in conn.execute(text("PRAGMA table_info(usuarios)")).fetchall()]
-            if 'apellido' not in cols:
-                conn.execute(text("ALTER TABLE usuarios ADD COLUMN apellido TEXT"))
-            if 'rut' not in cols:
-                conn.execute(text("ALTER TABLE usuarios ADD COLUMN rut TEXT"))
-            if 'email' not in cols:
-                conn.execute(text("ALTER TABLE usuarios ADD COLUMN email TEXT"))
-            if 'telefono' not in cols:
-                conn.execute(text("ALTER TABLE usuarios ADD COLUMN telefono TEXT"))
-            # Asegurar columna 'activo' para filtros en consultas
-            if 'activo' not in cols:
-                # En SQLite, Boolean se representa como INTEGER (0/1)
-                conn.execute(text("ALTER TABLE usuarios ADD COLUMN activo INTEGER DEFAULT 1"))
-                # Normalizar valores existentes a activo=1
-                try:
-                    conn.execute(text("UPDATE usuarios SET activo = 1 WHERE activo IS NULL"))
-                except Exception:
-                    pass
-            # Asegurar columna 'id_rol' para compatibilidad con roles
-            if 'id_rol' not in cols:
-                conn.execute(text("ALTER TABLE usuarios ADD COLUMN id_rol INTEGER"))
-    except Exception as e:
-        # No bloquear el arranque si falla; mostrar aviso
-        print(f"[DB] Aviso: migración usuarios parcialmente fallida: {e}")
-
-# Ejecutar verificación/migración al importar el módulo
-_ensure_usuario_extra_columns_sqlite()
-
-def _ensure_producto_subcategoria_column_sqlite():
-    """Agrega la columna id_subcategoria a productos en SQLite si no existe."""
-    try:
-        if engine.dialect.name != 'sqlite':
-            return
-        with engine.begin() as conn:
-            cols = [row[1] for row in conn.execute(text("PRAGMA table_info(productos)")).fetchall()]
-            if 'id_subcategoria' not in cols:
-                conn.execute(text("ALTER TABLE productos ADD COLUMN id_subcategoria INTEGER"))
-    except Exception as e:
-        print(f"[DB] Aviso: migración productos parcialmente fallida: {e}")
-
-# Ejecutar verificación para productos
-_ensure_producto_subcategoria_column_sqlite()
-
-# Nueva verificación: columnas de oferta en productos (SQLite)
-def _ensure_producto_oferta_columns_sqlite():
-    """Agrega columnas de oferta a productos en SQLite si no existen."""
-    try:
-        if engine.dialect.name != 'sqlite':
-            return
-        with engine.begin() as conn:
-            cols = [row[1] for row in conn.execute(text("PRAGMA table_info(productos)")).fetchall()]
-            if 'oferta_activa' not in cols:
-                conn.execute(text("ALTER TABLE productos ADD COLUMN oferta_activa INTEGER DEFAULT 0"))
-            if 'tipo_oferta' not in cols:
-                conn.execute(text("ALTER TABLE productos ADD COLUMN tipo_oferta TEXT"))
-            if 'valor_oferta' not in cols:
-                conn.execute(text("ALTER TABLE productos ADD COLUMN valor_oferta NUMERIC"))
-            if 'fecha_inicio_oferta' not in cols:
-                conn.execute(text("ALTER TABLE productos ADD COLUMN fecha_inicio_oferta TEXT"))
-            if 'fecha_fin_oferta' not in cols:
-                conn.execute(text("ALTER TABLE productos ADD COLUMN fecha_fin_oferta TEXT"))
-    except Exception as e:
-        print(f"[DB] Aviso: migración columnas de oferta parcialmente fallida: {e}")
-
-# Ejecutar verificación para columnas de oferta
-_ensure_producto_oferta_columns_sqlite()
-
-# Nueva verificación: columnas de detalles en productos (SQLite)
-def _ensure_producto_detalle_columns_sqlite():
-    """Agrega columnas de detalle (garantía y otros) a productos en SQLite si no existen."""
-    try:
-        if engine.dialect.name != 'sqlite':
-            return
-        with engine.begin() as conn:
-            cols = [row[1] for row in conn.execute(text("PRAGMA table_info(productos)")).fetchall()]
-            if 'garantia_meses' not in cols:
-                conn.execute(text("ALTER TABLE productos ADD COLUMN garantia_meses INTEGER"))
-            if 'modelo' not in cols:
-                conn.execute(text("ALTER TABLE productos ADD COLUMN modelo TEXT"))
-            if 'color' not in cols:
-                conn.execute(text("ALTER TABLE productos ADD COLUMN color TEXT"))
-            if 'material' not in cols:
-                conn.execute(text("ALTER TABLE productos ADD COLUMN material TEXT"))
-    except Exception as e:
-        print(f"[DB] Aviso: migración columnas de detalle parcialmente fallida: {e}")
-
-# Ejecutar verificación para columnas de detalle
-_ensure_producto_detalle_columns_sqlite()
-
-# Nueva verificación: índices adicionales en productos (SQLite)
-def _ensure_producto_extra_indexes_sqlite():
-    """Crea índices en campos consultados frecuentemente de productos."""
-    try:
-        if engine.dialect.name != 'sqlite':
-            return
-        with engine.begin() as conn:
-            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_productos_id_categoria ON productos (id_categoria)"))
-            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_productos_id_proveedor ON productos (id_proveedor)"))
-            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_productos_en_catalogo ON productos (en_catalogo)"))
-    except Exception as e:
-        print(f"[DB] Aviso: creación de índices de productos parcialmente fallida: {e}")
-
-# Ejecutar verificación de índices
-_ensure_producto_extra_indexes_sqlite()
-def _ensure_venta_delivery_columns_sqlite():
-    try:
-        if engine.dialect.name != 'sqlite':
-            return
-        with engine.begin() as conn:
-            cols = [row[1] for row in conn.execute(text("PRAGMA table_info(ventas)")).fetchall()]
-            if 'despacho_id' not in cols:
-                conn.execute(text("ALTER TABLE ventas ADD COLUMN despacho_id INTEGER"))
-            if 'metodo_entrega' not in cols:
-                conn.execute(text("ALTER TABLE ventas ADD COLUMN metodo_entrega TEXT"))
-            if 'estado_envio' not in cols:
-                conn.execute(text("ALTER TABLE ventas ADD COLUMN estado_envio TEXT"))
-            if 'repartidor_rut' not in cols:
-                conn.execute(text("ALTER TABLE ventas ADD COLUMN repartidor_rut TEXT"))
-            if 'ventana_inicio' not in cols:
-                conn.execute(text("ALTER TABLE ventas ADD COLUMN ventana_inicio TEXT"))
-            if 'ventana_fin' not in cols:
-                conn.execute(text("ALTER TABLE ventas ADD COLUMN ventana_fin TEXT"))
-            if 'fecha_asignacion' not in cols:
-                conn.execute(text("ALTER TABLE ventas ADD COLUMN fecha_asignacion TEXT"))
-            if 'fecha_despacho' not in cols:
-                conn.execute(text("ALTER TABLE ventas ADD COLUMN fecha_despacho TEXT"))
-            if 'fecha_entrega' not in cols:
-                conn.execute(text("ALTER TABLE ventas ADD COLUMN fecha_entrega TEXT"))
-            if 'prueba_entrega_url' not in cols:
-                conn.execute(text("ALTER TABLE ventas ADD COLUMN prueba_entrega_url TEXT"))
-            if 'geo_entrega_lat' not in cols:
-                conn.execute(text("ALTER TABLE ventas ADD COLUMN geo_entrega_lat NUMERIC"))
-            if 'geo_entrega_lng' not in cols:
-                conn.execute(text("ALTER TABLE ventas ADD COLUMN geo_entrega_lng NUMERIC"))
-            if 'motivo_no_entrega' not in cols:
-                conn.execute(text("ALTER TABLE ventas ADD COLUMN motivo_no_entrega TEXT"))
-            # Remover columnas obsoletas si existen
-            try:
-                if 'cliente_rut' in cols:
-                    conn.execute(text("DROP INDEX IF EXISTS ix_ventas_cliente"))
-                    conn.execute(text("ALTER TABLE ventas DROP COLUMN cliente_rut"))
-            except Exception:
-                pass
-            try:
-                if 'eta' in cols:
-                    conn.execute(text("ALTER TABLE ventas DROP COLUMN eta"))
-            except Exception:
-                pass
-            try:
-                if 'prioridad' in cols:
-                    conn.execute(text("ALTER TABLE ventas DROP COLUMN prioridad"))
-            except Exception:
-                pass
-            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_ventas_estado_envio ON ventas (estado_envio)"))
-            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_ventas_repartidor ON ventas (repartidor_rut)"))
-            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_ventas_despacho ON ventas (despacho_id)"))
-            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_ventas_fecha_entrega ON ventas (fecha_entrega)"))
-    except Exception as e:
-        print(f"[DB] Aviso: migración ventas (entrega) parcialmente fallida: {e}")
-
-_ensure_venta_delivery_columns_sqlite()
 # Gestión de dependencias y acceso a datos
 # --------------------------------------
 
@@ -242,3 +104,24 @@ def get_db():
         yield db  # Devolver la sesión para que FastAPI la use
     finally:
         db.close()  # Asegurar que la sesión se cierre al terminar
+
+
+def get_read_db(request: Request):
+    """Proporciona una sesión de solo lectura para las rutas de consulta intensiva.
+
+    Usa la réplica (DATABASE_READ_URL) salvo que el cliente haya escrito hace menos de
+    LECTURA_PEGAJOSA_SEGUNDOS (cookie COOKIE_LECTURA_PRIMARIA): entonces lee de la base
+    principal, para que vea sus propios cambios aunque la réplica vaya atrasada. Sin réplica
+    configurada equivale a get_db. Las rutas que la usan no deben escribir.
+
+    Yields:
+        Session: Una sesión de base de datos
+    """
+    if request.cookies.get(COOKIE_LECTURA_PRIMARIA):
+        db = SessionLocal()
+    else:
+        db = SessionLectura()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Migraciones de esquema (Alembic, migrations/versions).
+
+El arranque de la aplicación no hace DDL: verificar_esquema() lee alembic_version (una
+consulta) y la compara con la head de migrations/versions. Si la base está al día no hace
+nada más. Si no, y MIGRAR_AL_INICIAR está activo (por defecto solo con SQLite, para desarrollo
+y scripts), llama a migrar(); si no, avisa que falta ejecutar scripts/migrar.py.
+
+migrar() según el estado de la base:
+- vacía: create_all, índice de búsqueda y datos base, y la marca en head
+- con alembic_version: alembic upgrade head
+- con tablas pero sin alembic_version (creada por el create_all y los _ensure_* que main.py y
+  config/database.py ejecutaban al importar): la marca en BASE_LEGADA y sube a head;
+  20261024_esquema_legado completa de forma idempotente lo que esas funciones garantizaban
+Todo corre en una transacción; en PostgreSQL con un advisory lock para que dos procesos no
+migren a la vez.
+"""
+
+import os
+import time
+from typing import Optional
+
+from sqlalchemy import inspect, select, text
+
+from config.database import engine
+
+BASE_LEGADA = "20261023_movimientos_purga_indices"
+_LOCK_POSTGRES = 7_114_020
+
+_BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_head: Optional[str] = None
+
+PERMISOS_BASE = [
+    "usuarios", "catalogo", "inventario", "ventas", "pagos", "auditoria", "dashboard",
+    "proveedores", "categorias", "subcategorias", "despachos",
+]
+ROLES_BASE = ["administrador", "vendedor", "bodeguero", "cliente"]
+
+
+def _config():
+    from alembic.config import Config
+
+    cfg = Config(os.path.join(_BACKEND, "alembic.ini"))
+    cfg.set_main_option("script_location", os.path.join(_BACKEND, "migrations"))
+    return cfg
+
+
+def revision_head() -> str:
+    """Head de migrations/versions (se calcula una vez por proceso)"""
+    global _head
+    if _head is None:
+        from alembic.script import ScriptDirectory
+
+        _head = ScriptDirectory.from_config(_config()).get_current_head()
+    return _head
+
+
+def revision_actual(conn) -> Optional[str]:
+    """Revisión registrada en alembic_version, o None si la base no está versionada"""
+    if conn.in_transaction():
+        # Dentro de migrar(): un SELECT fallido abortaría la transacción en PostgreSQL
+        if "alembic_version" not in inspect(conn).get_table_names():
+            return None
+        return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    try:
+        return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except Exception:
+        return None
+
+
+def sembrar_roles_permisos(conn) -> None:
+    """Inserta los roles y permisos base que falten y da todos los permisos al administrador"""
+    from models.permiso import PermisoDB
+    from models.rol import RolDB
+    from models.rol_permiso import RolPermisoDB
+
+    permisos, roles, rol_permiso = PermisoDB.__table__, RolDB.__table__, RolPermisoDB.__table__
+    existentes = set(conn.execute(select(permisos.c.descripcion).where(permisos.c.descripcion.in_(PERMISOS_BASE))).scalars())
+    nuevos = [{"descripcion": p} for p in PERMISOS_BASE if p not in existentes]
+    if nuevos:
+        conn.execute(permisos.insert(), nuevos)
+    existentes = set(conn.execute(select(roles.c.nombre).where(roles.c.nombre.in_(ROLES_BASE))).scalars())
+    nuevos = [{"nombre": r} for r in ROLES_BASE if r not in existentes]
+    if nuevos:
+        conn.execute(roles.insert(), nuevos)
+
+    id_admin = conn.execute(select(roles.c.id_rol).where(roles.c.nombre == "administrador")).scalar()
+    ids_permiso = set(conn.execute(select(permisos.c.id_permiso).where(permisos.c.descripcion.in_(PERMISOS_BASE))).scalars())
+    asignados = set(conn.execute(select(rol_permiso.c.id_permiso).where(rol_permiso.c.id_rol == id_admin)).scalars())
+    faltantes = [{"id_rol": id_admin, "id_permiso": p} for p in sorted(ids_permiso - asignados)]
+    if faltantes:
+        conn.execute(rol_permiso.insert(), faltantes)
+
+
+def migrar(destino: str = "head", marcar: Optional[str] = None) -> dict:
+    """
+    Lleva la base a `destino`. Con `marcar` solo registra esa revisión sin ejecutar nada
+    (para bases cuyo estado real se conoce, p. ej. una PostgreSQL migrada a mano).
+
+    Returns:
+        dict: revisión anterior y actual, y qué se hizo ("al_dia", "creada", "legada", "actualizada", "marcada")
+    """
+    from alembic import command
+
+    from controllers.busqueda_controller import BusquedaController
+    from models.base import Base
+    import models  # noqa: F401
+
+    inicio = time.perf_counter()
+    cfg = _config()
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": _LOCK_POSTGRES})
+        cfg.attributes["connection"] = conn
+        anterior = revision_actual(conn)
+        if marcar:
+            command.stamp(cfg, marcar)
+            accion = "marcada"
+        elif anterior is not None:
+            accion = "al_dia" if anterior == revision_head() and destino == "head" else "actualizada"
+            if accion != "al_dia":
+                command.upgrade(cfg, destino)
+        elif not inspect(conn).get_table_names():
+            Base.metadata.create_all(bind=conn)
+            BusquedaController.asegurar_indice(conn)
+            sembrar_roles_permisos(conn)
+            command.stamp(cfg, "head")
+            accion = "creada"
+        else:
+            command.stamp(cfg, BASE_LEGADA)
+            command.upgrade(cfg, destino)
+            accion = "legada"
+        actual = revision_actual(conn)
+    return {"anterior": anterior, "actual": actual, "accion": accion, "segundos": round(time.perf_counter() - inicio, 3)}
+
+
+def verificar_esquema(migrar_si_falta: Optional[bool] = None) -> bool:
+    """
+    Comprobación de arranque: True si la base está en head (una consulta, sin DDL).
+    Si no lo está, migra cuando corresponde (MIGRAR_AL_INICIAR) o avisa.
+    """
+    with engine.connect() as conn:
+        actual = revision_actual(conn)
+    if actual is not None and actual == revision_head():
+        return True
+    if migrar_si_falta is None:
+        defecto = "1" if engine.dialect.name == "sqlite" else "0"
+        migrar_si_falta = os.getenv("MIGRAR_AL_INICIAR", defecto).lower() in ("1", "true", "si", "sí")
+    if migrar_si_falta:
+        resultado = migrar()
+        print(f"[DB] Esquema migrado: {resultado['anterior'] or 'sin versión'} -> {resultado['actual']} ({resultado['accion']})")
+        return True
+    print(f"[DB] Aviso: esquema en {actual or 'sin versión'}, la aplicación espera {revision_head()}. "
+          "Ejecutar: python scripts/migrar.py")
+    return False
@@ -3,68 +3,51 @@
 
 """
 Controlador de auditoría
-Registra eventos y permite consultas filtradas
+Registra eventos (encolados, escritura por lotes en segundo plano) y permite consultas filtradas
 """
 
+from datetime import datetime
 from typing import List, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, desc
-from fastapi import HTTPException, status
 from models.auditoria import AuditoriaDB, Auditoria, AuditoriaCreate
+from core.auditoria import escritor_auditoria
+from core.paginacion import acotar_limite, cursor_siguiente, decodificar_cursor, filtro_posterior
 
+# Clave de orden para paginación por cursor (la última columna es la clave primaria)
+CLAVE_AUDITORIA = (AuditoriaDB.fecha_evento, AuditoriaDB.id_evento)
 
-async def registrar_evento(
-    db: Session,
+
+def registrar_evento(
+    db: Optional[Session],
     accion: str,
     usuario_rut: Optional[str] = None,
     entidad_tipo: Optional[str] = None,
     entidad_id: Optional[int] = None,
     detalle: Optional[str] = None,
-) -> Auditoria:
-    """Registra un evento de auditoría"""
-    try:
-        # Permitir pasar un objeto AuditoriaCreate como primer argumento
-        try:
-            from models.auditoria import AuditoriaCreate
-            if isinstance(accion, AuditoriaCreate):
-                payload = accion
-                accion = payload.accion
-                usuario_rut = getattr(payload, 'usuario_rut', usuario_rut)
-                entidad_tipo = payload.entidad_tipo
-                entidad_id = payload.entidad_id
-                detalle = payload.detalle
-        except Exception:
-            pass
+) -> None:
+    """
+    Encola un evento de auditoría para el escritor en segundo plano (core/auditoria.py).
+    No hace commit ni usa `db` (se mantiene por compatibilidad con los llamadores): el
+    evento se inserta por lotes fuera de la transacción de la petición.
+    """
+    # Permitir pasar un objeto AuditoriaCreate como primer argumento
+    if isinstance(accion, AuditoriaCreate):
+        payload = accion
+        accion = payload.accion
+        usuario_rut = getattr(payload, 'usuario_rut', usuario_rut)
+        entidad_tipo = payload.entidad_tipo
+        entidad_id = payload.entidad_id
+        detalle = payload.detalle
 
-        if accion and accion.strip().lower().startswith("login"):
-            from datetime import datetime
-            return Auditoria(
-                id_evento=0,
-                usuario_rut=usuario_rut,
-                accion=accion,
-                entidad_tipo=entidad_tipo,
-                entidad_id=entidad_id,
-                detalle=detalle,
-                fecha_evento=datetime.utcnow(),
-            )
-        evento = AuditoriaDB(
-            usuario_rut=usuario_rut,
-            accion=accion,
-            entidad_tipo=entidad_tipo,
-            entidad_id=entidad_id,
-            detalle=detalle,
-        )
-        db.add(evento)
-        db.commit()
-        db.refresh(evento)
-        return Auditoria.from_orm(evento)
-    except Exception as e:
-        db.rollback()
-        # No bloquear la operación original por fallos de auditoría
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error al registrar auditoría: {str(e)}",
-        )
+    escritor_auditoria.encolar({
+        "usuario_rut": usuario_rut,
+        "accion": accion,
+        "entidad_tipo": entidad_tipo,
+        "entidad_id": entidad_id,
+        "detalle": detalle,
+        "fecha_evento": datetime.utcnow(),
+    })
 
 
 def obtener_auditoria_por_entidad(
@@ -99,8 +82,13 @@ def obtener_auditoria(
     fecha_hasta: Optional[str] = None,
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = None,
 ) -> dict:
-    """Lista eventos de auditoría con filtros dinámicos y paginación"""
+    """
+    Lista eventos de auditoría con filtros dinámicos y paginación.
+    Con cursor se pagina por (fecha_evento, id_evento) descendente; la respuesta
+    incluye next_cursor para pedir la página siguiente.
+    """
     from sqlalchemy import func, text
     qry = db.query(AuditoriaDB)
     if usuario_rut is not None:
@@ -114,8 +102,13 @@ def obtener_auditoria(
         qry = qry.filter(AuditoriaDB.fecha_evento <= fecha_hasta)
 
     total = qry.count()
+    limit = acotar_limite(limit)
+    if cursor:
+        valores = decodificar_cursor(cursor, "auditoria", (str, int))
+        qry = qry.filter(filtro_posterior(CLAVE_AUDITORIA, valores, descendente=True))
+        skip = 0
     items = (
-        qry.order_by(desc(AuditoriaDB.fecha_evento))
+        qry.order_by(desc(AuditoriaDB.fecha_evento), desc(AuditoriaDB.id_evento))
         .offset(skip)
         .limit(limit)
         .all()
@@ -123,4 +116,5 @@ def obtener_auditoria(
     return {
         "total": total,
         "data": [Auditoria.from_orm(e) for e in items],
+        "next_cursor": cursor_siguiente(db, items, limit, "auditoria", CLAVE_AUDITORIA, lambda e: e.id_evento),
     }
@@ -13,7 +13,7 @@ from models.usuario import UsuarioDB, Token
 from models.pago import PagoDB
 from models.venta import VentaDB
 from controllers.auditoria_controller import registrar_evento
-from core.auth import verificar_contraseña, crear_token
+from core.auth import verificar_contraseña, crear_token, hash_contraseña, requiere_rehash
 
 
 
@@ -21,7 +21,7 @@ class AuthController:
     """Controlador para manejo de autenticación"""
     
     @staticmethod
-    async def login(form_data: OAuth2PasswordRequestForm, db: Session) -> Token:
+    def login(form_data: OAuth2PasswordRequestForm, db: Session) -> Token:
         """
         Autentica un usuario y devuelve un token de acceso
         
@@ -82,6 +82,16 @@ class AuthController:
                     detail="Credenciales incorrectas"
                 )
             
+            # Migrar hashes legados (bcrypt / texto plano) al esquema actual ahora que se
+            # conoce la contraseña; si falla, el login sigue y se reintenta en el próximo
+            if requiere_rehash(usuario.password):
+                try:
+                    usuario.password = hash_contraseña(form_data.password)
+                    db.commit()
+                except Exception as e:
+                    db.rollback()
+                    print(f"[Auth] Aviso: no se pudo actualizar el hash de {usuario.rut}: {getattr(e, 'orig', e)}")
+            
             # Crear token con el RUT como 'sub' (como string)
             subject = str(usuario.rut)
             token = crear_token(data={"sub": subject})
@@ -117,7 +127,7 @@ class AuthController:
             )
 
     @staticmethod
-    async def login_por_orden(db: Session, rut: str, buy_order: str) -> Token:
+    def login_por_orden(db: Session, rut: str, buy_order: str) -> Token:
         try:
             s = str(rut or '').strip().upper()
             cuerpo = ''.join(ch for ch in s if ch.isdigit())
@@ -159,9 +169,9 @@ class AuthController:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error interno del servidor: {str(e)}")
 
     @staticmethod
-    async def login_cliente(form_data: OAuth2PasswordRequestForm, db: Session) -> Token:
+    def login_cliente(form_data: OAuth2PasswordRequestForm, db: Session) -> Token:
         try:
-            result = await AuthController.login(form_data, db)
+            result = AuthController.login(form_data, db)
             from models.rol import RolDB
             from models.usuario import UsuarioDB
             rol = (
@@ -180,9 +190,9 @@ class AuthController:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error interno del servidor: {str(e)}")
 
     @staticmethod
-    async def login_trabajador(form_data: OAuth2PasswordRequestForm, db: Session) -> Token:
+    def login_trabajador(form_data: OAuth2PasswordRequestForm, db: Session) -> Token:
         try:
-            result = await AuthController.login(form_data, db)
+            result = AuthController.login(form_data, db)
             if (result.role or '').lower() == 'cliente':
                 raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acceso restringido a trabajadores")
             return result
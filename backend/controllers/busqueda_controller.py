@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Controlador de búsqueda de productos
+Búsqueda de texto completo con ranking por relevancia:
+- SQLite: tabla virtual FTS5 (productos_fts) mantenida por triggers
+- PostgreSQL: columna tsvector (busqueda_tsv) con índice GIN + pg_trgm para errores de tipeo
+Ambos motores ignoran acentos (á -> a, ñ -> n) y el índice se actualiza en cada escritura de productos.
+"""
+
+import re
+import unicodedata
+from typing import List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import text, or_
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from models.producto import ProductoDB, ProductoBusqueda
+
+# Columnas indexadas (mismo orden que en la tabla FTS5)
+_COLUMNAS_FTS = ["nombre", "descripcion", "marca", "modelo", "codigo_interno", "caracteristicas"]
+# Pesos bm25 por columna: nombre y código pesan más que la descripción
+_PESOS_BM25 = "10.0, 2.0, 4.0, 4.0, 8.0, 1.0"
+# Similitud mínima (pg_trgm) para aceptar un resultado aproximado
+_SIMILITUD_MINIMA = 0.3
+
+_SELECT_CAMPOS = (
+    "p.id_producto, p.nombre, p.slug, p.codigo_interno, p.marca, p.modelo, p.imagen_url, p.imagen_miniatura_url, "
+    "p.precio_venta, p.cantidad_disponible, p.estado, p.en_catalogo"
+)
+
+
+class BusquedaController:
+    """Controlador para la búsqueda de productos por texto completo"""
+
+    @staticmethod
+    def _tokenizar(termino: str) -> List[str]:
+        """Normaliza el término (minúsculas, sin acentos) y lo separa en palabras alfanuméricas"""
+        if not termino:
+            return []
+        s = unicodedata.normalize('NFD', str(termino))
+        s = ''.join(ch for ch in s if unicodedata.category(ch) != 'Mn')
+        return re.findall(r'[a-z0-9]+', s.lower())[:10]
+
+    @staticmethod
+    def asegurar_indice(bind) -> None:
+        """
+        Crea (si no existe) el índice de búsqueda y los triggers que lo mantienen.
+        Es idempotente; lo ejecuta config.migraciones.migrar() al crear una base vacía (la
+        revisión 20261025_indice_busqueda lleva su propia copia). `bind` es un Engine (abre su
+        propia transacción) o una Connection ya en transacción.
+        """
+        if isinstance(bind, Engine):
+            with bind.begin() as conn:
+                return BusquedaController.asegurar_indice(conn)
+        if bind.dialect.name == 'sqlite':
+            BusquedaController._asegurar_indice_sqlite(bind)
+        elif bind.dialect.name == 'postgresql':
+            BusquedaController._asegurar_indice_postgres(bind)
+
+    @staticmethod
+    def _asegurar_indice_sqlite(conn) -> None:
+        cols = ", ".join(_COLUMNAS_FTS)
+        nuevos = ", ".join(f"new.{c}" for c in _COLUMNAS_FTS)
+        viejos = ", ".join(f"old.{c}" for c in _COLUMNAS_FTS)
+        existe = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'productos_fts'"
+        )).first()
+        if not existe:
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE productos_fts USING fts5({cols}, "
+                "content='productos', content_rowid='id_producto', "
+                "tokenize='unicode61 remove_diacritics 2')"
+            ))
+        conn.execute(text(
+            "CREATE TRIGGER IF NOT EXISTS productos_fts_ai AFTER INSERT ON productos BEGIN "
+            f"INSERT INTO productos_fts(rowid, {cols}) VALUES (new.id_producto, {nuevos}); END"
+        ))
+        conn.execute(text(
+            "CREATE TRIGGER IF NOT EXISTS productos_fts_ad AFTER DELETE ON productos BEGIN "
+            f"INSERT INTO productos_fts(productos_fts, rowid, {cols}) VALUES ('delete', old.id_producto, {viejos}); END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS productos_fts_au AFTER UPDATE OF {cols} ON productos BEGIN "
+            f"INSERT INTO productos_fts(productos_fts, rowid, {cols}) VALUES ('delete', old.id_producto, {viejos}); "
+            f"INSERT INTO productos_fts(rowid, {cols}) VALUES (new.id_producto, {nuevos}); END"
+        ))
+        if not existe:
+            # Poblar el índice con los productos existentes
+            conn.execute(text("INSERT INTO productos_fts(productos_fts) VALUES ('rebuild')"))
+
+    @staticmethod
+    def _asegurar_indice_postgres(conn) -> None:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS unaccent"))
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text(
+            """
+            DO $$ BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'es_unaccent') THEN
+                CREATE TEXT SEARCH CONFIGURATION es_unaccent (COPY = spanish);
+                ALTER TEXT SEARCH CONFIGURATION es_unaccent
+                    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+            END IF;
+            END $$;
+            """
+        ))
+        conn.execute(text("ALTER TABLE productos ADD COLUMN IF NOT EXISTS busqueda_tsv tsvector"))
+        conn.execute(text(
+            """
+            CREATE OR REPLACE FUNCTION productos_busqueda_tsv() RETURNS trigger AS $$
+            BEGIN
+                NEW.busqueda_tsv :=
+                    setweight(to_tsvector('es_unaccent', coalesce(NEW.nombre, '')), 'A') ||
+                    setweight(to_tsvector('es_unaccent', coalesce(NEW.codigo_interno, '') || ' ' ||
+                                                         coalesce(NEW.marca, '') || ' ' ||
+                                                         coalesce(NEW.modelo, '')), 'B') ||
+                    setweight(to_tsvector('es_unaccent', coalesce(NEW.descripcion, '')), 'C') ||
+                    setweight(to_tsvector('es_unaccent', coalesce(NEW.caracteristicas, '')), 'D');
+                RETURN NEW;
+            END $$ LANGUAGE plpgsql;
+            """
+        ))
+        conn.execute(text("DROP TRIGGER IF EXISTS trg_productos_busqueda_tsv ON productos"))
+        conn.execute(text(
+            "CREATE TRIGGER trg_productos_busqueda_tsv BEFORE INSERT OR UPDATE OF "
+            f"{', '.join(_COLUMNAS_FTS)} ON productos "
+            "FOR EACH ROW EXECUTE FUNCTION productos_busqueda_tsv()"
+        ))
+        # Backfill de filas sin vector (el trigger lo calcula)
+        conn.execute(text("UPDATE productos SET nombre = nombre WHERE busqueda_tsv IS NULL"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_productos_busqueda_tsv ON productos USING GIN (busqueda_tsv)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_productos_nombre_trgm ON productos USING GIN (lower(nombre) gin_trgm_ops)"))
+
+    @staticmethod
+    def _fila_a_resultado(row) -> ProductoBusqueda:
+        m = row._mapping
+        return ProductoBusqueda(
+            id_producto=m["id_producto"],
+            nombre=m["nombre"],
+            slug=m["slug"],
+            codigo_interno=m["codigo_interno"],
+            marca=m["marca"],
+            modelo=m["modelo"],
+            imagen_url=m["imagen_url"],
+            imagen_miniatura_url=m["imagen_miniatura_url"],
+            precio_venta=float(m["precio_venta"] or 0),
+            cantidad_disponible=int(m["cantidad_disponible"] or 0),
+            estado=m["estado"],
+            en_catalogo=bool(m["en_catalogo"]),
+            relevancia=float(m["relevancia"]) if m["relevancia"] is not None else None,
+        )
+
+    @staticmethod
+    def _buscar_sqlite(db: Session, tokens: List[str], skip: int, limit: int) -> dict:
+        # Cada palabra como prefijo ("tal"* encuentra "taladro"); todas deben aparecer
+        consulta = " ".join(f'"{t}"*' for t in tokens)
+        total = db.execute(
+            text("SELECT count(*) FROM productos_fts WHERE productos_fts MATCH :q"),
+            {"q": consulta}
+        ).scalar() or 0
+        filas = db.execute(
+            text(
+                f"SELECT {_SELECT_CAMPOS}, -bm25(productos_fts, {_PESOS_BM25}) AS relevancia "
+                "FROM productos_fts JOIN productos p ON p.id_producto = productos_fts.rowid "
+                "WHERE productos_fts MATCH :q "
+                f"ORDER BY bm25(productos_fts, {_PESOS_BM25}) LIMIT :limit OFFSET :skip"
+            ),
+            {"q": consulta, "limit": limit, "skip": skip}
+        ).fetchall() if total > skip else []
+        return {"total": int(total), "data": [BusquedaController._fila_a_resultado(r) for r in filas]}
+
+    @staticmethod
+    def _buscar_postgres(db: Session, tokens: List[str], skip: int, limit: int) -> dict:
+        consulta = " & ".join(f"{t}:*" for t in tokens)
+        total = db.execute(
+            text("SELECT count(*) FROM productos WHERE busqueda_tsv @@ to_tsquery('es_unaccent', :q)"),
+            {"q": consulta}
+        ).scalar() or 0
+        if total:
+            filas = db.execute(
+                text(
+                    f"SELECT {_SELECT_CAMPOS}, ts_rank_cd(p.busqueda_tsv, query) AS relevancia "
+                    "FROM productos p, to_tsquery('es_unaccent', :q) query "
+                    "WHERE p.busqueda_tsv @@ query "
+                    "ORDER BY relevancia DESC, p.id_producto LIMIT :limit OFFSET :skip"
+                ),
+                {"q": consulta, "limit": limit, "skip": skip}
+            ).fetchall() if total > skip else []
+            return {"total": int(total), "data": [BusquedaController._fila_a_resultado(r) for r in filas]}
+
+        # Sin coincidencias exactas: tolerar errores de tipeo por similitud de trigramas sobre el nombre
+        termino = " ".join(tokens)
+        similares = "lower(p.nombre) % :t AND similarity(lower(p.nombre), :t) >= :minimo"
+        total = db.execute(
+            text(f"SELECT count(*) FROM productos p WHERE {similares}"),
+            {"t": termino, "minimo": _SIMILITUD_MINIMA}
+        ).scalar() or 0
+        filas = db.execute(
+            text(
+                f"SELECT {_SELECT_CAMPOS}, similarity(lower(p.nombre), :t) AS relevancia "
+                f"FROM productos p WHERE {similares} "
+                "ORDER BY relevancia DESC, p.id_producto LIMIT :limit OFFSET :skip"
+            ),
+            {"t": termino, "minimo": _SIMILITUD_MINIMA, "limit": limit, "skip": skip}
+        ).fetchall() if total > skip else []
+        return {"total": int(total), "data": [BusquedaController._fila_a_resultado(r) for r in filas]}
+
+    @staticmethod
+    def _buscar_ilike(db: Session, termino: str, skip: int, limit: int) -> dict:
+        """Búsqueda por ILIKE (sin índice); se usa cuando el motor no tiene índice de texto completo"""
+        patron = f"%{termino}%"
+        query = db.query(ProductoDB).filter(or_(
+            ProductoDB.nombre.ilike(patron),
+            ProductoDB.descripcion.ilike(patron),
+            ProductoDB.marca.ilike(patron),
+            ProductoDB.modelo.ilike(patron),
+            ProductoDB.codigo_interno.ilike(patron),
+            ProductoDB.caracteristicas.ilike(patron),
+        ))
+        total = query.count()
+        productos = query.order_by(ProductoDB.nombre).offset(skip).limit(limit).all()
+        return {
+            "total": total,
+            "data": [
+                ProductoBusqueda(
+                    id_producto=p.id_producto,
+                    nombre=p.nombre,
+                    slug=p.slug,
+                    codigo_interno=p.codigo_interno,
+                    marca=p.marca,
+                    modelo=p.modelo,
+                    imagen_url=p.imagen_url,
+                    imagen_miniatura_url=p.imagen_miniatura_url,
+                    precio_venta=float(p.precio_venta or 0),
+                    cantidad_disponible=int(p.cantidad_disponible or 0),
+                    estado=p.estado,
+                    en_catalogo=bool(p.en_catalogo),
+                )
+                for p in productos
+            ],
+        }
+
+    @staticmethod
+    def buscar_productos(db: Session, termino: str, skip: int = 0, limit: int = 20) -> dict:
+        """
+        Busca productos por nombre, descripción, marca, modelo, código interno y características
+
+        Args:
+            db: Sesión de base de datos
+            termino: Texto ingresado por el usuario
+            skip: Número de resultados a omitir
+            limit: Número máximo de resultados a devolver
+
+        Returns:
+            dict: {"total": int, "data": List[ProductoBusqueda]} ordenado por relevancia
+        """
+        tokens = BusquedaController._tokenizar(termino)
+        if not tokens:
+            return {"total": 0, "data": []}
+        try:
+            dialecto = db.get_bind().dialect.name
+            if dialecto == 'sqlite':
+                return BusquedaController._buscar_sqlite(db, tokens, skip, limit)
+            if dialecto == 'postgresql':
+                return BusquedaController._buscar_postgres(db, tokens, skip, limit)
+            return BusquedaController._buscar_ilike(db, termino.strip(), skip, limit)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error al buscar productos: {str(e)}"
+            )
@@ -12,13 +12,14 @@ from sqlalchemy.exc import IntegrityError
 from typing import List
 from models.categoria import CategoriaDB, CategoriaCreate, CategoriaUpdate, Categoria
 from models.producto import ProductoDB
+from core.cache import invalidar
 
 
 class CategoriaController:
     """Controlador para manejo de categorías"""
     
     @staticmethod
-    async def crear_categoria(categoria: CategoriaCreate, db: Session) -> Categoria:
+    def crear_categoria(categoria: CategoriaCreate, db: Session) -> Categoria:
         """
         Crea una nueva categoría
         
@@ -36,6 +37,7 @@ class CategoriaController:
             db_categoria = CategoriaDB(**categoria.dict())
             db.add(db_categoria)
             db.commit()
+            invalidar("categorias", "subcategorias")
             db.refresh(db_categoria)
             
             return Categoria(
@@ -58,7 +60,7 @@ class CategoriaController:
             )
     
     @staticmethod
-    async def obtener_categorias(db: Session) -> List[Categoria]:
+    def obtener_categorias(db: Session) -> List[Categoria]:
         """
         Obtiene todas las categorías
         
@@ -84,7 +86,7 @@ class CategoriaController:
             )
     
     @staticmethod
-    async def obtener_categoria(categoria_id: int, db: Session) -> Categoria:
+    def obtener_categoria(categoria_id: int, db: Session) -> Categoria:
         """
         Obtiene una categoría por ID
         
@@ -120,7 +122,7 @@ class CategoriaController:
             )
     
     @staticmethod
-    async def actualizar_categoria(categoria_id: int, categoria_update: CategoriaUpdate, db: Session) -> Categoria:
+    def actualizar_categoria(categoria_id: int, categoria_update: CategoriaUpdate, db: Session) -> Categoria:
         """
         Actualiza una categoría
         
@@ -150,6 +152,7 @@ class CategoriaController:
                 categoria.descripcion = categoria_update.descripcion
             
             db.commit()
+            invalidar("categorias", "subcategorias")
             db.refresh(categoria)
             
             return Categoria(
@@ -174,7 +177,7 @@ class CategoriaController:
             )
     
     @staticmethod
-    async def eliminar_categoria(categoria_id: int, db: Session) -> dict:
+    def eliminar_categoria(categoria_id: int, db: Session) -> dict:
         """
         Elimina una categoría
         
@@ -205,6 +208,7 @@ class CategoriaController:
             
             db.delete(categoria)
             db.commit()
+            invalidar("categorias", "subcategorias")
             
             return {"message": "Categoría eliminada exitosamente"}
             
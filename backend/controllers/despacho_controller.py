@@ -16,7 +16,7 @@ class DespachoController:
     """Operaciones CRUD para direcciones de despacho"""
 
     @staticmethod
-    async def crear(rut_usuario: str, data: DespachoCreate, db: Session) -> Despacho:
+    def crear(rut_usuario: str, data: DespachoCreate, db: Session) -> Despacho:
         # Verificar usuario
         usuario = db.query(UsuarioDB).filter(UsuarioDB.rut == str(rut_usuario), UsuarioDB.activo == True).first()
         if not usuario:
@@ -43,7 +43,7 @@ class DespachoController:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al crear despacho: {str(e)}")
 
     @staticmethod
-    async def listar_por_usuario(rut_usuario: str, db: Session) -> List[Despacho]:
+    def listar_por_usuario(rut_usuario: str, db: Session) -> List[Despacho]:
         try:
             registros = db.query(DespachoDB).filter(DespachoDB.rut_usuario == str(rut_usuario)).order_by(DespachoDB.fecha_actualizacion.desc()).all()
             return [Despacho.from_orm(r) for r in registros]
@@ -51,14 +51,14 @@ class DespachoController:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al obtener despachos: {str(e)}")
 
     @staticmethod
-    async def obtener(despacho_id: int, db: Session) -> Despacho:
+    def obtener(despacho_id: int, db: Session) -> Despacho:
         registro = db.query(DespachoDB).filter(DespachoDB.id_despacho == despacho_id).first()
         if not registro:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Despacho no encontrado")
         return Despacho.from_orm(registro)
 
     @staticmethod
-    async def actualizar(despacho_id: int, data: DespachoUpdate, db: Session) -> Despacho:
+    def actualizar(despacho_id: int, data: DespachoUpdate, db: Session) -> Despacho:
         registro = db.query(DespachoDB).filter(DespachoDB.id_despacho == despacho_id).first()
         if not registro:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Despacho no encontrado")
@@ -77,7 +77,7 @@ class DespachoController:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al actualizar despacho: {str(e)}")
 
     @staticmethod
-    async def eliminar(despacho_id: int, db: Session) -> dict:
+    def eliminar(despacho_id: int, db: Session) -> dict:
         registro = db.query(DespachoDB).filter(DespachoDB.id_despacho == despacho_id).first()
         if not registro:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Despacho no encontrado")
@@ -16,7 +16,7 @@ class MensajeController:
     """Controlador para manejo de mensajes de contacto"""
     
     @staticmethod
-    async def crear_mensaje(mensaje: MensajeContactoCreate, db: Session) -> MensajeContacto:
+    def crear_mensaje(mensaje: MensajeContactoCreate, db: Session) -> MensajeContacto:
         """
         Crea un nuevo mensaje de contacto
         
@@ -55,7 +55,7 @@ class MensajeController:
             )
     
     @staticmethod
-    async def obtener_mensajes(db: Session, solo_no_leidos: bool = False) -> List[MensajeContacto]:
+    def obtener_mensajes(db: Session, solo_no_leidos: bool = False) -> List[MensajeContacto]:
         """
         Obtiene todos los mensajes de contacto
         
@@ -93,7 +93,7 @@ class MensajeController:
             )
     
     @staticmethod
-    async def obtener_mensaje(mensaje_id: int, db: Session) -> MensajeContacto:
+    def obtener_mensaje(mensaje_id: int, db: Session) -> MensajeContacto:
         """
         Obtiene un mensaje de contacto por ID
         
@@ -134,7 +134,7 @@ class MensajeController:
             )
     
     @staticmethod
-    async def marcar_como_leido(mensaje_id: int, db: Session) -> MensajeContacto:
+    def marcar_como_leido(mensaje_id: int, db: Session) -> MensajeContacto:
         """
         Marca un mensaje como leído
         
@@ -181,7 +181,7 @@ class MensajeController:
             )
     
     @staticmethod
-    async def eliminar_mensaje(mensaje_id: int, db: Session) -> dict:
+    def eliminar_mensaje(mensaje_id: int, db: Session) -> dict:
         """
         Elimina un mensaje de contacto
         
@@ -218,7 +218,7 @@ class MensajeController:
             )
     
     @staticmethod
-    async def obtener_estadisticas_mensajes(db: Session) -> dict:
+    def obtener_estadisticas_mensajes(db: Session) -> dict:
         """
         Obtiene estadísticas de los mensajes
         
@@ -156,6 +156,7 @@ class PagoController:
             rut_norm = f"{cuerpo}{dv}"
 
             from models.venta import VentaDB, DetalleVentaDB
+            from sqlalchemy import func
             from sqlalchemy.orm import joinedload
             from controllers.venta_controller import VentaController
             from models.pago import PagoDB
@@ -165,6 +166,7 @@ class PagoController:
                 db.query(VentaDB)
                 .options(
                     joinedload(VentaDB.usuario),
+                    joinedload(VentaDB.repartidor),
                     joinedload(VentaDB.detalles_venta).joinedload(DetalleVentaDB.producto)
                 )
                 .filter(VentaDB.rut_usuario == str(rut_norm))
@@ -174,16 +176,22 @@ class PagoController:
             if not ventas:
                 return []
 
+            # Estado del último pago de cada venta, en una sola consulta
+            ultimos = (
+                db.query(func.max(PagoDB.id_pago))
+                .join(VentaDB, VentaDB.id_venta == PagoDB.id_venta)
+                .filter(VentaDB.rut_usuario == str(rut_norm))
+                .group_by(PagoDB.id_venta)
+            )
+            estados = dict(
+                db.query(PagoDB.id_venta, PagoDB.estado)
+                .filter(PagoDB.id_pago.in_(ultimos.scalar_subquery()))
+                .all()
+            )
+
             result = []
             for v in ventas:
-                # Tomar estado del último pago
-                ultimo = (
-                    db.query(PagoDB)
-                    .filter(PagoDB.id_venta == v.id_venta)
-                    .order_by(PagoDB.id_pago.desc())
-                    .first()
-                )
-                if ultimo and str(ultimo.estado or '').lower() in {"aprobado", "authorized"}:
+                if str(estados.get(v.id_venta) or '').lower() in {"aprobado", "authorized"}:
                     result.append(VentaController._construir_venta_response(db, v))
             return result
         except Exception as e:
@@ -233,6 +241,7 @@ class PagoController:
                 db.query(VentaDB)
                 .options(
                     joinedload(VentaDB.usuario),
+                    joinedload(VentaDB.repartidor),
                     joinedload(VentaDB.detalles_venta).joinedload(DetalleVentaDB.producto)
                 )
                 .filter(VentaDB.id_venta.in_(ventas_ids))
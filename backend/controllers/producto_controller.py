@@ -13,16 +13,19 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy import or_
 from typing import List, Optional
 import uuid
-import base64
 import io
 from models.producto import ProductoDB, ProductoCreate, ProductoUpdate, Producto, ProductoInventario
+from models.producto_slug import ProductoSlugHistorialDB
 from .serializers import serialize_producto_inventario
+from .busqueda_controller import BusquedaController
+from core.precios import PrecioCalculado, calcular_precio, calcular_precios, precio_final_sql, precio_final_centavos_sql
+from core.cache import CacheLRU, catalogo_cache, invalidar_catalogo, version_catalogo
+from core.paginacion import acotar_limite, decodificar_cursor, filtro_posterior
 from models.catalogo import ProductoCatalogo, AgregarACatalogo
 from models.categoria import CategoriaDB
 from models.subcategoria import SubCategoriaDB
 from models.proveedor import ProveedorDB
-from config.cloudinary_config import upload_image
-import cloudinary.uploader
+from core.imagenes import decodificar_base64, pipeline_imagenes, prefijo_producto
 from datetime import datetime
 import re
 import unicodedata
@@ -39,25 +42,128 @@ class ProductoController:
         s = re.sub(r'[^a-z0-9]+', '-', s)
         s = re.sub(r'-+', '-', s).strip('-')
         return s
+
+    @staticmethod
+    def _primer_slug_libre(base: str, ocupados: set) -> str:
+        """Devuelve base, base-2, base-3... el primero que no esté ocupado"""
+        slug = base
+        n = 2
+        while slug in ocupados:
+            slug = f"{base}-{n}"
+            n += 1
+        return slug
+
+    @staticmethod
+    def _slugs_ocupados(db: Session, base: str, producto_id: Optional[int] = None) -> set:
+        """Slugs base y base-N vigentes o históricos de otros productos"""
+        patron = or_(ProductoDB.slug == base, ProductoDB.slug.like(f"{base}-%"))
+        patron_hist = or_(ProductoSlugHistorialDB.slug == base, ProductoSlugHistorialDB.slug.like(f"{base}-%"))
+        q = db.query(ProductoDB.slug).filter(patron)
+        q_hist = db.query(ProductoSlugHistorialDB.slug).filter(patron_hist)
+        if producto_id is not None:
+            q = q.filter(ProductoDB.id_producto != producto_id)
+            q_hist = q_hist.filter(ProductoSlugHistorialDB.id_producto != producto_id)
+        return {row[0] for row in q.all()} | {row[0] for row in q_hist.all()}
+
+    @staticmethod
+    def _generar_slug_unico(db: Session, nombre: str, producto_id: Optional[int] = None) -> str:
+        """
+        Genera un slug único para el nombre dado, agregando sufijo numérico en colisiones.
+        Considera ocupados los slugs vigentes y los históricos de otros productos.
+        """
+        base = ProductoController._slugify_nombre(nombre) or "producto"
+        ocupados = ProductoController._slugs_ocupados(db, base, producto_id)
+        return ProductoController._primer_slug_libre(base, ocupados)
+
+    @staticmethod
+    def _actualizar_slug(db: Session, producto: ProductoDB) -> None:
+        """
+        Recalcula el slug tras un cambio de nombre. El slug anterior queda en el
+        historial para que los enlaces antiguos sigan resolviendo.
+        """
+        base = ProductoController._slugify_nombre(producto.nombre) or "producto"
+        actual = producto.slug
+        if actual == base:
+            return
+        ocupados = ProductoController._slugs_ocupados(db, base, producto.id_producto)
+        # base-N se conserva solo si es sufijo de colisión: base lo tiene otro producto
+        # ("taladro-2000" no es una colisión de "taladro" si "taladro" está libre)
+        if actual and base in ocupados and re.fullmatch(rf"{re.escape(base)}-\d+", actual):
+            return
+        nuevo = ProductoController._primer_slug_libre(base, ocupados)
+        # Si el producto recupera un slug propio del historial, sacarlo de ahí
+        db.query(ProductoSlugHistorialDB).filter(ProductoSlugHistorialDB.slug == nuevo).delete(synchronize_session=False)
+        if actual:
+            db.merge(ProductoSlugHistorialDB(slug=actual, id_producto=producto.id_producto))
+        producto.slug = nuevo
+
+    @staticmethod
+    def asegurar_slugs(db: Session) -> int:
+        """
+        Asigna slug a los productos que aún no lo tienen (backfill).
+        Los productos más antiguos conservan el slug sin sufijo.
+
+        Returns:
+            int: Cantidad de productos actualizados
+        """
+        pendientes = db.query(ProductoDB).filter(ProductoDB.slug.is_(None)).order_by(ProductoDB.id_producto).all()
+        if not pendientes:
+            return 0
+        ocupados = {row[0] for row in db.query(ProductoDB.slug).filter(ProductoDB.slug.isnot(None)).all()}
+        ocupados |= {row[0] for row in db.query(ProductoSlugHistorialDB.slug).all()}
+        for p in pendientes:
+            base = ProductoController._slugify_nombre(p.nombre) or "producto"
+            p.slug = ProductoController._primer_slug_libre(base, ocupados)
+            ocupados.add(p.slug)
+        db.commit()
+        invalidar_catalogo()
+        return len(pendientes)
+
+    @staticmethod
+    def obtener_slug_vigente(db: Session, slug: str) -> Optional[str]:
+        """
+        Resuelve un slug antiguo (historial) al slug vigente de su producto catalogado.
+
+        Returns:
+            Optional[str]: Slug vigente o None si el slug no está en el historial
+        """
+        fila = db.query(ProductoDB.slug).join(
+            ProductoSlugHistorialDB, ProductoSlugHistorialDB.id_producto == ProductoDB.id_producto
+        ).filter(
+            ProductoSlugHistorialDB.slug == slug,
+            ProductoDB.en_catalogo == True,
+            ProductoDB.estado == "activo"
+        ).first()
+        return fila[0] if fila and fila[0] else None
+
     """Controlador para manejo de productos unificado con inventario"""
     
     @staticmethod
-    async def obtener_total_catalogo(db: Session) -> int:
+    def obtener_total_catalogo(db: Session, precio_min: Optional[float] = None, precio_max: Optional[float] = None) -> int:
         """
         Obtiene el total de productos en el catálogo público
         
         Args:
             db: Sesión de base de datos
+            precio_min: Precio final mínimo (opcional)
+            precio_max: Precio final máximo (opcional)
             
         Returns:
             int: Total de productos en catálogo
         """
+        clave = (version_catalogo(), "total", precio_min, precio_max)
+        total = catalogo_cache.obtener(clave)
+        if total is not CacheLRU.AUSENTE:
+            return total
         try:
-            total = db.query(ProductoDB).filter(
+            query = db.query(ProductoDB).filter(
                 ProductoDB.en_catalogo == True,
                 ProductoDB.estado == "activo"
-            ).count()
+            )
+            query = ProductoController._filtrar_catalogo_por_precio(query, datetime.utcnow(), precio_min, precio_max)
+            total = query.count()
             
+            catalogo_cache.guardar(clave, total)
             return total
             
         except Exception as e:
@@ -67,7 +173,7 @@ class ProductoController:
             )
 
     @staticmethod
-    async def obtener_inventario_por_id(inventario_id: int, db: Session) -> ProductoInventario:
+    def obtener_inventario_por_id(inventario_id: int, db: Session) -> ProductoInventario:
         """
         Obtiene un inventario específico por su ID
         
@@ -100,7 +206,54 @@ class ProductoController:
             )
     
     @staticmethod
-    async def obtener_catalogo_publico(db: Session, skip: int = 0, limit: int = 10) -> List[ProductoCatalogo]:
+    def _filtrar_catalogo_por_precio(query, ahora: datetime, precio_min: Optional[float] = None, precio_max: Optional[float] = None):
+        """Aplica filtros sobre el precio final (con oferta) calculado en la base de datos"""
+        if precio_min is not None:
+            query = query.filter(precio_final_sql(ahora) >= precio_min)
+        if precio_max is not None:
+            query = query.filter(precio_final_sql(ahora) <= precio_max)
+        return query
+
+    @staticmethod
+    def _construir_producto_catalogo(p: ProductoDB, precio: PrecioCalculado, completar: bool = True) -> ProductoCatalogo:
+        """Construye el ProductoCatalogo de un producto con su precio ya calculado"""
+        return ProductoCatalogo(
+            id_producto=p.id_producto,
+            nombre=p.nombre,
+            slug=p.slug,
+            descripcion=(p.descripcion or "Sin descripción") if completar else p.descripcion,
+            imagen_url=(p.imagen_url or "/images/default-product.jpg") if completar else p.imagen_url,
+            imagen_tarjeta_url=p.imagen_tarjeta_url or p.imagen_url,
+            imagen_miniatura_url=p.imagen_miniatura_url or p.imagen_tarjeta_url or p.imagen_url,
+            marca=p.marca or "Sin marca",
+            caracteristicas=(p.caracteristicas or "Sin características especificadas") if completar else p.caracteristicas,
+            garantia_meses=getattr(p, 'garantia_meses', None),
+            modelo=getattr(p, 'modelo', None),
+            color=getattr(p, 'color', None),
+            material=getattr(p, 'material', None),
+            precio_venta=precio.precio_base,
+            id_categoria=p.id_categoria,
+            id_subcategoria=p.id_subcategoria,
+            disponible=(p.cantidad_disponible or 0) > 0,
+            fecha_agregado_catalogo=p.fecha_actualizacion,
+            oferta_activa=getattr(p, 'oferta_activa', False),
+            tipo_oferta=getattr(p, 'tipo_oferta', None),
+            valor_oferta=float(getattr(p, 'valor_oferta', 0) or 0),
+            fecha_inicio_oferta=getattr(p, 'fecha_inicio_oferta', None),
+            fecha_fin_oferta=getattr(p, 'fecha_fin_oferta', None),
+            precio_final=precio.precio_final
+        )
+
+    @staticmethod
+    def obtener_catalogo_publico(
+        db: Session,
+        skip: int = 0,
+        limit: int = 10,
+        orden: Optional[str] = None,
+        precio_min: Optional[float] = None,
+        precio_max: Optional[float] = None,
+        cursor: Optional[str] = None
+    ) -> List[ProductoCatalogo]:
         """
         Obtiene todos los productos que están en el catálogo público con paginación
         
@@ -108,72 +261,57 @@ class ProductoController:
             db: Sesión de base de datos
             skip: Número de registros a omitir
             limit: Número máximo de registros a devolver
+            orden: 'precio_asc' | 'precio_desc' para ordenar por precio final (opcional)
+            precio_min: Precio final mínimo (opcional)
+            precio_max: Precio final máximo (opcional)
+            cursor: Cursor de paginación (si se entrega, se ignora skip)
             
         Returns:
             List[ProductoCatalogo]: Lista de productos en catálogo público
         """
+        # La versión se lee antes de consultar: si hay una mutación en paralelo, el resultado
+        # queda guardado bajo la versión anterior y ya no es alcanzable
+        limit = acotar_limite(limit)
+        clave = (version_catalogo(), "lista", skip, limit, orden, precio_min, precio_max, cursor)
+        resultado = catalogo_cache.obtener(clave)
+        if resultado is not CacheLRU.AUSENTE:
+            return resultado
         try:
-            productos = db.query(ProductoDB).options(
-                joinedload(ProductoDB.categoria),
-                joinedload(ProductoDB.subcategoria)
-            ).filter(
+            ahora = datetime.utcnow()
+            query = db.query(ProductoDB).filter(
                 ProductoDB.en_catalogo == True,
                 ProductoDB.estado == "activo"
-            ).offset(skip).limit(limit).all()
-            
-            catalogo_productos = []
-            for p in productos:
-                # Crear producto de catálogo con valores por defecto si faltan datos
-                # Calcular precio final con oferta si aplica
-                precio_base = float(p.precio_venta) if p.precio_venta else 0
-                precio_final = precio_base
-                try:
-                    aplica_oferta = bool(getattr(p, 'oferta_activa', False))
-                    if aplica_oferta:
-                        # Validar rango de fechas
-                        inicio_ok = True
-                        fin_ok = True
-                        if getattr(p, 'fecha_inicio_oferta', None):
-                            inicio_ok = datetime.utcnow() >= p.fecha_inicio_oferta
-                        if getattr(p, 'fecha_fin_oferta', None):
-                            fin_ok = datetime.utcnow() <= p.fecha_fin_oferta
-                        if inicio_ok and fin_ok:
-                            tipo = getattr(p, 'tipo_oferta', None)
-                            valor = float(getattr(p, 'valor_oferta', 0) or 0)
-                            if tipo == 'porcentaje' and valor > 0:
-                                precio_final = max(0.0, round(precio_base * (1 - valor / 100), 2))
-                            elif tipo == 'fijo' and valor > 0:
-                                precio_final = max(0.0, round(precio_base - valor, 2))
-                except Exception:
-                    # En caso de cualquier error, usar precio base
-                    precio_final = precio_base
-                producto_catalogo = ProductoCatalogo(
-                    id_producto=p.id_producto,
-                    nombre=p.nombre,
-                    descripcion=p.descripcion or "Sin descripción",
-                    imagen_url=p.imagen_url or "/images/default-product.jpg",
-                    marca=p.marca or "Sin marca",
-                    caracteristicas=p.caracteristicas or "Sin características especificadas",
-                    garantia_meses=getattr(p, 'garantia_meses', None),
-                    modelo=getattr(p, 'modelo', None),
-                    color=getattr(p, 'color', None),
-                    material=getattr(p, 'material', None),
-                    precio_venta=precio_base,
-                    id_categoria=p.id_categoria,
-                    id_subcategoria=p.id_subcategoria,
-                    disponible=(p.cantidad_disponible or 0) > 0,
-                    fecha_agregado_catalogo=p.fecha_actualizacion,
-                    oferta_activa=getattr(p, 'oferta_activa', False),
-                    tipo_oferta=getattr(p, 'tipo_oferta', None),
-                    valor_oferta=float(getattr(p, 'valor_oferta', 0) or 0),
-                    fecha_inicio_oferta=getattr(p, 'fecha_inicio_oferta', None),
-                    fecha_fin_oferta=getattr(p, 'fecha_fin_oferta', None),
-                    precio_final=precio_final
-                )
-                catalogo_productos.append(producto_catalogo)
+            )
+            query = ProductoController._filtrar_catalogo_por_precio(query, ahora, precio_min, precio_max)
+            precio_sql = precio_final_centavos_sql(ahora)
+            if cursor:
+                if orden in ("precio_asc", "precio_desc"):
+                    valores = decodificar_cursor(cursor, f"catalogo_{orden}", (int, int))
+                    query = query.filter(filtro_posterior(
+                        (precio_sql, ProductoDB.id_producto), valores, descendente=orden == "precio_desc"
+                    ))
+                else:
+                    (ultimo_id,) = decodificar_cursor(cursor, "catalogo", (int,))
+                    query = query.filter(ProductoDB.id_producto > ultimo_id)
+                skip = 0
+            if orden == "precio_asc":
+                query = query.order_by(precio_sql.asc(), ProductoDB.id_producto)
+            elif orden == "precio_desc":
+                query = query.order_by(precio_sql.desc(), ProductoDB.id_producto.desc())
+            else:
+                query = query.order_by(ProductoDB.id_producto)
+            productos = query.offset(skip).limit(limit).all()
             
-            return catalogo_productos
+            precios = calcular_precios(productos, ahora)
+            resultado = [
+                ProductoController._construir_producto_catalogo(p, precio)
+                for p, precio in zip(productos, precios)
+            ]
+            catalogo_cache.guardar(clave, resultado)
+            return resultado
             
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -181,74 +319,27 @@ class ProductoController:
             )
 
     @staticmethod
-    async def obtener_catalogo_por_slug(db: Session, slug: str) -> ProductoCatalogo:
+    def obtener_catalogo_por_slug(db: Session, slug: str) -> ProductoCatalogo:
         """
-        Obtiene un producto del catálogo público a partir del slug (derivado del nombre)
+        Obtiene un producto del catálogo público a partir de su slug persistido (columna indexada)
         """
+        clave = (version_catalogo(), "slug", slug)
+        resultado = catalogo_cache.obtener(clave)
+        if resultado is not CacheLRU.AUSENTE:
+            return resultado
         try:
-            productos = db.query(ProductoDB).options(
-                joinedload(ProductoDB.categoria),
-                joinedload(ProductoDB.subcategoria)
-            ).filter(
+            candidato = db.query(ProductoDB).filter(
+                ProductoDB.slug == slug,
                 ProductoDB.en_catalogo == True,
                 ProductoDB.estado == "activo"
-            ).all()
-
-            candidato = None
-            for p in productos:
-                if ProductoController._slugify_nombre(p.nombre) == slug:
-                    candidato = p
-                    break
+            ).first()
 
             if not candidato:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado por slug")
 
-            precio_base = float(candidato.precio_venta) if candidato.precio_venta else 0
-            precio_final = precio_base
-            try:
-                aplica_oferta = bool(getattr(candidato, 'oferta_activa', False))
-                if aplica_oferta:
-                    inicio_ok = True
-                    fin_ok = True
-                    if getattr(candidato, 'fecha_inicio_oferta', None):
-                        inicio_ok = datetime.utcnow() >= candidato.fecha_inicio_oferta
-                    if getattr(candidato, 'fecha_fin_oferta', None):
-                        fin_ok = datetime.utcnow() <= candidato.fecha_fin_oferta
-                    if inicio_ok and fin_ok:
-                        tipo = getattr(candidato, 'tipo_oferta', None)
-                        valor = float(getattr(candidato, 'valor_oferta', 0) or 0)
-                        if tipo == 'porcentaje' and valor > 0:
-                            precio_final = max(0.0, round(precio_base * (1 - valor / 100), 2))
-                        elif tipo == 'fijo' and valor > 0:
-                            precio_final = max(0.0, round(precio_base - valor, 2))
-            except Exception:
-                precio_final = precio_base
-
-            producto_catalogo = ProductoCatalogo(
-                id_producto=candidato.id_producto,
-                nombre=candidato.nombre,
-                descripcion=candidato.descripcion or "Sin descripción",
-                imagen_url=candidato.imagen_url or "/images/default-product.jpg",
-                marca=candidato.marca or "Sin marca",
-                caracteristicas=candidato.caracteristicas or "Sin características especificadas",
-                garantia_meses=getattr(candidato, 'garantia_meses', None),
-                modelo=getattr(candidato, 'modelo', None),
-                color=getattr(candidato, 'color', None),
-                material=getattr(candidato, 'material', None),
-                precio_venta=precio_base,
-                id_categoria=candidato.id_categoria,
-                id_subcategoria=candidato.id_subcategoria,
-                disponible=(candidato.cantidad_disponible or 0) > 0,
-                fecha_agregado_catalogo=candidato.fecha_actualizacion,
-                oferta_activa=getattr(candidato, 'oferta_activa', False),
-                tipo_oferta=getattr(candidato, 'tipo_oferta', None),
-                valor_oferta=float(getattr(candidato, 'valor_oferta', 0) or 0),
-                fecha_inicio_oferta=getattr(candidato, 'fecha_inicio_oferta', None),
-                fecha_fin_oferta=getattr(candidato, 'fecha_fin_oferta', None),
-                precio_final=precio_final
-            )
-
-            return producto_catalogo
+            resultado = ProductoController._construir_producto_catalogo(candidato, calcular_precio(candidato))
+            catalogo_cache.guardar(clave, resultado)
+            return resultado
 
         except HTTPException:
             raise
@@ -259,7 +350,7 @@ class ProductoController:
             )
     
     @staticmethod
-    async def agregar_producto_a_catalogo(producto_id: int, datos_catalogo: AgregarACatalogo, db: Session) -> ProductoCatalogo:
+    def agregar_producto_a_catalogo(producto_id: int, datos_catalogo: AgregarACatalogo, db: Session) -> ProductoCatalogo:
         """
         Agrega un producto del inventario al catálogo público
         
@@ -284,41 +375,21 @@ class ProductoController:
                     detail="Producto no encontrado en inventario"
                 )
             
-            # Manejar la imagen
-            imagen_url = datos_catalogo.imagen_url
-            
-            # Si se proporciona imagen_base64, subirla a Cloudinary
+            # Manejar la imagen: una URL externa se guarda tal cual; imagen_base64 pasa por
+            # el pipeline (variantes reducidas + almacenamiento)
+            ProductoController._asignar_imagenes(producto, datos_catalogo.imagen_url)
             if datos_catalogo.imagen_base64:
                 try:
-                    # Extraer el contenido base64 (remover el prefijo data:image/...;base64,)
-                    if ',' in datos_catalogo.imagen_base64:
-                        base64_data = datos_catalogo.imagen_base64.split(',')[1]
-                    else:
-                        base64_data = datos_catalogo.imagen_base64
-                    
-                    # Decodificar base64
-                    image_data = base64.b64decode(base64_data)
-                    
-                    # Subir a Cloudinary
-                    imagen_url = await upload_image(
-                        image_data, 
-                        public_id=f"producto_{producto_id}_{uuid.uuid4().hex[:8]}"
-                    )
-                    
-                    if not imagen_url:
-                        raise HTTPException(
-                            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail="Error al subir imagen a Cloudinary"
-                        )
-                        
+                    ProductoController._asignar_imagenes(producto, variantes=pipeline_imagenes.procesar(
+                        decodificar_base64(datos_catalogo.imagen_base64), prefijo_producto(producto_id)
+                    ))
                 except Exception as e:
                     print(f"Error al procesar imagen base64: {e}")
                     # Si falla la subida de imagen, continuar sin imagen
-                    imagen_url = None
+                    ProductoController._asignar_imagenes(producto, None)
             
             # Actualizar el producto con los datos del catálogo
             producto.descripcion = datos_catalogo.descripcion
-            producto.imagen_url = imagen_url
             producto.caracteristicas = datos_catalogo.caracteristicas
             # Nuevos campos de detalle
             try:
@@ -344,55 +415,11 @@ class ProductoController:
             producto.en_catalogo = True
             
             db.commit()
+            invalidar_catalogo()
             db.refresh(producto)
             
-            # Crear y retornar el objeto ProductoCatalogo
-            # Calcular precio final con oferta si aplica
-            precio_base = float(producto.precio_venta) if producto.precio_venta else 0
-            precio_final = precio_base
-            try:
-                aplica_oferta = bool(getattr(producto, 'oferta_activa', False))
-                if aplica_oferta:
-                    inicio_ok = True
-                    fin_ok = True
-                    if getattr(producto, 'fecha_inicio_oferta', None):
-                        inicio_ok = datetime.utcnow() >= producto.fecha_inicio_oferta
-                    if getattr(producto, 'fecha_fin_oferta', None):
-                        fin_ok = datetime.utcnow() <= producto.fecha_fin_oferta
-                    if inicio_ok and fin_ok:
-                        tipo = getattr(producto, 'tipo_oferta', None)
-                        valor = float(getattr(producto, 'valor_oferta', 0) or 0)
-                        if tipo == 'porcentaje' and valor > 0:
-                            precio_final = max(0.0, round(precio_base * (1 - valor / 100), 2))
-                        elif tipo == 'fijo' and valor > 0:
-                            precio_final = max(0.0, round(precio_base - valor, 2))
-            except Exception:
-                precio_final = precio_base
-            producto_catalogo = ProductoCatalogo(
-                id_producto=producto.id_producto,
-                nombre=producto.nombre,
-                descripcion=producto.descripcion,
-                imagen_url=producto.imagen_url,
-                marca=producto.marca or "Sin marca",
-                caracteristicas=producto.caracteristicas,
-                garantia_meses=getattr(producto, 'garantia_meses', None),
-                modelo=getattr(producto, 'modelo', None),
-                color=getattr(producto, 'color', None),
-                material=getattr(producto, 'material', None),
-                precio_venta=precio_base,
-                id_categoria=producto.id_categoria,
-                id_subcategoria=producto.id_subcategoria,
-                disponible=(producto.cantidad_disponible or 0) > 0,
-                fecha_agregado_catalogo=producto.fecha_actualizacion,
-                oferta_activa=getattr(producto, 'oferta_activa', False),
-                tipo_oferta=getattr(producto, 'tipo_oferta', None),
-                valor_oferta=float(getattr(producto, 'valor_oferta', 0) or 0),
-                fecha_inicio_oferta=getattr(producto, 'fecha_inicio_oferta', None),
-                fecha_fin_oferta=getattr(producto, 'fecha_fin_oferta', None),
-                precio_final=precio_final
-            )
-            
-            return producto_catalogo
+            # Crear y retornar el objeto ProductoCatalogo con el precio final vigente
+            return ProductoController._construir_producto_catalogo(producto, calcular_precio(producto), completar=False)
             
         except HTTPException:
             raise
@@ -404,7 +431,7 @@ class ProductoController:
             )
 
     @staticmethod
-    async def quitar_producto_de_catalogo(producto_id: int, db: Session) -> dict:
+    def quitar_producto_de_catalogo(producto_id: int, db: Session) -> dict:
         """
         Quita un producto del catálogo público (cambia en_catalogo a False)
         
@@ -434,11 +461,12 @@ class ProductoController:
             # Cambiar en_catalogo a False y limpiar campos opcionales
             producto.en_catalogo = False
             producto.descripcion = None
-            producto.imagen_url = None
+            ProductoController._asignar_imagenes(producto, None)
             producto.marca = None
             producto.caracteristicas = None
             
             db.commit()
+            invalidar_catalogo()
             
             return {"message": "Producto quitado del catálogo exitosamente"}
             
@@ -452,7 +480,7 @@ class ProductoController:
             )
 
     @staticmethod
-    async def obtener_inventario_por_id_alt(inventario_id: int, db: Session) -> ProductoInventario:
+    def obtener_inventario_por_id_alt(inventario_id: int, db: Session) -> ProductoInventario:
         """
         Obtiene un inventario específico por su ID (método alternativo)
         
@@ -487,7 +515,7 @@ class ProductoController:
             )
 
     @staticmethod
-    async def actualizar_inventario_por_id(inventario_id: int, inventario_data: dict, db: Session) -> ProductoInventario:
+    def actualizar_inventario_por_id(inventario_id: int, inventario_data: dict, db: Session) -> ProductoInventario:
         """
         Actualiza un inventario específico por su ID
         
@@ -515,10 +543,11 @@ class ProductoController:
                 producto.cantidad_disponible = inventario_data['cantidad']
             
             db.commit()
+            invalidar_catalogo()
             db.refresh(producto)
             
             # Retornar el inventario actualizado
-            return await ProductoController.obtener_inventario_por_id_alt(inventario_id, db)
+            return ProductoController.obtener_inventario_por_id_alt(inventario_id, db)
             
         except HTTPException:
             raise
@@ -530,7 +559,7 @@ class ProductoController:
             )
 
     @staticmethod
-    async def eliminar_inventario_por_id(inventario_id: int, db: Session) -> dict:
+    def eliminar_inventario_por_id(inventario_id: int, db: Session) -> dict:
         """
         Elimina un inventario específico por su ID
         
@@ -552,6 +581,7 @@ class ProductoController:
             
             db.delete(producto)
             db.commit()
+            invalidar_catalogo()
             
             return {"message": "Inventario eliminado exitosamente"}
             
@@ -571,7 +601,7 @@ class ProductoController:
             )
 
     @staticmethod
-    async def crear_producto(producto: ProductoCreate, db: Session) -> Producto:
+    def crear_producto(producto: ProductoCreate, db: Session) -> Producto:
         """
         Crea un nuevo producto con información de inventario integrada
         
@@ -629,9 +659,11 @@ class ProductoController:
             producto_data['codigo_interno'] = codigo_interno
             
             db_producto = ProductoDB(**producto_data)
+            db_producto.slug = ProductoController._generar_slug_unico(db, db_producto.nombre)
             
             db.add(db_producto)
             db.commit()
+            invalidar_catalogo()
             db.refresh(db_producto)
             
             # Cargar relaciones
@@ -648,6 +680,8 @@ class ProductoController:
                 "descripcion": db_producto.descripcion,
                 "codigo_interno": db_producto.codigo_interno,
                 "imagen_url": db_producto.imagen_url,
+                "imagen_tarjeta_url": db_producto.imagen_tarjeta_url,
+                "imagen_miniatura_url": db_producto.imagen_miniatura_url,
                 "id_categoria": db_producto.id_categoria,
                 "id_proveedor": db_producto.id_proveedor,
                 "id_subcategoria": db_producto.id_subcategoria,
@@ -689,7 +723,7 @@ class ProductoController:
             )
     
     @staticmethod
-    async def obtener_productos(db: Session, categoria_id: Optional[int] = None, proveedor_id: Optional[int] = None, skip: int = 0, limit: Optional[int] = None) -> List[Producto]:
+    def obtener_productos(db: Session, categoria_id: Optional[int] = None, proveedor_id: Optional[int] = None, skip: int = 0, limit: Optional[int] = None, cursor: Optional[str] = None) -> List[Producto]:
         """
         Obtiene todos los productos con información de inventario integrada
         
@@ -698,8 +732,8 @@ class ProductoController:
             categoria_id: ID de categoría para filtrar (opcional)
             proveedor_id: ID de proveedor para filtrar (opcional)
             skip: Número de registros a omitir (opcional, por defecto 0)
-            limit: Número máximo de registros a devolver (opcional; si no se
-                especifica, se devuelve todo)
+            limit: Número máximo de registros a devolver (acotado a LIMITE_MAXIMO)
+            cursor: Cursor de paginación (si se entrega, se ignora skip)
             
         Returns:
             List[Producto]: Lista de productos
@@ -716,9 +750,11 @@ class ProductoController:
             if proveedor_id:
                 query = query.filter(ProductoDB.id_proveedor == proveedor_id)
             
-            if limit is not None:
-                query = query.offset(skip).limit(limit)
-            productos = query.all()
+            if cursor:
+                (ultimo_id,) = decodificar_cursor(cursor, "productos", (int,))
+                query = query.filter(ProductoDB.id_producto > ultimo_id)
+                skip = 0
+            productos = query.order_by(ProductoDB.id_producto).offset(skip).limit(acotar_limite(limit)).all()
             
             # Convertir manualmente para manejar fechas y relaciones
             productos_convertidos = []
@@ -729,6 +765,8 @@ class ProductoController:
                     "descripcion": p.descripcion,
                     "codigo_interno": p.codigo_interno,
                     "imagen_url": p.imagen_url,
+                    "imagen_tarjeta_url": p.imagen_tarjeta_url,
+                    "imagen_miniatura_url": p.imagen_miniatura_url,
                     "id_categoria": p.id_categoria,
                     "id_proveedor": p.id_proveedor,
                     "id_subcategoria": p.id_subcategoria,
@@ -765,6 +803,8 @@ class ProductoController:
             
             return productos_convertidos
             
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -772,7 +812,7 @@ class ProductoController:
             )
     
     @staticmethod
-    async def obtener_producto(producto_id: int, db: Session) -> Producto:
+    def obtener_producto(producto_id: int, db: Session) -> Producto:
         """
         Obtiene un producto por ID con información de inventario
         
@@ -799,36 +839,12 @@ class ProductoController:
                     detail="Producto no encontrado"
                 )
             
-            # Crear el objeto Producto manualmente para evitar problemas de serialización
-            categoria_nombre = None
-            proveedor_nombre = None
-            subcategoria_nombre = None
-            
-            # Obtener nombre de categoría si existe
-            if producto.categoria:
-                categoria_nombre = producto.categoria.nombre
-            elif producto.id_categoria:
-                # Si no se cargó la relación, buscar manualmente
-                categoria = db.query(CategoriaDB).filter(CategoriaDB.id_categoria == producto.id_categoria).first()
-                if categoria:
-                    categoria_nombre = categoria.nombre
-            
-            # Obtener nombre de proveedor si existe
-            if producto.proveedor:
-                proveedor_nombre = producto.proveedor.nombre
-            elif producto.id_proveedor:
-                # Si no se cargó la relación, buscar manualmente
-                proveedor = db.query(ProveedorDB).filter(ProveedorDB.id_proveedor == producto.id_proveedor).first()
-                if proveedor:
-                    proveedor_nombre = proveedor.nombre
-
-            # Obtener nombre de subcategoría si existe
-            if hasattr(producto, 'subcategoria') and producto.subcategoria:
-                subcategoria_nombre = producto.subcategoria.nombre
-            elif getattr(producto, 'id_subcategoria', None):
-                sub = db.query(SubCategoriaDB).filter(SubCategoriaDB.id_subcategoria == producto.id_subcategoria).first()
-                if sub:
-                    subcategoria_nombre = sub.nombre
+            # Crear el objeto Producto manualmente para evitar problemas de serialización.
+            # Las relaciones vienen del joinedload (LEFT OUTER JOIN): si son None con la clave
+            # foránea puesta, la fila referida no existe y volver a buscarla no la encuentra
+            categoria_nombre = producto.categoria.nombre if producto.categoria else None
+            proveedor_nombre = producto.proveedor.nombre if producto.proveedor else None
+            subcategoria_nombre = producto.subcategoria.nombre if producto.subcategoria else None
             
             producto_dict = {
                 "id_producto": producto.id_producto,
@@ -836,6 +852,8 @@ class ProductoController:
                 "descripcion": producto.descripcion,
                 "codigo_interno": producto.codigo_interno,
                 "imagen_url": producto.imagen_url,
+                "imagen_tarjeta_url": producto.imagen_tarjeta_url,
+                "imagen_miniatura_url": producto.imagen_miniatura_url,
                 "id_categoria": producto.id_categoria,
                 "id_proveedor": producto.id_proveedor,
                 "id_subcategoria": getattr(producto, 'id_subcategoria', None),
@@ -880,7 +898,7 @@ class ProductoController:
             )
 
     @staticmethod
-    async def obtener_similares(producto_id: int, db: Session, limit: int = 6) -> List[dict]:
+    def obtener_similares(producto_id: int, db: Session, limit: int = 6) -> List[dict]:
         """
         Obtiene productos similares basados principalmente en la subcategoría.
         Filtros: estado activo, stock > 0, precio_venta > 0 y distinto del producto solicitado.
@@ -914,40 +932,20 @@ class ProductoController:
             similares = query.order_by(ProductoDB.fecha_actualizacion.desc()).limit(limit).all()
 
             resultado = []
-            for p in similares:
-                # Calcular oferta vigente y precio final
-                now = datetime.utcnow()
-                inicio = getattr(p, 'fecha_inicio_oferta', None)
-                fin = getattr(p, 'fecha_fin_oferta', None)
-                oferta_vigente = bool(getattr(p, 'oferta_activa', False)) and (not inicio or now >= inicio) and (not fin or now <= fin)
-                precio_original = float(p.precio_venta or 0)
-                precio_final = precio_original
-                descuento_pct = 0
-                valor = float(getattr(p, 'valor_oferta', 0) or 0)
-                tipo = getattr(p, 'tipo_oferta', None)
-                if oferta_vigente and valor > 0 and tipo:
-                    if tipo == 'porcentaje':
-                        desc = max(0.0, min(100.0, float(valor)))
-                        precio_final = max(0.0, precio_original * (1 - desc / 100.0))
-                        descuento_pct = int(round(desc))
-                    elif tipo == 'fijo':
-                        precio_final = max(0.0, precio_original - float(valor))
-                        if precio_original > 0:
-                            descuento_pct = int(round(((precio_original - precio_final) / precio_original) * 100))
-
+            for p, precio in zip(similares, calcular_precios(similares)):
                 resultado.append({
                     "id": p.id_producto,
                     "nombre": p.nombre,
                     "imagen": p.imagen_url,
-                    "precio": precio_final,
-                    "precio_original": precio_original if precio_final < precio_original else None,
-                    "tiene_oferta": precio_final < precio_original,
-                    "descuento_pct": descuento_pct,
+                    "precio": precio.precio_final,
+                    "precio_original": precio.precio_base if precio.precio_final < precio.precio_base else None,
+                    "tiene_oferta": precio.precio_final < precio.precio_base,
+                    "descuento_pct": precio.descuento_pct,
                     "oferta_activa": bool(getattr(p, 'oferta_activa', False)),
                     "tipo_oferta": getattr(p, 'tipo_oferta', None),
-                    "valor_oferta": valor,
-                    "fecha_inicio_oferta": inicio,
-                    "fecha_fin_oferta": fin,
+                    "valor_oferta": float(getattr(p, 'valor_oferta', 0) or 0),
+                    "fecha_inicio_oferta": getattr(p, 'fecha_inicio_oferta', None),
+                    "fecha_fin_oferta": getattr(p, 'fecha_fin_oferta', None),
                 })
 
             return resultado
@@ -960,7 +958,7 @@ class ProductoController:
             )
 
     @staticmethod
-    async def seed_ejemplos(db: Session) -> dict:
+    def seed_ejemplos(db: Session) -> dict:
         """
         Inserta datos de ejemplo: categorías, subcategorías y productos.
         Evita duplicados por nombre/código.
@@ -1046,13 +1044,15 @@ class ProductoController:
                 insertados += 1
 
             db.commit()
+            invalidar_catalogo()
+            ProductoController.asegurar_slugs(db)
             return {"insertados": insertados, "categorias": categorias_map, "subcategorias": subcats_map}
         except Exception as e:
             db.rollback()
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al insertar datos de ejemplo: {str(e)}")
     
     @staticmethod
-    async def actualizar_producto(producto_id: int, producto_update: ProductoUpdate, db: Session) -> Producto:
+    def actualizar_producto(producto_id: int, producto_update: ProductoUpdate, db: Session) -> Producto:
         """
         Actualiza un producto
         
@@ -1111,10 +1111,17 @@ class ProductoController:
                         )
             
             # Actualizar campos
-            for field, value in producto_update.dict(exclude_unset=True).items():
+            nombre_anterior = producto.nombre
+            cambios = producto_update.dict(exclude_unset=True)
+            if 'imagen_url' in cambios and cambios['imagen_url'] != producto.imagen_url:
+                ProductoController._asignar_imagenes(producto, cambios.pop('imagen_url'))
+            for field, value in cambios.items():
                 setattr(producto, field, value)
+            if producto.nombre != nombre_anterior or not producto.slug:
+                ProductoController._actualizar_slug(db, producto)
             
             db.commit()
+            invalidar_catalogo()
             db.refresh(producto)
             
             # Cargar relaciones
@@ -1160,6 +1167,8 @@ class ProductoController:
                 descripcion=producto.descripcion,
                 codigo_interno=producto.codigo_interno,
                 imagen_url=producto.imagen_url,
+                imagen_tarjeta_url=producto.imagen_tarjeta_url,
+                imagen_miniatura_url=producto.imagen_miniatura_url,
                 id_categoria=producto.id_categoria,
                 id_proveedor=producto.id_proveedor,
                 id_subcategoria=getattr(producto, 'id_subcategoria', None),
@@ -1199,7 +1208,7 @@ class ProductoController:
             )
     
     @staticmethod
-    async def eliminar_producto(producto_id: int, db: Session) -> dict:
+    def eliminar_producto(producto_id: int, db: Session) -> dict:
         """
         Elimina un producto
         
@@ -1223,6 +1232,7 @@ class ProductoController:
             
             db.delete(producto)
             db.commit()
+            invalidar_catalogo()
             
             return {"message": "Producto eliminado exitosamente"}
             
@@ -1236,7 +1246,22 @@ class ProductoController:
             )
     
     @staticmethod
-    async def subir_imagen_producto(producto_id: int, file: UploadFile, db: Session) -> dict:
+    def _asignar_imagenes(producto: ProductoDB, imagen_url: Optional[str] = None, variantes: Optional[dict] = None) -> None:
+        """
+        Asigna la imagen del producto: las variantes del pipeline (completa, tarjeta, miniatura)
+        o una sola URL externa, que deja sin variantes reducidas
+        """
+        if variantes:
+            producto.imagen_url = variantes["completa"]
+            producto.imagen_tarjeta_url = variantes.get("tarjeta")
+            producto.imagen_miniatura_url = variantes.get("miniatura")
+        else:
+            producto.imagen_url = imagen_url
+            producto.imagen_tarjeta_url = None
+            producto.imagen_miniatura_url = None
+
+    @staticmethod
+    def subir_imagen_producto(producto_id: int, file: UploadFile, db: Session) -> dict:
         """
         Sube una imagen para un producto
         
@@ -1259,18 +1284,21 @@ class ProductoController:
                     detail="Producto no encontrado"
                 )
             
-            # Subir imagen a Cloudinary
-            result = cloudinary.uploader.upload(
-                file.file,
-                folder="productos",
-                public_id=f"producto_{producto_id}_{uuid.uuid4().hex[:8]}"
-            )
+            # Variantes y subida en el pool de core/imagenes.py
+            variantes = pipeline_imagenes.procesar_archivo(file, prefijo_producto(producto_id))
             
-            # Actualizar URL en la base de datos
-            producto.imagen_url = result['secure_url']
+            # Actualizar URLs en la base de datos
+            ProductoController._asignar_imagenes(producto, variantes=variantes)
             db.commit()
+            invalidar_catalogo()
             
-            return {"imagen_url": result['secure_url']}
+            return {
+                "imagen_url": producto.imagen_url,
+                "imagen_tarjeta_url": producto.imagen_tarjeta_url,
+                "imagen_miniatura_url": producto.imagen_miniatura_url,
+                "imagen_tarjeta_url": producto.imagen_tarjeta_url,
+                "imagen_miniatura_url": producto.imagen_miniatura_url,
+            }
             
         except HTTPException:
             raise
@@ -1281,36 +1309,23 @@ class ProductoController:
             )
     
     @staticmethod
-    async def buscar_productos(query: str, db: Session) -> List[Producto]:
+    def buscar_productos(query: str, db: Session, skip: int = 0, limit: int = 20) -> dict:
         """
-        Busca productos por nombre o descripción
+        Busca productos por texto completo (ver BusquedaController)
         
         Args:
             query: Término de búsqueda
             db: Sesión de base de datos
+            skip: Número de resultados a omitir
+            limit: Número máximo de resultados a devolver
             
         Returns:
-            List[Producto]: Lista de productos encontrados
+            dict: {"total": int, "data": List[ProductoBusqueda]} ordenado por relevancia
         """
-        try:
-            productos = db.query(ProductoDB).options(
-                joinedload(ProductoDB.categoria),
-                joinedload(ProductoDB.proveedor)
-            ).filter(
-                ProductoDB.nombre.ilike(f"%{query}%") |
-                ProductoDB.descripcion.ilike(f"%{query}%")
-            ).all()
-            
-            return [Producto.from_orm(p) for p in productos]
-            
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error al buscar productos: {str(e)}"
-            )
+        return BusquedaController.buscar_productos(db, query, skip, limit)
     
     @staticmethod
-    async def actualizar_inventario_producto(producto_id: int, inventario_data: dict, db: Session) -> Producto:
+    def actualizar_inventario_producto(producto_id: int, inventario_data: dict, db: Session) -> Producto:
         """
         Actualiza la información de inventario de un producto
         
@@ -1339,6 +1354,7 @@ class ProductoController:
                     setattr(producto, campo, inventario_data[campo])
             
             db.commit()
+            invalidar_catalogo()
             db.refresh(producto)
             
             return Producto.from_orm(producto)
@@ -1353,7 +1369,7 @@ class ProductoController:
             )
 
     @staticmethod
-    async def obtener_inventario(db: Session, skip: int = 0, limit: int = 10, soloNoCatalogo: bool = False) -> List[ProductoInventario]:
+    def obtener_inventario(db: Session, skip: int = 0, limit: int = 10, soloNoCatalogo: bool = False, cursor: Optional[str] = None) -> List[ProductoInventario]:
         """
         Obtiene productos en formato de inventario que NO están catalogados con paginación
         
@@ -1369,6 +1385,7 @@ class ProductoController:
             # Obtener productos para inventario (incluir catalogados y no catalogados)
             query = db.query(ProductoDB).options(
                 joinedload(ProductoDB.categoria),
+                joinedload(ProductoDB.subcategoria),
                 joinedload(ProductoDB.proveedor)
             )
 
@@ -1376,11 +1393,18 @@ class ProductoController:
                 # Filtrar productos no catalogados
                 query = query.filter(ProductoDB.en_catalogo == False)
 
-            productos = query.offset(skip).limit(limit).all()
+            if cursor:
+                (ultimo_id,) = decodificar_cursor(cursor, "inventario", (int,))
+                query = query.filter(ProductoDB.id_producto > ultimo_id)
+                skip = 0
+
+            productos = query.order_by(ProductoDB.id_producto).offset(skip).limit(acotar_limite(limit)).all()
             
             inventario_list = [serialize_producto_inventario(p) for p in productos]
             return inventario_list
             
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1388,7 +1412,7 @@ class ProductoController:
             )
 
     @staticmethod
-    async def obtener_total_productos(db: Session, categoria_id: Optional[int] = None, proveedor_id: Optional[int] = None) -> int:
+    def obtener_total_productos(db: Session, categoria_id: Optional[int] = None, proveedor_id: Optional[int] = None) -> int:
         """
         Obtiene el total de productos aplicando filtros opcionales
         
@@ -1414,7 +1438,7 @@ class ProductoController:
             )
 
     @staticmethod
-    async def obtener_total_inventario(db: Session, soloNoCatalogo: bool = False) -> int:
+    def obtener_total_inventario(db: Session, soloNoCatalogo: bool = False) -> int:
         """
         Obtiene el total de productos en inventario que NO están catalogados
         
@@ -1440,7 +1464,7 @@ class ProductoController:
             )
 
     @staticmethod
-    async def obtener_resumen_inventario(db: Session) -> dict:
+    def obtener_resumen_inventario(db: Session) -> dict:
         """
         Obtiene un resumen del inventario total
         
@@ -1473,7 +1497,7 @@ class ProductoController:
             )
 
     @staticmethod
-    async def obtener_inventario_por_categoria(db: Session) -> list:
+    def obtener_inventario_por_categoria(db: Session) -> list:
         try:
             rows = db.query(
                 ProductoDB.id_categoria.label("id_categoria"),
@@ -1535,13 +1559,14 @@ class ProductoController:
                 if v:
                     v.total_venta = total
             db.commit()
+            invalidar_catalogo()
             return {"eliminados": len(targets), "ventas_ajustadas": len(venta_ids)}
         except Exception as e:
             db.rollback()
             raise HTTPException(status_code=500, detail=f"Error al purgar productos sin color: {str(e)}")
     
     @staticmethod
-    async def crear_producto_nuevo(producto: ProductoCreate, db: Session) -> Producto:
+    def crear_producto_nuevo(producto: ProductoCreate, db: Session) -> Producto:
         """
         Crea un nuevo producto (método alternativo para compatibilidad)
         
@@ -1552,10 +1577,10 @@ class ProductoController:
         Returns:
             Producto: Producto creado
         """
-        return await ProductoController.crear_producto(producto, db)
+        return ProductoController.crear_producto(producto, db)
 
     @staticmethod
-    async def actualizar_producto_catalogado(producto_id: int, datos_actualizacion: dict, db: Session) -> dict:
+    def actualizar_producto_catalogado(producto_id: int, datos_actualizacion: dict, db: Session) -> dict:
         """
         Actualiza un producto que ya está en el catálogo
         
@@ -1584,8 +1609,9 @@ class ProductoController:
                 )
             
             # Actualizar solo los campos permitidos para productos catalogados
-            if 'nombre' in datos_actualizacion:
+            if 'nombre' in datos_actualizacion and datos_actualizacion['nombre'] != producto.nombre:
                 producto.nombre = datos_actualizacion['nombre']
+                ProductoController._actualizar_slug(db, producto)
             if 'marca' in datos_actualizacion:
                 producto.marca = datos_actualizacion['marca']
             if 'descripcion' in datos_actualizacion:
@@ -1631,16 +1657,17 @@ class ProductoController:
             # Manejar imagen si se proporciona
             if 'imagen_base64' in datos_actualizacion and datos_actualizacion['imagen_base64']:
                 try:
-                    # Subir imagen a Cloudinary
-                    imagen_url = await upload_image(datos_actualizacion['imagen_base64'])
-                    producto.imagen_url = imagen_url
-                    print(f"Imagen actualizada para producto {producto_id}: {imagen_url}")
+                    ProductoController._asignar_imagenes(producto, variantes=pipeline_imagenes.procesar(
+                        decodificar_base64(datos_actualizacion['imagen_base64']), prefijo_producto(producto_id)
+                    ))
+                    print(f"Imagen actualizada para producto {producto_id}: {producto.imagen_url}")
                 except Exception as img_error:
                     print(f"Error al subir imagen: {str(img_error)}")
                     # No fallar la actualización si solo falla la imagen
                     pass
             
             db.commit()
+            invalidar_catalogo()
             
             return {"message": "Producto catalogado actualizado exitosamente"}
             
@@ -11,13 +11,14 @@ from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from typing import List
 from models.proveedor import ProveedorDB, ProveedorCreate, ProveedorUpdate, Proveedor
+from core.cache import invalidar
 
 
 class ProveedorController:
     """Controlador para manejo de proveedores"""
     
     @staticmethod
-    async def crear_proveedor(proveedor: ProveedorCreate, db: Session) -> Proveedor:
+    def crear_proveedor(proveedor: ProveedorCreate, db: Session) -> Proveedor:
         """
         Crea un nuevo proveedor
         
@@ -35,6 +36,7 @@ class ProveedorController:
             db_proveedor = ProveedorDB(**proveedor.dict())
             db.add(db_proveedor)
             db.commit()
+            invalidar("proveedores")
             db.refresh(db_proveedor)
             
             return Proveedor(
@@ -65,7 +67,7 @@ class ProveedorController:
             )
     
     @staticmethod
-    async def obtener_proveedores(db: Session) -> List[Proveedor]:
+    def obtener_proveedores(db: Session) -> List[Proveedor]:
         """
         Obtiene todos los proveedores
         
@@ -99,7 +101,7 @@ class ProveedorController:
             )
     
     @staticmethod
-    async def obtener_proveedor(proveedor_id: int, db: Session) -> Proveedor:
+    def obtener_proveedor(proveedor_id: int, db: Session) -> Proveedor:
         """
         Obtiene un proveedor por ID
         
@@ -143,7 +145,7 @@ class ProveedorController:
             )
     
     @staticmethod
-    async def actualizar_proveedor(proveedor_id: int, proveedor_update: ProveedorUpdate, db: Session) -> Proveedor:
+    def actualizar_proveedor(proveedor_id: int, proveedor_update: ProveedorUpdate, db: Session) -> Proveedor:
         """
         Actualiza un proveedor
         
@@ -189,6 +191,7 @@ class ProveedorController:
                 proveedor.celular = proveedor_update.celular
             
             db.commit()
+            invalidar("proveedores")
             db.refresh(proveedor)
             
             return Proveedor(
@@ -221,7 +224,7 @@ class ProveedorController:
             )
     
     @staticmethod
-    async def eliminar_proveedor(proveedor_id: int, db: Session) -> dict:
+    def eliminar_proveedor(proveedor_id: int, db: Session) -> dict:
         """
         Elimina un proveedor
         
@@ -245,6 +248,7 @@ class ProveedorController:
             
             db.delete(proveedor)
             db.commit()
+            invalidar("proveedores")
             
             return {"message": "Proveedor eliminado exitosamente"}
             
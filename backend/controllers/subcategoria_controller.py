@@ -12,11 +12,12 @@ from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 from models.subcategoria import SubCategoriaDB, SubCategoriaCreate, SubCategoriaUpdate, SubCategoria
 from models.categoria import CategoriaDB
+from core.cache import invalidar
 
 
 class SubCategoriaController:
     @staticmethod
-    async def crear_subcategoria(subcategoria: SubCategoriaCreate, db: Session) -> SubCategoria:
+    def crear_subcategoria(subcategoria: SubCategoriaCreate, db: Session) -> SubCategoria:
         try:
             # Validar categoría existente
             categoria = db.query(CategoriaDB).filter(CategoriaDB.id_categoria == subcategoria.id_categoria).first()
@@ -26,6 +27,7 @@ class SubCategoriaController:
             db_sub = SubCategoriaDB(**subcategoria.dict())
             db.add(db_sub)
             db.commit()
+            invalidar("subcategorias")
             db.refresh(db_sub)
 
             return SubCategoria(
@@ -42,7 +44,7 @@ class SubCategoriaController:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al crear subcategoría: {str(e)}")
 
     @staticmethod
-    async def obtener_subcategorias(db: Session, categoria_id: Optional[int] = None) -> List[SubCategoria]:
+    def obtener_subcategorias(db: Session, categoria_id: Optional[int] = None) -> List[SubCategoria]:
         try:
             query = db.query(SubCategoriaDB)
             if categoria_id is not None:
@@ -60,7 +62,7 @@ class SubCategoriaController:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al obtener subcategorías: {str(e)}")
 
     @staticmethod
-    async def obtener_subcategoria(subcategoria_id: int, db: Session) -> SubCategoria:
+    def obtener_subcategoria(subcategoria_id: int, db: Session) -> SubCategoria:
         try:
             sub = db.query(SubCategoriaDB).filter(SubCategoriaDB.id_subcategoria == subcategoria_id).first()
             if not sub:
@@ -77,7 +79,7 @@ class SubCategoriaController:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al obtener subcategoría: {str(e)}")
 
     @staticmethod
-    async def actualizar_subcategoria(subcategoria_id: int, sub_update: SubCategoriaUpdate, db: Session) -> SubCategoria:
+    def actualizar_subcategoria(subcategoria_id: int, sub_update: SubCategoriaUpdate, db: Session) -> SubCategoria:
         try:
             sub = db.query(SubCategoriaDB).filter(SubCategoriaDB.id_subcategoria == subcategoria_id).first()
             if not sub:
@@ -95,6 +97,7 @@ class SubCategoriaController:
                 sub.id_categoria = sub_update.id_categoria
 
             db.commit()
+            invalidar("subcategorias")
             db.refresh(sub)
 
             return SubCategoria(
@@ -113,13 +116,14 @@ class SubCategoriaController:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al actualizar subcategoría: {str(e)}")
 
     @staticmethod
-    async def eliminar_subcategoria(subcategoria_id: int, db: Session) -> dict:
+    def eliminar_subcategoria(subcategoria_id: int, db: Session) -> dict:
         try:
             sub = db.query(SubCategoriaDB).filter(SubCategoriaDB.id_subcategoria == subcategoria_id).first()
             if not sub:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Subcategoría no encontrada")
             db.delete(sub)
             db.commit()
+            invalidar("subcategorias")
             return {"message": "Subcategoría eliminada exitosamente"}
         except HTTPException:
             raise
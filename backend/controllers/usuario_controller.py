@@ -7,11 +7,13 @@ Maneja todas las operaciones CRUD de usuarios
 """
 
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.exc import IntegrityError
 from typing import List
 from models.usuario import UsuarioDB, UsuarioCreate, UsuarioUpdate, Usuario
-from core.auth import hash_contraseña
+from core.auth import hash_contraseña, invalidar_principal
+from core.purga import purgar_usuarios
+from core.trabajos import TrabajoCancelado
 import re
 
 
@@ -52,7 +54,7 @@ class UsuarioController:
     """Controlador para manejo de usuarios"""
     
     @staticmethod
-    async def crear_usuario(usuario: UsuarioCreate, db: Session) -> Usuario:
+    def crear_usuario(usuario: UsuarioCreate, db: Session) -> Usuario:
         """
         Crea un nuevo usuario
         
@@ -144,7 +146,7 @@ class UsuarioController:
     
     
     @staticmethod
-    async def obtener_usuarios(db: Session) -> List[Usuario]:
+    def obtener_usuarios(db: Session) -> List[Usuario]:
         """
         Obtiene todos los usuarios activos
         
@@ -155,7 +157,7 @@ class UsuarioController:
             List[Usuario]: Lista de usuarios activos
         """
         try:
-            usuarios = db.query(UsuarioDB).filter(UsuarioDB.activo == True).all()
+            usuarios = db.query(UsuarioDB).options(joinedload(UsuarioDB.rol_ref)).filter(UsuarioDB.activo == True).all()
             return usuarios
         except Exception as e:
             raise HTTPException(
@@ -164,7 +166,7 @@ class UsuarioController:
             )
 
     @staticmethod
-    async def obtener_usuarios_desactivados(db: Session) -> List[Usuario]:
+    def obtener_usuarios_desactivados(db: Session) -> List[Usuario]:
         """
         Obtiene todos los usuarios desactivados
         
@@ -175,7 +177,7 @@ class UsuarioController:
             List[Usuario]: Lista de usuarios desactivados
         """
         try:
-            usuarios = db.query(UsuarioDB).filter(UsuarioDB.activo == False).all()
+            usuarios = db.query(UsuarioDB).options(joinedload(UsuarioDB.rol_ref)).filter(UsuarioDB.activo == False).all()
             return usuarios
         except Exception as e:
             raise HTTPException(
@@ -184,7 +186,7 @@ class UsuarioController:
             )
     
     @staticmethod
-    async def obtener_usuario(rut: str, db: Session) -> Usuario:
+    def obtener_usuario(rut: str, db: Session) -> Usuario:
         """
         Obtiene un usuario por ID
         
@@ -216,7 +218,7 @@ class UsuarioController:
             )
     
     @staticmethod
-    async def actualizar_usuario(rut: str, usuario_update: UsuarioUpdate, db: Session) -> Usuario:
+    def actualizar_usuario(rut: str, usuario_update: UsuarioUpdate, db: Session) -> Usuario:
         """
         Actualiza un usuario
         
@@ -265,6 +267,7 @@ class UsuarioController:
                 usuario.email = usuario_update.email or None
             
             db.commit()
+            invalidar_principal(usuario.rut)
             db.refresh(usuario)
             
             return Usuario(
@@ -294,7 +297,7 @@ class UsuarioController:
             )
     
     @staticmethod
-    async def eliminar_usuario(rut: str, db: Session) -> dict:
+    def eliminar_usuario(rut: str, db: Session) -> dict:
         """
         Desactiva un usuario (eliminación lógica)
         
@@ -319,6 +322,7 @@ class UsuarioController:
             # Desactivar usuario en lugar de eliminarlo
             usuario.activo = False
             db.commit()
+            invalidar_principal(usuario.rut)
             
             return {"message": "Usuario desactivado exitosamente"}
             
@@ -332,7 +336,7 @@ class UsuarioController:
             )
 
     @staticmethod
-    async def activar_usuario(rut: str, db: Session) -> dict:
+    def activar_usuario(rut: str, db: Session) -> dict:
         """
         Activa un usuario previamente desactivado (alta lógica)
         
@@ -357,6 +361,7 @@ class UsuarioController:
             # Activar usuario
             usuario.activo = True
             db.commit()
+            invalidar_principal(usuario.rut)
 
             return {"message": "Usuario activado exitosamente"}
         except HTTPException:
@@ -369,19 +374,21 @@ class UsuarioController:
             )
 
     @staticmethod
-    async def eliminar_usuario_permanente(rut: str, db: Session) -> dict:
+    def eliminar_usuario_permanente(rut: str, db: Session) -> dict:
         """
-        Elimina permanentemente un usuario de la base de datos
+        Elimina permanentemente un usuario desactivado y sus datos relacionados
+        (ventas como cliente o repartidor, pagos, detalles, movimientos y despachos). Su
+        auditoría se conserva con usuario_rut en NULL.
         
         Args:
-            usuario_id: ID del usuario
+            rut: RUT del usuario
             db: Sesión de base de datos
             
         Returns:
-            dict: Mensaje de confirmación
+            dict: Mensaje de confirmación y filas borradas por tabla
             
         Raises:
-            HTTPException: Si el usuario no existe o hay error
+            HTTPException: Si el usuario no existe, sigue activo o hay error
         """
         try:
             usuario = db.query(UsuarioDB).filter(UsuarioDB.rut == rut).first()
@@ -393,50 +400,10 @@ class UsuarioController:
             # Solo permitir si está desactivado
             if usuario.activo:
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El usuario debe estar desactivado antes de eliminar permanentemente")
-            # Borrado en cascada manual de datos relacionados al usuario
-            from models.venta import VentaDB, MovimientoInventarioDB, DetalleVentaDB
-            from models.despacho import DespachoDB
-            from models.pago import PagoDB
-            from models.auditoria import AuditoriaDB
-
-            # 1) Eliminar movimientos de inventario asociados al usuario (sin venta)
-            movimientos_usuario = db.query(MovimientoInventarioDB).filter(MovimientoInventarioDB.rut_usuario == rut).all()
-            for m in movimientos_usuario:
-                db.delete(m)
-
-            # 2) Obtener ventas relacionadas al usuario
-            # Nota: el modelo VentaDB no tiene 'cliente_rut'. Usamos 'rut_usuario' (cliente/comprador)
-            # y también contemplamos 'repartidor_rut' por si el usuario figura como repartidor.
-            ventas_todas = db.query(VentaDB).filter((VentaDB.rut_usuario == rut) | (VentaDB.repartidor_rut == rut)).all()
-
-            # 2a) Eliminar movimientos de inventario asociados a cada venta (id_venta)
-            for v in ventas_todas:
-                movimientos_por_venta = db.query(MovimientoInventarioDB).filter(MovimientoInventarioDB.id_venta == v.id_venta).all()
-                for mv in movimientos_por_venta:
-                    db.delete(mv)
-                # Eliminar pagos asociados a la venta
-                pagos = db.query(PagoDB).filter(PagoDB.id_venta == v.id_venta).all()
-                for p in pagos:
-                    db.delete(p)
-                # Eliminar detalles de venta
-                detalles = db.query(DetalleVentaDB).filter(DetalleVentaDB.id_venta == v.id_venta).all()
-                for d in detalles:
-                    db.delete(d)
-
-            # 2b) Eliminar ventas (cascade elimina detalles_venta)
-            for v in ventas_todas:
-                db.delete(v)
 
-            # 3) Eliminar direcciones de despacho asociadas
-            despachos = db.query(DespachoDB).filter(DespachoDB.rut_usuario == rut).all()
-            for d in despachos:
-                db.delete(d)
-
-            # 4) Eliminar usuario
-            db.delete(usuario)
-            db.commit()
-
-            return {"message": "Usuario eliminado permanentemente"}
+            # La auditoría del usuario se conserva, sin usuario asociado
+            resumen = purgar_usuarios(db, UsuarioDB.rut == rut, conservar_auditoria=True)
+            return {"message": "Usuario eliminado permanentemente", "filas": resumen["filas"]}
             
         except HTTPException:
             raise
@@ -448,124 +415,37 @@ class UsuarioController:
             )
 
     @staticmethod
-    async def eliminar_usuarios_desactivados(db: Session) -> dict:
+    def eliminar_usuarios_desactivados(db: Session, progreso=None) -> dict:
         """
         Elimina permanentemente todos los usuarios desactivados (clientes y trabajadores)
-        realizando borrado en cascada seguro de datos relacionados.
+        con borrado en cascada por lotes (ver core.purga). `progreso` recibe el avance
+        después de cada lote.
         """
         try:
-            usuarios = db.query(UsuarioDB).filter(UsuarioDB.activo == False).all()
-            eliminados = 0
-            for usuario in usuarios:
-                uid = usuario.rut
-                from models.venta import VentaDB, MovimientoInventarioDB, DetalleVentaDB
-                from models.despacho import DespachoDB
-                from models.pago import PagoDB
-                from models.auditoria import AuditoriaDB
-
-                mov_sin_venta = db.query(MovimientoInventarioDB).filter(MovimientoInventarioDB.rut_usuario == uid, MovimientoInventarioDB.id_venta == None).all()
-                for m in mov_sin_venta:
-                    db.delete(m)
-
-                ventas_usuario = db.query(VentaDB).filter((VentaDB.rut_usuario == uid) | (VentaDB.repartidor_rut == uid)).all()
-                for v in ventas_usuario:
-                    movs = db.query(MovimientoInventarioDB).filter(MovimientoInventarioDB.id_venta == v.id_venta).all()
-                    for mv in movs:
-                        db.delete(mv)
-                    pays = db.query(PagoDB).filter(PagoDB.id_venta == v.id_venta).all()
-                    for p in pays:
-                        db.delete(p)
-                    dets = db.query(DetalleVentaDB).filter(DetalleVentaDB.id_venta == v.id_venta).all()
-                    for d in dets:
-                        db.delete(d)
-                    db.delete(v)
-
-                despachos = db.query(DespachoDB).filter(DespachoDB.rut_usuario == uid).all()
-                for d in despachos:
-                    db.delete(d)
-
-                auds = db.query(AuditoriaDB).filter(AuditoriaDB.usuario_rut == uid).all()
-                for a in auds:
-                    db.delete(a)
-
-                db.delete(usuario)
-                eliminados += 1
-
-            db.commit()
-            return {"eliminados": eliminados}
+            resumen = purgar_usuarios(db, UsuarioDB.activo == False, progreso=progreso)
+            return {"eliminados": resumen["usuarios"], **resumen}
+        except TrabajoCancelado:
+            raise
         except Exception as e:
             db.rollback()
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al eliminar usuarios desactivados: {str(e)}")
-            # 3b) Eliminar auditoría asociada al usuario
-            auds = db.query(AuditoriaDB).filter(AuditoriaDB.usuario_rut == uid).all()
-            for a in auds:
-                db.delete(a)
 
     @staticmethod
-    async def eliminar_clientes_y_compras(db: Session) -> dict:
+    def eliminar_clientes_y_compras(db: Session, progreso=None) -> dict:
         """
         Elimina de la base de datos todos los usuarios con role "cliente" y
         borra en cascada sus compras (ventas), pagos, detalles, movimientos de inventario,
-        direcciones de despacho y auditoría.
+        direcciones de despacho y auditoría, por lotes (ver core.purga).
         """
         try:
-            from models.venta import VentaDB, MovimientoInventarioDB, DetalleVentaDB
-            from models.despacho import DespachoDB
-            from models.pago import PagoDB
-            from models.auditoria import AuditoriaDB
-
-            from sqlalchemy import func
+            from sqlalchemy import func, select
             from models.rol import RolDB
-            clientes = (
-                db.query(UsuarioDB)
-                .join(RolDB, UsuarioDB.id_rol == RolDB.id_rol)
-                .filter(func.lower(RolDB.nombre) == 'cliente')
-                .all()
-            )
-            eliminados = 0
-
-            for cliente in clientes:
-                uid = cliente.rut
 
-                # Ventas relacionadas al usuario (como cliente/comprador o repartidor)
-                ventas_todas = db.query(VentaDB).filter((VentaDB.rut_usuario == uid) | (VentaDB.repartidor_rut == uid)).all()
-                for v in ventas_todas:
-                    # Eliminar movimientos generados por la venta
-                    movs = db.query(MovimientoInventarioDB).filter(MovimientoInventarioDB.id_venta == v.id_venta).all()
-                    for mv in movs:
-                        db.delete(mv)
-                    # Eliminar pagos de la venta
-                    pays = db.query(PagoDB).filter(PagoDB.id_venta == v.id_venta).all()
-                    for p in pays:
-                        db.delete(p)
-                    # Eliminar detalles de la venta
-                    dets = db.query(DetalleVentaDB).filter(DetalleVentaDB.id_venta == v.id_venta).all()
-                    for d in dets:
-                        db.delete(d)
-                    # Eliminar la venta
-                    db.delete(v)
-
-                # También eliminar movimientos de inventario sueltos del cliente (si existieran)
-                mov_sin_venta = db.query(MovimientoInventarioDB).filter(MovimientoInventarioDB.rut_usuario == uid, MovimientoInventarioDB.id_venta == None).all()
-                for m in mov_sin_venta:
-                    db.delete(m)
-
-                # Eliminar direcciones de despacho
-                despachos = db.query(DespachoDB).filter(DespachoDB.rut_usuario == uid).all()
-                for d in despachos:
-                    db.delete(d)
-
-                # Eliminar auditoría asociada al usuario
-                auds = db.query(AuditoriaDB).filter(AuditoriaDB.usuario_rut == uid).all()
-                for a in auds:
-                    db.delete(a)
-
-                # Finalmente eliminar el usuario cliente
-                db.delete(cliente)
-                eliminados += 1
-
-            db.commit()
-            return {"clientes_eliminados": eliminados}
+            roles_cliente = select(RolDB.id_rol).where(func.lower(RolDB.nombre) == 'cliente')
+            resumen = purgar_usuarios(db, UsuarioDB.id_rol.in_(roles_cliente), progreso=progreso)
+            return {"clientes_eliminados": resumen["usuarios"], **resumen}
+        except TrabajoCancelado:
+            raise
         except Exception as e:
             db.rollback()
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al eliminar clientes y compras: {str(e)}")
@@ -8,25 +8,165 @@ Controlador para gestión de ventas
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import desc, and_, func, or_
 from fastapi import HTTPException
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+from collections import defaultdict
 from datetime import datetime, date
 from decimal import Decimal
 from core.auth import hash_contraseña
 
 from models.venta import (
     VentaDB, DetalleVentaDB, MovimientoInventarioDB,
-    Venta, DetalleVenta, MovimientoInventario, VentaCreate, DetalleVentaCreate, VentaGuestCreate
+    Venta, DetalleVenta, MovimientoInventario, VentaCreate, DetalleVentaCreate, VentaGuestCreate,
+    CotizacionCarrito, LineaCotizacion
 )
 from models.producto import ProductoDB
 from models.pago import PagoDB
 from models.usuario import UsuarioDB
 from models.categoria import CategoriaDB
+from models.resumen_venta import ResumenVentaDiaDB, ResumenVentaProductoDB, ResumenVentaCategoriaDB
 from controllers.auditoria_controller import registrar_evento
+from core.cache import invalidar_catalogo
+from core.fechas import rango_dias
+from core.precios import calcular_precios
+from core import resumen_ventas
+from core.paginacion import acotar_limite, decodificar_cursor, filtro_posterior
 import json
 
+# Claves de orden para paginación por cursor (la última columna es la clave primaria)
+CLAVE_VENTAS = (VentaDB.fecha_venta, VentaDB.id_venta)
+CLAVE_MOVIMIENTOS = (MovimientoInventarioDB.fecha_movimiento, MovimientoInventarioDB.id_movimiento)
+
 
 class VentaController:
     """Controlador para gestión de ventas"""
+
+    @staticmethod
+    def _cargar_productos(db: Session, ids) -> Dict[int, ProductoDB]:
+        """
+        Carga en una sola consulta (IN) los productos referenciados por un carrito
+
+        Args:
+            db: Sesión de base de datos
+            ids: IDs de producto (se admiten repetidos)
+
+        Returns:
+            Dict[int, ProductoDB]: Productos encontrados por id_producto (los inexistentes no aparecen)
+        """
+        ids = set(ids)
+        if not ids:
+            return {}
+        productos = db.query(ProductoDB).filter(ProductoDB.id_producto.in_(ids)).populate_existing().all()
+        return {p.id_producto: p for p in productos}
+
+    @staticmethod
+    def _cantidades_por_producto(detalles) -> Dict[int, int]:
+        """Suma las cantidades de un carrito por producto (un mismo producto puede venir en varias líneas)"""
+        solicitado = defaultdict(int)
+        for detalle in detalles:
+            solicitado[detalle.id_producto] += detalle.cantidad
+        return solicitado
+
+    @staticmethod
+    def _reservar_stock(db: Session, detalles) -> Tuple[Dict[int, int], Dict[int, Optional[int]]]:
+        """
+        Descuenta el stock de los productos de una venta con UPDATE condicionales
+        (cantidad_disponible >= solicitado), de modo que dos checkouts concurrentes no
+        puedan vender la misma unidad. Las filas se bloquean en orden de id_producto para
+        evitar interbloqueos; el bloqueo se mantiene hasta el commit o rollback de la sesión.
+
+        Args:
+            db: Sesión de base de datos (transacción de la venta)
+            detalles: Detalles de la venta (id_producto, cantidad)
+
+        Returns:
+            Tuple: ({id_producto: stock previo a la venta}, {id_producto: id_categoria}); la
+            categoría se guarda en cada detalle para los resúmenes por categoría
+
+        Raises:
+            HTTPException: 404 si un producto no existe, 400 si la cantidad es inválida o no hay stock
+        """
+        for detalle in detalles:
+            if detalle.cantidad <= 0:
+                raise HTTPException(status_code=400, detail=f"Cantidad inválida para el producto {detalle.id_producto}")
+        solicitado = VentaController._cantidades_por_producto(detalles)
+
+        productos = VentaController._cargar_productos(db, solicitado)
+        for id_producto in solicitado:
+            if id_producto not in productos:
+                raise HTTPException(status_code=404, detail=f"Producto con ID {id_producto} no encontrado")
+
+        ahora = datetime.now()
+        for id_producto in sorted(solicitado):
+            cantidad = solicitado[id_producto]
+            actualizadas = db.query(ProductoDB).filter(
+                ProductoDB.id_producto == id_producto,
+                ProductoDB.cantidad_disponible >= cantidad
+            ).update({
+                ProductoDB.cantidad_disponible: ProductoDB.cantidad_disponible - cantidad,
+                ProductoDB.fecha_ultima_venta: ahora
+            }, synchronize_session=False)
+            if not actualizadas:
+                disponible = db.query(ProductoDB.cantidad_disponible).filter(ProductoDB.id_producto == id_producto).scalar()
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Stock insuficiente para {productos[id_producto].nombre}. Disponible: {disponible}, Solicitado: {cantidad}"
+                )
+
+        # Las filas quedan bloqueadas por los UPDATE: los valores leídos son los que dejó esta venta
+        productos = VentaController._cargar_productos(db, solicitado)
+        stock = {i: productos[i].cantidad_disponible + solicitado[i] for i in solicitado}
+        return stock, {i: productos[i].id_categoria for i in solicitado}
+
+    @staticmethod
+    def cotizar_carrito(db: Session, detalles) -> CotizacionCarrito:
+        """
+        Valida y cotiza un carrito sin crear la venta: disponibilidad por línea, precio final
+        con la oferta vigente, subtotales y total. Los productos se cargan en una sola consulta.
+
+        Args:
+            db: Sesión de base de datos
+            detalles: Líneas del carrito (id_producto, cantidad)
+
+        Returns:
+            CotizacionCarrito: Líneas cotizadas, total y si el carrito puede comprarse tal cual
+        """
+        productos = VentaController._cargar_productos(db, (d.id_producto for d in detalles))
+        solicitado = VentaController._cantidades_por_producto(detalles)
+        precios = dict(zip(productos, calcular_precios(productos.values())))
+
+        lineas = []
+        total_centavos = 0
+        for detalle in detalles:
+            producto = productos.get(detalle.id_producto)
+            if not producto:
+                lineas.append(LineaCotizacion(id_producto=detalle.id_producto, cantidad=detalle.cantidad, error="Producto no encontrado"))
+                continue
+            precio = precios[detalle.id_producto]
+            subtotal_centavos = round(precio.precio_final * 100) * max(detalle.cantidad, 0)
+            total_centavos += subtotal_centavos
+            error = None
+            if detalle.cantidad <= 0:
+                error = "Cantidad inválida"
+            elif solicitado[detalle.id_producto] > producto.cantidad_disponible:
+                error = "Stock insuficiente"
+            lineas.append(LineaCotizacion(
+                id_producto=producto.id_producto,
+                nombre=producto.nombre,
+                cantidad=detalle.cantidad,
+                stock_disponible=producto.cantidad_disponible,
+                disponible=error is None,
+                precio_base=precio.precio_base,
+                precio_final=precio.precio_final,
+                oferta_vigente=precio.oferta_vigente,
+                descuento_pct=precio.descuento_pct,
+                subtotal=subtotal_centavos / 100,
+                error=error
+            ))
+        return CotizacionCarrito(
+            lineas=lineas,
+            total=total_centavos / 100,
+            valido=bool(lineas) and all(l.disponible for l in lineas)
+        )
     
     @staticmethod
     def crear_venta(db: Session, venta_data: VentaCreate, rut_usuario: str) -> Venta:
@@ -40,25 +180,15 @@ class VentaController:
                 # No crear usuarios automáticamente. Forzar registro previo.
                 raise HTTPException(status_code=404, detail="Usuario no encontrado. Regístrese antes de realizar una venta")
             
-            # Verificar disponibilidad de productos y calcular total
+            # Reservar stock (UPDATE condicional por producto) y calcular total
+            stock, categorias = VentaController._reservar_stock(db, venta_data.detalles)
             total_calculado = Decimal('0.00')
             productos_verificados = []
             
             for detalle in venta_data.detalles:
-                producto = db.query(ProductoDB).filter(ProductoDB.id_producto == detalle.id_producto).first()
-                if not producto:
-                    raise HTTPException(status_code=404, detail=f"Producto con ID {detalle.id_producto} no encontrado")
-                
-                if producto.cantidad_disponible < detalle.cantidad:
-                    raise HTTPException(
-                        status_code=400, 
-                        detail=f"Stock insuficiente para {producto.nombre}. Disponible: {producto.cantidad_disponible}, Solicitado: {detalle.cantidad}"
-                    )
-                
                 subtotal = detalle.precio_unitario * detalle.cantidad
                 total_calculado += subtotal
                 productos_verificados.append({
-                    'producto': producto,
                     'detalle': detalle,
                     'subtotal': subtotal
                 })
@@ -83,7 +213,6 @@ class VentaController:
             
             # Crear detalles de venta y actualizar inventario
             for item in productos_verificados:
-                producto = item['producto']
                 detalle = item['detalle']
                 subtotal = item['subtotal']
                 
@@ -93,15 +222,15 @@ class VentaController:
                     id_producto=detalle.id_producto,
                     cantidad=detalle.cantidad,
                     precio_unitario=detalle.precio_unitario,
-                    subtotal=subtotal
+                    subtotal=subtotal,
+                    id_categoria=categorias[detalle.id_producto]
                 )
                 db.add(db_detalle)
                 
-                # Actualizar inventario
-                cantidad_anterior = producto.cantidad_disponible
+                # El stock ya se descontó en _reservar_stock; cada línea registra su tramo
+                cantidad_anterior = stock[detalle.id_producto]
                 cantidad_nueva = cantidad_anterior - detalle.cantidad
-                producto.cantidad_disponible = cantidad_nueva
-                producto.fecha_ultima_venta = datetime.now()
+                stock[detalle.id_producto] = cantidad_nueva
                 
                 # Registrar movimiento de inventario
                 movimiento = MovimientoInventarioDB(
@@ -116,7 +245,10 @@ class VentaController:
                 )
                 db.add(movimiento)
             
+            db.flush()
+            resumen_ventas.cambio_estado(db, db_venta.id_venta, None, db_venta.estado)
             db.commit()
+            invalidar_catalogo()
 
             # Auditoría: venta creada
             try:
@@ -125,7 +257,7 @@ class VentaController:
                     entidad_tipo="venta",
                     entidad_id=db_venta.id_venta,
                     accion="venta_creada",
-                    usuario_actor_id=None,
+                    usuario_rut=str(rut_usuario),
                     detalle=f"Total: {float(total_calculado)} | Detalles: {len(productos_verificados)}"
                 )
             except Exception:
@@ -269,22 +401,15 @@ class VentaController:
                     pass
                 rut_usuario = usuario_guest.rut
 
-            # Verificar disponibilidad de productos y calcular total
+            # Reservar stock (UPDATE condicional por producto) y calcular total
+            stock, categorias = VentaController._reservar_stock(db, venta_guest.detalles)
             total_calculado = Decimal('0.00')
             productos_verificados = []
 
             for detalle in venta_guest.detalles:
-                producto = db.query(ProductoDB).filter(ProductoDB.id_producto == detalle.id_producto).first()
-                if not producto:
-                    raise HTTPException(status_code=404, detail=f"Producto con ID {detalle.id_producto} no encontrado")
-                if producto.cantidad_disponible < detalle.cantidad:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Stock insuficiente para {producto.nombre}. Disponible: {producto.cantidad_disponible}, Solicitado: {detalle.cantidad}"
-                    )
                 subtotal = detalle.precio_unitario * detalle.cantidad
                 total_calculado += subtotal
-                productos_verificados.append({'producto': producto, 'detalle': detalle, 'subtotal': subtotal})
+                productos_verificados.append({'detalle': detalle, 'subtotal': subtotal})
 
             # Validar total enviado vs calculado (tolerancia mínima)
             try:
@@ -314,7 +439,6 @@ class VentaController:
 
             # Crear detalles y movimientos
             for item in productos_verificados:
-                producto = item['producto']
                 detalle = item['detalle']
                 subtotal = item['subtotal']
 
@@ -323,14 +447,14 @@ class VentaController:
                     id_producto=detalle.id_producto,
                     cantidad=detalle.cantidad,
                     precio_unitario=detalle.precio_unitario,
-                    subtotal=subtotal
+                    subtotal=subtotal,
+                    id_categoria=categorias[detalle.id_producto]
                 )
                 db.add(db_detalle)
 
-                cantidad_anterior = producto.cantidad_disponible
+                cantidad_anterior = stock[detalle.id_producto]
                 cantidad_nueva = cantidad_anterior - detalle.cantidad
-                producto.cantidad_disponible = cantidad_nueva
-                producto.fecha_ultima_venta = datetime.now()
+                stock[detalle.id_producto] = cantidad_nueva
 
                 movimiento = MovimientoInventarioDB(
                     id_producto=detalle.id_producto,
@@ -344,7 +468,10 @@ class VentaController:
                 )
                 db.add(movimiento)
 
+            db.flush()
+            resumen_ventas.cambio_estado(db, db_venta.id_venta, None, db_venta.estado)
             db.commit()
+            invalidar_catalogo()
 
             # Auditoría
             try:
@@ -374,30 +501,36 @@ class VentaController:
             raise HTTPException(status_code=500, detail=f"Error al crear venta como invitado: {str(e)}")
     
     @staticmethod
-    def obtener_ventas(db: Session, skip: int = 0, limit: int = 100, fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None, rut_usuario: Optional[str] = None) -> List[Venta]:
+    def obtener_ventas(db: Session, skip: int = 0, limit: int = 100, fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None, rut_usuario: Optional[str] = None, cursor: Optional[str] = None) -> List[Venta]:
         """
-        Obtener lista de ventas con filtros opcionales
+        Obtener lista de ventas con filtros opcionales.
+        Con cursor se pagina por (fecha_venta, id_venta) descendente en lugar de offset.
         """
         try:
             query = db.query(VentaDB).options(
                 joinedload(VentaDB.usuario),
+                joinedload(VentaDB.repartidor),
                 joinedload(VentaDB.detalles_venta).joinedload(DetalleVentaDB.producto)
             )
             
             # Aplicar filtros de fecha si se proporcionan
-            if fecha_inicio:
-                query = query.filter(func.date(VentaDB.fecha_venta) >= fecha_inicio)
-            if fecha_fin:
-                query = query.filter(func.date(VentaDB.fecha_venta) <= fecha_fin)
+            query = query.filter(*rango_dias(VentaDB.fecha_venta, fecha_inicio, fecha_fin))
             
             # Aplicar filtro de usuario si se proporciona
             if rut_usuario:
                 query = query.filter(VentaDB.rut_usuario == str(rut_usuario))
             
-            ventas = query.order_by(desc(VentaDB.fecha_venta)).offset(skip).limit(limit).all()
+            if cursor:
+                valores = decodificar_cursor(cursor, "ventas", (str, int))
+                query = query.filter(filtro_posterior(CLAVE_VENTAS, valores, descendente=True))
+                skip = 0
+            
+            ventas = query.order_by(desc(VentaDB.fecha_venta), desc(VentaDB.id_venta)).offset(skip).limit(acotar_limite(limit)).all()
             
             return [VentaController._construir_venta_response(db, venta) for venta in ventas]
             
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error al obtener ventas: {str(e)}")
     
@@ -438,12 +571,28 @@ class VentaController:
             if venta.estado == "cancelada":
                 raise HTTPException(status_code=400, detail="La venta ya está cancelada")
             
-            # Revertir inventario
-            for detalle in venta.detalles_venta:
-                producto = detalle.producto
-                cantidad_anterior = producto.cantidad_disponible
-                cantidad_nueva = cantidad_anterior + detalle.cantidad
-                producto.cantidad_disponible = cantidad_nueva
+            # Marcar la venta como cancelada solo si sigue en el estado leído: dos cancelaciones
+            # concurrentes repondrían el stock dos veces, y un completar_venta intermedio dejaría
+            # los resúmenes sin restar la venta completada
+            estado_anterior = venta.estado
+            marcadas = db.query(VentaDB).filter(
+                VentaDB.id_venta == id_venta,
+                VentaDB.estado == estado_anterior
+            ).update({
+                VentaDB.estado: "cancelada",
+                VentaDB.fecha_actualizacion: datetime.now()
+            }, synchronize_session=False)
+            if not marcadas:
+                raise HTTPException(status_code=409, detail="La venta cambió de estado durante la cancelación; reintente")
+            resumen_ventas.cambio_estado(db, id_venta, estado_anterior, "cancelada")
+            
+            # Revertir inventario con incrementos atómicos, en el mismo orden de filas que _reservar_stock
+            for detalle in sorted(venta.detalles_venta, key=lambda d: d.id_producto):
+                db.query(ProductoDB).filter(ProductoDB.id_producto == detalle.id_producto).update({
+                    ProductoDB.cantidad_disponible: ProductoDB.cantidad_disponible + detalle.cantidad
+                }, synchronize_session=False)
+                cantidad_nueva = db.query(ProductoDB.cantidad_disponible).filter(ProductoDB.id_producto == detalle.id_producto).scalar()
+                cantidad_anterior = cantidad_nueva - detalle.cantidad
                 
                 # Registrar movimiento de reversión
                 movimiento = MovimientoInventarioDB(
@@ -458,11 +607,8 @@ class VentaController:
                 )
                 db.add(movimiento)
             
-            # Actualizar estado de la venta
-            venta.estado = "cancelada"
-            venta.fecha_actualizacion = datetime.now()
-            
             db.commit()
+            invalidar_catalogo()
 
             # Auditoría: venta cancelada
             try:
@@ -504,6 +650,16 @@ class VentaController:
             if venta.estado == "completada":
                 return VentaController._construir_venta_response(db, venta)
 
+            # Transición condicional: un reintento concurrente de la notificación de pago no
+            # debe contar la venta dos veces en los resúmenes
+            marcadas = db.query(VentaDB).filter(
+                VentaDB.id_venta == id_venta,
+                VentaDB.estado != "completada"
+            ).update({VentaDB.estado: "completada"}, synchronize_session=False)
+            if not marcadas:
+                db.rollback()
+                return VentaController.obtener_venta_por_id(db, id_venta)
+            resumen_ventas.cambio_estado(db, id_venta, venta.estado, "completada")
             venta.estado = "completada"
             venta.fecha_actualizacion = datetime.now()
             # No marcar despacho como entregado automáticamente; mantener estado de envío
@@ -562,6 +718,10 @@ class VentaController:
             if not venta_ids:
                 return {"ventas_eliminadas": 0, "pagos_eliminados": 0, "movimientos_eliminados": 0, "detalles_eliminados": 0}
 
+            completadas = db.query(VentaDB.id_venta).filter(
+                VentaDB.id_venta.in_(venta_ids), VentaDB.estado == resumen_ventas.ESTADO_CONTABLE
+            ).all()
+            resumen_ventas.aplicar_ventas(db, [row.id_venta for row in completadas], -1)
             movimientos_eliminados = db.query(MovimientoInventarioDB).filter(MovimientoInventarioDB.id_venta.in_(venta_ids)).delete(synchronize_session=False)
             pagos_eliminados = db.query(PagoDB).filter(PagoDB.id_venta.in_(venta_ids)).delete(synchronize_session=False)
             detalles_eliminados = db.query(DetalleVentaDB).filter(DetalleVentaDB.id_venta.in_(venta_ids)).delete(synchronize_session=False)
@@ -575,7 +735,6 @@ class VentaController:
                     entidad_tipo="venta",
                     entidad_id=None,
                     accion="elim_compras_clientes",
-                    usuario_actor_id=None,
                     detalle=f"ventas={ventas_eliminadas}, pagos={pagos_eliminados}, movimientos={movimientos_eliminados}, detalles={detalles_eliminados}"
                 )
             except Exception:
@@ -605,6 +764,7 @@ class VentaController:
                 venta.fecha_despacho = datetime.now()
             if estado_envio == 'entregado':
                 venta.fecha_entrega = datetime.now()
+                resumen_ventas.cambio_estado(db, id_venta, venta.estado, 'completada')
                 venta.estado = 'completada'
             venta.fecha_actualizacion = datetime.now()
             db.commit()
@@ -616,9 +776,10 @@ class VentaController:
             raise HTTPException(status_code=500, detail=f"Error al actualizar estado de envío: {str(e)}")
     
     @staticmethod
-    def obtener_movimientos_inventario(db: Session, skip: int = 0, limit: int = 100, id_producto: Optional[int] = None) -> List[MovimientoInventario]:
+    def obtener_movimientos_inventario(db: Session, skip: int = 0, limit: int = 100, id_producto: Optional[int] = None, cursor: Optional[str] = None) -> List[MovimientoInventario]:
         """
-        Obtener movimientos de inventario con filtros opcionales
+        Obtener movimientos de inventario con filtros opcionales.
+        Con cursor se pagina por (fecha_movimiento, id_movimiento) descendente en lugar de offset.
         """
         try:
             query = db.query(MovimientoInventarioDB).options(
@@ -630,10 +791,19 @@ class VentaController:
             if id_producto:
                 query = query.filter(MovimientoInventarioDB.id_producto == id_producto)
             
-            movimientos = query.order_by(desc(MovimientoInventarioDB.fecha_movimiento)).offset(skip).limit(limit).all()
+            if cursor:
+                valores = decodificar_cursor(cursor, "movimientos", (str, int))
+                query = query.filter(filtro_posterior(CLAVE_MOVIMIENTOS, valores, descendente=True))
+                skip = 0
+            
+            movimientos = query.order_by(
+                desc(MovimientoInventarioDB.fecha_movimiento), desc(MovimientoInventarioDB.id_movimiento)
+            ).offset(skip).limit(acotar_limite(limit)).all()
             
             return [VentaController._construir_movimiento_response(mov) for mov in movimientos]
             
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error al obtener movimientos: {str(e)}")
     
@@ -645,10 +815,7 @@ class VentaController:
         try:
             query = db.query(VentaDB)
             
-            if fecha_inicio:
-                query = query.filter(func.date(VentaDB.fecha_venta) >= fecha_inicio)
-            if fecha_fin:
-                query = query.filter(func.date(VentaDB.fecha_venta) <= fecha_fin)
+            query = query.filter(*rango_dias(VentaDB.fecha_venta, fecha_inicio, fecha_fin))
             
             # Estadísticas básicas
             cantidad_ventas = query.filter(VentaDB.estado == "completada").count()
@@ -661,13 +828,8 @@ class VentaController:
             # Productos vendidos (suma de cantidades de detalles de ventas completadas)
             productos_vendidos = db.query(func.sum(DetalleVentaDB.cantidad)).join(VentaDB).filter(
                 VentaDB.estado == "completada"
-            )
+            ).filter(*rango_dias(VentaDB.fecha_venta, fecha_inicio, fecha_fin))
             
-            if fecha_inicio:
-                productos_vendidos = productos_vendidos.filter(func.date(VentaDB.fecha_venta) >= fecha_inicio)
-            if fecha_fin:
-                productos_vendidos = productos_vendidos.filter(func.date(VentaDB.fecha_venta) <= fecha_fin)
-                
             productos_vendidos = productos_vendidos.scalar() or 0
             
             return {
@@ -687,33 +849,24 @@ class VentaController:
         fecha_inicio: Optional[date] = None,
         fecha_fin: Optional[date] = None,
     ) -> list:
-        """Agrupa ventas por día con ingresos y cantidad.
+        """Agrupa ventas por día con ingresos y cantidad (lee el resumen ventas_resumen_dia).
 
         Retorna lista de dicts: {fecha: date, ingresos: float, cantidad: int}
         """
         try:
-            # Usar func.date para agrupar por día (compatible con SQLite/Postgres)
-            query = db.query(
-                func.date(VentaDB.fecha_venta).label("fecha"),
-                func.sum(VentaDB.total_venta).label("ingresos"),
-                func.count(VentaDB.id_venta).label("cantidad"),
-            ).filter(VentaDB.estado == "completada")
-
+            query = db.query(ResumenVentaDiaDB).filter(ResumenVentaDiaDB.cantidad_ventas > 0)
             if fecha_inicio:
-                query = query.filter(func.date(VentaDB.fecha_venta) >= fecha_inicio)
+                query = query.filter(ResumenVentaDiaDB.dia >= fecha_inicio)
             if fecha_fin:
-                query = query.filter(func.date(VentaDB.fecha_venta) <= fecha_fin)
+                query = query.filter(ResumenVentaDiaDB.dia <= fecha_fin)
 
-            query = query.group_by(func.date(VentaDB.fecha_venta)).order_by(func.date(VentaDB.fecha_venta))
-
-            resultados = query.all()
             return [
                 {
-                    "fecha": r[0],
-                    "ingresos": float(r[1] or 0),
-                    "cantidad": int(r[2] or 0),
+                    "fecha": r.dia,
+                    "ingresos": float(r.ingresos or 0),
+                    "cantidad": int(r.cantidad_ventas or 0),
                 }
-                for r in resultados
+                for r in query.order_by(ResumenVentaDiaDB.dia).all()
             ]
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error al agrupar ventas por día: {str(e)}")
@@ -725,34 +878,30 @@ class VentaController:
         fecha_fin: Optional[date] = None,
         limit: int = 5,
     ) -> list:
-        """Obtiene top productos por unidades vendidas y ventas totales.
+        """Obtiene top productos por unidades vendidas y ventas totales (lee ventas_resumen_producto).
 
         Retorna lista de dicts: {id_producto, nombre, unidades, ventas}
         """
         try:
-            query = (
-                db.query(
-                    DetalleVentaDB.id_producto.label("id_producto"),
-                    func.coalesce(func.sum(DetalleVentaDB.cantidad), 0).label("unidades"),
-                    func.coalesce(func.sum(DetalleVentaDB.subtotal), 0).label("ventas"),
-                )
-                .join(VentaDB, DetalleVentaDB.id_venta == VentaDB.id_venta)
-                .filter(VentaDB.estado == "completada")
+            unidades = func.sum(ResumenVentaProductoDB.unidades)
+            query = db.query(
+                ResumenVentaProductoDB.id_producto,
+                unidades.label("unidades"),
+                func.sum(ResumenVentaProductoDB.ventas).label("ventas"),
             )
-
             if fecha_inicio:
-                query = query.filter(func.date(VentaDB.fecha_venta) >= fecha_inicio)
+                query = query.filter(ResumenVentaProductoDB.dia >= fecha_inicio)
             if fecha_fin:
-                query = query.filter(func.date(VentaDB.fecha_venta) <= fecha_fin)
+                query = query.filter(ResumenVentaProductoDB.dia <= fecha_fin)
 
-            query = (
-                query.group_by(DetalleVentaDB.id_producto)
-                .order_by(desc("unidades"))
+            resultados = (
+                query.group_by(ResumenVentaProductoDB.id_producto)
+                .having(unidades > 0)
+                .order_by(desc("unidades"), ResumenVentaProductoDB.id_producto)
                 .limit(limit)
+                .all()
             )
 
-            resultados = query.all()
-
             # Enriquecer con nombre de producto
             ids = [r[0] for r in resultados]
             nombres = {}
@@ -778,25 +927,20 @@ class VentaController:
         fecha_inicio: Optional[date] = None,
         fecha_fin: Optional[date] = None,
     ) -> list:
+        """Ingresos y unidades por categoría (lee ventas_resumen_categoria)"""
         try:
-            query = (
-                db.query(
-                    ProductoDB.id_categoria.label("id_categoria"),
-                    func.coalesce(func.sum(DetalleVentaDB.subtotal), 0).label("ingresos"),
-                    func.coalesce(func.sum(DetalleVentaDB.cantidad), 0).label("cantidad"),
-                )
-                .join(VentaDB, DetalleVentaDB.id_venta == VentaDB.id_venta)
-                .join(ProductoDB, DetalleVentaDB.id_producto == ProductoDB.id_producto)
-                .filter(VentaDB.estado == "completada")
+            cantidad = func.sum(ResumenVentaCategoriaDB.cantidad)
+            query = db.query(
+                ResumenVentaCategoriaDB.id_categoria,
+                func.sum(ResumenVentaCategoriaDB.ingresos).label("ingresos"),
+                cantidad.label("cantidad"),
             )
-
             if fecha_inicio:
-                query = query.filter(func.date(VentaDB.fecha_venta) >= fecha_inicio)
+                query = query.filter(ResumenVentaCategoriaDB.dia >= fecha_inicio)
             if fecha_fin:
-                query = query.filter(func.date(VentaDB.fecha_venta) <= fecha_fin)
+                query = query.filter(ResumenVentaCategoriaDB.dia <= fecha_fin)
 
-            query = query.group_by(ProductoDB.id_categoria)
-            resultados = query.all()
+            resultados = query.group_by(ResumenVentaCategoriaDB.id_categoria).having(cantidad > 0).all()
 
             ids = [int(r[0]) for r in resultados if r[0] is not None]
             nombres = {}
@@ -834,14 +978,10 @@ class VentaController:
                 producto_nombre=detalle.producto.nombre if detalle.producto else None
             ))
         
-        # Cliente = usuario de la venta
+        # Cliente = usuario de la venta. El repartidor sale de la relación: los listados lo
+        # cargan con joinedload y una venta suelta lo busca por clave (mapa de identidad)
         cliente = venta.usuario
-        rep = None
-        try:
-            if venta.repartidor_rut:
-                rep = db.query(UsuarioDB).filter(UsuarioDB.rut == venta.repartidor_rut).first()
-        except Exception:
-            rep = None
+        rep = venta.repartidor if venta.repartidor_rut else None
 
         return Venta(
             id_venta=venta.id_venta,
@@ -931,13 +1071,14 @@ class VentaController:
             venta.motivo_no_entrega = motivo_no_entrega if not entregado else None
             if entregado:
                 venta.estado_envio = 'entregado'
+                resumen_ventas.cambio_estado(db, id_venta, venta.estado, 'completada')
                 venta.estado = 'completada'
                 venta.fecha_entrega = datetime.now()
             else:
                 venta.estado_envio = 'fallido'
             venta.fecha_actualizacion = datetime.now()
             db.commit()
-            return VentaController._construir_venta_response(venta)
+            return VentaController._construir_venta_response(db, venta)
         except HTTPException:
             raise
         except Exception as e:
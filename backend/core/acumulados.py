@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Upsert aditivo para tablas de resumen (rollups).
+
+acumular() suma los valores de cada fila a la fila existente con la misma clave, o la
+inserta si no existe, con INSERT ... ON CONFLICT DO UPDATE (SQLite y PostgreSQL): dos
+transacciones que tocan la misma clave no se pisan. Lo usan core.resumen_ventas y
+core.analytics.
+"""
+
+from sqlalchemy.orm import Session
+
+
+def acumular(db: Session, modelo, claves, filas) -> None:
+    """Suma las columnas no clave de `filas` a las existentes (upsert aditivo)"""
+    if not filas:
+        return
+    tabla = modelo.__table__
+    valores = [c for c in filas[0] if c not in claves]
+    dialecto = db.get_bind().dialect.name
+    if dialecto == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialecto == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        for fila in filas:
+            existente = db.get(modelo, tuple(fila[c] for c in claves))
+            if existente is None:
+                db.add(modelo(**fila))
+            else:
+                for c in valores:
+                    setattr(existente, c, getattr(existente, c) + fila[c])
+        db.flush()
+        return
+    stmt = insert(tabla)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=claves,
+        set_={c: tabla.c[c] + stmt.excluded[c] for c in valores},
+    )
+    # executemany: la sentencia se compila una vez (y queda en caché) para cualquier cantidad de
+    # filas, en vez de un VALUES de miles de parámetros compilado en cada llamada
+    db.execute(stmt, filas)
@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Ingesta de eventos de analytics (/api/analytics/events).
+
+Los handlers solo normalizan el evento y lo agregan a un buffer circular en memoria
+(ANALYTICS_BUFFER_MAX eventos). Si el buffer se llena, se descartan los eventos más antiguos
+y se cuentan en `descartados`: analytics tolera pérdida y nunca frena una petición.
+
+Un hilo vacía el buffer cada ANALYTICS_INTERVALO_MS, o antes si junta ANALYTICS_LOTE eventos.
+Cada vaciado es una transacción con:
+- INSERT por lotes en eventos_analytics (tabla de solo inserción; executemany, que psycopg2
+  agrupa en VALUES de varias filas)
+- suma de cantidades en eventos_analytics_hora (hora, nombre) y eventos_analytics_url (día, URL)
+
+eventos_por_hora() y top_urls() leen los resúmenes para el dashboard. La hora de un evento es
+la de recepción en el servidor (UTC); la enviada por el navegador se guarda en ts_cliente.
+"""
+
+import atexit
+import json
+import os
+import threading
+from collections import Counter, deque
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from config.database import SessionLocal
+from core.acumulados import acumular
+from models.evento_analytics import EventoAnalyticsDB, ResumenAnalyticsHoraDB, ResumenAnalyticsUrlDB
+
+LARGO_NOMBRE = 100
+LARGO_URL = 500
+LARGO_PROPIEDADES = 4000
+
+
+def normalizar_evento(evento: dict, recibido: Optional[datetime] = None) -> dict:
+    """Convierte el payload del navegador en una fila de eventos_analytics"""
+    nombre = str(evento.get("name") or "").strip()[:LARGO_NOMBRE] or "unknown"
+    url = str(evento.get("url") or "").strip()[:LARGO_URL] or None
+    propiedades = evento.get("properties")
+    if propiedades:
+        propiedades = json.dumps(propiedades, ensure_ascii=False, default=str)
+        if len(propiedades) > LARGO_PROPIEDADES:
+            propiedades = json.dumps({"_truncado": True})
+    ts = evento.get("ts")
+    return {
+        "nombre": nombre,
+        "url": url,
+        "propiedades": propiedades or None,
+        "ts_cliente": str(ts)[:40] if ts is not None else None,
+        "fecha_recepcion": recibido or datetime.utcnow(),
+    }
+
+
+class BufferAnalytics:
+    """Buffer circular de eventos + hilo que los escribe por lotes"""
+
+    def __init__(self, capacidad: int = 50000, lote: int = 1000, intervalo: float = 1.0):
+        self.lote = max(1, int(lote))
+        self.intervalo = float(intervalo)
+        self._eventos: deque = deque(maxlen=max(1, int(capacidad)))
+        self._lleno = threading.Event()
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._lock_escritura = threading.Lock()
+        self._atexit = False
+        self.recibidos = 0
+        self.escritos = 0
+        self.descartados = 0
+        self.errores = 0
+
+    def agregar(self, filas: List[dict]) -> None:
+        """Agrega eventos normalizados; si no hay espacio se pierden los más antiguos"""
+        self._asegurar_hilo()
+        libres = self._eventos.maxlen - len(self._eventos)
+        if len(filas) > libres:
+            self.descartados += len(filas) - max(libres, 0)
+        self._eventos.extend(filas)
+        self.recibidos += len(filas)
+        if len(self._eventos) >= self.lote:
+            self._lleno.set()
+
+    def _asegurar_hilo(self) -> None:
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        with self._lock:
+            if self._hilo is not None and self._hilo.is_alive():
+                return
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._bucle, name="analytics-escritor", daemon=True)
+            self._hilo.start()
+            if not self._atexit:
+                atexit.register(self.detener)
+                self._atexit = True
+
+    def detener(self, timeout: float = 10.0) -> None:
+        """Detiene el hilo y escribe lo que quede en el buffer"""
+        with self._lock:
+            hilo, self._hilo = self._hilo, None
+        if hilo is not None:
+            self._detener.set()
+            self._lleno.set()
+            hilo.join(timeout)
+        self.vaciar()
+
+    def _bucle(self) -> None:
+        while not self._detener.is_set():
+            self._lleno.wait(self.intervalo)
+            self._lleno.clear()
+            self.vaciar()
+
+    def _tomar(self) -> List[dict]:
+        filas = []
+        while len(filas) < self.lote:
+            try:
+                filas.append(self._eventos.popleft())
+            except IndexError:
+                break
+        return filas
+
+    def vaciar(self) -> int:
+        """Escribe todo el contenido actual del buffer; devuelve la cantidad de eventos escritos"""
+        total = 0
+        with self._lock_escritura:
+            while True:
+                filas = self._tomar()
+                if not filas:
+                    break
+                try:
+                    self._escribir(filas)
+                    self.escritos += len(filas)
+                    total += len(filas)
+                except Exception as e:
+                    self.errores += len(filas)
+                    print(f"[Analytics] Aviso: lote de {len(filas)} eventos descartado: {getattr(e, 'orig', e)}")
+        return total
+
+    def _escribir(self, filas: List[dict]) -> None:
+        por_hora = Counter(
+            (f["fecha_recepcion"].replace(minute=0, second=0, microsecond=0), f["nombre"]) for f in filas
+        )
+        por_url = Counter((f["fecha_recepcion"].date(), f["url"]) for f in filas if f["url"])
+        db = SessionLocal()
+        try:
+            db.execute(insert(EventoAnalyticsDB.__table__), filas)
+            acumular(db, ResumenAnalyticsHoraDB, ("hora", "nombre"), [
+                {"hora": hora, "nombre": nombre, "cantidad": cantidad}
+                for (hora, nombre), cantidad in sorted(por_hora.items())
+            ])
+            acumular(db, ResumenAnalyticsUrlDB, ("dia", "url"), [
+                {"dia": dia, "url": url, "cantidad": cantidad}
+                for (dia, url), cantidad in sorted(por_url.items())
+            ])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+buffer_analytics = BufferAnalytics(
+    capacidad=int(os.getenv("ANALYTICS_BUFFER_MAX", "50000")),
+    lote=int(os.getenv("ANALYTICS_LOTE", "1000")),
+    intervalo=float(os.getenv("ANALYTICS_INTERVALO_MS", "1000")) / 1000,
+)
+
+
+def eventos_por_hora(
+    db: Session,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+    nombre: Optional[str] = None,
+) -> list:
+    """Cantidad de eventos por hora y nombre (por defecto, las últimas 24 horas)"""
+    hasta = hasta or datetime.utcnow()
+    desde = desde or hasta - timedelta(hours=24)
+    query = db.query(
+        ResumenAnalyticsHoraDB.hora, ResumenAnalyticsHoraDB.nombre, ResumenAnalyticsHoraDB.cantidad
+    ).filter(
+        ResumenAnalyticsHoraDB.hora >= desde.replace(minute=0, second=0, microsecond=0),
+        ResumenAnalyticsHoraDB.hora <= hasta,
+    )
+    if nombre:
+        query = query.filter(ResumenAnalyticsHoraDB.nombre == nombre)
+    filas = query.order_by(ResumenAnalyticsHoraDB.hora, ResumenAnalyticsHoraDB.nombre).all()
+    return [{"hora": hora, "nombre": nombre, "cantidad": int(cantidad)} for hora, nombre, cantidad in filas]
+
+
+def top_urls(db: Session, fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None, limite: int = 10) -> list:
+    """URLs con más eventos en el rango de días (por defecto, los últimos 7)"""
+    fecha_fin = fecha_fin or datetime.utcnow().date()
+    fecha_inicio = fecha_inicio or fecha_fin - timedelta(days=6)
+    cantidad = func.sum(ResumenAnalyticsUrlDB.cantidad).label("cantidad")
+    filas = db.query(ResumenAnalyticsUrlDB.url, cantidad).filter(
+        ResumenAnalyticsUrlDB.dia >= fecha_inicio,
+        ResumenAnalyticsUrlDB.dia <= fecha_fin,
+    ).group_by(ResumenAnalyticsUrlDB.url).order_by(cantidad.desc()).limit(limite).all()
+    return [{"url": url, "cantidad": int(total)} for url, total in filas]
@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Escritura de auditoría en segundo plano, por lotes.
+
+registrar_evento() solo encola el evento (con su fecha ya fijada) y vuelve: la petición no
+paga un commit ni comparte transacción con la auditoría. Un hilo escritor vacía la cola con
+INSERT de varias filas cuando junta AUDITORIA_LOTE eventos o pasan AUDITORIA_INTERVALO_MS
+desde el primero del lote.
+
+- Contrapresión: la cola está acotada (AUDITORIA_COLA_MAX). Si está llena, el productor espera
+  hasta AUDITORIA_ESPERA_MS y, si sigue llena, el evento va al archivo de respaldo en lugar de
+  bloquear la petición.
+- Respaldo durable: los eventos que no se pueden escribir (BD caída, cola llena, cierre del
+  proceso con la BD inaccesible) se agregan como JSON por línea a AUDITORIA_RESPALDO. Al iniciar,
+  iniciar() reinserta ese archivo.
+- Cierre: detener() (evento shutdown de FastAPI y atexit) escribe lo que quede en la cola.
+
+Si un lote falla por integridad (p. ej. el RUT del evento ya no existe), se reintenta fila
+por fila; la fila rechazada se guarda sin usuario_rut y con el RUT anotado en el detalle.
+"""
+
+import atexit
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from config.database import engine
+from models.auditoria import AuditoriaDB
+
+_FIN = object()
+
+
+class EscritorAuditoria:
+    """Cola acotada + hilo que inserta los eventos de auditoría por lotes"""
+
+    def __init__(self, lote: int = 200, intervalo: float = 0.5, capacidad: int = 10000,
+                 espera: float = 0.05, ruta_respaldo: Optional[str] = None):
+        self.lote = max(1, int(lote))
+        self.intervalo = float(intervalo)
+        self.espera = float(espera)
+        self.ruta_respaldo = ruta_respaldo
+        self._cola: "queue.Queue" = queue.Queue(maxsize=max(1, int(capacidad)))
+        self._hilo: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._lock_respaldo = threading.Lock()
+        self._atexit = False
+        self.escritos = 0
+        self.lotes = 0
+        self.respaldados = 0
+
+    # --- productores -------------------------------------------------------------------
+
+    def encolar(self, evento: dict) -> None:
+        """Agrega un evento (columnas de AuditoriaDB) a la cola; no bloquea más de `espera`"""
+        self._asegurar_hilo()
+        try:
+            self._cola.put(evento, timeout=self.espera)
+        except queue.Full:
+            self._respaldar([evento])
+
+    # --- ciclo de vida -----------------------------------------------------------------
+
+    def _asegurar_hilo(self) -> None:
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        with self._lock:
+            if self._hilo is not None and self._hilo.is_alive():
+                return
+            self._hilo = threading.Thread(target=self._bucle, name="auditoria-escritor", daemon=True)
+            self._hilo.start()
+            if not self._atexit:
+                atexit.register(self.detener)
+                self._atexit = True
+
+    def iniciar(self) -> None:
+        """Arranca el hilo escritor y reinserta los eventos del archivo de respaldo"""
+        self._asegurar_hilo()
+        self.reprocesar_respaldo()
+
+    def detener(self, timeout: float = 10.0) -> None:
+        """Vacía la cola y detiene el hilo; lo que no se pueda escribir queda en el respaldo"""
+        with self._lock:
+            hilo, self._hilo = self._hilo, None
+        if hilo is not None and hilo.is_alive():
+            try:
+                self._cola.put(_FIN, timeout=timeout)
+                hilo.join(timeout)
+            except queue.Full:
+                pass
+        pendientes = []
+        while True:
+            try:
+                evento = self._cola.get_nowait()
+            except queue.Empty:
+                break
+            if evento is not _FIN:
+                pendientes.append(evento)
+        for i in range(0, len(pendientes), self.lote):
+            self._escribir(pendientes[i:i + self.lote])
+
+    # --- escritor ----------------------------------------------------------------------
+
+    def _bucle(self) -> None:
+        fin = False
+        while not fin:
+            primero = self._cola.get()
+            if primero is _FIN:
+                break
+            lote = [primero]
+            limite = time.monotonic() + self.intervalo
+            while len(lote) < self.lote:
+                resto = limite - time.monotonic()
+                if resto <= 0:
+                    break
+                try:
+                    evento = self._cola.get(timeout=resto)
+                except queue.Empty:
+                    break
+                if evento is _FIN:
+                    fin = True
+                    break
+                lote.append(evento)
+            self._escribir(lote)
+
+    def _escribir(self, filas: List[dict]) -> None:
+        if not filas:
+            return
+        tabla = AuditoriaDB.__table__
+        try:
+            with engine.begin() as conn:
+                conn.execute(insert(tabla).values(filas))
+            self.escritos += len(filas)
+            self.lotes += 1
+            return
+        except IntegrityError:
+            pass
+        except Exception as e:
+            print(f"[Auditoría] Aviso: lote de {len(filas)} eventos al respaldo: {getattr(e, 'orig', e)}")
+            self._respaldar(filas)
+            return
+
+        for fila in filas:
+            sin_rut = dict(fila, usuario_rut=None, detalle=f"[rut={fila.get('usuario_rut')}] {fila.get('detalle') or ''}".strip())
+            for intento in (fila, sin_rut):
+                try:
+                    with engine.begin() as conn:
+                        conn.execute(insert(tabla).values(intento))
+                    self.escritos += 1
+                    break
+                except IntegrityError:
+                    continue
+                except Exception:
+                    self._respaldar([fila])
+                    break
+            else:
+                self._respaldar([fila])
+
+    # --- respaldo en archivo -----------------------------------------------------------
+
+    def _respaldar(self, filas: List[dict]) -> None:
+        if not self.ruta_respaldo:
+            print(f"[Auditoría] Aviso: {len(filas)} eventos descartados (sin AUDITORIA_RESPALDO)")
+            return
+        try:
+            with self._lock_respaldo, open(self.ruta_respaldo, "a", encoding="utf-8") as f:
+                for fila in filas:
+                    f.write(json.dumps(fila, default=lambda v: v.isoformat(), ensure_ascii=False) + "\n")
+            self.respaldados += len(filas)
+        except OSError as e:
+            print(f"[Auditoría] Error: no se pudo escribir el respaldo {self.ruta_respaldo}: {e}")
+
+    def reprocesar_respaldo(self) -> int:
+        """Inserta los eventos del archivo de respaldo; los que vuelvan a fallar se respaldan de nuevo"""
+        if not self.ruta_respaldo or not os.path.exists(self.ruta_respaldo):
+            return 0
+        en_proceso = f"{self.ruta_respaldo}.{os.getpid()}"
+        with self._lock_respaldo:
+            try:
+                os.replace(self.ruta_respaldo, en_proceso)
+            except OSError:
+                return 0
+        filas = []
+        with open(en_proceso, encoding="utf-8") as f:
+            for linea in f:
+                if not linea.strip():
+                    continue
+                fila = json.loads(linea)
+                if fila.get("fecha_evento"):
+                    fila["fecha_evento"] = datetime.fromisoformat(fila["fecha_evento"])
+                filas.append(fila)
+        for i in range(0, len(filas), self.lote):
+            self._escribir(filas[i:i + self.lote])
+        os.remove(en_proceso)
+        if filas:
+            print(f"[Auditoría] {len(filas)} eventos reprocesados desde {self.ruta_respaldo}")
+        return len(filas)
+
+
+escritor_auditoria = EscritorAuditoria(
+    lote=int(os.getenv("AUDITORIA_LOTE", "200")),
+    intervalo=float(os.getenv("AUDITORIA_INTERVALO_MS", "500")) / 1000,
+    capacidad=int(os.getenv("AUDITORIA_COLA_MAX", "10000")),
+    espera=float(os.getenv("AUDITORIA_ESPERA_MS", "50")) / 1000,
+    ruta_respaldo=os.getenv(
+        "AUDITORIA_RESPALDO", os.path.join(tempfile.gettempdir(), "hammernet_auditoria_pendiente.jsonl")
+    ),
+)
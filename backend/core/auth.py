@@ -17,21 +17,33 @@ en entornos de desarrollo como de producción, con configuración a través de
 variables de entorno.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from typing import Optional
+from typing import Dict, NamedTuple, Optional, Tuple
+import hashlib
 import json
 import os
+import threading
+import time
 from config.database import get_db
+from core.cache import CacheLRU, principal_cache
 from sqlalchemy.orm import Session
 
 # Configuración del hash de contraseñas usando PBKDF2-SHA256
 # PBKDF2 es un algoritmo de derivación de clave robusto para contraseñas
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 
+# Verificar y generar hashes es CPU puro (PBKDF2 ~20 ms; bcrypt legado, cientos de ms). Se hace
+# en un pool propio de HASH_WORKERS hilos: hashlib y bcrypt liberan el GIL, así que los hilos
+# se reparten los núcleos, y el tope evita que una ráfaga de logins ocupe todos los núcleos
+# (y deje sin CPU al resto de las peticiones); los logins que excedan el tope esperan turno.
+HASH_WORKERS = int(os.environ.get("HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+_pool_hash = ThreadPoolExecutor(max_workers=max(1, HASH_WORKERS), thread_name_prefix="hash")
+
 # Configuración de JWT (JSON Web Tokens)
 # La clave secreta debe ser segura y cambiada en producción
 SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "clave_por_defecto_desarrollo_no_usar_en_produccion")
@@ -49,7 +61,12 @@ def verificar_contraseña(plain_password, hashed_password):
     1. Hash PBKDF2-SHA256 (nuevo esquema: comienza con '$pbkdf2-sha256$')
     2. Hash bcrypt (compatibilidad temporal: comienza con '$2')
     3. Texto plano (compatibilidad con datos antiguos)
+    
+    Se ejecuta en el pool de hash (bloquea al llamador hasta tener el resultado).
     """
+    return _pool_hash.submit(_verificar_contraseña, plain_password, hashed_password).result()
+
+def _verificar_contraseña(plain_password, hashed_password):
     try:
         # PBKDF2-SHA256 (nuevo esquema)
         if hashed_password.startswith("$pbkdf2-sha256$"):
@@ -71,8 +88,17 @@ def verificar_contraseña(plain_password, hashed_password):
         return False
 
 def hash_contraseña(password):
-    """Genera un hash seguro de la contraseña usando PBKDF2-SHA256."""
-    return pwd_context.hash(password)
+    """Genera un hash seguro de la contraseña usando PBKDF2-SHA256 (en el pool de hash)."""
+    return _pool_hash.submit(pwd_context.hash, password).result()
+
+def requiere_rehash(hashed_password) -> bool:
+    """True si el hash no es del esquema actual: bcrypt o texto plano legados, o parámetros viejos"""
+    if not hashed_password or not hashed_password.startswith("$pbkdf2-sha256$"):
+        return True
+    try:
+        return pwd_context.needs_update(hashed_password)
+    except Exception:
+        return False
 
 def crear_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Crea un token JWT (JSON Web Token) para autenticación.
@@ -98,6 +124,17 @@ def crear_token(data: dict, expires_delta: Optional[timedelta] = None):
     
     return encoded_jwt
 
+def _decodificar_token(token: str) -> Optional[dict]:
+    """Payload del token si la firma y la expiración son válidas y trae 'sub'; None si no"""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        # Si hay cualquier error en la decodificación, el token es inválido
+        return None
+    if payload.get("sub") is None:
+        return None
+    return payload
+
 def verificar_token(token: str):
     """Verifica y decodifica un token JWT.
     
@@ -107,32 +144,111 @@ def verificar_token(token: str):
     Returns:
         dict: Diccionario con el rut extraído del token, o None si el token es inválido
     """
-    try:
-        # Decodificar el token usando la clave secreta y el algoritmo configurado
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        
-        # Extraer el valor del campo 'sub' (puede ser RUT o email según flujo)
-        subject: str = payload.get("sub")
-        if subject is None:
-            return None
-            
-        return {"rut": subject}
-    except JWTError:
-        # Si hay cualquier error en la decodificación, el token es inválido
+    payload = _decodificar_token(token)
+    if payload is None:
         return None
+    # El campo 'sub' puede ser RUT o email según flujo
+    return {"rut": payload["sub"]}
+
+
+class RolPrincipal(NamedTuple):
+    id_rol: int
+    nombre: Optional[str]
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+
+class Principal(NamedTuple):
+    """Usuario autenticado, independiente de la sesión de BD (se guarda en principal_cache).
+
+    Expone los atributos de UsuarioDB que leen las rutas (rut, nombre, rol_ref.nombre, activo...)
+    más el nombre del rol y los permisos del rol.
+    """
+    rut: str
+    nombre: str
+    apellido: Optional[str]
+    email: Optional[str]
+    telefono: Optional[str]
+    activo: bool
+    fecha_creacion: Optional[datetime]
+    id_rol: Optional[int]
+    role: Optional[str]
+    permisos: frozenset
+
+    @property
+    def rol_ref(self) -> Optional[RolPrincipal]:
+        return RolPrincipal(self.id_rol, self.role) if self.id_rol is not None else None
+
+
+# Generación de los principales en caché: global y por RUT. Cada entrada guarda la generación
+# vigente al leer el usuario; si cambió (invalidar_principal / invalidar_principales), la
+# entrada ya no sirve y se vuelve a leer de la BD.
+_generacion_global = 0
+_generaciones: Dict[str, int] = {}
+_generacion_lock = threading.Lock()
+
+def _generacion(rut) -> Tuple[int, int]:
+    # En PostgreSQL usuarios.rut es INTEGER (migración 20251109): la clave siempre es el texto
+    return _generacion_global, _generaciones.get(str(rut), 0)
+
+def invalidar_principal(rut) -> None:
+    """Descarta los tokens en caché de un usuario; llamar tras confirmar cambios en él"""
+    rut = str(rut)
+    with _generacion_lock:
+        _generaciones[rut] = _generaciones.get(rut, 0) + 1
+
+def invalidar_principales() -> None:
+    """Descarta todos los tokens en caché (cambios masivos de usuarios)"""
+    global _generacion_global
+    with _generacion_lock:
+        _generacion_global += 1
+    principal_cache.limpiar()
+
+def _cargar_principal(db: Session, rut: str) -> Optional[Principal]:
+    from models import UsuarioDB
+    from models.rol import RolDB
+    from models.permiso import PermisoDB
+    from models.rol_permiso import RolPermisoDB
+
+    fila = db.query(UsuarioDB, RolDB.nombre).outerjoin(
+        RolDB, RolDB.id_rol == UsuarioDB.id_rol
+    ).filter(UsuarioDB.rut == rut).first()
+    if fila is None:
+        return None
+    usuario, rol = fila
+    permisos = frozenset()
+    if usuario.id_rol is not None:
+        permisos = frozenset(descripcion for (descripcion,) in db.query(PermisoDB.descripcion).join(
+            RolPermisoDB, RolPermisoDB.id_permiso == PermisoDB.id_permiso
+        ).filter(RolPermisoDB.id_rol == usuario.id_rol))
+    return Principal(
+        rut=str(usuario.rut),
+        nombre=usuario.nombre,
+        apellido=usuario.apellido,
+        email=usuario.email,
+        telefono=usuario.telefono,
+        activo=bool(usuario.activo),
+        fecha_creacion=usuario.fecha_creacion,
+        id_rol=usuario.id_rol,
+        role=rol,
+        permisos=permisos,
+    )
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     """Obtiene el usuario actual a partir del token JWT.
     
     Esta función actúa como una dependencia inyectable en FastAPI para proteger rutas.
     Verifica el token JWT y busca el usuario correspondiente en la base de datos o en JSON.
+    Es síncrona a propósito: FastAPI la ejecuta en el threadpool y la consulta no bloquea el event loop.
+    
+    El resultado se guarda en principal_cache con clave sha256 del token: mientras no expire
+    el token, ni el TTL de la caché, ni se invalide el usuario, las peticiones siguientes con
+    el mismo token no verifican la firma ni consultan la BD.
     
     Args:
         token: Token JWT obtenido del header Authorization (inyectado por FastAPI)
         db: Sesión de base de datos (inyectada por FastAPI)
         
     Returns:
-        dict | UsuarioDB: Datos del usuario autenticado
+        Principal: Datos del usuario autenticado
         
     Raises:
         HTTPException: Si el token es inválido o el usuario no existe
@@ -144,18 +260,27 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         headers={"WWW-Authenticate": "Bearer"},  # Requerido por el estándar OAuth2
     )
     
+    clave = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    entrada = principal_cache.obtener(clave)
+    if entrada is not CacheLRU.AUSENTE:
+        principal, expira, generacion = entrada
+        if expira > time.time() and generacion == _generacion(principal.rut):
+            return principal
+
     # Verificar el token JWT
-    user_data = verificar_token(token)
-    if user_data is None:
+    payload = _decodificar_token(token)
+    if payload is None:
         raise credentials_exception
 
-    subject = user_data["rut"]
-    from models import UsuarioDB
-    user = db.query(UsuarioDB).filter(UsuarioDB.rut == str(subject)).first()
-
-    if user is None:
+    subject = str(payload["sub"])
+    generacion = _generacion(subject)
+    principal = _cargar_principal(db, subject)
+    if principal is None:
         raise credentials_exception
-    return user
+
+    expira = payload.get("exp")
+    principal_cache.guardar(clave, (principal, float(expira) if expira is not None else float("inf"), generacion))
+    return principal
 
 def verificar_permisos_admin(current_user, accion: str = "realizar esta acción"):
     """Verifica permisos de administrador.
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Caché en memoria del proceso.
+
+- CacheLRU: diccionario acotado (LRU) con expiración por TTL y contadores de aciertos/fallos
+- catalogo_cache: instancia usada por las lecturas públicas del catálogo
+- dashboard_cache: métricas compuestas del dashboard (solo TTL, sin versión)
+- principal_cache: usuarios autenticados por token (ver core.auth.get_current_user)
+
+Las claves del catálogo incluyen una "versión de catálogo" global que se incrementa en cada
+mutación de productos (ProductoController, VentaController, seeds). Al cambiar la versión,
+las entradas anteriores dejan de ser alcanzables y además se vacía la caché. Las demás
+familias ("categorias", "subcategorias", "proveedores") solo llevan versión y fecha de
+cambio, que core.condicional usa para los ETag / Last-Modified.
+
+Configuración por variables de entorno:
+- CATALOGO_CACHE_MAX: máximo de entradas (por defecto 512; 0 desactiva la caché)
+- CATALOGO_CACHE_TTL: segundos de vida de cada entrada (por defecto 60). Acota también
+  el desfase de precios cuando una oferta empieza o vence sin que haya mutaciones.
+- DASHBOARD_CACHE_TTL: segundos de vida de las métricas del dashboard (por defecto 15; 0 desactiva)
+- PRINCIPAL_CACHE_MAX / PRINCIPAL_CACHE_TTL: tokens verificados en caché (por defecto 2048 y 60
+  segundos; 0 desactiva). Con varios workers el TTL acota cuánto tarda un cambio de usuario
+  hecho en otro proceso en verse en este.
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Hashable, Tuple
+
+
+class CacheLRU:
+    """Caché LRU con TTL, segura entre hilos"""
+
+    AUSENTE = object()
+
+    def __init__(self, nombre: str, max_entradas: int = 512, ttl_segundos: float = 60.0):
+        self.nombre = nombre
+        self.max_entradas = max(0, int(max_entradas))
+        self.ttl_segundos = float(ttl_segundos)
+        self._datos: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expirados = 0
+        self.desalojos = 0
+        # Segundos tras limpiar() en los que guardar() no guarda: con réplica de lectura, lo
+        # leído justo después de una mutación puede venir atrasado (ver core/replica.py)
+        self.espera_tras_vaciar = 0.0
+        self._vaciada = float("-inf")
+
+    def obtener(self, clave: Hashable) -> Any:
+        """Devuelve el valor guardado o CacheLRU.AUSENTE si no existe o expiró"""
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return CacheLRU.AUSENTE
+            expira, valor = entrada
+            if expira < ahora:
+                del self._datos[clave]
+                self.expirados += 1
+                self.fallos += 1
+                return CacheLRU.AUSENTE
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return valor
+
+    def guardar(self, clave: Hashable, valor: Any) -> None:
+        """Guarda un valor, desalojando la entrada usada hace más tiempo si se supera el máximo"""
+        if self.max_entradas <= 0:
+            return
+        with self._lock:
+            if time.monotonic() - self._vaciada < self.espera_tras_vaciar:
+                return
+            self._datos[clave] = (time.monotonic() + self.ttl_segundos, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+                self.desalojos += 1
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._datos.clear()
+            self._vaciada = time.monotonic()
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "nombre": self.nombre,
+                "entradas": len(self._datos),
+                "max_entradas": self.max_entradas,
+                "ttl_segundos": self.ttl_segundos,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "expirados": self.expirados,
+                "desalojos": self.desalojos,
+                "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else 0.0,
+            }
+
+
+catalogo_cache = CacheLRU(
+    "catalogo",
+    max_entradas=int(os.getenv("CATALOGO_CACHE_MAX", "512")),
+    ttl_segundos=float(os.getenv("CATALOGO_CACHE_TTL", "60")),
+)
+
+_dashboard_ttl = float(os.getenv("DASHBOARD_CACHE_TTL", "15"))
+dashboard_cache = CacheLRU(
+    "dashboard",
+    max_entradas=64 if _dashboard_ttl > 0 else 0,
+    ttl_segundos=_dashboard_ttl,
+)
+
+principal_cache = CacheLRU(
+    "principales",
+    max_entradas=int(os.getenv("PRINCIPAL_CACHE_MAX", "2048")),
+    ttl_segundos=float(os.getenv("PRINCIPAL_CACHE_TTL", "60")),
+)
+
+# Versiones por familia de recursos ("catalogo", "categorias", ...): número y momento del último
+# cambio. Son del proceso; quien las use para validadores HTTP debe combinarlas con ARRANQUE_ID.
+ARRANQUE_ID = uuid.uuid4().hex[:8]
+_ARRANQUE = datetime.utcnow().replace(microsecond=0)
+_version_lock = threading.Lock()
+_versiones: Dict[str, Tuple[int, datetime]] = {}
+
+
+def version(familia: str) -> int:
+    """Versión actual de una familia de recursos"""
+    return _versiones.get(familia, (0, _ARRANQUE))[0]
+
+
+def modificado(familia: str) -> datetime:
+    """Momento (UTC, al segundo) del último cambio de una familia; el arranque del proceso si no hubo cambios"""
+    return _versiones.get(familia, (0, _ARRANQUE))[1]
+
+
+def invalidar(*familias: str) -> None:
+    """Incrementa la versión de las familias indicadas. Llamar después del commit que las modifica."""
+    # Redondeo hacia arriba: un cambio dentro del mismo segundo de una lectura previa
+    # debe quedar "posterior" al Last-Modified que recibió ese cliente
+    ahora = datetime.utcnow().replace(microsecond=0) + timedelta(seconds=1)
+    with _version_lock:
+        for familia in familias:
+            _versiones[familia] = (version(familia) + 1, ahora)
+    if "catalogo" in familias:
+        catalogo_cache.limpiar()
+
+
+def version_catalogo() -> int:
+    """Versión actual del catálogo (forma parte de las claves de caché)"""
+    return version("catalogo")
+
+
+def invalidar_catalogo() -> int:
+    """Incrementa la versión del catálogo y vacía la caché. Llamar después de cada commit que modifique productos."""
+    invalidar("catalogo")
+    return version("catalogo")
+
+
+def estadisticas_cache() -> dict:
+    """Estadísticas de las cachés del proceso (para monitoreo)"""
+    return {
+        "version_catalogo": version_catalogo(),
+        "versiones": {familia: v for familia, (v, _) in _versiones.items()},
+        "catalogo": catalogo_cache.estadisticas(),
+        "dashboard": dashboard_cache.estadisticas(),
+        "principales": principal_cache.estadisticas(),
+    }
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Peticiones GET condicionales (ETag / Last-Modified).
+
+El validador se calcula con las versiones de core.cache, sin consultar la BD ni serializar
+la respuesta: ETag fuerte = hash de (arranque del proceso, ruta, versiones de las familias
+de las que depende el recurso, parámetros de la consulta, codificación gzip). Si el cliente
+envía If-None-Match o If-Modified-Since y el recurso no cambió, la ruta responde 304 antes
+de llamar al controlador.
+
+Con réplica de lectura, justo después de un cambio la ruta puede leer datos anteriores a él:
+mientras core.replica.desfase_posible() sea verdadero la respuesta sale sin validadores.
+
+Uso en una ruta:
+
+    no_modificado = respuesta_condicional(request, response, "categorias")
+    if no_modificado:
+        return no_modificado
+"""
+
+import hashlib
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import List, Optional
+
+from fastapi import Request, Response
+
+from core.cache import ARRANQUE_ID, catalogo_cache, modificado, version
+from core.replica import desfase_posible
+
+
+def _etag(request: Request, familias: tuple, extra: List) -> str:
+    partes = [ARRANQUE_ID, request.url.path]
+    partes += [f"{f}={version(f)}" for f in familias]
+    partes += sorted(request.query_params.multi_items())
+    partes += extra
+    return '"' + hashlib.sha1(repr(partes).encode()).hexdigest()[:20] + '"'
+
+
+def _coincide_etag(if_none_match: str, etag: str) -> bool:
+    # If-None-Match usa comparación débil (RFC 7232 §3.2): se ignora el prefijo W/
+    for candidato in if_none_match.split(","):
+        candidato = candidato.strip()
+        if candidato.startswith("W/"):
+            candidato = candidato[2:]
+        if candidato == "*" or candidato == etag:
+            return True
+    return False
+
+
+def _no_modificado_desde(if_modified_since: str, ultimo: datetime) -> bool:
+    try:
+        fecha = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError, IndexError):
+        return False
+    if fecha is None:
+        return False
+    if fecha.tzinfo is not None:
+        fecha = fecha.astimezone(timezone.utc).replace(tzinfo=None)
+    return ultimo <= fecha
+
+
+def respuesta_condicional(
+    request: Request,
+    response: Response,
+    *familias: str,
+    segun_reloj: bool = False,
+) -> Optional[Response]:
+    """
+    Evalúa If-None-Match / If-Modified-Since para un recurso que depende de `familias`.
+
+    Args:
+        request: Petición entrante
+        response: Respuesta de la ruta (recibe ETag y Last-Modified si hay que responder completo)
+        familias: Familias de core.cache de las que depende la representación
+        segun_reloj: El contenido depende de la hora (precios con oferta); el validador se
+            renueva cada CATALOGO_CACHE_TTL segundos, igual que la caché del catálogo
+
+    Returns:
+        Response 304 si el cliente ya tiene la versión vigente; None en caso contrario
+    """
+    if desfase_posible(request, familias):
+        return None
+    # GZipMiddleware cambia los bytes enviados: un ETag fuerte debe distinguir la codificación
+    extra = ["gzip" in request.headers.get("accept-encoding", "").lower()]
+    ultimo = max(modificado(f) for f in familias)
+    if segun_reloj:
+        periodo = max(1, int(catalogo_cache.ttl_segundos))
+        tramo = int(time.time()) // periodo
+        extra.append(tramo)
+        ultimo = max(ultimo, datetime.utcfromtimestamp(tramo * periodo))
+    cabeceras = {
+        "ETag": _etag(request, familias, extra),
+        "Last-Modified": format_datetime(ultimo.replace(tzinfo=timezone.utc), usegmt=True),
+    }
+
+    # If-None-Match tiene prioridad; If-Modified-Since solo se evalúa si no viene (RFC 7232 §6)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        no_modificado = _coincide_etag(if_none_match, cabeceras["ETag"])
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        no_modificado = bool(if_modified_since) and _no_modificado_desde(if_modified_since, ultimo)
+
+    if no_modificado:
+        return Response(status_code=304, headers=cabeceras)
+    response.headers.update(cabeceras)
+    return None
@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Contador de consultas SQL por petición y detector de N+1.
+
+Escucha before/after_cursor_execute de SQLAlchemy (todas las instancias de Engine) y acumula,
+en el registro activo del contexto actual (contextvars), cuántas sentencias se ejecutaron,
+cuánto tiempo se pasó en la base y cuántas veces se repitió cada texto SQL. El mismo texto
+repetido muchas veces en una petición (solo cambian los parámetros) es la huella de un N+1:
+una consulta por fila dentro de un bucle.
+
+- medir(): context manager que activa un registro nuevo y lo entrega
+- presupuesto(maximo): igual que medir(), pero al salir lanza ExcesoConsultas si se superó
+  el máximo de consultas o hubo sentencias repetidas. Lo usan scripts/verificar_consultas.py
+  y sirve tal cual como fixture de pytest
+- MiddlewareConsultas: middleware ASGI (main.py) que mide cada petición y agrega a
+  Server-Timing las métricas db;dur=<ms>;desc="<n> consultas" y, por cada N+1 sospechoso,
+  n1;desc="<veces>x <tabla>". Es ASGI puro y no @app.middleware("http"): BaseHTTPMiddleware
+  suma cerca de 1 ms por petición
+
+Sin registro activo (scripts, hilos de fondo) el costo por sentencia es una lectura de
+ContextVar.
+
+Configuración por variables de entorno:
+- CONSULTAS_SERVER_TIMING: 0 desactiva la medición por petición (por defecto 1)
+- CONSULTAS_UMBRAL_N1: repeticiones de un mismo SQL en una petición a partir de las cuales
+  se informa N+1 (por defecto 5)
+- CONSULTAS_AVISAR_N1: 1 imprime un aviso por cada petición con N+1 sospechoso (por defecto 0)
+"""
+
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+SERVER_TIMING = os.getenv("CONSULTAS_SERVER_TIMING", "1").lower() not in ("0", "false", "no")
+UMBRAL_N1 = int(os.getenv("CONSULTAS_UMBRAL_N1", "5"))
+AVISAR_N1 = os.getenv("CONSULTAS_AVISAR_N1", "0").lower() in ("1", "true", "si", "sí")
+
+_TABLA = re.compile(r'\b(?:FROM|INTO|UPDATE)\s+"?(\w+)"?', re.IGNORECASE)
+
+
+class ExcesoConsultas(AssertionError):
+    """Una medición superó su presupuesto de consultas o repitió sentencias (N+1)"""
+
+
+class RegistroConsultas:
+    """Consultas de una petición (o de un bloque medir()): total, tiempo en BD y repeticiones"""
+
+    def __init__(self, umbral_n1: int = UMBRAL_N1, padre: "Optional[RegistroConsultas]" = None):
+        self.umbral_n1 = max(2, int(umbral_n1))
+        self.padre = padre
+        self.total = 0
+        self.segundos = 0.0
+        self.sentencias: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def anotar(self, sentencia: str, segundos: float) -> None:
+        registro = self
+        while registro is not None:
+            with registro._lock:
+                registro.total += 1
+                registro.segundos += segundos
+                registro.sentencias[sentencia] += 1
+            registro = registro.padre
+
+    @property
+    def milisegundos(self) -> float:
+        return self.segundos * 1000
+
+    def repetidas(self) -> List[Tuple[str, int]]:
+        """Sentencias ejecutadas al menos umbral_n1 veces, de la más a la menos repetida"""
+        return [(sql, n) for sql, n in self.sentencias.most_common() if n >= self.umbral_n1]
+
+    def server_timing(self) -> str:
+        """Métricas para la cabecera Server-Timing"""
+        partes = [f'db;dur={self.milisegundos:.1f};desc="{self.total} consultas"']
+        for sql, veces in self.repetidas():
+            partes.append(f'n1;desc="{veces}x {tabla_de(sql)}"')
+        return ", ".join(partes)
+
+    def resumen(self) -> str:
+        lineas = [f"{self.total} consultas, {self.milisegundos:.1f} ms en BD"]
+        for sql, veces in self.repetidas():
+            lineas.append(f"  N+1 sospechoso ({veces}x): {' '.join(sql.split())[:300]}")
+        return "\n".join(lineas)
+
+
+_actual: ContextVar[Optional[RegistroConsultas]] = ContextVar("registro_consultas", default=None)
+
+
+def tabla_de(sql: str) -> str:
+    """Primera tabla mencionada en la sentencia (para describir un N+1)"""
+    m = _TABLA.search(sql)
+    return m.group(1) if m else "?"
+
+
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    if _actual.get() is not None:
+        conn.info.setdefault("consultas_inicio", []).append(time.perf_counter())
+
+
+def _despues(conn, cursor, statement, parameters, context, executemany):
+    registro = _actual.get()
+    if registro is None:
+        return
+    inicios = conn.info.get("consultas_inicio")
+    if not inicios:
+        return
+    registro.anotar(statement, time.perf_counter() - inicios.pop())
+
+
+_instalado = False
+
+
+def instalar() -> None:
+    """Registra los eventos en la clase Engine (una sola vez por proceso)"""
+    global _instalado
+    if _instalado:
+        return
+    event.listen(Engine, "before_cursor_execute", _antes)
+    event.listen(Engine, "after_cursor_execute", _despues)
+    _instalado = True
+
+
+@contextmanager
+def medir(umbral_n1: int = UMBRAL_N1):
+    """Cuenta las consultas ejecutadas dentro del bloque (también suman al registro exterior)"""
+    instalar()
+    registro = RegistroConsultas(umbral_n1, padre=_actual.get())
+    token = _actual.set(registro)
+    try:
+        yield registro
+    finally:
+        _actual.reset(token)
+
+
+@contextmanager
+def presupuesto(maximo: int, umbral_n1: int = 2):
+    """
+    Falla (ExcesoConsultas) si el bloque ejecuta más de `maximo` consultas o repite una
+    sentencia `umbral_n1` veces o más. Como fixture de pytest:
+
+        @pytest.fixture
+        def presupuesto_consultas():
+            return consultas.presupuesto
+
+        def test_catalogo(client, presupuesto_consultas):
+            with presupuesto_consultas(3):
+                client.get("/api/productos/catalogo")
+    """
+    with medir(umbral_n1) as registro:
+        yield registro
+    problemas = []
+    if registro.total > maximo:
+        problemas.append(f"{registro.total} consultas (máximo {maximo})")
+    if registro.repetidas():
+        problemas.append("sentencias repetidas")
+    if problemas:
+        raise ExcesoConsultas(f"{', '.join(problemas)}: {registro.resumen()}")
+
+
+class MiddlewareConsultas:
+    """Mide las consultas de cada petición HTTP y las informa en la cabecera Server-Timing"""
+
+    def __init__(self, app):
+        self.app = app
+        instalar()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with medir() as registro:
+            async def enviar(mensaje):
+                if mensaje["type"] == "http.response.start":
+                    cabeceras = MutableHeaders(scope=mensaje)
+                    metricas = registro.server_timing()
+                    previas = cabeceras.get("server-timing")
+                    cabeceras["Server-Timing"] = f"{previas}, {metricas}" if previas else metricas
+                    if AVISAR_N1 and registro.repetidas():
+                        print(f"[Consultas] N+1 sospechoso en {scope['method']} {scope['path']}: {registro.resumen()}")
+                await send(mensaje)
+
+            await self.app(scope, receive, enviar)
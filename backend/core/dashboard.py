@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Métricas del dashboard (/api/dashboard/metrics).
+
+Cada bloque se calcula con una sola consulta de agregados condicionales (SUM(CASE ...)):
+- resumen_inventario(): conteos, stock y valor del inventario
+- estadisticas_ventas(): ingresos, cantidad, promedio, canceladas y unidades de un rango
+- ventas_periodos(): ventas del día, la semana (7 días) y el mes en curso (desde el resumen diario)
+- resumen_usuarios(): activos / inactivos
+- actividad_reciente(): últimos eventos de auditoría
+
+metricas_dashboard() compone el resultado, mide cada sección y lo guarda en
+dashboard_cache (DASHBOARD_CACHE_TTL segundos; no se invalida con las escrituras).
+"""
+
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from core.cache import CacheLRU, dashboard_cache
+from core.fechas import rango_dias
+from models.auditoria import AuditoriaDB
+from models.producto import ProductoDB
+from models.resumen_venta import ResumenVentaDiaDB
+from models.usuario import UsuarioDB
+from models.venta import DetalleVentaDB, VentaDB
+
+
+def _contar(condicion):
+    return func.coalesce(func.sum(case((condicion, 1), else_=0)), 0)
+
+
+def _sumar(condicion, valor):
+    return func.coalesce(func.sum(case((condicion, valor), else_=0)), 0)
+
+
+def resumen_inventario(db: Session) -> dict:
+    """Resumen de inventario en una consulta"""
+    cantidad = func.coalesce(ProductoDB.cantidad_disponible, 0)
+    fila = db.query(
+        func.count(ProductoDB.id_producto),
+        _contar(ProductoDB.estado == 'activo'),
+        _contar(cantidad == 0),
+        _contar(cantidad <= func.coalesce(ProductoDB.stock_minimo, 0)),
+        func.coalesce(func.sum(cantidad), 0),
+        func.coalesce(func.sum(func.coalesce(ProductoDB.precio_venta, 0) * cantidad), 0),
+        _contar(ProductoDB.oferta_activa == True),
+    ).one()
+    total_items, activos, sin_stock, bajo_stock, unidades, valor, en_oferta = fila
+    return {
+        "total_productos": int(activos),
+        "productos_bajo_stock": int(bajo_stock),
+        "productos_sin_stock": int(sin_stock),
+        "productos_con_stock": int(activos) - int(sin_stock),
+        "total_cantidad_disponible": int(unidades),
+        "valor_inventario_total": float(valor),
+        "porcentaje_en_oferta": (int(en_oferta) / int(total_items) * 100) if total_items else 0,
+    }
+
+
+def _filtro_rango(fecha_inicio: Optional[date], fecha_fin: Optional[date]):
+    return rango_dias(VentaDB.fecha_venta, fecha_inicio, fecha_fin)
+
+
+def estadisticas_ventas(db: Session, fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None) -> dict:
+    """Mismas cifras que VentaController.obtener_estadisticas_ventas, en una consulta"""
+    completada = VentaDB.estado == "completada"
+    unidades = db.query(func.coalesce(func.sum(DetalleVentaDB.cantidad), 0)).join(VentaDB).filter(
+        completada, *_filtro_rango(fecha_inicio, fecha_fin)
+    ).scalar_subquery()
+    cantidad, ingresos, canceladas, vendidos = db.query(
+        _contar(completada),
+        _sumar(completada, VentaDB.total_venta),
+        _contar(VentaDB.estado == "cancelada"),
+        unidades,
+    ).filter(*_filtro_rango(fecha_inicio, fecha_fin)).one()
+    return {
+        "total_ventas": float(ingresos),
+        "cantidad_ventas": int(cantidad),
+        "productos_vendidos": int(vendidos or 0),
+        "promedio_venta": float(ingresos) / int(cantidad) if cantidad else 0.0,
+        "ventas_canceladas": int(canceladas),
+    }
+
+
+def ventas_periodos(db: Session, hoy: date) -> dict:
+    """Ingresos y cantidad de ventas completadas del día, la semana (7 días) y el mes, en una consulta sobre ventas_resumen_dia"""
+    ventanas = {
+        "dia": hoy,
+        "semana": hoy - timedelta(days=6),
+        "mes": hoy.replace(day=1),
+    }
+    dia = ResumenVentaDiaDB.dia
+    columnas = []
+    for desde in ventanas.values():
+        columnas += [
+            _sumar(dia >= desde, ResumenVentaDiaDB.ingresos),
+            _sumar(dia >= desde, ResumenVentaDiaDB.cantidad_ventas),
+        ]
+    fila = db.query(*columnas).filter(dia >= min(ventanas.values()), dia <= hoy).one()
+    return {
+        nombre: {"ingresos": float(fila[2 * i]), "cantidad": int(fila[2 * i + 1])}
+        for i, nombre in enumerate(ventanas)
+    }
+
+
+def resumen_usuarios(db: Session) -> dict:
+    """Usuarios activos, inactivos y total en una consulta"""
+    activos, inactivos = db.query(
+        _contar(UsuarioDB.activo == True),
+        _contar(UsuarioDB.activo == False),
+    ).one()
+    return {"activos": int(activos), "inactivos": int(inactivos), "total": int(activos) + int(inactivos)}
+
+
+def actividad_reciente(db: Session, limite: int) -> list:
+    """Últimos eventos de auditoría"""
+    eventos = db.query(AuditoriaDB).order_by(
+        AuditoriaDB.fecha_evento.desc(), AuditoriaDB.id_evento.desc()
+    ).limit(limite).all()
+    return [
+        {
+            "id_evento": evt.id_evento,
+            "accion": evt.accion,
+            "entidad_tipo": evt.entidad_tipo,
+            "entidad_id": evt.entidad_id,
+            "detalle": evt.detalle,
+            "fecha_evento": evt.fecha_evento,
+            "usuario_rut": evt.usuario_rut,
+        }
+        for evt in eventos
+    ]
+
+
+def metricas_dashboard(
+    db: Session,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None,
+    limite_actividad: int = 5,
+) -> Tuple[dict, Dict[str, float]]:
+    """
+    Compone las métricas del dashboard (con caché de TTL corto)
+
+    Args:
+        db: Sesión de base de datos
+        fecha_inicio: Inicio del rango para el bloque "ventas"
+        fecha_fin: Fin del rango para el bloque "ventas"
+        limite_actividad: Cantidad de eventos de auditoría
+
+    Returns:
+        Tuple[dict, Dict[str, float]]: Métricas y duración en ms de cada sección
+        (vacío si la respuesta vino de la caché)
+    """
+    hoy = datetime.utcnow().date()
+    clave = (fecha_inicio, fecha_fin, limite_actividad, hoy)
+    metricas = dashboard_cache.obtener(clave)
+    if metricas is not CacheLRU.AUSENTE:
+        return metricas, {}
+
+    tiempos: Dict[str, float] = {}
+    fallidas = []
+
+    def medir(nombre, funcion, *args, respaldo=None):
+        inicio = time.perf_counter()
+        try:
+            return funcion(db, *args)
+        except Exception:
+            db.rollback()
+            fallidas.append(nombre)
+            return respaldo
+        finally:
+            tiempos[nombre] = (time.perf_counter() - inicio) * 1000
+
+    metricas = {
+        "productos": medir("inventario", resumen_inventario, respaldo={
+            "total_productos": 0,
+            "productos_bajo_stock": 0,
+            "productos_sin_stock": 0,
+            "productos_con_stock": 0,
+            "total_cantidad_disponible": 0,
+            "valor_inventario_total": 0,
+            "porcentaje_en_oferta": 0,
+        }),
+        "ventas": medir("ventas", estadisticas_ventas, fecha_inicio, fecha_fin, respaldo={
+            "ingresos": 0, "cantidad_ventas": 0, "promedio": 0, "canceladas": 0,
+        }),
+        "ventas_periodos": medir("periodos", ventas_periodos, hoy, respaldo={
+            "dia": {"ingresos": 0, "cantidad": 0},
+            "semana": {"ingresos": 0, "cantidad": 0},
+            "mes": {"ingresos": 0, "cantidad": 0},
+        }),
+        "usuarios": medir("usuarios", resumen_usuarios, respaldo={"activos": 0, "inactivos": 0, "total": 0}),
+        "actividad_reciente": medir("actividad", actividad_reciente, limite_actividad, respaldo=[]),
+    }
+    # Una sección con valores de respaldo no se cachea: la próxima petición la reintenta
+    if not fallidas:
+        dashboard_cache.guardar(clave, metricas)
+    return metricas, tiempos
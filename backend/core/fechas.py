@@ -0,0 +1,29 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Filtros de fecha que pueden usar índices (sargables).
+
+`date(columna) BETWEEN desde AND hasta` obliga a evaluar la función fila por fila y a
+recorrer la tabla completa. rango_dias() expresa lo mismo como un rango semiabierto
+sobre la columna: columna >= desde AND columna < hasta + 1 día.
+
+Los extremos se envían como DATE ('YYYY-MM-DD'): en SQLite las fechas se guardan como
+texto y un DATETIME de medianoche se formatearía con microsegundos, dejando fuera las
+filas escritas por CURRENT_TIMESTAMP a esa hora exacta.
+"""
+
+from datetime import date, timedelta
+from typing import List, Optional
+
+from sqlalchemy import Date, literal
+
+
+def rango_dias(columna, desde: Optional[date] = None, hasta: Optional[date] = None) -> List:
+    """Condiciones equivalentes a date(columna) >= desde y date(columna) <= hasta (ambos opcionales)"""
+    condiciones = []
+    if desde:
+        condiciones.append(columna >= literal(desde, Date()))
+    if hasta:
+        condiciones.append(columna < literal(hasta + timedelta(days=1), Date()))
+    return condiciones
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Pipeline de subida de imágenes de productos.
+
+La imagen recibida se decodifica y se reduce localmente (Pillow) a las variantes de
+VARIANTES (miniatura, tarjeta y completa, lado mayor en píxeles, sin agrandar), cada una en
+WebP. Las variantes se suben al almacenamiento configurado y se devuelven sus URLs; el
+producto guarda las tres (ver ProductoController._asignar_imagenes).
+
+El trabajo pesado (decodificar, redimensionar, codificar y subir) corre en un pool propio
+de IMAGENES_WORKERS hilos: Pillow y las subidas HTTP liberan el GIL, y el pool acota cuántas
+imágenes se procesan a la vez sin ocupar el event loop. Las variantes de una misma imagen se
+suben en paralelo.
+
+Almacenamiento (IMAGENES_ALMACENAMIENTO):
+- cloudinary: sube cada variante con su public_id (productos/<prefijo>/<variante>)
+- local: escribe en IMAGENES_DIR y devuelve URLs bajo IMAGENES_URL_BASE (main.py monta ese
+  directorio como estáticos); para pruebas y despliegues sin Cloudinary
+Por defecto se usa cloudinary si CLOUDINARY_CLOUD_NAME está definido, y local si no.
+"""
+
+import base64
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Dict, Optional
+
+from fastapi import HTTPException, status
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+VARIANTES = {"miniatura": 160, "tarjeta": 480, "completa": 1600}
+
+# Rechaza imágenes con más píxeles que esto antes de decodificarlas (bombas de descompresión)
+Image.MAX_IMAGE_PIXELS = int(os.getenv("IMAGENES_MAX_PIXELES", str(40_000_000)))
+
+
+class AlmacenamientoLocal:
+    """Guarda los archivos bajo un directorio servido como estáticos"""
+
+    nombre = "local"
+
+    def __init__(self, directorio: str, url_base: str):
+        self.directorio = directorio
+        self.url_base = url_base.rstrip("/")
+        os.makedirs(directorio, exist_ok=True)
+
+    def guardar(self, ruta: str, contenido: bytes, content_type: str) -> str:
+        destino = os.path.join(self.directorio, *ruta.split("/"))
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        temporal = f"{destino}.{uuid.uuid4().hex[:8]}.parcial"
+        with open(temporal, "wb") as f:
+            f.write(contenido)
+        os.replace(temporal, destino)
+        return f"{self.url_base}/{ruta}"
+
+
+class AlmacenamientoCloudinary:
+    """Sube los archivos a Cloudinary (configurado por configure_cloudinary)"""
+
+    nombre = "cloudinary"
+
+    def guardar(self, ruta: str, contenido: bytes, content_type: str) -> str:
+        import cloudinary.uploader
+
+        resultado = cloudinary.uploader.upload(
+            contenido,
+            public_id=ruta.rsplit(".", 1)[0],
+            resource_type="image",
+            overwrite=True,
+        )
+        return resultado["secure_url"]
+
+
+def generar_variantes(contenido: bytes, calidad: int = 82) -> Dict[str, bytes]:
+    """Bytes WebP de cada variante; ValueError si el contenido no es una imagen válida"""
+    try:
+        with Image.open(BytesIO(contenido)) as original:
+            imagen = ImageOps.exif_transpose(original)
+            imagen.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError) as e:
+        raise ValueError(f"Imagen inválida: {e}")
+
+    if imagen.mode not in ("RGB", "RGBA"):
+        imagen = imagen.convert("RGBA" if "transparency" in imagen.info or imagen.mode in ("LA", "PA") else "RGB")
+
+    variantes = {}
+    for nombre, lado in VARIANTES.items():
+        copia = imagen.copy()
+        copia.thumbnail((lado, lado), Image.LANCZOS)
+        salida = BytesIO()
+        copia.save(salida, "WEBP", quality=calidad, method=4)
+        variantes[nombre] = salida.getvalue()
+    return variantes
+
+
+def decodificar_base64(datos: str) -> bytes:
+    """Bytes de una imagen en base64, con o sin prefijo data:image/...;base64,"""
+    if "," in datos:
+        datos = datos.split(",", 1)[1]
+    return base64.b64decode(datos)
+
+
+class PipelineImagenes:
+    """Genera las variantes y las sube en un pool de hilos acotado"""
+
+    def __init__(self, almacenamiento, workers: int = 2, max_bytes: int = 15 * 1024 * 1024, calidad: int = 82):
+        self.almacenamiento = almacenamiento
+        self.max_bytes = int(max_bytes)
+        self.calidad = int(calidad)
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix="imagenes")
+        self.procesadas = 0
+        self.rechazadas = 0
+
+    def procesar(self, contenido: bytes, prefijo: str) -> Dict[str, str]:
+        """Procesa y sube la imagen; devuelve {variante: url}. HTTPException si no se puede."""
+        if not contenido:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Imagen vacía")
+        if len(contenido) > self.max_bytes:
+            self.rechazadas += 1
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Imagen demasiado grande")
+        try:
+            variantes = self._pool.submit(generar_variantes, contenido, self.calidad).result()
+        except ValueError as e:
+            self.rechazadas += 1
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        subidas = {
+            nombre: self._pool.submit(self.almacenamiento.guardar, f"{prefijo}/{nombre}.webp", datos, "image/webp")
+            for nombre, datos in variantes.items()
+        }
+        try:
+            urls = {nombre: futuro.result() for nombre, futuro in subidas.items()}
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=f"Error al guardar la imagen: {e}")
+        self.procesadas += 1
+        return urls
+
+    def procesar_archivo(self, archivo, prefijo: str) -> Dict[str, str]:
+        """Como procesar() para un UploadFile, leyendo como máximo max_bytes + 1"""
+        return self.procesar(archivo.file.read(self.max_bytes + 1), prefijo)
+
+    def cerrar(self) -> None:
+        self._pool.shutdown(wait=True)
+
+    def estadisticas(self) -> dict:
+        return {
+            "almacenamiento": self.almacenamiento.nombre,
+            "procesadas": self.procesadas,
+            "rechazadas": self.rechazadas,
+        }
+
+
+def prefijo_producto(producto_id: int) -> str:
+    """Carpeta única de las variantes de una subida (una subida nueva no pisa la anterior)"""
+    return f"productos/producto_{producto_id}_{uuid.uuid4().hex[:8]}"
+
+
+def _almacenamiento_configurado(tipo: Optional[str] = None):
+    tipo = (tipo or os.getenv("IMAGENES_ALMACENAMIENTO") or
+            ("cloudinary" if os.getenv("CLOUDINARY_CLOUD_NAME") else "local")).lower()
+    if tipo == "cloudinary":
+        return AlmacenamientoCloudinary()
+    return AlmacenamientoLocal(
+        os.getenv("IMAGENES_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "uploads", "imagenes")),
+        os.getenv("IMAGENES_URL_BASE", "/api/imagenes"),
+    )
+
+
+pipeline_imagenes = PipelineImagenes(
+    _almacenamiento_configurado(),
+    workers=int(os.getenv("IMAGENES_WORKERS", "2")),
+    max_bytes=int(float(os.getenv("IMAGENES_MAX_MB", "15")) * 1024 * 1024),
+    calidad=int(os.getenv("IMAGENES_CALIDAD", "82")),
+)
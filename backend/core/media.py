@@ -0,0 +1,319 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Proxy de imágenes (/api/media) con caché en disco.
+
+- Cliente httpx.AsyncClient compartido (pool de conexiones keep-alive), creado al primer uso
+  en el event loop y cerrado en el shutdown de la app.
+- La imagen se descarga en streaming a un archivo temporal de la caché, cortando si supera
+  MEDIA_MAX_BYTES o si el Content-Type no es una imagen rasterizada (TIPOS_PERMITIDOS; un SVG
+  puede traer script y se serviría desde nuestro origen); nunca se arma completa en memoria.
+  Al cliente se le entrega en streaming desde el disco (FileResponse).
+- Caché en disco acotada (MEDIA_CACHE_MAX_MB) con desalojo LRU, clave sha256 de la URL.
+  Cada entrada guarda ETag / Last-Modified del origen; pasados MEDIA_CACHE_FRESCO segundos
+  se revalida con If-None-Match / If-Modified-Since (un 304 no vuelve a descargar). Si el
+  origen falla al revalidar se sirve la copia vencida.
+- Descargas concurrentes de la misma URL se agrupan (single-flight): una sola va al origen
+  y las demás esperan su resultado.
+- MEDIA_HOSTS_PERMITIDOS (lista separada por comas, por defecto res.cloudinary.com) restringe
+  los hosts de origen; vacía, el proxy rechaza todo. Además se rechazan los hosts que resuelven a
+  direcciones privadas, de loopback o reservadas, también en cada redirección.
+"""
+
+import asyncio
+import hashlib
+import ipaddress
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from fastapi import HTTPException, status
+from fastapi.responses import FileResponse
+
+TIPOS_PERMITIDOS = frozenset({"image/jpeg", "image/png", "image/webp", "image/gif", "image/avif"})
+
+CABECERAS_RESPUESTA = {
+    "Cache-Control": "public, max-age=86400",
+    "Referrer-Policy": "no-referrer",
+    "Cross-Origin-Resource-Policy": "same-origin",
+}
+
+
+class CacheDisco:
+    """Archivos <clave>.bin + <clave>.json en un directorio, con tamaño total acotado (LRU)"""
+
+    def __init__(self, directorio: str, max_bytes: int):
+        self.directorio = directorio
+        self.max_bytes = max(0, int(max_bytes))
+        self._entradas: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+        self.desalojos = 0
+        os.makedirs(directorio, exist_ok=True)
+        self._cargar()
+
+    def _cargar(self) -> None:
+        """Reconstruye el índice LRU desde el disco (más antiguo = menos usado)"""
+        encontradas = []
+        for nombre in os.listdir(self.directorio):
+            if not nombre.endswith(".bin"):
+                continue
+            clave = nombre[:-4]
+            ruta = self.ruta(clave)
+            if not os.path.exists(self.ruta_meta(clave)):
+                os.remove(ruta)
+                continue
+            st = os.stat(ruta)
+            encontradas.append((st.st_mtime, clave, st.st_size))
+        for _, clave, tamaño in sorted(encontradas):
+            self._entradas[clave] = tamaño
+            self._total += tamaño
+        self._desalojar()
+
+    def ruta(self, clave: str) -> str:
+        return os.path.join(self.directorio, f"{clave}.bin")
+
+    def ruta_meta(self, clave: str) -> str:
+        return os.path.join(self.directorio, f"{clave}.json")
+
+    def obtener(self, clave: str) -> Optional[dict]:
+        """Metadatos de la entrada (y la marca como usada) o None"""
+        with self._lock:
+            if clave not in self._entradas:
+                return None
+            self._entradas.move_to_end(clave)
+        try:
+            with open(self.ruta_meta(clave), encoding="utf-8") as f:
+                meta = json.load(f)
+            os.utime(self.ruta(clave))
+            return meta
+        except (OSError, ValueError):
+            self.eliminar(clave)
+            return None
+
+    def guardar(self, clave: str, temporal: str, meta: dict) -> None:
+        """Mueve el archivo descargado a la caché y registra sus metadatos"""
+        tamaño = os.path.getsize(temporal)
+        self.actualizar_meta(clave, meta)
+        os.replace(temporal, self.ruta(clave))
+        with self._lock:
+            self._total += tamaño - self._entradas.pop(clave, 0)
+            self._entradas[clave] = tamaño
+        self._desalojar()
+
+    def actualizar_meta(self, clave: str, meta: dict) -> None:
+        temporal = f"{self.ruta_meta(clave)}.{os.getpid()}.{threading.get_ident()}"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(temporal, self.ruta_meta(clave))
+
+    def eliminar(self, clave: str) -> None:
+        with self._lock:
+            self._total -= self._entradas.pop(clave, 0)
+        for ruta in (self.ruta(clave), self.ruta_meta(clave)):
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+
+    def _desalojar(self) -> None:
+        while True:
+            with self._lock:
+                if self._total <= self.max_bytes or not self._entradas:
+                    return
+                clave = next(iter(self._entradas))
+            self.eliminar(clave)
+            self.desalojos += 1
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {"entradas": len(self._entradas), "bytes": self._total, "max_bytes": self.max_bytes, "desalojos": self.desalojos}
+
+
+class ProxyMedia:
+    """Descarga, valida y cachea imágenes remotas"""
+
+    def __init__(
+        self,
+        cache: CacheDisco,
+        max_bytes: int = 10 * 1024 * 1024,
+        fresco_segundos: float = 86400,
+        hosts_permitidos: Optional[set] = None,
+        max_conexiones: int = 20,
+        timeout: float = 10.0,
+    ):
+        self.cache = cache
+        self.max_bytes = int(max_bytes)
+        self.fresco_segundos = float(fresco_segundos)
+        self.hosts_permitidos = hosts_permitidos or set()
+        # Solo para pruebas contra un origen local
+        self.permitir_redes_privadas = False
+        self.max_conexiones = int(max_conexiones)
+        self.timeout = float(timeout)
+        self._cliente: Optional[httpx.AsyncClient] = None
+        self._en_curso: Dict[str, asyncio.Future] = {}
+        self.aciertos = 0
+        self.revalidaciones = 0
+        self.descargas = 0
+
+    def _cliente_http(self) -> httpx.AsyncClient:
+        if self._cliente is None or self._cliente.is_closed:
+            self._cliente = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=5.0),
+                limits=httpx.Limits(max_connections=self.max_conexiones, max_keepalive_connections=self.max_conexiones),
+                follow_redirects=True,
+                max_redirects=3,
+                # Se llama también en cada redirección
+                event_hooks={"request": [self._validar_peticion]},
+                headers={"User-Agent": "hammernet-media-proxy"},
+            )
+        return self._cliente
+
+    async def cerrar(self) -> None:
+        if self._cliente is not None:
+            await self._cliente.aclose()
+            self._cliente = None
+
+    def _validar_url(self, url: str) -> None:
+        partes = urlsplit(url)
+        if partes.scheme not in ("http", "https") or not partes.hostname:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="URL de imagen inválida")
+        if partes.hostname.lower() not in self.hosts_permitidos:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Host de imagen no permitido")
+
+    async def _validar_peticion(self, peticion: httpx.Request) -> None:
+        """Hook de httpx: valida el host de la petición y de cada redirección antes de conectar"""
+        self._validar_url(str(peticion.url))
+        if self.permitir_redes_privadas:
+            return
+        puerto = peticion.url.port or (443 if peticion.url.scheme == "https" else 80)
+        try:
+            direcciones = await asyncio.get_running_loop().getaddrinfo(peticion.url.host, puerto)
+        except OSError:
+            raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="No se pudo resolver el host de la imagen")
+        for *_, direccion in direcciones:
+            ip = ipaddress.ip_address(direccion[0].split("%")[0])
+            if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+                ip = ip.ipv4_mapped
+            if not ip.is_global or ip.is_multicast:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Host de imagen no permitido")
+
+    async def obtener(self, url: str) -> FileResponse:
+        """Respuesta con la imagen de `url`, desde la caché o el origen"""
+        self._validar_url(url)
+        clave = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        meta = self.cache.obtener(clave)
+        if meta is not None and time.time() - meta["validado"] < self.fresco_segundos:
+            self.aciertos += 1
+        else:
+            meta = await self._unico(clave, url, meta)
+        return FileResponse(
+            self.cache.ruta(clave),
+            media_type=meta["content_type"],
+            headers=dict(CABECERAS_RESPUESTA),
+        )
+
+    async def _unico(self, clave: str, url: str, meta: Optional[dict]) -> dict:
+        """Single-flight: una descarga/revalidación por clave; el resto espera su resultado"""
+        en_curso = self._en_curso.get(clave)
+        if en_curso is not None:
+            return await asyncio.shield(en_curso)
+        futuro = asyncio.get_running_loop().create_future()
+        self._en_curso[clave] = futuro
+        try:
+            resultado = await self._descargar(clave, url, meta)
+            futuro.set_result(resultado)
+            return resultado
+        except BaseException as e:
+            futuro.set_exception(e)
+            # Evita el aviso "exception was never retrieved" si nadie más esperaba
+            futuro.exception()
+            raise
+        finally:
+            del self._en_curso[clave]
+
+    async def _descargar(self, clave: str, url: str, meta: Optional[dict]) -> dict:
+        cabeceras = {}
+        if meta is not None:
+            if meta.get("etag"):
+                cabeceras["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                cabeceras["If-Modified-Since"] = meta["last_modified"]
+        temporal = None
+        try:
+            async with self._cliente_http().stream("GET", url, headers=cabeceras) as r:
+                if r.status_code == 304 and meta is not None:
+                    self.revalidaciones += 1
+                    meta = dict(meta, validado=time.time())
+                    self.cache.actualizar_meta(clave, meta)
+                    return meta
+                if r.status_code != 200:
+                    raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=f"Origen respondió {r.status_code}")
+                tipo = r.headers.get("content-type", "").split(";")[0].strip().lower()
+                if tipo not in TIPOS_PERMITIDOS:
+                    raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="El recurso no es una imagen")
+                declarado = r.headers.get("content-length")
+                if declarado and declarado.isdigit() and int(declarado) > self.max_bytes:
+                    raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Imagen demasiado grande")
+
+                fd, temporal = tempfile.mkstemp(dir=self.cache.directorio, suffix=".parcial")
+                recibido = 0
+                with os.fdopen(fd, "wb") as f:
+                    async for bloque in r.aiter_bytes(64 * 1024):
+                        recibido += len(bloque)
+                        if recibido > self.max_bytes:
+                            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Imagen demasiado grande")
+                        f.write(bloque)
+                nuevo = {
+                    "url": url,
+                    "content_type": tipo,
+                    "etag": r.headers.get("etag"),
+                    "last_modified": r.headers.get("last-modified"),
+                    "validado": time.time(),
+                }
+            self.cache.guardar(clave, temporal, nuevo)
+            temporal = None
+            self.descargas += 1
+            return nuevo
+        except httpx.HTTPError:
+            if meta is not None:
+                # stale-if-error: mejor una imagen vencida que un 502
+                return meta
+            raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="No se pudo obtener la imagen")
+        except HTTPException as e:
+            if e.status_code == status.HTTP_502_BAD_GATEWAY and meta is not None:
+                return meta
+            raise
+        finally:
+            if temporal is not None:
+                try:
+                    os.remove(temporal)
+                except OSError:
+                    pass
+
+    def estadisticas(self) -> dict:
+        return {
+            "aciertos": self.aciertos,
+            "revalidaciones": self.revalidaciones,
+            "descargas": self.descargas,
+            **self.cache.estadisticas(),
+        }
+
+
+proxy_media = ProxyMedia(
+    CacheDisco(
+        os.getenv("MEDIA_CACHE_DIR", os.path.join(tempfile.gettempdir(), "hammernet_media")),
+        int(float(os.getenv("MEDIA_CACHE_MAX_MB", "256")) * 1024 * 1024),
+    ),
+    max_bytes=int(float(os.getenv("MEDIA_MAX_MB", "10")) * 1024 * 1024),
+    fresco_segundos=float(os.getenv("MEDIA_CACHE_FRESCO", "86400")),
+    hosts_permitidos={h.strip().lower() for h in os.getenv("MEDIA_HOSTS_PERMITIDOS", "res.cloudinary.com").split(",") if h.strip()},
+    max_conexiones=int(os.getenv("MEDIA_MAX_CONEXIONES", "20")),
+)
@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Métricas del proceso en formato de texto de Prometheus (GET /api/metrics).
+
+- MiddlewareMetricas: middleware ASGI que cuenta peticiones y mide su latencia por método y
+  plantilla de ruta ("/api/productos/{producto_id}", no la ruta concreta, para acotar la
+  cardinalidad) y lleva la cuenta de peticiones en curso
+- QueuePoolMedido: QueuePool que mide cuánto espera cada checkout por una conexión;
+  config/database.py lo usa con PostgreSQL
+- registrar_pool(): engines cuyo pool se informa (conexiones en uso, desborde, espera)
+- exponer(): texto con lo anterior más cachés del proceso, threadpool y memoria/CPU
+
+El camino caliente solo hace un bisect y un par de sumas bajo un lock por petición; todo lo
+demás se calcula al servir /api/metrics. No depende de prometheus_client.
+
+Los valores son del proceso: con varios workers de gunicorn cada scrape ve el worker que lo
+atendió (los contadores siguen siendo monótonos por proceso; agregar con sum() en Prometheus).
+
+Configuración por variables de entorno:
+- METRICAS_TOKEN: si se define, /api/metrics exige "Authorization: Bearer <token>"
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+from sqlalchemy.pool import QueuePool
+
+# Segundos; los límites por defecto de los clientes oficiales de Prometheus
+LIMITES_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+LIMITES_ESPERA_POOL = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+TOKEN = os.getenv("METRICAS_TOKEN") or None
+
+_ARRANQUE = time.time()
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _etiquetas(nombres: Tuple[str, ...], valores: tuple, extra: str = "") -> str:
+    pares = [f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _numero(valor: float) -> str:
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def _metrica(nombre: str, ayuda: str, tipo: str, etiquetas: Tuple[str, ...], series) -> List[str]:
+    """Líneas de una métrica a partir de [(valores de etiquetas, número), ...]"""
+    lineas = [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} {tipo}"]
+    lineas += [f"{nombre}{_etiquetas(etiquetas, v)} {_numero(x)}" for v, x in series]
+    return lineas
+
+
+class Contador:
+    """Contador monótono por combinación de etiquetas"""
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Tuple[str, ...]):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self._series: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, valores: tuple, cantidad: int = 1) -> None:
+        with self._lock:
+            self._series[valores] = self._series.get(valores, 0) + cantidad
+
+    def exponer(self) -> List[str]:
+        with self._lock:
+            series = sorted(self._series.items())
+        return _metrica(self.nombre, self.ayuda, "counter", self.etiquetas, series)
+
+
+class Histograma:
+    """Histograma con límites fijos por combinación de etiquetas (cubetas no acumuladas)"""
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Tuple[str, ...], limites: Tuple[float, ...]):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.limites = tuple(sorted(limites))
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valores: tuple, segundos: float) -> None:
+        # bisect_left: un valor igual al límite cuenta en esa cubeta (le = "menor o igual")
+        i = bisect_left(self.limites, segundos)
+        with self._lock:
+            serie = self._series.get(valores)
+            if serie is None:
+                serie = self._series[valores] = [[0] * (len(self.limites) + 1), 0.0]
+            serie[0][i] += 1
+            serie[1] += segundos
+
+    def exponer(self) -> List[str]:
+        with self._lock:
+            series = sorted((v, list(cubetas), suma) for v, (cubetas, suma) in self._series.items())
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} histogram"]
+        for valores, cubetas, suma in series:
+            acumulado = 0
+            for limite, n in zip(self.limites + ("+Inf",), cubetas):
+                acumulado += n
+                le = f'le="{limite}"'
+                lineas.append(f"{self.nombre}_bucket{_etiquetas(self.etiquetas, valores, le)} {acumulado}")
+            lineas.append(f"{self.nombre}_sum{_etiquetas(self.etiquetas, valores)} {_numero(suma)}")
+            lineas.append(f"{self.nombre}_count{_etiquetas(self.etiquetas, valores)} {acumulado}")
+        return lineas
+
+
+def _gauge(nombre: str, ayuda: str, etiquetas: Tuple[str, ...], series) -> List[str]:
+    return _metrica(nombre, ayuda, "gauge", etiquetas, series)
+
+
+peticiones = Contador("http_requests_total", "Peticiones HTTP atendidas", ("method", "route", "status"))
+latencia = Histograma(
+    "http_request_duration_seconds", "Duración de las peticiones HTTP", ("method", "route"), LIMITES_LATENCIA
+)
+espera_pool = Histograma(
+    "db_pool_checkout_wait_seconds", "Espera por una conexión del pool", ("pool",), LIMITES_ESPERA_POOL
+)
+_en_curso = 0
+
+_engines: Dict[str, object] = {}
+
+
+def registrar_pool(nombre: str, engine) -> None:
+    """Informa el pool de `engine` con la etiqueta pool=<nombre>"""
+    _engines[nombre] = engine
+
+
+def _nombre_pool(pool) -> str:
+    # Se busca por engine y no se guarda en el pool: engine.dispose() crea un pool nuevo
+    for nombre, engine in _engines.items():
+        if engine.pool is pool:
+            return nombre
+    return "sin_registrar"
+
+
+class QueuePoolMedido(QueuePool):
+    """QueuePool que registra en db_pool_checkout_wait_seconds la espera de cada checkout"""
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            espera_pool.observar((_nombre_pool(self),), time.perf_counter() - inicio)
+
+
+def _plantilla(scope: dict, raiz: str) -> str:
+    """Plantilla de la ruta atendida; el router de Starlette la deja en el scope al resolver"""
+    ruta = scope.get("route")
+    if ruta is not None:
+        return getattr(ruta, "path", "desconocida")
+    if "endpoint" in scope:
+        # Montaje (StaticFiles): Mount agrega su prefijo a root_path
+        return (scope.get("root_path") or "")[len(raiz):] or "montaje"
+    return "sin_ruta"
+
+
+class MiddlewareMetricas:
+    """Cuenta peticiones, mide su latencia por plantilla de ruta y lleva las peticiones en curso"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _en_curso
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        estado = [500]
+
+        async def enviar(mensaje):
+            if mensaje["type"] == "http.response.start":
+                estado[0] = mensaje["status"]
+            await send(mensaje)
+
+        raiz = scope.get("root_path") or ""
+        _en_curso += 1
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            duracion = time.perf_counter() - inicio
+            _en_curso -= 1
+            ruta = _plantilla(scope, raiz)
+            peticiones.incrementar((scope["method"], ruta, str(estado[0])))
+            latencia.observar((scope["method"], ruta), duracion)
+
+
+def _pools() -> List[str]:
+    tamanos, en_uso, libres, desborde = [], [], [], []
+    for nombre, engine in sorted(_engines.items()):
+        pool = engine.pool
+        if not hasattr(pool, "checkedout"):
+            continue  # NullPool / StaticPool (SQLite): sin conexiones reutilizables que contar
+        tamanos.append(((nombre,), pool.size()))
+        en_uso.append(((nombre,), pool.checkedout()))
+        libres.append(((nombre,), pool.checkedin()))
+        # overflow() parte en -pool_size mientras el pool no abrió todas sus conexiones
+        desborde.append(((nombre,), max(0, pool.overflow())))
+    return (
+        _gauge("db_pool_size", "Conexiones fijas del pool", ("pool",), tamanos)
+        + _gauge("db_pool_checked_out", "Conexiones del pool en uso", ("pool",), en_uso)
+        + _gauge("db_pool_checked_in", "Conexiones abiertas libres en el pool", ("pool",), libres)
+        + _gauge("db_pool_overflow", "Conexiones abiertas por encima de pool_size", ("pool",), desborde)
+        + espera_pool.exponer()
+    )
+
+
+def _caches() -> List[str]:
+    from core.cache import catalogo_cache, dashboard_cache, principal_cache
+    from core.media import proxy_media
+
+    series = []
+    for cache in (catalogo_cache, dashboard_cache, principal_cache):
+        e = cache.estadisticas()
+        series.append((e["nombre"], e["aciertos"], e["fallos"], e["entradas"]))
+    media = proxy_media.estadisticas()
+    series.append(("media", media["aciertos"] + media["revalidaciones"], media["descargas"], media["entradas"]))
+
+    def proporcion(aciertos, fallos):
+        return round(aciertos / (aciertos + fallos), 4) if aciertos + fallos else 0.0
+
+    return (
+        _metrica("cache_hits_total", "Aciertos de la caché", "counter", ("cache",), [((n,), a) for n, a, _, _ in series])
+        + _metrica("cache_misses_total", "Fallos de la caché", "counter", ("cache",), [((n,), f) for n, _, f, _ in series])
+        + _gauge("cache_hit_ratio", "Aciertos / consultas desde el arranque", ("cache",),
+                 [((n,), proporcion(a, f)) for n, a, f, _ in series])
+        + _gauge("cache_entries", "Entradas en la caché", ("cache",), [((n,), e) for n, _, _, e in series])
+    )
+
+
+def _proceso() -> List[str]:
+    lineas = []
+    try:
+        with open("/proc/self/statm") as f:
+            virtual, residente = (int(x) for x in f.read().split()[:2])
+        pagina = os.sysconf("SC_PAGE_SIZE")
+        lineas += _gauge("process_resident_memory_bytes", "Memoria residente", (), [((), residente * pagina)])
+        lineas += _gauge("process_virtual_memory_bytes", "Memoria virtual", (), [((), virtual * pagina)])
+    except (OSError, ValueError, AttributeError):
+        pass  # sin /proc (Windows, macOS)
+    try:
+        import resource
+        maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # KiB en Linux
+        lineas += _gauge("process_max_resident_memory_bytes", "Máximo de memoria residente", (), [((), maximo)])
+    except ImportError:
+        pass
+    lineas += _metrica("process_cpu_seconds_total", "Tiempo de CPU del proceso", "counter", (),
+                       [((), round(time.process_time(), 3))])
+    lineas += _gauge("process_start_time_seconds", "Arranque del proceso (epoch)", (), [((), round(_ARRANQUE, 3))])
+    return lineas
+
+
+def _threadpool() -> List[str]:
+    try:
+        import anyio.to_thread
+        limitador = anyio.to_thread.current_default_thread_limiter()
+    except Exception:
+        return []  # fuera del event loop
+    return (
+        _gauge("threadpool_size", "Hilos del threadpool de AnyIO", (), [((), int(limitador.total_tokens))])
+        + _gauge("threadpool_in_use", "Hilos del threadpool ocupados", (), [((), limitador.borrowed_tokens)])
+    )
+
+
+def exponer() -> str:
+    """Todas las métricas en formato de texto de Prometheus 0.0.4"""
+    lineas = (
+        peticiones.exponer()
+        + latencia.exponer()
+        + _gauge("http_requests_in_flight", "Peticiones HTTP en curso", (), [((), _en_curso)])
+        + _pools()
+        + _caches()
+        + _threadpool()
+        + _proceso()
+    )
+    return "\n".join(lineas) + "\n"
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Paginación por cursor (keyset) para los listados grandes.
+
+El cursor es opaco para el cliente: codifica el tipo de listado y los valores de la
+clave de orden de la última fila entregada, por ejemplo (fecha_venta, id_venta).
+La página siguiente se obtiene con "WHERE (clave) < (último)" sobre un índice, sin
+recorrer las filas ya vistas como ocurre con OFFSET.
+
+El modo offset (skip/limit) se mantiene por compatibilidad, pero el tamaño de página
+queda acotado a LIMITE_MAXIMO (variable de entorno PAGINACION_LIMITE_MAXIMO).
+"""
+
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import DateTime, String, and_, or_, type_coerce
+from sqlalchemy.orm import Session
+
+LIMITE_MAXIMO = int(os.getenv("PAGINACION_LIMITE_MAXIMO", "1000"))
+
+# Cabecera con el cursor de la página siguiente en los listados que devuelven una lista JSON
+CABECERA_CURSOR = "X-Next-Cursor"
+
+
+def acotar_limite(limit: Optional[int]) -> int:
+    """Tamaño de página efectivo: sin límite o por sobre el máximo se usa LIMITE_MAXIMO"""
+    if limit is None or limit > LIMITE_MAXIMO:
+        return LIMITE_MAXIMO
+    return max(1, int(limit))
+
+
+def codificar_cursor(tipo: str, valores: Sequence[Any]) -> str:
+    """Serializa la clave de la última fila como cursor opaco (base64 URL-safe)"""
+    datos = {
+        "t": tipo,
+        "v": [v.isoformat() if isinstance(v, datetime) else v for v in valores],
+    }
+    crudo = json.dumps(datos, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, tipo: str, tipos: Sequence[type]) -> List[Any]:
+    """
+    Valida y decodifica un cursor generado por codificar_cursor()
+
+    Args:
+        cursor: Cursor recibido del cliente
+        tipo: Tipo de listado esperado (un cursor de ventas no sirve para auditoría)
+        tipos: Tipo Python de cada valor de la clave (int, str, ...)
+
+    Raises:
+        HTTPException 400 si el cursor no es válido
+    """
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        datos = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        valores = datos["v"]
+        if datos["t"] != tipo or len(valores) != len(tipos):
+            raise ValueError("cursor de otro listado")
+        return [t(v) for v, t in zip(valores, tipos)]
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor de paginación inválido")
+
+
+def _comparable(columna, valor):
+    # Las fechas viajan en el cursor con su representación textual de la BD. En SQLite las
+    # fechas son texto con dos formatos posibles (CURRENT_TIMESTAMP sin microsegundos y
+    # SQLAlchemy con microsegundos), así que se comparan como texto tal cual están guardadas;
+    # en PostgreSQL el literal se convierte a timestamp. En ambos casos no se aplica ninguna
+    # función sobre la columna y el índice sigue siendo utilizable.
+    if isinstance(valor, str) and isinstance(getattr(columna, "type", None), DateTime):
+        return type_coerce(columna, String)
+    return columna
+
+
+def filtro_posterior(columnas: Sequence[Any], valores: Sequence[Any], descendente: bool = False):
+    """
+    Condición "fila posterior al cursor" para un orden lexicográfico sobre varias columnas.
+
+    Para (a, b) descendente genera: a < :a OR (a = :a AND b < :b)
+    """
+    columnas = [_comparable(c, v) for c, v in zip(columnas, valores)]
+    condiciones = []
+    for i, (columna, valor) in enumerate(zip(columnas, valores)):
+        comparacion = columna < valor if descendente else columna > valor
+        iguales = [c == v for c, v in zip(columnas[:i], valores[:i])]
+        condiciones.append(and_(*iguales, comparacion) if iguales else comparacion)
+    return or_(*condiciones)
+
+
+def cursor_siguiente(db: Session, items: Sequence[Any], limit: int, tipo: str,
+                     columnas: Sequence[Any], id_de: Callable[[Any], Any]) -> Optional[str]:
+    """
+    Cursor de la página siguiente, o None si la página vino incompleta (no hay más filas).
+
+    Args:
+        db: Sesión de base de datos
+        items: Página entregada
+        limit: Tamaño de página solicitado
+        tipo: Tipo de listado (ver decodificar_cursor)
+        columnas: Columnas/expresiones de la clave de orden; la última es la clave primaria
+        id_de: Función que extrae la clave primaria de un item
+    """
+    if not items or len(items) < limit:
+        return None
+    ultimo = id_de(items[-1])
+    if len(columnas) == 1:
+        return codificar_cursor(tipo, [ultimo])
+    # Releer la clave tal como está guardada (una búsqueda por clave primaria)
+    expresiones = [type_coerce(c, String) if isinstance(getattr(c, "type", None), DateTime) else c for c in columnas]
+    fila = db.query(*expresiones).filter(columnas[-1] == ultimo).first()
+    if fila is None:
+        return None
+    return codificar_cursor(tipo, list(fila))
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Cálculo de precios con oferta.
+
+Fuente única de la regla "¿la oferta está vigente? entonces aplicar porcentaje/fijo":
+- calcular_precios(): calcula un lote completo de productos en una pasada (una sola lectura del reloj)
+- precio_final_sql(): expresión SQL equivalente para calcular, filtrar y ordenar por precio final en la BD
+
+Ambas implementaciones trabajan en centavos enteros y redondean igual (mitad hacia arriba),
+de modo que el resultado es idéntico en Python, SQLite y PostgreSQL.
+"""
+
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import BigInteger, and_, case, cast, func, or_
+
+from models.producto import ProductoDB
+
+
+_CENTAVO = Decimal("0.01")
+
+
+class PrecioCalculado(NamedTuple):
+    """Resultado del cálculo de precio para un producto"""
+    precio_base: float
+    precio_final: float
+    oferta_vigente: bool
+    descuento_pct: int
+
+
+def _centavos(valor) -> int:
+    """Convierte un monto (Decimal/float/int/None) a centavos enteros, redondeando mitad hacia arriba"""
+    if valor is None:
+        return 0
+    # Sin pasar por float: 0.285 * 100 en binario es 28.4999... y redondearía a 28
+    monto = valor if isinstance(valor, Decimal) else Decimal(str(valor))
+    return int(monto.quantize(_CENTAVO, rounding=ROUND_HALF_UP) * 100)
+
+
+def _oferta_vigente(p, ahora: datetime) -> bool:
+    if not getattr(p, 'oferta_activa', False):
+        return False
+    if getattr(p, 'tipo_oferta', None) not in ('porcentaje', 'fijo'):
+        return False
+    if _centavos(getattr(p, 'valor_oferta', None)) <= 0:
+        return False
+    inicio = getattr(p, 'fecha_inicio_oferta', None)
+    fin = getattr(p, 'fecha_fin_oferta', None)
+    return (inicio is None or ahora >= inicio) and (fin is None or ahora <= fin)
+
+
+def _precio_final_centavos(base: int, tipo: Optional[str], valor: int) -> int:
+    if tipo == 'porcentaje':
+        # valor en centavos de punto porcentual (15.5% -> 1550), acotado a [0, 100%]
+        pb = min(max(valor, 0), 10000)
+        return (base * (10000 - pb) + 5000) // 10000
+    if tipo == 'fijo':
+        return max(0, base - valor)
+    return base
+
+
+def calcular_precios(productos: Iterable, ahora: Optional[datetime] = None) -> List[PrecioCalculado]:
+    """
+    Calcula precio base, precio final y descuento para un lote de productos
+
+    Args:
+        productos: Objetos con precio_venta, oferta_activa, tipo_oferta, valor_oferta y fechas de oferta
+        ahora: Instante de referencia (por defecto datetime.utcnow(), leído una vez por lote)
+
+    Returns:
+        List[PrecioCalculado]: Un resultado por producto, en el mismo orden
+    """
+    if ahora is None:
+        ahora = datetime.utcnow()
+    resultado = []
+    for p in productos:
+        base = max(_centavos(getattr(p, 'precio_venta', None)), 0)
+        final = base
+        descuento = 0
+        vigente = _oferta_vigente(p, ahora)
+        if vigente:
+            tipo = p.tipo_oferta
+            valor = _centavos(p.valor_oferta)
+            final = _precio_final_centavos(base, tipo, valor)
+            if tipo == 'porcentaje':
+                descuento = int((min(valor, 10000) + 50) // 100)
+            elif base > 0:
+                descuento = int(((base - final) * 100 * 2 + base) // (2 * base))
+        resultado.append(PrecioCalculado(base / 100, final / 100, vigente, descuento))
+    return resultado
+
+
+def calcular_precio(producto, ahora: Optional[datetime] = None) -> PrecioCalculado:
+    """Atajo de calcular_precios() para un solo producto"""
+    return calcular_precios([producto], ahora)[0]
+
+
+def _centavos_sql(columna):
+    return cast(func.round(func.coalesce(columna, 0) * 100), BigInteger)
+
+
+def oferta_vigente_sql(ahora: datetime):
+    """Condición SQL equivalente a la vigencia de la oferta usada en calcular_precios()"""
+    return and_(
+        ProductoDB.oferta_activa == True,
+        ProductoDB.tipo_oferta.in_(('porcentaje', 'fijo')),
+        _centavos_sql(ProductoDB.valor_oferta) > 0,
+        or_(ProductoDB.fecha_inicio_oferta.is_(None), ProductoDB.fecha_inicio_oferta <= ahora),
+        or_(ProductoDB.fecha_fin_oferta.is_(None), ProductoDB.fecha_fin_oferta >= ahora),
+    )
+
+
+def precio_final_centavos_sql(ahora: Optional[datetime] = None):
+    """Expresión SQL (entera, en centavos) del precio final de ProductoDB"""
+    if ahora is None:
+        ahora = datetime.utcnow()
+    base = _centavos_sql(ProductoDB.precio_venta)
+    base = case((base < 0, 0), else_=base)
+    valor = _centavos_sql(ProductoDB.valor_oferta)
+    pb = case((valor > 10000, 10000), else_=valor)
+    vigente = oferta_vigente_sql(ahora)
+    # Operandos enteros: la división es entera (piso) en SQLite y PostgreSQL
+    porcentaje = (base * (10000 - pb) + 5000) / 10000
+    fijo = case((base - valor < 0, 0), else_=base - valor)
+    return case(
+        (and_(vigente, ProductoDB.tipo_oferta == 'porcentaje'), porcentaje),
+        (and_(vigente, ProductoDB.tipo_oferta == 'fijo'), fijo),
+        else_=base,
+    )
+
+
+def precio_final_sql(ahora: Optional[datetime] = None):
+    """Expresión SQL del precio final en pesos (para filtrar/ordenar en la BD)"""
+    return precio_final_centavos_sql(ahora) / 100.0
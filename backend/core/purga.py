@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Borrado en cascada de usuarios por lotes, con sentencias por conjunto.
+
+purgar_usuarios() toma los usuarios que cumplen un filtro de a PURGA_LOTE_USUARIOS (por RUT,
+en orden) y, para cada lote:
+
+1. Ventas del lote (como cliente o como repartidor), de a PURGA_LOTE_VENTAS: resta las
+   completadas de los resúmenes diarios y borra movimientos, pagos, detalles y ventas con
+   DELETE ... WHERE id_venta IN (SELECT id_venta FROM ventas WHERE ... LIMIT n). Commit.
+2. Movimientos, despachos y auditoría que quedan a nombre de los usuarios del lote, y los
+   usuarios. Commit. Con conservar_auditoria la auditoría no se borra: queda sin usuario
+   (usuario_rut NULL), como en el borrado permanente de un usuario.
+
+Cada commit cierra una transacción corta, así que los bloqueos duran un lote y no toda la
+purga; si se interrumpe, lo confirmado queda borrado y volver a correrla termina el resto.
+Después de cada commit se llama a progreso(dict) con usuarios procesados y filas borradas
+por tabla (ver core.trabajos para correrla en segundo plano).
+"""
+
+import os
+import time
+from typing import Callable, Optional
+
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from core import resumen_ventas
+from core.auth import invalidar_principal
+from models.auditoria import AuditoriaDB
+from models.despacho import DespachoDB
+from models.pago import PagoDB
+from models.usuario import UsuarioDB
+from models.venta import DetalleVentaDB, MovimientoInventarioDB, VentaDB
+
+PURGA_LOTE_USUARIOS = int(os.getenv("PURGA_LOTE_USUARIOS", "200"))
+PURGA_LOTE_VENTAS = int(os.getenv("PURGA_LOTE_VENTAS", "2000"))
+
+# Orden de borrado: primero lo que referencia a ventas, al final los usuarios
+TABLAS = ("movimientos_inventario", "pagos", "detalles_venta", "ventas", "despachos", "auditoria", "usuarios")
+
+
+def _borrar(db: Session, filas: dict, tabla: str, sentencia) -> int:
+    n = db.execute(sentencia.execution_options(synchronize_session=False)).rowcount or 0
+    filas[tabla] += n
+    return n
+
+
+def _purgar_ventas(db: Session, ruts: list, lote_ventas: int, filas: dict, avisar: Callable) -> None:
+    """Borra las ventas de `ruts` y lo que cuelga de ellas, un commit cada lote_ventas ventas"""
+    while True:
+        # correlate(None): la subconsulta también se usa dentro de consultas y DELETE sobre ventas
+        lote = (
+            select(VentaDB.id_venta)
+            .where(or_(VentaDB.rut_usuario.in_(ruts), VentaDB.repartidor_rut.in_(ruts)))
+            .order_by(VentaDB.id_venta)
+            .limit(lote_ventas)
+            .correlate(None)
+        )
+        resumen_ventas.aplicar_filtro(db, VentaDB.id_venta.in_(lote), -1)
+        _borrar(db, filas, "movimientos_inventario", delete(MovimientoInventarioDB).where(MovimientoInventarioDB.id_venta.in_(lote)))
+        _borrar(db, filas, "pagos", delete(PagoDB).where(PagoDB.id_venta.in_(lote)))
+        _borrar(db, filas, "detalles_venta", delete(DetalleVentaDB).where(DetalleVentaDB.id_venta.in_(lote)))
+        borradas = _borrar(db, filas, "ventas", delete(VentaDB).where(VentaDB.id_venta.in_(lote)))
+        db.commit()
+        if borradas < lote_ventas:
+            return
+        avisar()
+
+
+def purgar_usuarios(
+    db: Session,
+    filtro,
+    progreso: Optional[Callable[[dict], None]] = None,
+    lote_usuarios: Optional[int] = None,
+    lote_ventas: Optional[int] = None,
+    conservar_auditoria: bool = False,
+) -> dict:
+    """
+    Borra los usuarios que cumplen `filtro` (expresión sobre UsuarioDB) con sus ventas, pagos,
+    detalles, movimientos, despachos y auditoría. Hace commit por lote. Con
+    `conservar_auditoria` la auditoría de los usuarios queda con usuario_rut en NULL.
+
+    Returns:
+        dict: usuarios borrados, filas borradas por tabla, lotes y segundos
+    """
+    lote_usuarios = max(1, int(lote_usuarios or PURGA_LOTE_USUARIOS))
+    lote_ventas = max(1, int(lote_ventas or PURGA_LOTE_VENTAS))
+    inicio = time.perf_counter()
+    total = db.query(func.count(UsuarioDB.rut)).filter(filtro).scalar() or 0
+    estado = {"usuarios_total": total, "usuarios": 0, "lotes": 0, "filas": dict.fromkeys(TABLAS, 0), "segundos": 0.0}
+
+    def avisar():
+        estado["segundos"] = round(time.perf_counter() - inicio, 3)
+        if progreso:
+            progreso(estado)
+
+    ultimo = None
+    try:
+        while True:
+            consulta = db.query(UsuarioDB.rut).filter(filtro)
+            if ultimo is not None:
+                consulta = consulta.filter(UsuarioDB.rut > ultimo)
+            ruts = [rut for (rut,) in consulta.order_by(UsuarioDB.rut).limit(lote_usuarios)]
+            if not ruts:
+                break
+
+            _purgar_ventas(db, ruts, lote_ventas, estado["filas"], avisar)
+            filas = estado["filas"]
+            _borrar(db, filas, "movimientos_inventario", delete(MovimientoInventarioDB).where(MovimientoInventarioDB.rut_usuario.in_(ruts)))
+            _borrar(db, filas, "despachos", delete(DespachoDB).where(DespachoDB.rut_usuario.in_(ruts)))
+            if conservar_auditoria:
+                db.execute(
+                    update(AuditoriaDB).where(AuditoriaDB.usuario_rut.in_(ruts)).values(usuario_rut=None)
+                    .execution_options(synchronize_session=False)
+                )
+            else:
+                _borrar(db, filas, "auditoria", delete(AuditoriaDB).where(AuditoriaDB.usuario_rut.in_(ruts)))
+            _borrar(db, filas, "usuarios", delete(UsuarioDB).where(UsuarioDB.rut.in_(ruts)))
+            db.commit()
+            for rut in ruts:
+                invalidar_principal(rut)
+
+            ultimo = ruts[-1]
+            estado["usuarios"] = filas["usuarios"]
+            estado["lotes"] += 1
+            avisar()
+    except Exception:
+        db.rollback()
+        raise
+    estado["segundos"] = round(time.perf_counter() - inicio, 3)
+    return estado
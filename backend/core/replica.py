@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Lecturas desde la réplica con "lee tus escrituras".
+
+Con DATABASE_READ_URL configurada, las rutas de consulta intensiva (catálogo, gráficos del
+dashboard, auditoría, movimientos, reportes) reciben su sesión de config.database.get_read_db,
+que lee de la réplica. La réplica puede ir unos segundos atrasada; para que un cliente vea sus
+propios cambios:
+
+- MiddlewareLecturaPegajosa: toda petición que escribe (método distinto de GET/HEAD/OPTIONS)
+  y termina bien deja la cookie COOKIE_LECTURA_PRIMARIA por LECTURA_PEGAJOSA_SEGUNDOS; mientras
+  esté presente, get_read_db entrega una sesión de la base principal
+- desfase_posible(): para los demás clientes, indica si una familia de core.cache cambió hace
+  menos de LECTURA_PEGAJOSA_SEGUNDOS; core.condicional no emite validadores en ese lapso (un
+  ETag nuevo sobre datos viejos de la réplica quedaría fijo en el navegador) y la caché del
+  catálogo no guarda entradas (CacheLRU.espera_tras_vaciar)
+
+Sin réplica configurada no se instala el middleware y desfase_posible() siempre es False.
+"""
+
+import os
+from datetime import datetime, timedelta
+
+from starlette.datastructures import MutableHeaders
+
+from config.database import COOKIE_LECTURA_PRIMARIA, DATABASE_READ_URL, LECTURA_PEGAJOSA_SEGUNDOS
+from core.cache import modificado
+
+ACTIVA = DATABASE_READ_URL is not None
+
+_METODOS_LECTURA = ("GET", "HEAD", "OPTIONS")
+# Escrituras que nadie vuelve a leer de inmediato: no fuerzan la base principal
+_EXCLUIDAS = ("/api/analytics",)
+
+
+def desfase_posible(request, familias) -> bool:
+    """La petición lee de la réplica y alguna de `familias` cambió dentro de la ventana de desfase"""
+    if not ACTIVA or request.cookies.get(COOKIE_LECTURA_PRIMARIA):
+        return False
+    limite = datetime.utcnow() - timedelta(seconds=LECTURA_PEGAJOSA_SEGUNDOS)
+    return any(modificado(familia) > limite for familia in familias)
+
+
+def _cookie() -> str:
+    atributos = [f"{COOKIE_LECTURA_PRIMARIA}=1", f"Max-Age={int(LECTURA_PEGAJOSA_SEGUNDOS)}", "Path=/", "HttpOnly"]
+    # En producción el frontend está en otro subdominio de onrender.com (otro sitio): la cookie
+    # solo viaja en fetch con credentials: 'include' si es SameSite=None; Secure
+    if os.getenv("ENVIRONMENT", "development").lower() == "production":
+        atributos += ["Secure", "SameSite=None"]
+    else:
+        atributos.append("SameSite=Lax")
+    return "; ".join(atributos)
+
+
+class MiddlewareLecturaPegajosa:
+    """Marca con una cookie de vida corta a los clientes que acaban de escribir"""
+
+    def __init__(self, app):
+        self.app = app
+        self.cookie = _cookie()
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or scope["method"] in _METODOS_LECTURA
+                or scope["path"].startswith(_EXCLUIDAS)):
+            await self.app(scope, receive, send)
+            return
+
+        async def enviar(mensaje):
+            if mensaje["type"] == "http.response.start" and mensaje["status"] < 400:
+                MutableHeaders(scope=mensaje).append("set-cookie", self.cookie)
+            await send(mensaje)
+
+        await self.app(scope, receive, enviar)
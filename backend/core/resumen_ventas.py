@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Resumen diario de ventas (rollups) para los gráficos del dashboard.
+
+Solo cuentan las ventas en estado "completada". Cada cambio que hace entrar o salir una
+venta de ese estado se aplica como un delta (+/-) dentro de la misma transacción:
+
+- cambio_estado(): aplica el delta si la venta entra o sale de "completada"
+- aplicar_ventas(): suma o resta un conjunto de ventas (p. ej. antes de borrarlas)
+- aplicar_filtro(): lo mismo para las ventas que cumplen una condición (borrados por lotes)
+- reconstruir(): recalcula los resúmenes desde ventas/detalles_venta (backfill, seeds);
+  también disponible como scripts/reconstruir_resumen_ventas.py
+
+Los deltas se escriben con core.acumulados.acumular() (INSERT ... ON CONFLICT DO UPDATE), de
+modo que dos transacciones que tocan el mismo día no se pisan. El día de una venta es
+date(fecha_venta) evaluado en la BD, igual que en las consultas que reemplazan.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session
+
+from core.acumulados import acumular
+from models.resumen_venta import ResumenVentaCategoriaDB, ResumenVentaDiaDB, ResumenVentaProductoDB
+from models.venta import DetalleVentaDB, VentaDB
+
+ESTADO_CONTABLE = "completada"
+_LOTE_IDS = 500
+
+
+def _dia(valor) -> date:
+    # date() devuelve texto en SQLite y date en PostgreSQL
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    return date.fromisoformat(str(valor)[:10])
+
+
+def _agregar(db: Session, filtro, signo: int) -> None:
+    """Aplica a los resúmenes las ventas que cumplen `filtro`, multiplicadas por `signo`"""
+    dia_venta = func.date(VentaDB.fecha_venta)
+    por_dia = {}
+    for dia, ingresos, cantidad in db.query(
+        dia_venta, func.coalesce(func.sum(VentaDB.total_venta), 0), func.count(VentaDB.id_venta)
+    ).filter(filtro).group_by(dia_venta):
+        dia = _dia(dia)
+        por_dia[dia] = {"dia": dia, "ingresos": signo * ingresos, "cantidad_ventas": signo * cantidad, "unidades": 0}
+
+    por_producto = {}
+    por_categoria = defaultdict(lambda: [0, 0])
+    # La categoría es la guardada en el detalle al vender (no la actual del producto): restar una
+    # venta toca la misma fila de ventas_resumen_categoria que la sumó
+    for dia, id_producto, id_categoria, unidades, subtotal in db.query(
+        dia_venta,
+        DetalleVentaDB.id_producto,
+        DetalleVentaDB.id_categoria,
+        func.coalesce(func.sum(DetalleVentaDB.cantidad), 0),
+        func.coalesce(func.sum(DetalleVentaDB.subtotal), 0),
+    ).join(VentaDB, DetalleVentaDB.id_venta == VentaDB.id_venta).filter(filtro).group_by(
+        dia_venta, DetalleVentaDB.id_producto, DetalleVentaDB.id_categoria
+    ):
+        dia = _dia(dia)
+        por_dia[dia]["unidades"] += signo * unidades
+        producto = por_producto.setdefault((dia, id_producto), {"dia": dia, "id_producto": id_producto, "unidades": 0, "ventas": 0})
+        producto["unidades"] += signo * unidades
+        producto["ventas"] += signo * subtotal
+        if id_categoria is not None:
+            por_categoria[(dia, id_categoria)][0] += signo * subtotal
+            por_categoria[(dia, id_categoria)][1] += signo * unidades
+
+    acumular(db, ResumenVentaDiaDB, ("dia",), list(por_dia.values()))
+    acumular(db, ResumenVentaProductoDB, ("dia", "id_producto"), list(por_producto.values()))
+    acumular(db, ResumenVentaCategoriaDB, ("dia", "id_categoria"), [
+        {"dia": dia, "id_categoria": id_categoria, "ingresos": ingresos, "cantidad": cantidad}
+        for (dia, id_categoria), (ingresos, cantidad) in por_categoria.items()
+    ])
+
+
+def aplicar_ventas(db: Session, ids_venta: Iterable[int], signo: int = 1) -> None:
+    """
+    Suma (signo=1) o resta (signo=-1) ventas a los resúmenes, sin mirar su estado.
+    Llamar antes del commit; las ventas y sus detalles deben estar en la BD (se hace flush).
+    """
+    ids = sorted(set(ids_venta))
+    if not ids:
+        return
+    db.flush()
+    for i in range(0, len(ids), _LOTE_IDS):
+        _agregar(db, VentaDB.id_venta.in_(ids[i:i + _LOTE_IDS]), signo)
+
+
+def aplicar_filtro(db: Session, filtro, signo: int = 1) -> None:
+    """
+    Como aplicar_ventas() para las ventas que cumplen `filtro` (expresión sobre VentaDB), sin
+    traer sus ids. Solo cuentan las que están en ESTADO_CONTABLE.
+    """
+    db.flush()
+    _agregar(db, and_(filtro, VentaDB.estado == ESTADO_CONTABLE), signo)
+
+
+def cambio_estado(db: Session, id_venta: int, anterior: Optional[str], nuevo: Optional[str]) -> None:
+    """Registra en los resúmenes un cambio de estado de venta (anterior=None para una venta nueva)"""
+    contaba = anterior == ESTADO_CONTABLE
+    cuenta = nuevo == ESTADO_CONTABLE
+    if contaba != cuenta:
+        aplicar_ventas(db, [id_venta], 1 if cuenta else -1)
+
+
+def reconstruir(db: Session) -> None:
+    """Recalcula los tres resúmenes desde cero. No hace commit."""
+    for modelo in (ResumenVentaDiaDB, ResumenVentaProductoDB, ResumenVentaCategoriaDB):
+        db.query(modelo).delete(synchronize_session=False)
+    db.flush()
+    _agregar(db, VentaDB.estado == ESTADO_CONTABLE, 1)
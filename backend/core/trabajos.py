@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Trabajos administrativos en segundo plano (purgas de usuarios y similares).
+
+lanzar() encola una función `funcion(db, progreso=...)` en un pool propio de TRABAJOS_WORKERS
+hilos (1 por defecto: las purgas corren de a una) y devuelve el Trabajo de inmediato. El
+trabajo abre su propia sesión de BD, y la función informa su avance llamando a progreso(dict);
+ese dict queda visible en Trabajo.resumen() mientras corre.
+
+Cancelación: cancelar() (y cerrar(), en el shutdown de FastAPI) marca el trabajo; la siguiente
+llamada a progreso() lanza TrabajoCancelado. Las funciones llaman a progreso() después de cada
+commit, así que lo ya borrado queda confirmado y el resto queda intacto.
+
+El registro guarda los últimos TRABAJOS_HISTORIAL trabajos en memoria (por proceso).
+"""
+
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Optional
+
+from fastapi import HTTPException
+
+from config.database import SessionLocal
+
+
+class TrabajoCancelado(Exception):
+    """El trabajo se canceló entre dos lotes"""
+
+
+class Trabajo:
+    """Estado de un trabajo en segundo plano"""
+
+    def __init__(self, tipo: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.tipo = tipo
+        self.estado = "pendiente"  # pendiente, en_curso, completado, cancelado, error
+        self.progreso: dict = {}
+        self.resultado: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.creado = datetime.utcnow()
+        self.iniciado: Optional[datetime] = None
+        self.terminado: Optional[datetime] = None
+        self._cancelar = threading.Event()
+
+    def actualizar(self, progreso: dict) -> None:
+        self.progreso = dict(progreso)
+        if self._cancelar.is_set():
+            raise TrabajoCancelado()
+
+    def resumen(self) -> dict:
+        return {
+            "id": self.id,
+            "tipo": self.tipo,
+            "estado": self.estado,
+            "progreso": self.progreso,
+            "resultado": self.resultado,
+            "error": self.error,
+            "creado": self.creado.isoformat(),
+            "iniciado": self.iniciado.isoformat() if self.iniciado else None,
+            "terminado": self.terminado.isoformat() if self.terminado else None,
+        }
+
+
+class RegistroTrabajos:
+    """Pool acotado + registro en memoria de los últimos trabajos"""
+
+    def __init__(self, workers: int = 1, historial: int = 50):
+        self.historial = max(1, int(historial))
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix="trabajos")
+        self._trabajos: "OrderedDict[str, Trabajo]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lanzar(self, tipo: str, funcion: Callable) -> Trabajo:
+        trabajo = Trabajo(tipo)
+        with self._lock:
+            self._trabajos[trabajo.id] = trabajo
+            while len(self._trabajos) > self.historial:
+                antiguo = next(iter(self._trabajos.values()))
+                if antiguo.estado in ("pendiente", "en_curso"):
+                    break
+                self._trabajos.popitem(last=False)
+        self._pool.submit(self._correr, trabajo, funcion)
+        return trabajo
+
+    def _correr(self, trabajo: Trabajo, funcion: Callable) -> None:
+        if trabajo._cancelar.is_set():
+            trabajo.estado, trabajo.terminado = "cancelado", datetime.utcnow()
+            return
+        trabajo.estado, trabajo.iniciado = "en_curso", datetime.utcnow()
+        db = SessionLocal()
+        try:
+            trabajo.resultado = funcion(db, progreso=trabajo.actualizar)
+            trabajo.estado = "completado"
+        except TrabajoCancelado:
+            trabajo.estado = "cancelado"
+        except HTTPException as e:
+            trabajo.estado, trabajo.error = "error", str(e.detail)
+        except Exception as e:
+            trabajo.estado, trabajo.error = "error", str(e)
+        finally:
+            db.close()
+            trabajo.terminado = datetime.utcnow()
+
+    def obtener(self, id_trabajo: str) -> Optional[Trabajo]:
+        with self._lock:
+            return self._trabajos.get(id_trabajo)
+
+    def cancelar(self, id_trabajo: str) -> Optional[Trabajo]:
+        trabajo = self.obtener(id_trabajo)
+        if trabajo:
+            trabajo._cancelar.set()
+        return trabajo
+
+    def cerrar(self) -> None:
+        with self._lock:
+            for trabajo in self._trabajos.values():
+                trabajo._cancelar.set()
+        self._pool.shutdown(wait=True)
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            estados = [t.estado for t in self._trabajos.values()]
+        return {estado: estados.count(estado) for estado in set(estados)}
+
+
+registro_trabajos = RegistroTrabajos(
+    workers=int(os.getenv("TRABAJOS_WORKERS", "1")),
+    historial=int(os.getenv("TRABAJOS_HISTORIAL", "50")),
+)
@@ -1,10 +1,13 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, HTTPException
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.gzip import GZipMiddleware
 import uvicorn
+import anyio
+import hmac
 import os
 from dotenv import load_dotenv
 
@@ -12,8 +15,16 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Importar módulos personalizados
-from config.database import Base, engine
+from config.migraciones import verificar_esquema
 from config.cloudinary_config import configure_cloudinary
+from core.cache import catalogo_cache, estadisticas_cache
+from core import consultas, metricas, replica
+from config.database import LECTURA_PEGAJOSA_SEGUNDOS, engine, engine_lectura
+from core.auditoria import escritor_auditoria
+from core.analytics import buffer_analytics
+from core.media import proxy_media
+from core.imagenes import AlmacenamientoLocal, pipeline_imagenes
+from core.trabajos import registro_trabajos
 # Registrar todos los modelos antes de crear tablas para evitar errores de mapeo en producción
 from models import *  # noqa: F401,F403
 
@@ -62,74 +73,36 @@ try:
 except Exception as _gz_err:
     print(f"[GZip] No se pudo agregar middleware: {_gz_err}")
 
-# Crear las tablas en la base de datos (solo si no existen)
+# Esquema de la base: el arranque no hace DDL. Solo comprueba (una consulta) que la base esté
+# en la última migración; las migraciones se aplican con scripts/migrar.py (ver
+# config/migraciones.py). Con SQLite migra aquí mismo si hace falta (MIGRAR_AL_INICIAR).
 try:
-    Base.metadata.create_all(bind=engine)
-    # Ajuste de compatibilidad de esquema: asegurar columna id_rol en usuarios
-    from sqlalchemy import text
-    with engine.connect() as conn:
-        try:
-            cols = conn.execute(text("PRAGMA table_info(usuarios)")).fetchall()
-            names = [c[1] for c in cols]
-            if 'id_rol' not in names:
-                conn.execute(text("ALTER TABLE usuarios ADD COLUMN id_rol INTEGER"))
-        except Exception as ie:
-            print(f"⚠️  No se pudo asegurar columna id_rol en usuarios: {ie}")
+    verificar_esquema()
     print("🔄 Servidor iniciado - Base de datos verificada")
 except Exception as e:
-    print(f"❌ Error al inicializar base de datos: {e}")
+    print(f"❌ Error al verificar el esquema de la base de datos: {e}")
 
-try:
-    from config.database import SessionLocal
-    from models.rol import RolDB
-    from models.permiso import PermisoDB
-    from models.rol_permiso import RolPermisoDB
-    db = SessionLocal()
-    perms = [
-        "usuarios",
-        "catalogo",
-        "inventario",
-        "ventas",
-        "pagos",
-        "auditoria",
-        "dashboard",
-        "proveedores",
-        "categorias",
-        "subcategorias",
-        "despachos",
-    ]
-    created_perms = {}
-    for name in perms:
-        p = db.query(PermisoDB).filter(PermisoDB.descripcion == name).first()
-        if not p:
-            p = PermisoDB(descripcion=name)
-            db.add(p)
-            db.flush()
-        created_perms[name] = p.id_permiso
-    roles = ["administrador", "vendedor", "bodeguero", "cliente"]
-    created_roles = {}
-    for rname in roles:
-        r = db.query(RolDB).filter(RolDB.nombre == rname).first()
-        if not r:
-            r = RolDB(nombre=rname)
-            db.add(r)
-            db.flush()
-        created_roles[rname] = r.id_rol
-    admin_id = created_roles.get("administrador")
-    if admin_id:
-        for pid in created_perms.values():
-            rp = db.query(RolPermisoDB).filter(RolPermisoDB.id_rol == admin_id, RolPermisoDB.id_permiso == pid).first()
-            if not rp:
-                db.add(RolPermisoDB(id_rol=admin_id, id_permiso=pid))
-    db.commit()
-    db.close()
-except Exception as e:
-    try:
-        db.rollback()
-        db.close()
-    except Exception:
-        pass
-    print(f"⚠️  Inicialización de permisos/roles parcialmente fallida: {e}")
+# Handlers y controladores son síncronos (SQLAlchemy síncrono): FastAPI los ejecuta en el
+# threadpool de AnyIO. Su tamaño limita las peticiones con BD en paralelo por worker.
+THREADPOOL_WORKERS = int(os.getenv("THREADPOOL_WORKERS", "40"))
+
+@app.on_event("startup")
+async def configurar_threadpool():
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_WORKERS
+
+# Auditoría: hilo escritor por lotes; al cerrar se vacía la cola (o se respalda en archivo)
+@app.on_event("startup")
+def iniciar_auditoria():
+    escritor_auditoria.iniciar()
+
+@app.on_event("shutdown")
+def detener_auditoria():
+    escritor_auditoria.detener()
+
+# Analytics: el buffer en memoria se escribe por lotes; al cerrar se vacía lo pendiente
+@app.on_event("shutdown")
+def detener_analytics():
+    buffer_analytics.detener()
 
 # Configurar CORS
 origins_str = os.getenv("ALLOWED_ORIGINS", "https://ferreteria-patricio.onrender.com,https://hammernet.onrender.com")
@@ -152,7 +125,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
     allow_headers=["Authorization", "Content-Type", "Accept", "X-Requested-With", "Access-Control-Allow-Origin"],
-    expose_headers=["Authorization"],
+    expose_headers=["Authorization", "X-Next-Cursor", "ETag", "Last-Modified"],
     max_age=3600
 )
 
@@ -165,6 +138,8 @@ async def cache_headers_middleware(request: Request, call_next):
         if method == "GET":
             if path.startswith("/api/productos"):
                 response.headers["Cache-Control"] = "public, max-age=60"
+            elif path.startswith(("/api/categorias", "/api/subcategorias")):
+                response.headers["Cache-Control"] = "public, max-age=60"
             elif path.startswith("/api/dashboard"):
                 response.headers["Cache-Control"] = "public, max-age=30"
             elif path.startswith("/api/ventas"):
@@ -173,6 +148,24 @@ async def cache_headers_middleware(request: Request, call_next):
     except Exception:
         return response
 
+# Consultas SQL por petición (core/consultas.py): cantidad y tiempo en BD en Server-Timing,
+# junto a las métricas que ya ponga el endpoint; marca los N+1 sospechosos
+if consultas.SERVER_TIMING:
+    app.add_middleware(consultas.MiddlewareConsultas)
+
+# Réplica de lectura (DATABASE_READ_URL, core/replica.py): quien escribe lee de la base
+# principal durante LECTURA_PEGAJOSA_SEGUNDOS, y en ese lapso el catálogo no se guarda en caché
+if replica.ACTIVA:
+    catalogo_cache.espera_tras_vaciar = LECTURA_PEGAJOSA_SEGUNDOS
+    app.add_middleware(replica.MiddlewareLecturaPegajosa)
+
+# Métricas Prometheus (core/metricas.py): va por fuera de todo lo anterior para medir la
+# petición completa
+metricas.registrar_pool("principal", engine)
+if replica.ACTIVA:
+    metricas.registrar_pool("lectura", engine_lectura)
+app.add_middleware(metricas.MiddlewareMetricas)
+
 # Endpoint de salud del sistema
 @app.get("/health", tags=["Sistema"])
 @app.get("/api/health", tags=["Sistema"])
@@ -189,6 +182,27 @@ async def health_check():
         "version": "1.0.0"
     }
 
+@app.get("/api/health/cache", tags=["Sistema"])
+async def cache_stats():
+    """
+    Estadísticas de las cachés del proceso (aciertos, fallos, entradas, versión del catálogo)
+    y de la caché en disco del proxy de imágenes
+    """
+    return {**estadisticas_cache(), "media": proxy_media.estadisticas(), "imagenes": pipeline_imagenes.estadisticas()}
+
+@app.get("/api/metrics", tags=["Sistema"], response_class=PlainTextResponse)
+async def metrics(request: Request):
+    """
+    Métricas en formato de texto de Prometheus: peticiones y latencia por ruta, peticiones en
+    curso, pool de conexiones, cachés, threadpool y memoria. Con METRICAS_TOKEN definido exige
+    "Authorization: Bearer <token>"
+    """
+    if metricas.TOKEN and not hmac.compare_digest(
+        request.headers.get("authorization", ""), f"Bearer {metricas.TOKEN}"
+    ):
+        raise HTTPException(status_code=401, detail="No autorizado")
+    return PlainTextResponse(metricas.exponer(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Incluir las rutas en la aplicación
 app.include_router(auth_router)
 app.include_router(usuario_router)
@@ -204,24 +218,45 @@ app.include_router(dashboard_router)
 app.include_router(pago_router)
 app.include_router(analytics_router)
 
-# Proxy ligero de imágenes para evitar advertencias de tracking y servir desde mismo origen
-from fastapi import Query, Response
-import requests
+# Rutas de datos de ejemplo (seed_data.py): solo con RUTAS_DEV=1; en producción no se importan.
+# Para volúmenes de prueba de carga: scripts/generar_datos.py
+if os.getenv("RUTAS_DEV", "0").lower() in ("1", "true", "si", "sí"):
+    from views.dev_routes import router as dev_router
+
+    app.include_router(dev_router)
+
+# Proxy de imágenes para evitar advertencias de tracking y servir desde mismo origen
+# (caché en disco, revalidación condicional y descargas agrupadas: core/media.py)
+from fastapi import Query
 
 @app.get("/api/media", tags=["Media"])
-def proxy_media(url: str = Query(..., description="URL absoluta de la imagen")):
-    try:
-        r = requests.get(url, timeout=10)
-        ct = r.headers.get("content-type", "image/jpeg")
-        headers = {
-            "Cache-Control": "public, max-age=86400",
-            "Content-Type": ct,
-            "Referrer-Policy": "no-referrer",
-            "Cross-Origin-Resource-Policy": "same-origin",
-        }
-        return Response(content=r.content, headers=headers, media_type=ct)
-    except Exception as e:
-        return Response(status_code=502, content=b"", headers={"Cache-Control": "no-cache"})
+async def obtener_media(url: str = Query(..., description="URL absoluta de la imagen")):
+    return await proxy_media.obtener(url)
+
+@app.on_event("shutdown")
+async def cerrar_proxy_media():
+    await proxy_media.cerrar()
+
+# Imágenes de productos con almacenamiento local (core/imagenes.py): se sirven desde el
+# mismo origen; con Cloudinary las URLs ya son absolutas
+if isinstance(pipeline_imagenes.almacenamiento, AlmacenamientoLocal):
+    from fastapi.staticfiles import StaticFiles
+
+    app.mount(
+        pipeline_imagenes.almacenamiento.url_base,
+        StaticFiles(directory=pipeline_imagenes.almacenamiento.directorio),
+        name="imagenes",
+    )
+
+@app.on_event("shutdown")
+def cerrar_pipeline_imagenes():
+    pipeline_imagenes.cerrar()
+
+
+@app.on_event("shutdown")
+def cerrar_trabajos():
+    # Las purgas en curso se detienen al terminar su lote
+    registro_trabajos.cerrar()
 
 if __name__ == "__main__":
     # Obtener configuración del servidor desde variables de entorno
@@ -0,0 +1,50 @@
+"""
+Entorno de Alembic para migrations/versions.
+
+La conexión la entrega config.migraciones.migrar() en config.attributes["connection"] (misma
+transacción que el resto de la migración); si no viene, se usa el engine de config.database.
+"""
+
+from alembic import context
+
+from config.database import engine
+from models.base import Base
+import models  # noqa: F401  (registra todas las tablas en Base.metadata)
+
+config = context.config
+target_metadata = Base.metadata
+
+
+def _configurar(conexion) -> None:
+    context.configure(
+        connection=conexion,
+        target_metadata=target_metadata,
+        # SQLite no soporta la mayoría de ALTER TABLE: autogenerate usa batch
+        render_as_batch=conexion.dialect.name == "sqlite",
+        compare_type=True,
+    )
+
+
+def run_migrations_offline() -> None:
+    context.configure(url=str(engine.url), target_metadata=target_metadata, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    conexion = config.attributes.get("connection")
+    if conexion is not None:
+        _configurar(conexion)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+    with engine.begin() as conexion:
+        _configurar(conexion)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
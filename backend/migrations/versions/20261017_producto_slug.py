@@ -0,0 +1,69 @@
+"""Slug persistido en productos e historial de slugs para redirecciones
+
+Revision ID: 20261017_producto_slug
+Revises: 20251109_rut_integer_unique
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import re
+import unicodedata
+
+
+# revision identifiers, used by Alembic.
+revision = '20261017_producto_slug'
+down_revision = '20251109_rut_integer_unique'
+branch_labels = None
+depends_on = None
+
+
+def _slugify(nombre):
+    # Copia de ProductoController._slugify_nombre (las migraciones no importan código de la app)
+    if not nombre:
+        return ""
+    s = unicodedata.normalize('NFD', str(nombre))
+    s = ''.join(ch for ch in s if unicodedata.category(ch) != 'Mn')
+    s = s.lower().replace('ñ', 'n')
+    s = re.sub(r'[^a-z0-9]+', '-', s)
+    return re.sub(r'-+', '-', s).strip('-')
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    cols = [c['name'] for c in inspector.get_columns('productos')]
+    if 'slug' not in cols:
+        op.add_column('productos', sa.Column('slug', sa.String(220), nullable=True))
+
+    if 'productos_slug_historial' not in inspector.get_table_names():
+        op.create_table(
+            'productos_slug_historial',
+            sa.Column('slug', sa.String(220), primary_key=True),
+            sa.Column('id_producto', sa.Integer, sa.ForeignKey('productos.id_producto', ondelete='CASCADE'), nullable=False),
+            sa.Column('fecha_creacion', sa.DateTime, server_default=sa.func.now()),
+        )
+        op.create_index('ix_productos_slug_historial_id_producto', 'productos_slug_historial', ['id_producto'])
+
+    # Backfill: el producto más antiguo conserva el slug sin sufijo
+    ocupados = {r[0] for r in conn.execute(sa.text("SELECT slug FROM productos WHERE slug IS NOT NULL"))}
+    pendientes = conn.execute(sa.text("SELECT id_producto, nombre FROM productos WHERE slug IS NULL ORDER BY id_producto")).fetchall()
+    for id_producto, nombre in pendientes:
+        base = _slugify(nombre) or "producto"
+        slug, n = base, 2
+        while slug in ocupados:
+            slug = f"{base}-{n}"
+            n += 1
+        ocupados.add(slug)
+        conn.execute(sa.text("UPDATE productos SET slug = :slug WHERE id_producto = :id"), {"slug": slug, "id": id_producto})
+
+    indexes = [i['name'] for i in inspector.get_indexes('productos')]
+    if 'ux_productos_slug' not in indexes:
+        op.create_index('ux_productos_slug', 'productos', ['slug'], unique=True)
+
+
+def downgrade():
+    op.drop_index('ux_productos_slug', table_name='productos')
+    op.drop_table('productos_slug_historial')
+    op.drop_column('productos', 'slug')
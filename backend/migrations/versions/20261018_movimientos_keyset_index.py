@@ -0,0 +1,28 @@
+"""Índice (fecha_movimiento, id_movimiento) para paginación por cursor de movimientos
+
+Revision ID: 20261018_movimientos_keyset_index
+Revises: 20261017_producto_slug
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '20261018_movimientos_keyset_index'
+down_revision = '20261017_producto_slug'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_movimientos_fecha_id',
+        'movimientos_inventario',
+        ['fecha_movimiento', 'id_movimiento'],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_movimientos_fecha_id', table_name='movimientos_inventario')
@@ -0,0 +1,52 @@
+"""Tablas de resumen diario de ventas (día, día x producto, día x categoría)
+
+Revision ID: 20261019_ventas_resumen
+Revises: 20261018_movimientos_keyset_index
+Create Date: 2026-10-19
+
+Tras aplicar la migración, poblar con: python scripts/reconstruir_resumen_ventas.py
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_ventas_resumen'
+down_revision = '20261018_movimientos_keyset_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'ventas_resumen_dia',
+        sa.Column('dia', sa.Date, primary_key=True),
+        sa.Column('ingresos', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.Column('cantidad_ventas', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('unidades', sa.Integer, nullable=False, server_default='0'),
+    )
+    op.create_table(
+        'ventas_resumen_producto',
+        sa.Column('dia', sa.Date, primary_key=True),
+        sa.Column('id_producto', sa.Integer, primary_key=True),
+        sa.Column('unidades', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('ventas', sa.Numeric(14, 2), nullable=False, server_default='0'),
+    )
+    op.create_index('ix_ventas_resumen_producto_id_producto', 'ventas_resumen_producto', ['id_producto'])
+    op.create_table(
+        'ventas_resumen_categoria',
+        sa.Column('dia', sa.Date, primary_key=True),
+        sa.Column('id_categoria', sa.Integer, primary_key=True),
+        sa.Column('ingresos', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.Column('cantidad', sa.Integer, nullable=False, server_default='0'),
+    )
+    op.create_index('ix_ventas_resumen_categoria_id_categoria', 'ventas_resumen_categoria', ['id_categoria'])
+
+
+def downgrade():
+    op.drop_index('ix_ventas_resumen_categoria_id_categoria', table_name='ventas_resumen_categoria')
+    op.drop_table('ventas_resumen_categoria')
+    op.drop_index('ix_ventas_resumen_producto_id_producto', table_name='ventas_resumen_producto')
+    op.drop_table('ventas_resumen_producto')
+    op.drop_table('ventas_resumen_dia')
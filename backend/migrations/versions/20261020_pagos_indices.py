@@ -0,0 +1,25 @@
+"""Índices de pagos por buy_order y session_id
+
+Revision ID: 20261020_pagos_indices
+Revises: 20261019_ventas_resumen
+Create Date: 2026-10-20
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '20261020_pagos_indices'
+down_revision = '20261019_ventas_resumen'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_pagos_buy_order', 'pagos', ['buy_order'], unique=False)
+    op.create_index('ix_pagos_session_id', 'pagos', ['session_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_pagos_session_id', table_name='pagos')
+    op.drop_index('ix_pagos_buy_order', table_name='pagos')
@@ -0,0 +1,50 @@
+"""Eventos de analytics (solo inserción) y resúmenes por hora/nombre y día/URL
+
+Revision ID: 20261021_eventos_analytics
+Revises: 20261020_pagos_indices
+Create Date: 2026-10-21
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261021_eventos_analytics'
+down_revision = '20261020_pagos_indices'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'eventos_analytics',
+        sa.Column('id_evento', sa.Integer, primary_key=True),
+        sa.Column('nombre', sa.String(100), nullable=False),
+        sa.Column('url', sa.String(500), nullable=True),
+        sa.Column('propiedades', sa.Text, nullable=True),
+        sa.Column('ts_cliente', sa.String(40), nullable=True),
+        sa.Column('fecha_recepcion', sa.DateTime, nullable=False),
+    )
+    op.create_index('ix_eventos_analytics_recepcion', 'eventos_analytics', ['fecha_recepcion'])
+    op.create_index('ix_eventos_analytics_nombre_recepcion', 'eventos_analytics', ['nombre', 'fecha_recepcion'])
+    op.create_table(
+        'eventos_analytics_hora',
+        sa.Column('hora', sa.DateTime, primary_key=True),
+        sa.Column('nombre', sa.String(100), primary_key=True),
+        sa.Column('cantidad', sa.Integer, nullable=False, server_default='0'),
+    )
+    op.create_table(
+        'eventos_analytics_url',
+        sa.Column('dia', sa.Date, primary_key=True),
+        sa.Column('url', sa.String(500), primary_key=True),
+        sa.Column('cantidad', sa.Integer, nullable=False, server_default='0'),
+    )
+
+
+def downgrade():
+    op.drop_table('eventos_analytics_url')
+    op.drop_table('eventos_analytics_hora')
+    op.drop_index('ix_eventos_analytics_nombre_recepcion', table_name='eventos_analytics')
+    op.drop_index('ix_eventos_analytics_recepcion', table_name='eventos_analytics')
+    op.drop_table('eventos_analytics')
@@ -0,0 +1,29 @@
+"""URLs de variantes de imagen (tarjeta y miniatura) en productos
+
+Revision ID: 20261022_producto_imagen_variantes
+Revises: 20261021_eventos_analytics
+Create Date: 2026-10-22
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261022_producto_imagen_variantes'
+down_revision = '20261021_eventos_analytics'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    cols = [c['name'] for c in sa.inspect(op.get_bind()).get_columns('productos')]
+    if 'imagen_tarjeta_url' not in cols:
+        op.add_column('productos', sa.Column('imagen_tarjeta_url', sa.String(500), nullable=True))
+    if 'imagen_miniatura_url' not in cols:
+        op.add_column('productos', sa.Column('imagen_miniatura_url', sa.String(500), nullable=True))
+
+
+def downgrade():
+    op.drop_column('productos', 'imagen_miniatura_url')
+    op.drop_column('productos', 'imagen_tarjeta_url')
@@ -0,0 +1,25 @@
+"""Índices de movimientos_inventario por venta y por usuario (borrado en cascada por lotes)
+
+Revision ID: 20261023_movimientos_purga_indices
+Revises: 20261022_producto_imagen_variantes
+Create Date: 2026-10-23
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '20261023_movimientos_purga_indices'
+down_revision = '20261022_producto_imagen_variantes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_movimientos_venta', 'movimientos_inventario', ['id_venta'], unique=False)
+    op.create_index('ix_movimientos_usuario', 'movimientos_inventario', ['rut_usuario'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_movimientos_usuario', table_name='movimientos_inventario')
+    op.drop_index('ix_movimientos_venta', table_name='movimientos_inventario')
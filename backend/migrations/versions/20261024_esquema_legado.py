@@ -0,0 +1,128 @@
+"""Columnas e índices que antes agregaban los _ensure_*_sqlite de config/database.py al importar
+
+Revision ID: 20261024_esquema_legado
+Revises: 20261023_movimientos_purga_indices
+Create Date: 2026-10-24
+
+Hasta esta revisión el esquema se mantenía en cada arranque con create_all y las funciones
+_ensure_* (solo SQLite). Las bases creadas así no tienen alembic_version: migrar() las marca en
+20261023_movimientos_purga_indices y esta revisión completa, de forma idempotente, lo que esas
+funciones garantizaban (tablas, columnas agregadas después e índices). En una base al día no
+hace nada.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261024_esquema_legado'
+down_revision = '20261023_movimientos_purga_indices'
+branch_labels = None
+depends_on = None
+
+# Tablas que create_all creaba al arrancar (hasta esta revisión)
+TABLAS = [
+    'roles', 'permisos', 'rol_permiso', 'usuarios', 'categorias', 'subcategorias', 'proveedores',
+    'productos', 'productos_slug_historial', 'mensajes_contacto', 'despachos', 'ventas',
+    'detalles_venta', 'movimientos_inventario', 'pagos', 'auditoria', 'ventas_resumen_dia',
+    'ventas_resumen_producto', 'ventas_resumen_categoria', 'eventos_analytics',
+    'eventos_analytics_hora', 'eventos_analytics_url',
+]
+
+COLUMNAS = {
+    'usuarios': [
+        sa.Column('apellido', sa.String(50)),
+        sa.Column('email', sa.String(120)),
+        sa.Column('telefono', sa.String(20)),
+        sa.Column('activo', sa.Boolean(), server_default=sa.true()),
+        sa.Column('id_rol', sa.Integer()),
+    ],
+    'productos': [
+        sa.Column('id_subcategoria', sa.Integer()),
+        sa.Column('oferta_activa', sa.Boolean(), server_default=sa.false()),
+        sa.Column('tipo_oferta', sa.String(20)),
+        sa.Column('valor_oferta', sa.Numeric(12, 2)),
+        sa.Column('fecha_inicio_oferta', sa.DateTime()),
+        sa.Column('fecha_fin_oferta', sa.DateTime()),
+        sa.Column('garantia_meses', sa.Integer()),
+        sa.Column('modelo', sa.String(100)),
+        sa.Column('color', sa.String(50)),
+        sa.Column('material', sa.String(100)),
+        sa.Column('imagen_tarjeta_url', sa.String(500)),
+        sa.Column('imagen_miniatura_url', sa.String(500)),
+        sa.Column('slug', sa.String(220)),
+    ],
+    'ventas': [
+        sa.Column('despacho_id', sa.Integer()),
+        sa.Column('metodo_entrega', sa.String(20)),
+        sa.Column('estado_envio', sa.String(30)),
+        sa.Column('repartidor_rut', sa.String(9)),
+        sa.Column('ventana_inicio', sa.DateTime()),
+        sa.Column('ventana_fin', sa.DateTime()),
+        sa.Column('fecha_asignacion', sa.DateTime()),
+        sa.Column('fecha_despacho', sa.DateTime()),
+        sa.Column('fecha_entrega', sa.DateTime()),
+        sa.Column('prueba_entrega_url', sa.String(255)),
+        sa.Column('geo_entrega_lat', sa.Numeric(9, 6)),
+        sa.Column('geo_entrega_lng', sa.Numeric(9, 6)),
+        sa.Column('motivo_no_entrega', sa.String(255)),
+    ],
+}
+
+# (nombre, tabla, columnas, único)
+INDICES = [
+    ('ux_productos_slug', 'productos', ['slug'], True),
+    ('ix_productos_id_proveedor', 'productos', ['id_proveedor'], False),
+    ('ix_movimientos_fecha_id', 'movimientos_inventario', ['fecha_movimiento', 'id_movimiento'], False),
+    ('ix_movimientos_venta', 'movimientos_inventario', ['id_venta'], False),
+    ('ix_movimientos_usuario', 'movimientos_inventario', ['rut_usuario'], False),
+    ('ix_pagos_buy_order', 'pagos', ['buy_order'], False),
+    ('ix_pagos_session_id', 'pagos', ['session_id'], False),
+    ('ix_ventas_estado_envio', 'ventas', ['estado_envio'], False),
+    ('ix_ventas_repartidor', 'ventas', ['repartidor_rut'], False),
+    ('ix_ventas_despacho', 'ventas', ['despacho_id'], False),
+    ('ix_ventas_fecha_entrega', 'ventas', ['fecha_entrega'], False),
+]
+
+# Columnas obsoletas de ventas que se quitaban en SQLite
+OBSOLETAS_VENTAS = ['cliente_rut', 'eta', 'prioridad']
+
+
+def upgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    from models.base import Base
+    import models  # noqa: F401
+    existentes = set(inspector.get_table_names())
+    faltantes = [Base.metadata.tables[t] for t in TABLAS if t not in existentes and t in Base.metadata.tables]
+    if faltantes:
+        Base.metadata.create_all(bind=conn, tables=faltantes)
+        inspector = sa.inspect(conn)
+
+    for tabla, columnas in COLUMNAS.items():
+        actuales = {c['name'] for c in inspector.get_columns(tabla)}
+        for columna in columnas:
+            if columna.name not in actuales:
+                op.add_column(tabla, columna.copy())
+
+    indices = {}
+    for nombre, tabla, columnas, unico in INDICES:
+        if tabla not in indices:
+            indices[tabla] = {i['name'] for i in inspector.get_indexes(tabla)}
+        if nombre not in indices[tabla]:
+            op.create_index(nombre, tabla, columnas, unique=unico)
+
+    if conn.dialect.name == 'sqlite':
+        actuales = {c['name'] for c in inspector.get_columns('ventas')}
+        if 'cliente_rut' in actuales:
+            op.execute("DROP INDEX IF EXISTS ix_ventas_cliente")
+        for columna in OBSOLETAS_VENTAS:
+            if columna in actuales:
+                op.execute(f"ALTER TABLE ventas DROP COLUMN {columna}")
+
+
+def downgrade():
+    # Solo completa el esquema heredado; no hay nada que revertir
+    pass
@@ -0,0 +1,118 @@
+"""Índice de búsqueda de texto completo (FTS5 en SQLite, tsvector/GIN en PostgreSQL)
+
+Revision ID: 20261025_indice_busqueda
+Revises: 20261024_esquema_legado
+Create Date: 2026-10-25
+
+Antes lo creaba main.py en cada arranque (BusquedaController.asegurar_indice, idempotente).
+Esta revisión lleva una copia congelada de ese DDL: las migraciones no importan código de la app.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261025_indice_busqueda'
+down_revision = '20261024_esquema_legado'
+branch_labels = None
+depends_on = None
+
+
+# Columnas indexadas (copia de busqueda_controller._COLUMNAS_FTS a la fecha de esta revisión)
+COLUMNAS = ["nombre", "descripcion", "marca", "modelo", "codigo_interno", "caracteristicas"]
+
+
+def _upgrade_sqlite(conn):
+    cols = ", ".join(COLUMNAS)
+    nuevos = ", ".join(f"new.{c}" for c in COLUMNAS)
+    viejos = ", ".join(f"old.{c}" for c in COLUMNAS)
+    existe = conn.execute(sa.text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'productos_fts'"
+    )).first()
+    if not existe:
+        op.execute(
+            f"CREATE VIRTUAL TABLE productos_fts USING fts5({cols}, "
+            "content='productos', content_rowid='id_producto', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS productos_fts_ai AFTER INSERT ON productos BEGIN "
+        f"INSERT INTO productos_fts(rowid, {cols}) VALUES (new.id_producto, {nuevos}); END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS productos_fts_ad AFTER DELETE ON productos BEGIN "
+        f"INSERT INTO productos_fts(productos_fts, rowid, {cols}) VALUES ('delete', old.id_producto, {viejos}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS productos_fts_au AFTER UPDATE OF {cols} ON productos BEGIN "
+        f"INSERT INTO productos_fts(productos_fts, rowid, {cols}) VALUES ('delete', old.id_producto, {viejos}); "
+        f"INSERT INTO productos_fts(rowid, {cols}) VALUES (new.id_producto, {nuevos}); END"
+    )
+    if not existe:
+        # Poblar el índice con los productos existentes
+        op.execute("INSERT INTO productos_fts(productos_fts) VALUES ('rebuild')")
+
+
+def _upgrade_postgres():
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        """
+        DO $$ BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'es_unaccent') THEN
+            CREATE TEXT SEARCH CONFIGURATION es_unaccent (COPY = spanish);
+            ALTER TEXT SEARCH CONFIGURATION es_unaccent
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+        END IF;
+        END $$;
+        """
+    )
+    op.execute("ALTER TABLE productos ADD COLUMN IF NOT EXISTS busqueda_tsv tsvector")
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION productos_busqueda_tsv() RETURNS trigger AS $$
+        BEGIN
+            NEW.busqueda_tsv :=
+                setweight(to_tsvector('es_unaccent', coalesce(NEW.nombre, '')), 'A') ||
+                setweight(to_tsvector('es_unaccent', coalesce(NEW.codigo_interno, '') || ' ' ||
+                                                     coalesce(NEW.marca, '') || ' ' ||
+                                                     coalesce(NEW.modelo, '')), 'B') ||
+                setweight(to_tsvector('es_unaccent', coalesce(NEW.descripcion, '')), 'C') ||
+                setweight(to_tsvector('es_unaccent', coalesce(NEW.caracteristicas, '')), 'D');
+            RETURN NEW;
+        END $$ LANGUAGE plpgsql;
+        """
+    )
+    op.execute("DROP TRIGGER IF EXISTS trg_productos_busqueda_tsv ON productos")
+    op.execute(
+        "CREATE TRIGGER trg_productos_busqueda_tsv BEFORE INSERT OR UPDATE OF "
+        f"{', '.join(COLUMNAS)} ON productos "
+        "FOR EACH ROW EXECUTE FUNCTION productos_busqueda_tsv()"
+    )
+    # Backfill de filas sin vector (el trigger lo calcula)
+    op.execute("UPDATE productos SET nombre = nombre WHERE busqueda_tsv IS NULL")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_productos_busqueda_tsv ON productos USING GIN (busqueda_tsv)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_productos_nombre_trgm ON productos USING GIN (lower(nombre) gin_trgm_ops)")
+
+
+def upgrade():
+    conn = op.get_bind()
+    if conn.dialect.name == 'sqlite':
+        _upgrade_sqlite(conn)
+    elif conn.dialect.name == 'postgresql':
+        _upgrade_postgres()
+
+
+def downgrade():
+    conn = op.get_bind()
+    if conn.dialect.name == 'sqlite':
+        for trigger in ('productos_fts_ai', 'productos_fts_ad', 'productos_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS productos_fts")
+    elif conn.dialect.name == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS trg_productos_busqueda_tsv ON productos")
+        op.execute("DROP FUNCTION IF EXISTS productos_busqueda_tsv()")
+        op.execute("DROP INDEX IF EXISTS ix_productos_nombre_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_productos_busqueda_tsv")
+        op.execute("ALTER TABLE productos DROP COLUMN IF EXISTS busqueda_tsv")
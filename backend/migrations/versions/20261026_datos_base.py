@@ -0,0 +1,94 @@
+"""Roles y permisos base, y slugs de productos que no lo tengan
+
+Revision ID: 20261026_datos_base
+Revises: 20261025_indice_busqueda
+Create Date: 2026-10-26
+
+Antes main.py lo hacía en cada arranque (una consulta por permiso y por rol, y el backfill de
+slugs). Es idempotente: solo inserta lo que falta. Los datos y el slug son copias congeladas a la
+fecha de esta revisión (las migraciones no importan código de la app).
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import re
+import unicodedata
+
+
+# revision identifiers, used by Alembic.
+revision = '20261026_datos_base'
+down_revision = '20261025_indice_busqueda'
+branch_labels = None
+depends_on = None
+
+# Copia de config.migraciones.PERMISOS_BASE / ROLES_BASE
+PERMISOS = [
+    "usuarios", "catalogo", "inventario", "ventas", "pagos", "auditoria", "dashboard",
+    "proveedores", "categorias", "subcategorias", "despachos",
+]
+ROLES = ["administrador", "vendedor", "bodeguero", "cliente"]
+
+permisos = sa.table('permisos', sa.column('id_permiso', sa.Integer), sa.column('descripcion', sa.String))
+roles = sa.table('roles', sa.column('id_rol', sa.Integer), sa.column('nombre', sa.String))
+rol_permiso = sa.table('rol_permiso', sa.column('id_rol', sa.Integer), sa.column('id_permiso', sa.Integer))
+
+
+def _slugify(nombre):
+    # Copia de ProductoController._slugify_nombre
+    if not nombre:
+        return ""
+    s = unicodedata.normalize('NFD', str(nombre))
+    s = ''.join(ch for ch in s if unicodedata.category(ch) != 'Mn')
+    s = s.lower().replace('ñ', 'n')
+    s = re.sub(r'[^a-z0-9]+', '-', s)
+    return re.sub(r'-+', '-', s).strip('-')
+
+
+def _roles_permisos(conn):
+    existentes = set(conn.execute(sa.select(permisos.c.descripcion).where(permisos.c.descripcion.in_(PERMISOS))).scalars())
+    nuevos = [{"descripcion": p} for p in PERMISOS if p not in existentes]
+    if nuevos:
+        conn.execute(permisos.insert(), nuevos)
+    existentes = set(conn.execute(sa.select(roles.c.nombre).where(roles.c.nombre.in_(ROLES))).scalars())
+    nuevos = [{"nombre": r} for r in ROLES if r not in existentes]
+    if nuevos:
+        conn.execute(roles.insert(), nuevos)
+
+    # El administrador recibe todos los permisos base
+    id_admin = conn.execute(sa.select(roles.c.id_rol).where(roles.c.nombre == "administrador")).scalar()
+    ids_permiso = set(conn.execute(sa.select(permisos.c.id_permiso).where(permisos.c.descripcion.in_(PERMISOS))).scalars())
+    asignados = set(conn.execute(sa.select(rol_permiso.c.id_permiso).where(rol_permiso.c.id_rol == id_admin)).scalars())
+    faltantes = [{"id_rol": id_admin, "id_permiso": p} for p in sorted(ids_permiso - asignados)]
+    if faltantes:
+        conn.execute(rol_permiso.insert(), faltantes)
+
+
+def _slugs(conn):
+    # Backfill: el producto más antiguo conserva el slug sin sufijo; los slugs del historial
+    # siguen ocupados (redirigen a otro producto)
+    pendientes = conn.execute(sa.text(
+        "SELECT id_producto, nombre FROM productos WHERE slug IS NULL ORDER BY id_producto"
+    )).fetchall()
+    if not pendientes:
+        return
+    ocupados = {r[0] for r in conn.execute(sa.text("SELECT slug FROM productos WHERE slug IS NOT NULL"))}
+    ocupados |= {r[0] for r in conn.execute(sa.text("SELECT slug FROM productos_slug_historial"))}
+    for id_producto, nombre in pendientes:
+        base = _slugify(nombre) or "producto"
+        slug, n = base, 2
+        while slug in ocupados:
+            slug = f"{base}-{n}"
+            n += 1
+        ocupados.add(slug)
+        conn.execute(sa.text("UPDATE productos SET slug = :slug WHERE id_producto = :id"), {"slug": slug, "id": id_producto})
+
+
+def upgrade():
+    conn = op.get_bind()
+    _roles_permisos(conn)
+    _slugs(conn)
+
+
+def downgrade():
+    # Datos base: no se borran
+    pass
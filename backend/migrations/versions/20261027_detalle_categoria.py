@@ -0,0 +1,46 @@
+"""Categoría del producto al momento de la venta en detalles_venta
+
+Revision ID: 20261027_detalle_categoria
+Revises: 20261026_datos_base
+Create Date: 2026-10-27
+
+ventas_resumen_categoria tomaba la categoría actual del producto: una venta cancelada después
+de recategorizar el producto se restaba de otra categoría, y si el producto ya no existía no se
+restaba. Los detalles existentes reciben la categoría actual de su producto (la mejor
+aproximación disponible) y el resumen por categoría se recalcula desde ellos.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261027_detalle_categoria'
+down_revision = '20261026_datos_base'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    cols = [c['name'] for c in sa.inspect(op.get_bind()).get_columns('detalles_venta')]
+    if 'id_categoria' not in cols:
+        op.add_column('detalles_venta', sa.Column('id_categoria', sa.Integer, nullable=True))
+
+    op.execute(
+        "UPDATE detalles_venta SET id_categoria = ("
+        "SELECT p.id_categoria FROM productos p WHERE p.id_producto = detalles_venta.id_producto"
+        ") WHERE id_categoria IS NULL"
+    )
+    # Mismo cálculo que core.resumen_ventas.reconstruir() para esta tabla
+    op.execute("DELETE FROM ventas_resumen_categoria")
+    op.execute(
+        "INSERT INTO ventas_resumen_categoria (dia, id_categoria, ingresos, cantidad) "
+        "SELECT date(v.fecha_venta), d.id_categoria, COALESCE(SUM(d.subtotal), 0), COALESCE(SUM(d.cantidad), 0) "
+        "FROM detalles_venta d JOIN ventas v ON v.id_venta = d.id_venta "
+        "WHERE v.estado = 'completada' AND d.id_categoria IS NOT NULL "
+        "GROUP BY date(v.fecha_venta), d.id_categoria"
+    )
+
+
+def downgrade():
+    op.drop_column('detalles_venta', 'id_categoria')
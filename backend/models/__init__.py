@@ -12,12 +12,15 @@ from .categoria import CategoriaDB, Categoria, CategoriaCreate, CategoriaUpdate
 from .subcategoria import SubCategoriaDB, SubCategoria, SubCategoriaCreate, SubCategoriaUpdate
 from .proveedor import ProveedorDB, Proveedor, ProveedorCreate, ProveedorUpdate
 from .producto import ProductoDB, Producto, ProductoCreate, ProductoUpdate
+from .producto_slug import ProductoSlugHistorialDB
 from .catalogo import ProductoCatalogo, AgregarACatalogo
 from .mensaje import MensajeContactoDB, MensajeContacto, MensajeContactoCreate
 from .venta import VentaDB, DetalleVentaDB, MovimientoInventarioDB, Venta, DetalleVenta, MovimientoInventario, VentaCreate, DetalleVentaCreate, MovimientoInventarioCreate
+from .resumen_venta import ResumenVentaDiaDB, ResumenVentaProductoDB, ResumenVentaCategoriaDB
 from .pago import PagoDB, Pago, PagoCreate
 from .despacho import DespachoDB, Despacho, DespachoCreate, DespachoUpdate
 from .auditoria import AuditoriaDB, Auditoria
+from .evento_analytics import EventoAnalyticsDB, ResumenAnalyticsHoraDB, ResumenAnalyticsUrlDB
 from .rol import RolDB, Rol
 from .permiso import PermisoDB, Permiso
 from .rol_permiso import RolPermisoDB
@@ -29,14 +32,17 @@ __all__ = [
     "SubCategoriaDB", "SubCategoria", "SubCategoriaCreate", "SubCategoriaUpdate",
     "ProveedorDB", "Proveedor", "ProveedorCreate", "ProveedorUpdate",
     "ProductoDB", "Producto", "ProductoCreate", "ProductoUpdate",
+    "ProductoSlugHistorialDB",
     "ProductoCatalogo", "AgregarACatalogo",
     "MensajeContactoDB", "MensajeContacto", "MensajeContactoCreate",
     "VentaDB", "DetalleVentaDB", "MovimientoInventarioDB",
     "Venta", "DetalleVenta", "MovimientoInventario",
     "VentaCreate", "DetalleVentaCreate", "MovimientoInventarioCreate",
+    "ResumenVentaDiaDB", "ResumenVentaProductoDB", "ResumenVentaCategoriaDB",
     "PagoDB", "Pago", "PagoCreate",
     "DespachoDB", "Despacho", "DespachoCreate", "DespachoUpdate",
     "AuditoriaDB", "Auditoria",
+    "EventoAnalyticsDB", "ResumenAnalyticsHoraDB", "ResumenAnalyticsUrlDB",
     "RolDB", "Rol",
     "PermisoDB", "Permiso",
     "RolPermisoDB",
@@ -14,8 +14,12 @@ class ProductoCatalogo(BaseModel):
     """Modelo para productos en el catálogo público"""
     id_producto: int
     nombre: str
+    slug: Optional[str] = None
     descripcion: str
     imagen_url: str
+    # Variantes reducidas para listados (si el producto no tiene, la URL original)
+    imagen_tarjeta_url: Optional[str] = None
+    imagen_miniatura_url: Optional[str] = None
     marca: str
     caracteristicas: str
     # Detalles adicionales
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Modelos de analytics del sitio
+Eventos crudos (tabla de solo inserción) y resúmenes por hora/nombre y por día/URL,
+escritos por lotes desde core.analytics
+"""
+
+from sqlalchemy import Column, Date, DateTime, Index, Integer, String, Text
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+from .base import Base
+
+
+class EventoAnalyticsDB(Base):
+    """Evento recibido en /api/analytics/events (solo se inserta, nunca se actualiza)"""
+    __tablename__ = "eventos_analytics"
+
+    id_evento = Column(Integer, primary_key=True)
+    nombre = Column(String(100), nullable=False)
+    url = Column(String(500), nullable=True)
+    propiedades = Column(Text, nullable=True)  # JSON serializado
+    ts_cliente = Column(String(40), nullable=True)  # Marca de tiempo enviada por el navegador, sin validar
+    fecha_recepcion = Column(DateTime, nullable=False)  # UTC del servidor; define la hora del resumen
+
+    __table_args__ = (
+        Index("ix_eventos_analytics_recepcion", "fecha_recepcion"),
+        Index("ix_eventos_analytics_nombre_recepcion", "nombre", "fecha_recepcion"),
+    )
+
+
+class ResumenAnalyticsHoraDB(Base):
+    """Cantidad de eventos por hora (UTC) y nombre"""
+    __tablename__ = "eventos_analytics_hora"
+
+    hora = Column(DateTime, primary_key=True)
+    nombre = Column(String(100), primary_key=True)
+    cantidad = Column(Integer, default=0, nullable=False)
+
+
+class ResumenAnalyticsUrlDB(Base):
+    """Cantidad de eventos por día (UTC) y URL"""
+    __tablename__ = "eventos_analytics_url"
+
+    dia = Column(Date, primary_key=True)
+    url = Column(String(500), primary_key=True)
+    cantidad = Column(Integer, default=0, nullable=False)
+
+
+# Modelos Pydantic
+
+class EventoAnalytics(BaseModel):
+    name: Optional[str] = Field(None, description="Nombre del evento (page_view, add_to_cart, ...)")
+    url: Optional[str] = None
+    properties: Optional[Dict[str, Any]] = None
+    ts: Optional[Any] = Field(None, description="Marca de tiempo del cliente")
+
+
+class LoteEventosAnalytics(BaseModel):
+    events: List[EventoAnalytics] = Field(..., max_items=500)
@@ -47,6 +47,8 @@ class PagoDB(Base):
 
     __table_args__ = (
         Index("ix_pagos_id_venta_estado", "id_venta", "estado"),
+        Index("ix_pagos_buy_order", "buy_order"),
+        Index("ix_pagos_session_id", "session_id"),
     )
 
 
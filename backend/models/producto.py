@@ -21,16 +21,21 @@ class ProductoDB(Base):
         Index('ix_productos_nombre', 'nombre'),
         Index('ix_productos_catalogo', 'en_catalogo', 'estado'),
         Index('ix_productos_categoria', 'id_categoria'),
+        Index('ix_productos_id_proveedor', 'id_proveedor'),
         Index('ix_productos_subcategoria', 'id_subcategoria'),
+        Index('ux_productos_slug', 'slug', unique=True),
     )
     
     id_producto = Column(Integer, primary_key=True, index=True)
     
     # Información básica del producto
     nombre = Column(String(200), nullable=False)
+    slug = Column(String(220), nullable=True)  # Derivado del nombre, único (sufijo -2, -3... en colisiones)
     descripcion = Column(String, nullable=True)
     codigo_interno = Column(String(50), unique=True, nullable=True)
-    imagen_url = Column(String(500), nullable=True)
+    imagen_url = Column(String(500), nullable=True)  # Variante completa (o URL externa)
+    imagen_tarjeta_url = Column(String(500), nullable=True)  # Variantes reducidas (core/imagenes.py)
+    imagen_miniatura_url = Column(String(500), nullable=True)
     id_categoria = Column(Integer, ForeignKey("categorias.id_categoria"), nullable=False)
     id_proveedor = Column(Integer, ForeignKey("proveedores.id_proveedor"), nullable=True)
     id_subcategoria = Column(Integer, ForeignKey("subcategorias.id_subcategoria"), nullable=True)
@@ -218,6 +223,8 @@ class ProductoUpdate(BaseModel):
 class Producto(ProductoBase):
     """Modelo completo de producto con información de inventario"""
     id_producto: int
+    imagen_tarjeta_url: Optional[str] = None
+    imagen_miniatura_url: Optional[str] = None
     fecha_creacion: Optional[datetime] = None
     fecha_actualizacion: Optional[datetime] = None
     fecha_ultima_venta: Optional[datetime] = None
@@ -247,4 +254,20 @@ class ProductoInventario(BaseModel):
         orm_mode = True
         json_encoders = {
             datetime: lambda v: v.isoformat() if v else None
-        }
\ No newline at end of file
+        }
+
+class ProductoBusqueda(BaseModel):
+    """Resultado liviano de la búsqueda de productos (ordenado por relevancia)"""
+    id_producto: int
+    nombre: str
+    slug: Optional[str] = None
+    codigo_interno: Optional[str] = None
+    marca: Optional[str] = None
+    modelo: Optional[str] = None
+    imagen_url: Optional[str] = None
+    imagen_miniatura_url: Optional[str] = None
+    precio_venta: float = 0
+    cantidad_disponible: int = 0
+    estado: Optional[str] = None
+    en_catalogo: bool = False
+    relevancia: Optional[float] = None
@@ -0,0 +1,20 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Historial de slugs de productos
+Guarda los slugs anteriores de un producto para redirigir enlaces antiguos tras un cambio de nombre
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from .base import Base
+
+
+class ProductoSlugHistorialDB(Base):
+    """Tabla de slugs antiguos -> producto vigente"""
+    __tablename__ = "productos_slug_historial"
+
+    slug = Column(String(220), primary_key=True)
+    id_producto = Column(Integer, ForeignKey("productos.id_producto", ondelete="CASCADE"), nullable=False, index=True)
+    fecha_creacion = Column(DateTime, default=func.now())
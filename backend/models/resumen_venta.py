@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tablas de resumen diario de ventas completadas (rollups)
+Se mantienen de forma incremental desde core.resumen_ventas y alimentan los gráficos del dashboard
+"""
+
+from sqlalchemy import Column, Integer, Numeric, Date
+from .base import Base
+
+
+class ResumenVentaDiaDB(Base):
+    """Ventas completadas por día"""
+    __tablename__ = "ventas_resumen_dia"
+
+    dia = Column(Date, primary_key=True)
+    ingresos = Column(Numeric(14, 2), default=0, nullable=False)
+    cantidad_ventas = Column(Integer, default=0, nullable=False)
+    unidades = Column(Integer, default=0, nullable=False)
+
+
+class ResumenVentaProductoDB(Base):
+    """Unidades y monto vendido por día y producto"""
+    __tablename__ = "ventas_resumen_producto"
+
+    dia = Column(Date, primary_key=True)
+    id_producto = Column(Integer, primary_key=True, index=True)
+    unidades = Column(Integer, default=0, nullable=False)
+    ventas = Column(Numeric(14, 2), default=0, nullable=False)
+
+
+class ResumenVentaCategoriaDB(Base):
+    """Ingresos y unidades por día y categoría (categoría del producto al momento de la venta)"""
+    __tablename__ = "ventas_resumen_categoria"
+
+    dia = Column(Date, primary_key=True)
+    id_categoria = Column(Integer, primary_key=True, index=True)
+    ingresos = Column(Numeric(14, 2), default=0, nullable=False)
+    cantidad = Column(Integer, default=0, nullable=False)
@@ -6,7 +6,7 @@ Modelos relacionados con ventas y movimientos de inventario
 """
 
 from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Numeric, Text, Index, Date
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from sqlalchemy.orm import relationship
 from pydantic import BaseModel
 from typing import Optional, List
@@ -59,6 +59,16 @@ class VentaDB(Base):
     pagos = relationship("PagoDB", back_populates="venta")
 
 
+def _categoria_del_producto(context):
+    """Categoría actual del producto, para los detalles que se insertan sin id_categoria"""
+    id_producto = context.get_current_parameters().get("id_producto")
+    if id_producto is None:
+        return None
+    return context.connection.execute(
+        text("SELECT id_categoria FROM productos WHERE id_producto = :id"), {"id": id_producto}
+    ).scalar()
+
+
 class DetalleVentaDB(Base):
     """Modelo de base de datos para detalles de venta"""
     __tablename__ = "detalles_venta"
@@ -72,6 +82,9 @@ class DetalleVentaDB(Base):
     cantidad = Column(Integer, nullable=False)
     precio_unitario = Column(Numeric(10, 2), nullable=False)
     subtotal = Column(Numeric(10, 2), nullable=False)
+    # Categoría del producto al momento de la venta: los resúmenes por categoría suman y restan
+    # la venta siempre en la misma categoría aunque después se recategorice o borre el producto
+    id_categoria = Column(Integer, nullable=True, default=_categoria_del_producto)
     fecha_creacion = Column(DateTime, default=func.now())
     
     # Relaciones
@@ -84,6 +97,9 @@ class MovimientoInventarioDB(Base):
     __tablename__ = "movimientos_inventario"
     __table_args__ = (
         Index('ix_movimientos_producto_fecha', 'id_producto', 'fecha_movimiento'),
+        Index('ix_movimientos_fecha_id', 'fecha_movimiento', 'id_movimiento'),
+        Index('ix_movimientos_venta', 'id_venta'),
+        Index('ix_movimientos_usuario', 'rut_usuario'),
     )
     
     id_movimiento = Column(Integer, primary_key=True, index=True)
@@ -193,6 +209,39 @@ class DetalleVenta(DetalleVentaBase):
     class Config:
         from_attributes = True
 
+class ItemCarrito(BaseModel):
+    """Línea de un carrito a cotizar (acepta también detalles de venta; se ignoran los demás campos)"""
+    id_producto: int
+    cantidad: int
+
+
+class CarritoCotizar(BaseModel):
+    """Carrito enviado a /ventas/cotizar"""
+    detalles: List[ItemCarrito]
+
+
+class LineaCotizacion(BaseModel):
+    """Línea cotizada con precio de servidor (oferta vigente aplicada) y disponibilidad"""
+    id_producto: int
+    nombre: Optional[str] = None
+    cantidad: int
+    stock_disponible: int = 0
+    disponible: bool = False
+    precio_base: float = 0
+    precio_final: float = 0
+    oferta_vigente: bool = False
+    descuento_pct: int = 0
+    subtotal: float = 0
+    error: Optional[str] = None
+
+
+class CotizacionCarrito(BaseModel):
+    """Resultado de cotizar un carrito completo"""
+    lineas: List[LineaCotizacion]
+    total: float
+    valido: bool
+
+
 class MovimientoInventarioBase(BaseModel):
     """Modelo base para movimiento de inventario"""
     id_producto: int
@@ -0,0 +1,19 @@
+#!/usr/bin/env python
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.database import SessionLocal
+from models import *  # noqa: F401,F403
+from controllers.producto_controller import ProductoController
+
+def main():
+    db = SessionLocal()
+    try:
+        asignados = ProductoController.asegurar_slugs(db)
+        print("SLUGS_ASIGNADOS=", asignados)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
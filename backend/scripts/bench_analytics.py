@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+"""
+Benchmark de ingesta de analytics (eventos/s).
+
+Mide dos formas de ingresar --eventos eventos por el camino de /api/analytics/events:
+- buffer: normalizar_evento() + BufferAnalytics.agregar() en el proceso, sin HTTP
+- http: POST /api/analytics/events/batch con --por-peticion eventos, desde --hilos hilos
+  (TestClient, ASGI en proceso; mide la aplicación, no la red)
+
+Para cada una informa eventos/s aceptados (hasta que el último evento entra al buffer) y
+eventos/s persistidos (hasta que el hilo escritor dejó todo en eventos_analytics y en los
+resúmenes), con el hilo escribiendo en paralelo como en producción.
+
+Al terminar verifica que las filas escritas y los resúmenes por hora/URL cuadren con los
+eventos enviados. Usa una base SQLite temporal salvo que se defina DATABASE_URL.
+Termina con código 1 si alguna verificación falla.
+
+Uso:
+    python scripts/bench_analytics.py --eventos 200000 --por-peticion 100 --hilos 8
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+_TMP = tempfile.mkdtemp(prefix="bench_analytics_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP, 'app.db')}")
+# Buffer amplio para que la medición no descarte eventos
+os.environ.setdefault("ANALYTICS_BUFFER_MAX", "1000000")
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func
+
+import main  # noqa: F401  (crea las tablas)
+from config.database import SessionLocal
+from core.analytics import buffer_analytics, normalizar_evento
+from models.evento_analytics import EventoAnalyticsDB, ResumenAnalyticsHoraDB, ResumenAnalyticsUrlDB
+
+NOMBRES = ["page_view", "product_view", "add_to_cart", "search", "checkout_start", "purchase"]
+
+
+def _evento(rnd: random.Random) -> dict:
+    id_producto = rnd.randint(1, 2000)
+    return {
+        "name": rnd.choice(NOMBRES),
+        "url": f"/productos/{id_producto}" if rnd.random() < 0.7 else rnd.choice(["/", "/catalogo", "/carrito", "/checkout"]),
+        "properties": {"id_producto": id_producto, "origen": rnd.choice(["web", "movil"])},
+        "ts": int(time.time() * 1000),
+    }
+
+
+def _esperar_escritura(inicio: float, timeout: float = 300.0) -> float:
+    """Espera a que el hilo escritor persista todo lo recibido; devuelve segundos desde `inicio`"""
+    limite = time.monotonic() + timeout
+    while buffer_analytics.escritos + buffer_analytics.errores < buffer_analytics.recibidos:
+        if time.monotonic() > limite:
+            break
+        time.sleep(0.005)
+    return time.perf_counter() - inicio
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--eventos", type=int, default=100000, help="Eventos por etapa")
+    parser.add_argument("--por-peticion", type=int, default=100, help="Eventos por petición batch (máx. 500)")
+    parser.add_argument("--hilos", type=int, default=8)
+    parser.add_argument("--semilla", type=int, default=7)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.semilla)
+    eventos = [_evento(rnd) for _ in range(args.eventos)]
+    resultados = {}
+
+    # buffer en proceso
+    inicio = time.perf_counter()
+    for i in range(0, len(eventos), args.por_peticion):
+        buffer_analytics.agregar([normalizar_evento(e) for e in eventos[i:i + args.por_peticion]])
+    aceptado = time.perf_counter() - inicio
+    resultados["buffer"] = (args.eventos / aceptado, args.eventos / _esperar_escritura(inicio))
+
+    # HTTP batch
+    lotes = [eventos[i:i + args.por_peticion] for i in range(0, len(eventos), args.por_peticion)]
+    with TestClient(main.app) as client:
+        def enviar(lote):
+            return client.post("/api/analytics/events/batch", json={"events": lote}).status_code
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.hilos) as pool:
+            codigos = list(pool.map(enviar, lotes))
+        aceptado = time.perf_counter() - inicio
+        resultados["http"] = (args.eventos / aceptado, args.eventos / _esperar_escritura(inicio))
+        # Un evento suelto por el endpoint simple (se escribe al cerrar la app)
+        codigos.append(client.post("/api/analytics/events", json=eventos[0]).status_code)
+
+    enviados = 2 * args.eventos + 1
+    db = SessionLocal()
+    try:
+        filas = db.query(func.count(EventoAnalyticsDB.id_evento)).scalar()
+        por_hora = db.query(func.coalesce(func.sum(ResumenAnalyticsHoraDB.cantidad), 0)).scalar()
+        por_url = db.query(func.coalesce(func.sum(ResumenAnalyticsUrlDB.cantidad), 0)).scalar()
+    finally:
+        db.close()
+
+    print(f"motor: {SessionLocal.kw['bind'].dialect.name}  eventos por etapa: {args.eventos}  "
+          f"por petición: {args.por_peticion}  hilos: {args.hilos}")
+    for etapa, (aceptados, persistidos) in resultados.items():
+        print(f"  {etapa:<7} aceptados: {aceptados:>10,.0f} eventos/s   persistidos: {persistidos:>10,.0f} eventos/s")
+    print(f"enviados: {enviados}  filas: {filas}  resumen hora: {por_hora}  resumen url: {por_url}  "
+          f"descartados: {buffer_analytics.descartados}  errores: {buffer_analytics.errores}")
+
+    fallos = []
+    if any(c != 200 for c in codigos):
+        fallos.append(f"{sum(c != 200 for c in codigos)} peticiones con error")
+    if filas != enviados:
+        fallos.append("filas escritas no cuadran con los eventos enviados")
+    if por_hora != enviados or por_url != enviados:
+        fallos.append("resúmenes no cuadran con los eventos enviados")
+    if fallos:
+        print("FALLO: " + ", ".join(fallos))
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""
+Mide el arranque en frío de la aplicación (import main) y cuenta las sentencias SQL que hace.
+
+Para cada base (una SQLite vacía y una copia de --base con datos) lanza --repeticiones procesos
+nuevos que solo hacen `import main`, y reporta el tiempo medio y las sentencias ejecutadas por
+tipo: DDL (CREATE/ALTER/DROP), PRAGMA y el resto. La primera importación sobre la base vacía es
+la que crea el esquema; las siguientes miden el arranque normal de un worker.
+
+Con --migrar ejecuta antes scripts/migrar.py sobre cada copia, como haría el despliegue.
+
+Uso:
+    python scripts/bench_arranque.py --repeticiones 5 --base ferreteria.db --migrar
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_HIJO = r"""
+import json, sys, time
+inicio = time.perf_counter()
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+conteo = {"ddl": 0, "pragma": 0, "otras": 0}
+
+@event.listens_for(Engine, "before_cursor_execute")
+def contar(conn, cursor, statement, parameters, context, executemany):
+    primera = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    clave = "ddl" if primera in ("CREATE", "ALTER", "DROP") else "pragma" if primera == "PRAGMA" else "otras"
+    conteo[clave] += 1
+
+import main  # noqa: F401
+conteo["segundos"] = time.perf_counter() - inicio
+sys.stderr.write("\n@@" + json.dumps(conteo) + "\n")
+"""
+
+
+def _importar(url: str) -> dict:
+    entorno = dict(os.environ, DATABASE_URL=url, PYTHONDONTWRITEBYTECODE="0")
+    r = subprocess.run([sys.executable, "-c", _HIJO], cwd=BACKEND, env=entorno, capture_output=True, text=True)
+    for linea in reversed(r.stderr.splitlines()):
+        if linea.startswith("@@"):
+            return json.loads(linea[2:])
+    raise RuntimeError(f"import main falló:\n{r.stderr[-2000:]}")
+
+
+def _migrar(url: str) -> None:
+    entorno = dict(os.environ, DATABASE_URL=url)
+    subprocess.run([sys.executable, os.path.join("scripts", "migrar.py")], cwd=BACKEND, env=entorno,
+                   check=True, capture_output=True)
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--base", default=os.path.join(BACKEND, "ferreteria.db"), help="Base SQLite con datos (se copia)")
+    parser.add_argument("--migrar", action="store_true", help="Ejecutar scripts/migrar.py antes de medir")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench_arranque_")
+    bases = {"vacía": os.path.join(tmp, "vacia.db")}
+    if os.path.exists(args.base):
+        bases["con datos"] = os.path.join(tmp, "datos.db")
+        shutil.copy(args.base, bases["con datos"])
+
+    for nombre, ruta in bases.items():
+        url = f"sqlite:///{ruta}"
+        if args.migrar:
+            _migrar(url)
+        medidas = [_importar(url) for _ in range(args.repeticiones + 1)]
+        primera, resto = medidas[0], medidas[1:]
+        print(f"{nombre:<10} primera: {primera['segundos']:.3f}s  DDL {primera['ddl']:>3}  PRAGMA {primera['pragma']:>3}  "
+              f"otras {primera['otras']:>3}")
+        print(f"{'':<10} siguientes: {statistics.mean(m['segundos'] for m in resto):.3f}s  "
+              f"DDL {max(m['ddl'] for m in resto):>3}  PRAGMA {max(m['pragma'] for m in resto):>3}  "
+              f"otras {max(m['otras'] for m in resto):>3}")
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main_bench()
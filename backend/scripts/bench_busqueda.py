@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+"""
+Benchmark de búsqueda de productos: ILIKE (implementación anterior) vs índice de texto completo.
+
+Genera bases SQLite temporales con N productos sintéticos (reproducibles) y mide la latencia de
+ambas rutas para un conjunto fijo de términos.
+
+Uso:
+    python scripts/bench_busqueda.py --tamanos 10000,100000,1000000 --repeticiones 5
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+_TMP = tempfile.mkdtemp(prefix="bench_busqueda_")
+# Evitar que la importación de la app toque la base de desarrollo
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP, 'app.db')}")
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker, joinedload
+
+from models import *  # noqa: F401,F403
+from models.base import Base
+from models.producto import ProductoDB
+from controllers.busqueda_controller import BusquedaController
+
+TIPOS = ["Taladro", "Martillo", "Llave", "Cable", "Ampolleta", "Destornillador", "Sierra", "Pintura",
+         "Tornillo", "Brocha", "Alicate", "Huincha", "Esmeril", "Lijadora", "Candado", "Manguera"]
+ATRIBUTOS = ["Percutor", "Inalámbrico", "Ajustable", "LED", "Eléctrico", "Industrial", "Compacto",
+             "Profesional", "Galvanizado", "Térmico", "Reforzado", "Pequeño"]
+MARCAS = ["Bosch", "Makita", "Stanley", "Truper", "DeWalt", "Philips", "Osram", "Fensa", "Voltex", "Tricolor"]
+MATERIALES = ["acero", "aluminio", "plástico", "cobre", "madera", "fibra de vidrio"]
+TERMINOS = ["taladro", "martillo bosch", "llave ajustable", "ampolleta led", "electrico",
+            "destornillador stanley", "cable cobre", "sierra profesional", "pintura", "esmeril makita"]
+
+
+def _generar_filas(n, rng):
+    for i in range(1, n + 1):
+        tipo = rng.choice(TIPOS)
+        atributo = rng.choice(ATRIBUTOS)
+        marca = rng.choice(MARCAS)
+        material = rng.choice(MATERIALES)
+        yield {
+            "id_producto": i,
+            "nombre": f"{tipo} {atributo} {rng.randint(1, 999)}",
+            "descripcion": f"{tipo} {atributo.lower()} de {material} marca {marca}, ideal para uso en obra y hogar",
+            "codigo_interno": f"SKU-{i:08d}",
+            "id_categoria": 1,
+            "marca": marca,
+            "modelo": f"{marca[:3].upper()}-{rng.randint(100, 9999)}",
+            "caracteristicas": f"Material: {material}; Garantía {rng.choice([6, 12, 24])} meses",
+            "precio_venta": rng.randint(990, 199990),
+            "cantidad_disponible": rng.randint(0, 200),
+            "estado": "activo",
+            "en_catalogo": 1,
+        }
+
+
+def _crear_base(n, semilla):
+    ruta = os.path.join(_TMP, f"productos_{n}.db")
+    engine = create_engine(f"sqlite:///{ruta}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    cols = ["id_producto", "nombre", "descripcion", "codigo_interno", "id_categoria", "marca", "modelo",
+            "caracteristicas", "precio_venta", "cantidad_disponible", "estado", "en_catalogo"]
+    sql = (
+        f"INSERT INTO productos ({', '.join(cols)}, costo_bruto, costo_neto, stock_minimo, oferta_activa) "
+        f"VALUES ({', '.join('?' for _ in cols)}, 0, 0, 0, 0)"
+    )
+    rng = random.Random(semilla)
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        cur.execute("INSERT INTO categorias (id_categoria, nombre) VALUES (1, 'Ferretería')")
+        lote = []
+        for fila in _generar_filas(n, rng):
+            lote.append(tuple(fila[c] for c in cols))
+            if len(lote) >= 20000:
+                cur.executemany(sql, lote)
+                lote = []
+        if lote:
+            cur.executemany(sql, lote)
+        raw.commit()
+    finally:
+        raw.close()
+    inicio = time.perf_counter()
+    BusquedaController.asegurar_indice(engine)
+    return engine, time.perf_counter() - inicio
+
+
+def _buscar_legacy(db, termino):
+    # Réplica de la implementación anterior: ILIKE sin límite + joinedload
+    return db.query(ProductoDB).options(
+        joinedload(ProductoDB.categoria),
+        joinedload(ProductoDB.proveedor)
+    ).filter(
+        ProductoDB.nombre.ilike(f"%{termino}%") |
+        ProductoDB.descripcion.ilike(f"%{termino}%")
+    ).all()
+
+
+def _medir(fn, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        fn()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return tiempos[len(tiempos) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanos", default="10000,100000,1000000")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'productos':>10} {'termino':<24} {'ilike_ms':>10} {'ilike_hits':>10} {'fts_ms':>8} {'fts_total':>9}")
+    for n in [int(x) for x in args.tamanos.split(",") if x.strip()]:
+        engine, t_indice = _crear_base(n, args.semilla)
+        print(f"# {n} productos: índice FTS construido en {t_indice:.2f}s")
+        db = sessionmaker(bind=engine)()
+        try:
+            for termino in TERMINOS:
+                hits = len(_buscar_legacy(db, termino))
+                t_legacy = _medir(lambda: _buscar_legacy(db, termino), args.repeticiones)
+                total = BusquedaController.buscar_productos(db, termino, 0, 20)["total"]
+                t_fts = _medir(lambda: BusquedaController.buscar_productos(db, termino, 0, 20), args.repeticiones)
+                print(f"{n:>10} {termino:<24} {t_legacy:>10.1f} {hits:>10} {t_fts:>8.1f} {total:>9}")
+        finally:
+            db.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+#!/usr/bin/env python
+"""
+Prueba de carga HTTP repetible de los endpoints más usados.
+
+Levanta la aplicación con uvicorn (proceso aparte, sin servicios externos) contra una base
+preparada y la recorre con --concurrencia clientes durante --duracion segundos, eligiendo en
+cada iteración un escenario según --escenarios:
+
+- catalogo:   GET /api/productos/catalogo (página al azar)
+- producto:   GET /api/productos/catalogo/slug/{slug}
+- buscar:     GET /api/productos/buscar?q=...
+- checkout:   POST /api/ventas/guest (venta pendiente de 1 a 3 líneas)
+- notify:     POST /api/pagos/notify firmado, que aprueba una venta del checkout
+- dashboard:  GET /api/dashboard/metrics
+- inventario: GET /api/productos/inventario (con token de administrador)
+
+Base: por defecto una SQLite temporal generada con scripts/generar_datos.py (semilla y fecha
+fijas, así que es la misma en cada corrida); --base usa una copia de un archivo SQLite y
+--database-url una base existente (p. ej. PostgreSQL local, ya migrada; con --generar se le
+agregan datos).
+
+Escribe en --salida un JSON (claves ordenadas) con p50/p95/p99, RPS, errores y códigos por
+endpoint, más los parámetros y el commit, para comparar entre commits con diff o con
+--comparar anterior.json. El cliente y el servidor comparten la máquina. Termina con código 1
+si hubo errores 5xx o de conexión.
+
+Uso:
+    python scripts/bench_carga.py --concurrencia 16 --duracion 30 --salida carga.json
+    python scripts/bench_carga.py --salida carga_nuevo.json --comparar carga.json
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND)
+
+import httpx
+from sqlalchemy import create_engine, text
+
+ESCENARIOS = "catalogo=30,producto=25,buscar=15,checkout=8,notify=6,dashboard=6,inventario=10"
+TERMINOS = ["taladro", "martillo bosch", "cable", "ampolleta", "pintura esmalte", "tornillo galvanizado",
+            "sierra circular", "llave ajustable", "manguera", "candado", "makita", "cemento"]
+SECRETO_NOTIFY = "bench-carga"
+RUT_ADMIN = "11111111"
+CLAVE_ADMIN = "bench-carga"
+DATOS = ["--productos", "5000", "--usuarios", "2000", "--ventas", "50000", "--semilla", "42", "--hasta", "2026-09-30"]
+
+
+def _puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _percentil(ordenados: list, p: float) -> float:
+    if not ordenados:
+        return 0.0
+    indice = max(0, min(len(ordenados) - 1, int(round(p / 100 * len(ordenados) + 0.5)) - 1))
+    return ordenados[indice]
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return ""
+
+
+def _ejecutar(script: str, url: str, *argumentos: str) -> None:
+    subprocess.run([sys.executable, os.path.join("scripts", script), *argumentos], cwd=BACKEND, check=True,
+                   env=dict(os.environ, DATABASE_URL=url), stdout=subprocess.DEVNULL)
+
+
+def _preparar_usuarios(url: str) -> None:
+    """Administrador con clave conocida para las rutas que lo requieren, y el rol 'invitado' que
+    el primer checkout de invitado crearía (así la carga no mide esa creación)"""
+    os.environ["DATABASE_URL"] = url
+    from controllers.usuario_controller import _rut_normalizado
+    from core.auth import hash_contraseña
+
+    rut = _rut_normalizado(RUT_ADMIN)
+    motor = create_engine(url)
+    with motor.begin() as conn:
+        if not conn.execute(text("SELECT 1 FROM roles WHERE nombre = 'invitado'")).first():
+            conn.execute(text("INSERT INTO roles (nombre) VALUES ('invitado')"))
+        id_rol = conn.execute(text("SELECT id_rol FROM roles WHERE nombre = 'administrador'")).scalar()
+        conn.execute(text("DELETE FROM usuarios WHERE rut = :rut"), {"rut": rut})
+        conn.execute(text(
+            "INSERT INTO usuarios (rut, id_rol, nombre, password, activo) VALUES (:rut, :rol, 'Bench', :clave, :activo)"
+        ), {"rut": rut, "rol": id_rol, "clave": hash_contraseña(CLAVE_ADMIN), "activo": True})
+    motor.dispose()
+
+
+def _fixtures(url: str, semilla: int) -> dict:
+    """Slugs del catálogo, productos con stock y RUTs (con DV) de invitados para los escenarios"""
+    from controllers.usuario_controller import _rut_normalizado
+
+    rng = random.Random(f"{semilla}:ruts")
+    ruts = [_rut_normalizado(str(cuerpo)) for cuerpo in rng.sample(range(30_000_000, 40_000_000), 5000)]
+    motor = create_engine(url)
+    with motor.connect() as conn:
+        slugs = [s for (s,) in conn.execute(text(
+            "SELECT slug FROM productos WHERE en_catalogo = :si AND estado = 'activo' AND slug IS NOT NULL "
+            "ORDER BY id_producto LIMIT 2000"), {"si": True})]
+        productos = [tuple(f) for f in conn.execute(text(
+            "SELECT id_producto, precio_venta FROM productos WHERE estado = 'activo' AND cantidad_disponible > 50 "
+            "ORDER BY id_producto LIMIT 2000"))]
+        paginas = conn.execute(text("SELECT count(*) FROM productos WHERE en_catalogo = :si"), {"si": True}).scalar()
+    motor.dispose()
+    if not slugs or not productos:
+        raise SystemExit("La base no tiene productos en catálogo con stock (usar --generar)")
+    return {"slugs": slugs, "productos": productos, "ruts": ruts, "paginas": max(1, min(50, paginas // 20))}
+
+
+class _Servidor:
+    def __init__(self, url: str, workers: int, directorio: str):
+        self.puerto = _puerto_libre()
+        self.base = f"http://127.0.0.1:{self.puerto}"
+        self.log = os.path.join(directorio, "servidor.log")
+        entorno = dict(os.environ, DATABASE_URL=url, PAYMENT_NOTIFY_SECRET=SECRETO_NOTIFY, MIGRAR_AL_INICIAR="0")
+        with open(self.log, "w") as salida:
+            self.proceso = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(self.puerto),
+                 "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+                cwd=BACKEND, env=entorno, stdout=salida, stderr=subprocess.STDOUT,
+            )
+
+    def esperar(self, limite: float = 90.0) -> None:
+        fin = time.monotonic() + limite
+        while time.monotonic() < fin:
+            if self.proceso.poll() is not None:
+                break
+            try:
+                if httpx.get(f"{self.base}/api/categorias/", timeout=2).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.3)
+        self.detener()
+        with open(self.log) as f:
+            raise SystemExit(f"El servidor no arrancó:\n{f.read()[-3000:]}")
+
+    def detener(self) -> None:
+        if self.proceso.poll() is None:
+            self.proceso.terminate()
+            try:
+                self.proceso.wait(timeout=20)
+            except subprocess.TimeoutExpired:
+                self.proceso.kill()
+
+
+class _Carga:
+    """Clientes concurrentes con escenarios ponderados; registra latencias por endpoint"""
+
+    def __init__(self, cliente: httpx.AsyncClient, fixtures: dict, token: str, pesos: dict, semilla: int):
+        self.cliente = cliente
+        self.fixtures = fixtures
+        self.admin = {"Authorization": f"Bearer {token}"}
+        self.nombres, self.pesos = list(pesos), list(pesos.values())
+        self.semilla = semilla
+        self.pendientes = []  # ventas del checkout que esperan notify
+        self.medir = False
+        self.muestras = {}
+        self.errores = []  # primeras respuestas 5xx, para el informe
+
+    async def _pedir(self, nombre: str, metodo: str, ruta: str, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            respuesta = await self.cliente.request(metodo, ruta, **kwargs)
+            codigo = str(respuesta.status_code)
+            if self.medir and respuesta.status_code >= 500 and len(self.errores) < 5:
+                self.errores.append(f"{nombre} {codigo}: {respuesta.text[:300]}")
+        except httpx.HTTPError as e:
+            respuesta, codigo = None, type(e).__name__
+        if self.medir:
+            latencias, codigos = self.muestras.setdefault(nombre, ([], {}))
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            codigos[codigo] = codigos.get(codigo, 0) + 1
+        return respuesta
+
+    async def catalogo(self, rng):
+        await self._pedir("catalogo", "GET", "/api/productos/catalogo",
+                          params={"skip": rng.randrange(self.fixtures["paginas"]) * 20, "limit": 20})
+
+    async def producto(self, rng):
+        await self._pedir("producto", "GET", f"/api/productos/catalogo/slug/{rng.choice(self.fixtures['slugs'])}")
+
+    async def buscar(self, rng):
+        await self._pedir("buscar", "GET", "/api/productos/buscar", params={"q": rng.choice(TERMINOS), "limit": 20})
+
+    async def checkout(self, rng):
+        lineas = rng.sample(self.fixtures["productos"], rng.randint(1, 3))
+        detalles = [{"id_producto": p, "cantidad": 1, "precio_unitario": float(precio)} for p, precio in lineas]
+        rut = rng.choice(self.fixtures["ruts"])
+        respuesta = await self._pedir("checkout", "POST", "/api/ventas/guest", json={
+            "total_venta": sum(d["precio_unitario"] for d in detalles),
+            "estado": "pendiente",
+            "detalles": detalles,
+            "guest_info": {"rut": rut, "nombre": "Carga", "email": f"carga{rut}@correo.cl",
+                           "metodo_entrega": "retiro"},
+        })
+        if respuesta is not None and respuesta.status_code == 200:
+            self.pendientes.append(respuesta.json()["id_venta"])
+
+    async def notify(self, rng):
+        if not self.pendientes:
+            return await self.checkout(rng)
+        id_venta = self.pendientes.pop(0)
+        token = f"tok_{id_venta}"
+        firma = hmac.new(SECRETO_NOTIFY.encode(), f"{id_venta}|{token}|aprobado".encode(), hashlib.sha256).hexdigest()
+        await self._pedir("notify", "POST", "/api/pagos/notify",
+                          json={"venta_id": id_venta, "token": token, "status": "aprobado", "signature": firma})
+
+    async def dashboard(self, rng):
+        await self._pedir("dashboard", "GET", "/api/dashboard/metrics")
+
+    async def inventario(self, rng):
+        await self._pedir("inventario", "GET", "/api/productos/inventario",
+                          params={"skip": rng.randrange(self.fixtures["paginas"]) * 20, "limit": 20}, headers=self.admin)
+
+    async def _cliente(self, i: int, fin: float):
+        rng = random.Random(f"{self.semilla}:{i}")
+        while time.monotonic() < fin:
+            escenario = rng.choices(self.nombres, weights=self.pesos)[0]
+            await getattr(self, escenario)(rng)
+
+    async def correr(self, concurrencia: int, segundos: float, medir: bool) -> float:
+        self.medir = medir
+        inicio = time.monotonic()
+        await asyncio.gather(*(self._cliente(i, inicio + segundos) for i in range(concurrencia)))
+        return time.monotonic() - inicio
+
+
+def _resumen(muestras: dict, segundos: float) -> dict:
+    endpoints = {}
+    todas = []
+    for nombre, (latencias, codigos) in sorted(muestras.items()):
+        ordenadas = sorted(latencias)
+        todas.extend(ordenadas)
+        errores = sum(n for codigo, n in codigos.items() if not codigo.startswith(("2", "3")))
+        endpoints[nombre] = {
+            "peticiones": len(ordenadas),
+            "rps": round(len(ordenadas) / segundos, 2),
+            "errores": errores,
+            "codigos": dict(sorted(codigos.items())),
+            "media_ms": round(sum(ordenadas) / len(ordenadas), 2),
+            "p50_ms": round(_percentil(ordenadas, 50), 2),
+            "p95_ms": round(_percentil(ordenadas, 95), 2),
+            "p99_ms": round(_percentil(ordenadas, 99), 2),
+            "max_ms": round(ordenadas[-1], 2),
+        }
+    todas.sort()
+    total = {
+        "peticiones": len(todas),
+        "rps": round(len(todas) / segundos, 2),
+        "errores": sum(e["errores"] for e in endpoints.values()),
+        "p50_ms": round(_percentil(todas, 50), 2),
+        "p95_ms": round(_percentil(todas, 95), 2),
+        "p99_ms": round(_percentil(todas, 99), 2),
+    }
+    return {"endpoints": endpoints, "total": total}
+
+
+def _comparar(actual: dict, anterior: dict) -> None:
+    print(f"\nComparación con {anterior.get('commit') or 'anterior'} ({anterior.get('fecha', '')}):")
+    print(f"{'endpoint':<12} {'métrica':<7} {'anterior':>10} {'actual':>10} {'cambio':>8}")
+    filas = dict(anterior["endpoints"], total=anterior["total"])
+    for nombre, valores in dict(actual["endpoints"], total=actual["total"]).items():
+        if nombre not in filas:
+            continue
+        for metrica in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+            antes, ahora = filas[nombre][metrica], valores[metrica]
+            cambio = f"{(ahora - antes) / antes * 100:+.1f}%" if antes else "-"
+            print(f"{nombre:<12} {metrica:<7} {antes:>10.2f} {ahora:>10.2f} {cambio:>8}")
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrencia", type=int, default=16)
+    parser.add_argument("--duracion", type=float, default=30.0, help="Segundos medidos")
+    parser.add_argument("--calentamiento", type=float, default=5.0, help="Segundos previos sin medir")
+    parser.add_argument("--escenarios", default=ESCENARIOS, help="Pesos nombre=peso separados por coma")
+    parser.add_argument("--workers", type=int, default=1, help="Workers de uvicorn")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--base", help="Archivo SQLite con datos (se usa una copia)")
+    parser.add_argument("--database-url", help="Base existente (p. ej. PostgreSQL local) en vez de una SQLite temporal")
+    parser.add_argument("--generar", action="store_true", help="Agregar datos con generar_datos.py (por defecto solo en la SQLite temporal)")
+    parser.add_argument("--salida", default="bench_carga.json")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior")
+    args = parser.parse_args()
+
+    pesos = {}
+    for parte in args.escenarios.split(","):
+        nombre, _, peso = parte.partition("=")
+        if not hasattr(_Carga, nombre.strip()):
+            raise SystemExit(f"Escenario desconocido: {nombre}")
+        pesos[nombre.strip()] = float(peso)
+
+    tmp = tempfile.mkdtemp(prefix="bench_carga_")
+    try:
+        if args.database_url:
+            url, generar = args.database_url, args.generar
+        else:
+            ruta = os.path.join(tmp, "carga.db")
+            if args.base:
+                shutil.copy(args.base, ruta)
+            url, generar = f"sqlite:///{ruta}", args.generar or not args.base
+        _ejecutar("migrar.py", url)
+        if generar:
+            inicio = time.perf_counter()
+            _ejecutar("generar_datos.py", url, *DATOS)
+            print(f"Datos generados en {time.perf_counter() - inicio:.1f}s ({' '.join(DATOS)})")
+        _preparar_usuarios(url)
+        fixtures = _fixtures(url, args.semilla)
+
+        servidor = _Servidor(url, args.workers, tmp)
+        try:
+            servidor.esperar()
+            fallas = asyncio.run(_correr(args, servidor, fixtures, pesos, url))
+        finally:
+            servidor.detener()
+        if fallas:
+            with open(servidor.log) as f:
+                print(f"FALLA: errores de servidor o conexión: {fallas}\n--- servidor.log ---\n{f.read()[-4000:]}")
+            sys.exit(1)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+async def _correr(args, servidor: _Servidor, fixtures: dict, pesos: dict, url: str) -> dict:
+    """Calentamiento, medición, JSON de salida y comparación; devuelve los errores 5xx/conexión"""
+    limites = httpx.Limits(max_connections=args.concurrencia, max_keepalive_connections=args.concurrencia)
+    async with httpx.AsyncClient(base_url=servidor.base, limits=limites, timeout=60) as cliente:
+        login = await cliente.post("/api/auth/login", data={"username": RUT_ADMIN, "password": CLAVE_ADMIN})
+        if login.status_code != 200:
+            raise SystemExit(f"Login de administrador falló: {login.status_code} {login.text[:200]}")
+        carga = _Carga(cliente, fixtures, login.json()["access_token"], pesos, args.semilla)
+        if args.calentamiento > 0:
+            await carga.correr(args.concurrencia, args.calentamiento, medir=False)
+        segundos = await carga.correr(args.concurrencia, args.duracion, medir=True)
+
+    resultado = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "parametros": {
+            "concurrencia": args.concurrencia, "duracion": args.duracion, "calentamiento": args.calentamiento,
+            "escenarios": pesos, "workers": args.workers, "semilla": args.semilla,
+            "datos": " ".join(DATOS) if not args.base and not args.database_url else None,
+        },
+        "entorno": {"motor": url.split(":", 1)[0], "python": platform.python_version(), "cpus": os.cpu_count()},
+        **_resumen(carga.muestras, segundos),
+    }
+    with open(args.salida, "w") as f:
+        json.dump(resultado, f, indent=2, sort_keys=True, ensure_ascii=False)
+        f.write("\n")
+
+    print(f"{'endpoint':<12} {'peticiones':>10} {'rps':>8} {'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8} {'errores':>8}")
+    for nombre, e in dict(resultado["endpoints"], total=resultado["total"]).items():
+        print(f"{nombre:<12} {e['peticiones']:>10} {e['rps']:>8.1f} {e['p50_ms']:>8.1f} {e['p95_ms']:>8.1f} "
+              f"{e['p99_ms']:>8.1f} {e['errores']:>8}")
+    print(f"Resultados en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar) as f:
+            _comparar(resultado, json.load(f))
+
+    for ejemplo in carga.errores:
+        print(f"  {ejemplo}")
+    return {f"{nombre} {codigo}": n for nombre, e in resultado["endpoints"].items()
+            for codigo, n in e["codigos"].items() if not codigo[0].isdigit() or codigo.startswith("5")}
+
+
+if __name__ == "__main__":
+    main_bench()
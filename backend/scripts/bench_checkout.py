@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""
+Prueba de estrés del checkout: cientos de ventas concurrentes sobre un mismo producto.
+
+Lanza --ventas llamadas a VentaController.crear_venta desde --hilos hilos (cada una con su
+propia sesión, como hace el threadpool de FastAPI) contra un producto con --stock unidades.
+Al terminar verifica que:
+- el stock nunca queda negativo y coincide con stock inicial - unidades vendidas
+- las ventas aceptadas no superan el stock inicial (sin sobreventa)
+- la suma de movimientos de inventario coincide con las unidades vendidas
+
+Usa una base SQLite temporal salvo que se defina DATABASE_URL (p. ej. PostgreSQL).
+Termina con código 1 si alguna verificación falla.
+
+Uso:
+    python scripts/bench_checkout.py --ventas 500 --hilos 32 --stock 200 --cantidad 1
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+_TMP = tempfile.mkdtemp(prefix="bench_checkout_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP, 'app.db')}")
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from decimal import Decimal
+
+from fastapi import HTTPException
+from sqlalchemy import func
+
+import main  # noqa: F401  (crea las tablas)
+from config.database import SessionLocal
+from controllers.venta_controller import VentaController
+from models.categoria import CategoriaDB
+from models.producto import ProductoDB
+from models.usuario import UsuarioDB
+from models.venta import DetalleVentaCreate, MovimientoInventarioDB, VentaCreate
+
+RUT_BENCH = "11111111K"
+
+
+def _preparar(stock: int) -> int:
+    db = SessionLocal()
+    try:
+        if not db.query(UsuarioDB).filter(UsuarioDB.rut == RUT_BENCH).first():
+            db.add(UsuarioDB(rut=RUT_BENCH, nombre="Bench", password="x", activo=True))
+        categoria = CategoriaDB(nombre=f"Bench checkout {time.time_ns()}")
+        db.add(categoria)
+        db.flush()
+        producto = ProductoDB(
+            nombre=f"SKU estrés {time.time_ns()}",
+            id_categoria=categoria.id_categoria,
+            precio_venta=Decimal("1000"),
+            cantidad_disponible=stock,
+        )
+        db.add(producto)
+        db.commit()
+        return producto.id_producto
+    finally:
+        db.close()
+
+
+def _comprar(id_producto: int, cantidad: int) -> str:
+    db = SessionLocal()
+    try:
+        venta = VentaCreate(
+            rut_usuario=RUT_BENCH,
+            total_venta=Decimal("1000") * cantidad,
+            detalles=[DetalleVentaCreate(id_producto=id_producto, cantidad=cantidad, precio_unitario=Decimal("1000"))],
+        )
+        VentaController.crear_venta(db, venta, RUT_BENCH)
+        return "ok"
+    except HTTPException as e:
+        return "sin_stock" if e.status_code == 400 else f"error {e.status_code}: {e.detail}"
+    finally:
+        db.close()
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ventas", type=int, default=500, help="Checkouts a lanzar")
+    parser.add_argument("--hilos", type=int, default=32)
+    parser.add_argument("--stock", type=int, default=200, help="Stock inicial del producto")
+    parser.add_argument("--cantidad", type=int, default=1, help="Unidades por venta")
+    args = parser.parse_args()
+
+    id_producto = _preparar(args.stock)
+    barrera = threading.Barrier(args.hilos)
+
+    def tarea(i):
+        # Los primeros checkouts de cada hilo arrancan a la vez para maximizar la contención
+        if i < args.hilos:
+            barrera.wait()
+        return _comprar(id_producto, args.cantidad)
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.hilos) as pool:
+        resultados = list(pool.map(tarea, range(args.ventas)))
+    duracion = time.perf_counter() - inicio
+
+    aceptadas = resultados.count("ok")
+    rechazadas = resultados.count("sin_stock")
+    errores = [r for r in resultados if r not in ("ok", "sin_stock")]
+
+    db = SessionLocal()
+    try:
+        stock_final = db.query(ProductoDB.cantidad_disponible).filter(ProductoDB.id_producto == id_producto).scalar()
+        movido = db.query(func.coalesce(func.sum(MovimientoInventarioDB.cantidad), 0)).filter(
+            MovimientoInventarioDB.id_producto == id_producto
+        ).scalar()
+    finally:
+        db.close()
+
+    vendidas = aceptadas * args.cantidad
+    print(f"motor: {SessionLocal.kw['bind'].dialect.name}  hilos: {args.hilos}  ventas: {args.ventas}")
+    print(f"aceptadas: {aceptadas}  sin stock: {rechazadas}  errores: {len(errores)}")
+    print(f"stock inicial: {args.stock}  vendido: {vendidas}  final: {stock_final}  movimientos: {movido}")
+    print(f"duración: {duracion:.2f}s  throughput: {args.ventas / duracion:.1f} checkouts/s "
+          f"({aceptadas / duracion:.1f} ventas/s)")
+
+    fallos = []
+    if stock_final < 0:
+        fallos.append("stock negativo")
+    if stock_final != args.stock - vendidas:
+        fallos.append("stock final no cuadra con las ventas aceptadas")
+    if vendidas > args.stock:
+        fallos.append("sobreventa")
+    if -movido != vendidas:
+        fallos.append("movimientos de inventario no cuadran")
+    if vendidas < min(args.stock // args.cantidad, args.ventas) * args.cantidad and not errores:
+        fallos.append("se rechazaron ventas con stock disponible")
+    for e in sorted(set(errores))[:5]:
+        print(f"  {e}")
+    if fallos:
+        print("FALLO: " + ", ".join(fallos))
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main_bench()
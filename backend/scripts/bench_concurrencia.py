@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+"""
+Benchmark de concurrencia: peticiones rápidas mezcladas con consultas lentas.
+
+Compara dos variantes del mismo trabajo sobre la app real (main.app):
+- antes:   handlers `async def` que ejecutan SQLAlchemy síncrono (bloquean el event loop)
+- después: handlers `def` (como quedan las rutas), ejecutados por FastAPI en el threadpool
+
+La petición rápida es el listado de categorías (CategoriaController.obtener_categorias) y la
+lenta una consulta SQL costosa en SQLite. Se usa httpx con transporte ASGI, sin red ni servidor.
+
+Uso:
+    python scripts/bench_concurrencia.py --clientes 20 --duracion 5 --proporcion-lentas 0.1
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+_TMP = tempfile.mkdtemp(prefix="bench_concurrencia_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP, 'app.db')}")
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import httpx
+from fastapi import APIRouter, Depends
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+import main
+from config.database import SessionLocal, get_db
+from controllers.categoria_controller import CategoriaController
+from models.categoria import CategoriaDB
+
+# Cuenta hasta N con un CTE recursivo: ~0,2-0,5 s en SQLite según la máquina
+SQL_LENTA = text(
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < :n) SELECT count(*) FROM c"
+)
+
+router = APIRouter(prefix="/bench")
+
+
+@router.get("/antes/rapida")
+async def rapida_antes(db: Session = Depends(get_db)):
+    return CategoriaController.obtener_categorias(db)
+
+
+@router.get("/antes/lenta")
+async def lenta_antes(n: int, db: Session = Depends(get_db)):
+    return {"filas": db.execute(SQL_LENTA, {"n": n}).scalar()}
+
+
+@router.get("/despues/rapida")
+def rapida_despues(db: Session = Depends(get_db)):
+    return CategoriaController.obtener_categorias(db)
+
+
+@router.get("/despues/lenta")
+def lenta_despues(n: int, db: Session = Depends(get_db)):
+    return {"filas": db.execute(SQL_LENTA, {"n": n}).scalar()}
+
+
+def _percentil(valores, p):
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(round(p / 100 * (len(valores) - 1))))]
+
+
+async def _ejecutar(variante, args):
+    transporte = httpx.ASGITransport(app=main.app)
+    rapidas, lentas = [], []
+    fin = time.perf_counter() + args.duracion
+
+    async def cliente(i):
+        rng = random.Random(args.semilla + i)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://bench") as http:
+            while time.perf_counter() < fin:
+                lenta = rng.random() < args.proporcion_lentas
+                url = f"/bench/{variante}/lenta?n={args.n}" if lenta else f"/bench/{variante}/rapida"
+                inicio = time.perf_counter()
+                r = await http.get(url)
+                r.raise_for_status()
+                (lentas if lenta else rapidas).append((time.perf_counter() - inicio) * 1000)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente(i) for i in range(args.clientes)))
+    total = time.perf_counter() - inicio
+    return {
+        "variante": variante,
+        "rps": (len(rapidas) + len(lentas)) / total,
+        "rapidas": len(rapidas),
+        "lentas": len(lentas),
+        "rapida_p50": _percentil(rapidas, 50),
+        "rapida_p95": _percentil(rapidas, 95),
+        "lenta_p50": _percentil(lentas, 50),
+    }
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clientes", type=int, default=20)
+    parser.add_argument("--duracion", type=float, default=5.0, help="Segundos por variante")
+    parser.add_argument("--proporcion-lentas", type=float, default=0.1)
+    parser.add_argument("--n", type=int, default=1000000, help="Tamaño de la consulta lenta")
+    parser.add_argument("--semilla", type=int, default=1)
+    args = parser.parse_args()
+
+    main.app.include_router(router)
+    db = SessionLocal()
+    try:
+        if not db.query(CategoriaDB).count():
+            db.add_all([CategoriaDB(nombre=f"Categoría {i}") for i in range(20)])
+            db.commit()
+    finally:
+        db.close()
+
+    print(f"{'variante':<8} {'rps':>8} {'rapidas':>8} {'lentas':>7} {'rapida_p50':>11} {'rapida_p95':>11} {'lenta_p50':>10}")
+    for variante in ("antes", "despues"):
+        r = asyncio.run(_ejecutar(variante, args))
+        print(f"{r['variante']:<8} {r['rps']:>8.1f} {r['rapidas']:>8} {r['lentas']:>7} "
+              f"{r['rapida_p50']:>9.1f}ms {r['rapida_p95']:>9.1f}ms {r['lenta_p50']:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main_bench()
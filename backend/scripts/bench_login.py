@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+"""
+Benchmark de logins (logins/s con N clientes concurrentes) y verificación de la migración de
+hashes legados.
+
+Crea --usuarios usuarios con hash PBKDF2 en una base SQLite temporal, más usuarios legados con
+hash bcrypt y con la contraseña en texto plano. Para cada valor de --clientes hace --logins
+POST /api/auth/login desde ese número de hilos (TestClient, ASGI en proceso) e informa
+logins/s, latencias p50/p95 y la peor latencia de /api/health medida en paralelo.
+
+Verifica además que:
+- todos los logins válidos responden 200
+- los usuarios bcrypt y texto plano quedan con hash PBKDF2 tras su primer login y siguen entrando
+- una contraseña incorrecta responde 401 y no toca el hash
+
+Termina con código 1 si alguna verificación falla.
+
+Uso:
+    python scripts/bench_login.py --usuarios 200 --logins 400 --clientes 1,4,16
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+_TMP = tempfile.mkdtemp(prefix="bench_login_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP, 'app.db')}")
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import bcrypt
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+import main
+from config.database import SessionLocal, engine
+from core.auth import HASH_WORKERS, hash_contraseña
+from models.rol import RolDB
+from models.usuario import UsuarioDB
+
+CLAVE = "clave123"
+
+
+def _rut(cuerpo: int) -> str:
+    acc, f = 0, 2
+    for ch in reversed(str(cuerpo)):
+        acc += int(ch) * f
+        f = 2 if f == 7 else f + 1
+    resto = 11 - (acc % 11)
+    # El login recibe el RUT sin dígito verificador y lo calcula
+    return f"{cuerpo}{'0' if resto == 11 else ('K' if resto == 10 else resto)}"
+
+
+def _sembrar(n: int, legados: int) -> dict:
+    hash_actual = hash_contraseña(CLAVE)
+    hash_bcrypt = bcrypt.hashpw(CLAVE.encode(), bcrypt.gensalt(rounds=4)).decode()
+    grupos = {
+        "pbkdf2": [_rut(10000000 + i) for i in range(n)],
+        "bcrypt": [_rut(20000000 + i) for i in range(legados)],
+        "texto": [_rut(30000000 + i) for i in range(legados)],
+    }
+    hashes = {"pbkdf2": hash_actual, "bcrypt": hash_bcrypt, "texto": CLAVE}
+    with engine.begin() as conn:
+        if not conn.execute(RolDB.__table__.select().where(RolDB.nombre == "cliente")).first():
+            conn.execute(insert(RolDB.__table__), [{"nombre": "cliente"}])
+        id_rol = conn.execute(RolDB.__table__.select().where(RolDB.nombre == "cliente")).first().id_rol
+        conn.execute(insert(UsuarioDB.__table__), [
+            {"rut": rut, "id_rol": id_rol, "nombre": f"Usuario {rut}", "password": hashes[grupo], "activo": True}
+            for grupo, ruts in grupos.items() for rut in ruts
+        ])
+    return grupos
+
+
+def _hash_de(rut: str) -> str:
+    db = SessionLocal()
+    try:
+        return db.query(UsuarioDB.password).filter(UsuarioDB.rut == rut).scalar()
+    finally:
+        db.close()
+
+
+def _etapa(client, ruts: list, logins: int, clientes: int) -> dict:
+    latencias, sondeos = [], []
+    fin = threading.Event()
+
+    def login(i):
+        inicio = time.perf_counter()
+        r = client.post("/api/auth/login", data={"username": ruts[i % len(ruts)][:-1], "password": CLAVE})
+        latencias.append(time.perf_counter() - inicio)
+        return r.status_code
+
+    def sondear():
+        while not fin.is_set():
+            inicio = time.perf_counter()
+            client.get("/api/health")
+            sondeos.append(time.perf_counter() - inicio)
+            time.sleep(0.02)
+
+    sonda = threading.Thread(target=sondear, daemon=True)
+    sonda.start()
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clientes) as pool:
+        codigos = list(pool.map(login, range(logins)))
+    duracion = time.perf_counter() - inicio
+    fin.set()
+    sonda.join()
+    latencias.sort()
+    return {
+        "por_segundo": logins / duracion,
+        "p50": statistics.median(latencias),
+        "p95": latencias[int(len(latencias) * 0.95) - 1],
+        "health": max(sondeos) if sondeos else 0.0,
+        "errores": sum(c != 200 for c in codigos),
+    }
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--usuarios", type=int, default=200)
+    parser.add_argument("--legados", type=int, default=10, help="Usuarios bcrypt y texto plano (de cada uno)")
+    parser.add_argument("--logins", type=int, default=400, help="Logins por etapa")
+    parser.add_argument("--clientes", default="1,4,16", help="Clientes concurrentes por etapa, separados por coma")
+    args = parser.parse_args()
+
+    fallos = []
+
+    def verificar(condicion, mensaje):
+        print(("  ok    " if condicion else "  FALLO ") + mensaje)
+        if not condicion:
+            fallos.append(mensaje)
+
+    grupos = _sembrar(args.usuarios, args.legados)
+    with TestClient(main.app) as client:
+        print(f"motor: {engine.dialect.name}  CPUs: {os.cpu_count()}  HASH_WORKERS: {HASH_WORKERS}  logins por etapa: {args.logins}")
+        for clientes in [int(c) for c in args.clientes.split(",") if c.strip()]:
+            r = _etapa(client, grupos["pbkdf2"], args.logins, clientes)
+            print(f"  {clientes:>3} clientes  {r['por_segundo']:>7.1f} logins/s   p50 {r['p50'] * 1000:>6.1f} ms   "
+                  f"p95 {r['p95'] * 1000:>6.1f} ms   /api/health peor {r['health'] * 1000:>5.1f} ms")
+            verificar(r["errores"] == 0, f"{clientes} clientes: todos los logins responden 200")
+
+        for grupo in ("bcrypt", "texto"):
+            rut = grupos[grupo][0]
+            mala = client.post("/api/auth/login", data={"username": rut[:-1], "password": "incorrecta"})
+            verificar(mala.status_code == 401 and not _hash_de(rut).startswith("$pbkdf2-sha256$"),
+                      f"{grupo}: contraseña incorrecta responde 401 y no migra el hash")
+            primera = client.post("/api/auth/login", data={"username": rut[:-1], "password": CLAVE}).status_code
+            migrado = _hash_de(rut).startswith("$pbkdf2-sha256$")
+            segunda = client.post("/api/auth/login", data={"username": rut[:-1], "password": CLAVE}).status_code
+            verificar(primera == 200 and migrado and segunda == 200, f"{grupo}: migra a PBKDF2 en el login y sigue entrando")
+
+    if fallos:
+        print(f"FALLO: {len(fallos)} verificaciones")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main_bench()
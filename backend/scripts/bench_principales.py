@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+"""
+Benchmark y verificación de la caché de usuarios autenticados (core.auth.get_current_user).
+
+Crea --usuarios usuarios con token en una base SQLite temporal y hace --peticiones GET
+/api/usuarios/me repartidas entre ellos, primero con la caché desactivada y luego activada.
+Para cada etapa informa peticiones/s, verificaciones de firma JWT por petición y sentencias
+SQL por petición. Después verifica que:
+- actualizar, desactivar y activar un usuario se ven en la petición siguiente con el mismo token
+- un token vencido se rechaza aunque esté en la caché
+- un usuario eliminado deja de autenticarse
+- con rut INTEGER (PostgreSQL tras la migración 20251109; aquí se emula al cargar UsuarioDB),
+  invalidar el usuario también descarta su entrada y la siguiente vuelve a usar la caché
+- con la caché activa, las peticiones repetidas no verifican la firma ni consultan la BD
+
+Termina con código 1 si alguna verificación falla.
+
+Uso:
+    python scripts/bench_principales.py --usuarios 50 --peticiones 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+_TMP = tempfile.mkdtemp(prefix="bench_principales_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP, 'app.db')}")
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, insert
+from sqlalchemy.orm.attributes import set_committed_value
+
+import main
+import core.auth as auth
+from config.database import engine
+from core.cache import principal_cache
+from models.rol import RolDB
+from models.usuario import UsuarioDB
+
+_contadores = {"sql": 0, "jwt": 0}
+_decode_original = auth.jwt.decode
+
+
+def _decode_contado(*args, **kwargs):
+    _contadores["jwt"] += 1
+    return _decode_original(*args, **kwargs)
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _contar_sql(conn, cursor, statement, parameters, context, executemany):
+    _contadores["sql"] += 1
+
+
+def _sembrar(n: int) -> list:
+    with engine.begin() as conn:
+        if not conn.execute(RolDB.__table__.select().where(RolDB.nombre == "cliente")).first():
+            conn.execute(insert(RolDB.__table__), [{"nombre": "cliente"}])
+        id_rol = conn.execute(RolDB.__table__.select().where(RolDB.nombre == "cliente")).first().id_rol
+        ruts = [f"{20000000 + i}" for i in range(n)]
+        conn.execute(insert(UsuarioDB.__table__), [
+            {"rut": rut, "id_rol": id_rol, "nombre": f"Cliente {i}", "email": f"c{i}@ejemplo.cl", "password": "x", "activo": True}
+            for i, rut in enumerate(ruts)
+        ])
+    return ruts
+
+
+def _rut_entero(usuario, contexto):
+    """Emula la columna rut INTEGER de PostgreSQL: UsuarioDB.rut llega como int"""
+    if isinstance(usuario.rut, str) and usuario.rut.isdigit():
+        set_committed_value(usuario, "rut", int(usuario.rut))
+
+
+def _medir(client, tokens: list, peticiones: int) -> dict:
+    _contadores.update(sql=0, jwt=0)
+    inicio = time.perf_counter()
+    errores = 0
+    for i in range(peticiones):
+        r = client.get("/api/usuarios/me", headers={"Authorization": f"Bearer {tokens[i % len(tokens)]}"})
+        errores += r.status_code != 200
+    duracion = time.perf_counter() - inicio
+    return {
+        "por_segundo": peticiones / duracion,
+        "jwt": _contadores["jwt"] / peticiones,
+        "sql": _contadores["sql"] / peticiones,
+        "errores": errores,
+    }
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--usuarios", type=int, default=50)
+    parser.add_argument("--peticiones", type=int, default=5000)
+    args = parser.parse_args()
+
+    fallos = []
+
+    def verificar(condicion, mensaje):
+        print(("  ok    " if condicion else "  FALLO ") + mensaje)
+        if not condicion:
+            fallos.append(mensaje)
+
+    ruts = _sembrar(args.usuarios)
+    tokens = [auth.crear_token({"sub": rut}) for rut in ruts]
+    auth.jwt.decode = _decode_contado
+    main.app.dependency_overrides[auth.require_admin] = lambda: None
+
+    with TestClient(main.app) as client:
+        maximo = principal_cache.max_entradas
+        principal_cache.max_entradas = 0
+        sin_cache = _medir(client, tokens, args.peticiones)
+        principal_cache.max_entradas = maximo
+        principal_cache.limpiar()
+        con_cache = _medir(client, tokens, args.peticiones)
+
+        print(f"motor: {engine.dialect.name}  usuarios: {args.usuarios}  peticiones por etapa: {args.peticiones}")
+        for etapa, r in (("sin caché", sin_cache), ("con caché", con_cache)):
+            print(f"  {etapa:<10} {r['por_segundo']:>8,.0f} pet/s   firmas JWT/pet: {r['jwt']:.3f}   SQL/pet: {r['sql']:.3f}")
+        verificar(sin_cache["errores"] == 0 and con_cache["errores"] == 0, "todas las peticiones autenticadas")
+        verificar(sin_cache["jwt"] == 1 and sin_cache["sql"] >= 2, "sin caché: una firma y consultas por petición")
+        # Solo la primera petición de cada token pasa por la firma y la BD
+        verificar(con_cache["jwt"] * args.peticiones <= args.usuarios and con_cache["sql"] * args.peticiones <= 2 * args.usuarios,
+                  "con caché: firma y BD solo en la primera petición de cada token")
+
+        rut, token = ruts[0], tokens[0]
+        cabecera = {"Authorization": f"Bearer {token}"}
+        client.get("/api/usuarios/me", headers=cabecera)
+
+        client.put(f"/api/usuarios/{rut}", json={"nombre": "Renombrado"})
+        verificar(client.get("/api/usuarios/me", headers=cabecera).json().get("nombre") == "Renombrado",
+                  "actualizar_usuario invalida la caché")
+        client.put(f"/api/usuarios/{rut}/desactivar")
+        verificar(client.get("/api/usuarios/me", headers=cabecera).json().get("activo") is False,
+                  "eliminar_usuario (desactivar) invalida la caché")
+        client.put(f"/api/usuarios/{rut}/activar")
+        verificar(client.get("/api/usuarios/me", headers=cabecera).json().get("activo") is True,
+                  "activar_usuario invalida la caché")
+
+        corto = auth.crear_token({"sub": ruts[1]}, expires_delta=timedelta(seconds=1))
+        primera = client.get("/api/usuarios/me", headers={"Authorization": f"Bearer {corto}"}).status_code
+        time.sleep(2.5)  # exp va en segundos enteros
+        segunda = client.get("/api/usuarios/me", headers={"Authorization": f"Bearer {corto}"}).status_code
+        verificar(primera == 200 and segunda == 401, f"token vencido se rechaza aunque esté en la caché ({primera}, {segunda})")
+
+        cabecera2 = {"Authorization": f"Bearer {tokens[2]}"}
+        client.get("/api/usuarios/me", headers=cabecera2)
+        client.put(f"/api/usuarios/{ruts[2]}/desactivar")
+        client.delete(f"/api/usuarios/{ruts[2]}/eliminar-permanente")
+        verificar(client.get("/api/usuarios/me", headers=cabecera2).status_code == 401,
+                  "usuario eliminado deja de autenticarse")
+
+        event.listen(UsuarioDB, "load", _rut_entero)
+        principal_cache.limpiar()  # la entrada del token 3 debe guardarse con el rut entero
+        try:
+            cabecera3 = {"Authorization": f"Bearer {tokens[3]}"}
+            client.get("/api/usuarios/me", headers=cabecera3)
+            client.put(f"/api/usuarios/{ruts[3]}", json={"nombre": "Rut entero"})
+            verificar(client.get("/api/usuarios/me", headers=cabecera3).json().get("nombre") == "Rut entero",
+                      "rut INTEGER: actualizar_usuario invalida la caché")
+            _contadores.update(sql=0, jwt=0)
+            client.get("/api/usuarios/me", headers=cabecera3)
+            verificar(_contadores["jwt"] == 0 and _contadores["sql"] == 0,
+                      "rut INTEGER: tras invalidar, la petición siguiente vuelve a salir de la caché")
+        finally:
+            event.remove(UsuarioDB, "load", _rut_entero)
+
+    print(f"caché: {principal_cache.estadisticas()}")
+    if fallos:
+        print(f"FALLO: {len(fallos)} verificaciones")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python
+"""
+Benchmark y verificación de las purgas de usuarios por lotes (core.purga).
+
+Crea en una base SQLite temporal --usuarios clientes (el 90 % desactivados) con --ventas
+ventas repartidas entre ellos, cada una con 2 detalles, 1 pago y 2 movimientos, más un
+despacho, una fila de auditoría y un movimiento suelto por usuario. Luego:
+
+1. Borra --legado usuarios desactivados con el borrado fila a fila anterior (una consulta por
+   venta y tabla) y extrapola su tiempo al total.
+2. Borra el resto con POST /api/usuarios/eliminar-desactivados?en_segundo_plano=true,
+   consultando el avance en GET /api/usuarios/purgas/{id}.
+
+Verifica que:
+- no quedan usuarios desactivados ni filas huérfanas (detalles, pagos, movimientos sin venta)
+- las filas informadas por tabla coinciden con lo que desapareció de cada tabla
+- las ventas de los usuarios activos siguen intactas
+- los resúmenes diarios quedan iguales a recalcularlos desde cero
+- eliminar-permanente de un usuario borra sus ventas y devuelve las filas, y conserva su
+  auditoría sin usuario asociado
+- cancelar una purga en curso la detiene entre lotes sin dejar huérfanos
+
+Termina con código 1 si alguna verificación falla.
+
+Uso:
+    python scripts/bench_purga.py --usuarios 10000 --ventas 100000 --legado 300
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+_TMP = tempfile.mkdtemp(prefix="bench_purga_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP, 'app.db')}")
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func, insert
+
+import main
+import core.purga as purga
+from config.database import SessionLocal, engine
+from core import resumen_ventas
+from core.auth import require_admin
+from models.auditoria import AuditoriaDB
+from models.categoria import CategoriaDB
+from models.despacho import DespachoDB
+from models.pago import PagoDB
+from models.producto import ProductoDB
+from models.resumen_venta import ResumenVentaCategoriaDB, ResumenVentaDiaDB, ResumenVentaProductoDB
+from models.rol import RolDB
+from models.usuario import UsuarioDB
+from models.venta import DetalleVentaDB, MovimientoInventarioDB, VentaDB
+
+MODELOS = {
+    "movimientos_inventario": MovimientoInventarioDB, "pagos": PagoDB, "detalles_venta": DetalleVentaDB,
+    "ventas": VentaDB, "despachos": DespachoDB, "auditoria": AuditoriaDB, "usuarios": UsuarioDB,
+}
+_sql = {"n": 0}
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _contar_sql(conn, cursor, statement, parameters, context, executemany):
+    _sql["n"] += 1
+
+
+def _sembrar(n_usuarios: int, n_ventas: int) -> None:
+    azar = random.Random(7)
+    inicio = datetime(2026, 1, 1)
+    with engine.begin() as conn:
+        if not conn.execute(RolDB.__table__.select().where(RolDB.nombre == "cliente")).first():
+            conn.execute(insert(RolDB.__table__), [{"nombre": "cliente"}])
+        id_rol = conn.execute(RolDB.__table__.select().where(RolDB.nombre == "cliente")).first().id_rol
+        conn.execute(insert(CategoriaDB.__table__), [{"id_categoria": c, "nombre": f"Categoría {c}"} for c in range(1, 6)])
+        conn.execute(insert(ProductoDB.__table__), [
+            {"id_producto": p, "nombre": f"Producto {p}", "slug": f"producto-{p}", "id_categoria": 1 + p % 5,
+             "precio_venta": 1000 + p, "cantidad_disponible": 10**6, "estado": "activo"}
+            for p in range(1, 201)
+        ])
+        ruts = [f"{10000000 + i}" for i in range(n_usuarios)]
+        conn.execute(insert(UsuarioDB.__table__), [
+            {"rut": rut, "id_rol": id_rol, "nombre": f"Cliente {i}", "password": "x", "activo": i % 10 == 0}
+            for i, rut in enumerate(ruts)
+        ])
+        conn.execute(insert(DespachoDB.__table__), [{"rut_usuario": rut, "calle": "Calle", "numero": "1"} for rut in ruts])
+        conn.execute(insert(AuditoriaDB.__table__), [{"usuario_rut": rut, "accion": "login"} for rut in ruts])
+        conn.execute(insert(MovimientoInventarioDB.__table__), [
+            {"id_producto": 1, "rut_usuario": rut, "tipo_movimiento": "ajuste", "cantidad": 1,
+             "cantidad_anterior": 0, "cantidad_nueva": 1, "fecha_movimiento": inicio}
+            for rut in ruts
+        ])
+
+        for desde in range(0, n_ventas, 10000):
+            ventas, detalles, pagos, movimientos = [], [], [], []
+            for id_venta in range(desde + 1, min(desde + 10000, n_ventas) + 1):
+                rut = ruts[id_venta % n_usuarios]
+                fecha = inicio + timedelta(minutes=azar.randrange(300 * 24 * 60))
+                productos = azar.sample(range(1, 201), 2)
+                ventas.append({"id_venta": id_venta, "rut_usuario": rut, "fecha_venta": fecha, "total_venta": 0,
+                               "estado": "completada" if azar.random() < 0.8 else "pendiente"})
+                total = 0
+                for id_producto in productos:
+                    cantidad = azar.randint(1, 3)
+                    total += cantidad * (1000 + id_producto)
+                    detalles.append({"id_venta": id_venta, "id_producto": id_producto, "cantidad": cantidad,
+                                     "precio_unitario": 1000 + id_producto, "subtotal": cantidad * (1000 + id_producto),
+                                     "id_categoria": 1 + id_producto % 5})
+                    movimientos.append({"id_producto": id_producto, "rut_usuario": rut, "id_venta": id_venta,
+                                        "tipo_movimiento": "venta", "cantidad": -cantidad, "cantidad_anterior": 0,
+                                        "cantidad_nueva": 0, "fecha_movimiento": fecha})
+                ventas[-1]["total_venta"] = total
+                pagos.append({"id_venta": id_venta, "monto": total, "estado": "autorizado"})
+            conn.execute(insert(VentaDB.__table__), ventas)
+            conn.execute(insert(DetalleVentaDB.__table__), detalles)
+            conn.execute(insert(PagoDB.__table__), pagos)
+            conn.execute(insert(MovimientoInventarioDB.__table__), movimientos)
+
+    db = SessionLocal()
+    try:
+        resumen_ventas.reconstruir(db)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _purga_fila_a_fila(db, ruts: list) -> None:
+    """Borrado anterior (UsuarioController.eliminar_usuarios_desactivados antes de core.purga)"""
+    for uid in ruts:
+        usuario = db.query(UsuarioDB).filter(UsuarioDB.rut == uid).first()
+        for m in db.query(MovimientoInventarioDB).filter(MovimientoInventarioDB.rut_usuario == uid, MovimientoInventarioDB.id_venta == None).all():  # noqa: E711
+            db.delete(m)
+        ventas_usuario = db.query(VentaDB).filter((VentaDB.rut_usuario == uid) | (VentaDB.repartidor_rut == uid)).all()
+        resumen_ventas.aplicar_ventas(db, [v.id_venta for v in ventas_usuario if v.estado == resumen_ventas.ESTADO_CONTABLE], -1)
+        for v in ventas_usuario:
+            for modelo in (MovimientoInventarioDB, PagoDB, DetalleVentaDB):
+                for fila in db.query(modelo).filter(modelo.id_venta == v.id_venta).all():
+                    db.delete(fila)
+            db.delete(v)
+        for d in db.query(DespachoDB).filter(DespachoDB.rut_usuario == uid).all():
+            db.delete(d)
+        for a in db.query(AuditoriaDB).filter(AuditoriaDB.usuario_rut == uid).all():
+            db.delete(a)
+        db.delete(usuario)
+    db.commit()
+
+
+def _conteos(db) -> dict:
+    return {tabla: db.query(func.count()).select_from(modelo).scalar() for tabla, modelo in MODELOS.items()}
+
+
+def _huerfanos(db) -> int:
+    ventas = db.query(VentaDB.id_venta)
+    usuarios = db.query(UsuarioDB.rut)
+    return sum((
+        db.query(func.count(DetalleVentaDB.id_detalle)).filter(~DetalleVentaDB.id_venta.in_(ventas)).scalar(),
+        db.query(func.count(PagoDB.id_pago)).filter(~PagoDB.id_venta.in_(ventas)).scalar(),
+        db.query(func.count(MovimientoInventarioDB.id_movimiento)).filter(
+            MovimientoInventarioDB.id_venta != None, ~MovimientoInventarioDB.id_venta.in_(ventas)).scalar(),  # noqa: E711
+        db.query(func.count(VentaDB.id_venta)).filter(~VentaDB.rut_usuario.in_(usuarios)).scalar(),
+        db.query(func.count(DespachoDB.id_despacho)).filter(~DespachoDB.rut_usuario.in_(usuarios)).scalar(),
+    ))
+
+
+def _resumenes(db) -> dict:
+    return {
+        "dia": {r.dia: (round(float(r.ingresos), 2), r.cantidad_ventas, r.unidades)
+                for r in db.query(ResumenVentaDiaDB) if r.cantidad_ventas},
+        "producto": {(r.dia, r.id_producto): (r.unidades, round(float(r.ventas), 2))
+                     for r in db.query(ResumenVentaProductoDB) if r.unidades},
+        "categoria": {(r.dia, r.id_categoria): (round(float(r.ingresos), 2), r.cantidad)
+                      for r in db.query(ResumenVentaCategoriaDB) if r.cantidad},
+    }
+
+
+def _esperar(client, id_trabajo: str, mostrar: bool = True) -> dict:
+    visto = None
+    while True:
+        trabajo = client.get(f"/api/usuarios/purgas/{id_trabajo}").json()
+        p = trabajo["progreso"]
+        if mostrar and p and p.get("lotes") != visto:
+            visto = p.get("lotes")
+            print(f"    lote {p['lotes']:>3}  usuarios {p['usuarios']:>6}/{p['usuarios_total']}  "
+                  f"ventas {p['filas']['ventas']:>7}  {p['segundos']:>6.2f}s")
+        if trabajo["estado"] not in ("pendiente", "en_curso"):
+            return trabajo
+        time.sleep(0.2)
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--usuarios", type=int, default=10000)
+    parser.add_argument("--ventas", type=int, default=100000)
+    parser.add_argument("--legado", type=int, default=300, help="Usuarios desactivados borrados fila a fila")
+    args = parser.parse_args()
+
+    fallos = []
+
+    def verificar(condicion, mensaje):
+        print(("  ok    " if condicion else "  FALLO ") + mensaje)
+        if not condicion:
+            fallos.append(mensaje)
+
+    inicio = time.perf_counter()
+    _sembrar(args.usuarios, args.ventas)
+    db = SessionLocal()
+    inactivos = [rut for (rut,) in db.query(UsuarioDB.rut).filter(UsuarioDB.activo == False).order_by(UsuarioDB.rut)]  # noqa: E712
+    activos = [rut for (rut,) in db.query(UsuarioDB.rut).filter(UsuarioDB.activo == True).order_by(UsuarioDB.rut)]  # noqa: E712
+    ventas_activos = db.query(func.count(VentaDB.id_venta)).filter(VentaDB.rut_usuario.in_(activos)).scalar()
+    print(f"motor: {engine.dialect.name}  sembrado en {time.perf_counter() - inicio:.1f}s: {_conteos(db)}")
+
+    _sql["n"] = 0
+    inicio = time.perf_counter()
+    _purga_fila_a_fila(db, inactivos[:args.legado])
+    legado = time.perf_counter() - inicio
+    por_usuario = legado / max(1, args.legado)
+    print(f"  fila a fila:  {args.legado} usuarios en {legado:.2f}s ({_sql['n'] / max(1, args.legado):.0f} SQL/usuario), "
+          f"extrapolado a {len(inactivos)}: {por_usuario * len(inactivos):.1f}s")
+
+    antes = _conteos(db)
+    main.app.dependency_overrides[require_admin] = lambda: None
+    with TestClient(main.app) as client:
+        _sql["n"] = 0
+        inicio = time.perf_counter()
+        r = client.post("/api/usuarios/eliminar-desactivados", params={"en_segundo_plano": "true"})
+        verificar(r.status_code == 202, f"en segundo plano responde 202 ({r.status_code})")
+        trabajo = _esperar(client, r.json()["trabajo"]["id"])
+        duracion = time.perf_counter() - inicio
+        resultado = trabajo["resultado"] or {}
+        restantes = len(inactivos) - args.legado
+        print(f"  por lotes:    {restantes} usuarios en {duracion:.2f}s ({_sql['n'] / max(1, restantes):.2f} SQL/usuario), "
+              f"{restantes / duracion:,.0f} usuarios/s, {por_usuario * restantes / duracion:.0f}x")
+        verificar(trabajo["estado"] == "completado" and resultado.get("eliminados") == restantes,
+                  f"trabajo completado, {resultado.get('eliminados')} usuarios eliminados")
+
+        db.expire_all()
+        despues = _conteos(db)
+        filas = resultado.get("filas", {})
+        verificar(all(filas.get(t) == antes[t] - despues[t] for t in MODELOS),
+                  f"filas informadas coinciden con las borradas: {filas}")
+        verificar(db.query(func.count(UsuarioDB.rut)).filter(UsuarioDB.activo == False).scalar() == 0,  # noqa: E712
+                  "no quedan usuarios desactivados")
+        verificar(_huerfanos(db) == 0, "sin filas huérfanas")
+        verificar(db.query(func.count(VentaDB.id_venta)).filter(VentaDB.rut_usuario.in_(activos)).scalar() == ventas_activos,
+                  f"ventas de usuarios activos intactas ({ventas_activos})")
+        actuales = _resumenes(db)
+        resumen_ventas.reconstruir(db)
+        db.flush()
+        verificar(actuales == _resumenes(db), "resúmenes diarios iguales a recalcularlos")
+        db.rollback()
+
+        rut = activos[0]
+        client.put(f"/api/usuarios/{rut}/desactivar")
+        auditoria_antes = db.query(func.count(AuditoriaDB.id_evento)).scalar()
+        auditoria_usuario = db.query(AuditoriaDB).filter(AuditoriaDB.usuario_rut == rut).count()
+        r = client.delete(f"/api/usuarios/{rut}/eliminar-permanente")
+        verificar(r.status_code == 200 and r.json()["filas"]["usuarios"] == 1 and r.json()["filas"]["ventas"] > 0
+                  and not db.query(VentaDB).filter(VentaDB.rut_usuario == rut).first(),
+                  f"eliminar-permanente borra el usuario y sus ventas: {r.json().get('filas')}")
+        verificar(auditoria_usuario and db.query(func.count(AuditoriaDB.id_evento)).scalar() >= auditoria_antes
+                  and not db.query(AuditoriaDB).filter(AuditoriaDB.usuario_rut == rut).first(),
+                  "eliminar-permanente conserva la auditoría del usuario sin usuario asociado")
+
+        purga.PURGA_LOTE_USUARIOS = 5
+        r = client.post("/api/usuarios/purge-clientes", params={"en_segundo_plano": "true"})
+        id_trabajo = r.json()["trabajo"]["id"]
+        time.sleep(0.3)
+        client.delete(f"/api/usuarios/purgas/{id_trabajo}")
+        trabajo = _esperar(client, id_trabajo, mostrar=False)
+        db.expire_all()
+        quedan = db.query(func.count(UsuarioDB.rut)).scalar()
+        verificar(trabajo["estado"] == "cancelado" and 0 < quedan < len(activos) - 1 and _huerfanos(db) == 0,
+                  f"cancelar detiene la purga entre lotes ({trabajo['estado']}, quedan {quedan} usuarios, sin huérfanos)")
+        verificar(client.get("/api/usuarios/purgas/noexiste").status_code == 404, "trabajo inexistente responde 404")
+    db.close()
+
+    if fallos:
+        print(f"FALLO: {len(fallos)} verificaciones")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main_bench()
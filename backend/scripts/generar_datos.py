@@ -0,0 +1,565 @@
+#!/usr/bin/env python
+"""
+Generador de datos sintéticos en volumen para pruebas de carga (fuera de la aplicación).
+
+Agrega a la base de DATABASE_URL categorías, subcategorías, proveedores, productos, usuarios
+(clientes y bodegueros), despachos, ventas con sus detalles, pagos, movimientos de inventario y
+auditoría, y al final reconstruye los resúmenes de ventas. No importa main ni seed_data.
+
+Reproducible: cada etapa usa su propio generador derivado de --semilla, así que con los mismos
+argumentos (incluida --hasta) se obtiene el mismo conjunto de datos, y cambiar --ventas no cambia
+los productos ni los usuarios.
+
+Distribuciones (configurables):
+- popularidad de productos y actividad de clientes: Zipf (--zipf, --zipf-clientes)
+- precios: lognormal (--precio-mediana, --precio-sigma)
+- líneas por venta y unidades por línea: geométricas (--items-media, --unidades-media)
+- ventas por día: peso por día de la semana y por mes (peak en diciembre) en --dias días
+  hasta --hasta
+- estados de venta: --estados "completada=0.85,pendiente=0.1,cancelada=0.05"
+
+El stock se sigue venta a venta: cada línea registra su movimiento (cantidad anterior y nueva),
+las canceladas devuelven el stock y cuando no alcanza se registra una reposición antes.
+
+Carga por lotes: en SQLite con executemany y en PostgreSQL con COPY; commit cada --lote ventas.
+Los IDs se asignan a partir de los máximos existentes (en PostgreSQL se ajustan las secuencias).
+Los usuarios generados tienen RUT desde 50.000.000 (login con el cuerpo, sin DV) y la clave
+--clave; los bodegueros son los primeros.
+
+Uso:
+    DATABASE_URL=sqlite:///carga.db python scripts/generar_datos.py --productos 1000000 --ventas 10000000
+    python scripts/generar_datos.py --productos 2000 --usuarios 500 --ventas 20000 --hasta 2026-10-01
+"""
+import argparse
+import csv
+import io
+import math
+import os
+import random
+import sys
+import time
+import unicodedata
+from array import array
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import text
+
+from config.database import SessionLocal, engine
+from config.migraciones import migrar
+from core import resumen_ventas
+from controllers.usuario_controller import _rut_normalizado
+from core.auth import hash_contraseña
+
+CATALOGO = {
+    "Herramientas eléctricas": ["Taladro", "Esmeril", "Lijadora", "Sierra circular", "Atornillador", "Rotomartillo"],
+    "Herramientas manuales": ["Martillo", "Destornillador", "Alicate", "Llave", "Huincha", "Serrucho"],
+    "Electricidad": ["Cable", "Enchufe", "Interruptor", "Alargador", "Automático", "Canaleta"],
+    "Iluminación": ["Ampolleta", "Foco", "Panel", "Huincha LED", "Aplique", "Linterna"],
+    "Pinturas": ["Pintura", "Esmalte", "Barniz", "Brocha", "Rodillo", "Diluyente"],
+    "Fijaciones": ["Tornillo", "Perno", "Tarugo", "Clavo", "Remache", "Abrazadera"],
+    "Gasfitería": ["Llave de paso", "Flexible", "Sifón", "Teflón", "Codo", "Grifería"],
+    "Jardín": ["Manguera", "Pala", "Tijera de podar", "Rastrillo", "Aspersor", "Carretilla"],
+    "Seguridad": ["Candado", "Guante", "Casco", "Antiparra", "Mascarilla", "Chaleco reflectante"],
+    "Construcción": ["Cemento", "Yeso", "Sellador", "Malla", "Nivel", "Espátula"],
+}
+ATRIBUTOS = ["Percutor", "Inalámbrico", "Ajustable", "Eléctrico", "Industrial", "Compacto", "Profesional",
+             "Galvanizado", "Térmico", "Reforzado", "Pequeño", "Grande", "Premium", "Básico"]
+MARCAS = ["Bosch", "Makita", "Stanley", "Truper", "DeWalt", "Philips", "Osram", "Fensa", "Voltex",
+          "Tricolor", "Sherwin", "Black+Decker", "Irwin", "Vinilit", "Sika"]
+MATERIALES = ["acero", "aluminio", "plástico", "cobre", "madera", "fibra de vidrio", "PVC", "bronce"]
+COLORES = ["negro", "gris", "rojo", "amarillo", "azul", "blanco", "verde", "naranjo"]
+NOMBRES = ["Juan", "María", "José", "Ana", "Pedro", "Camila", "Luis", "Francisca", "Diego", "Valentina",
+           "Carlos", "Javiera", "Jorge", "Constanza", "Felipe", "Catalina", "Matías", "Fernanda", "Tomás", "Daniela"]
+APELLIDOS = ["González", "Muñoz", "Rojas", "Díaz", "Pérez", "Soto", "Contreras", "Silva", "Martínez", "Sepúlveda",
+             "Morales", "Rodríguez", "López", "Fuentes", "Hernández", "Torres", "Araya", "Flores", "Espinoza", "Valenzuela"]
+CALLES = ["Av. Providencia", "Av. Libertador Bernardo O'Higgins", "Los Leones", "Av. Vicuña Mackenna", "Irarrázaval",
+          "Gran Avenida", "Av. Pajaritos", "Av. Grecia", "Av. Las Condes", "San Diego", "Av. Matta", "Blanco Encalada"]
+COMUNAS = ["Santiago", "Providencia", "Ñuñoa", "Maipú", "La Florida", "Puente Alto", "Las Condes", "San Miguel",
+           "Macul", "Peñalolén", "Quilicura", "Estación Central"]
+METODOS_PAGO = ["VD", "VN", "VC", "SI", "NC"]
+
+# Peso de cada día de la semana (lunes..domingo) y de cada mes (enero..diciembre)
+PESO_DIA_SEMANA = [0.9, 0.9, 0.95, 1.0, 1.15, 1.45, 0.75]
+PESO_MES = [0.85, 0.85, 1.05, 1.0, 0.95, 0.9, 0.9, 0.95, 1.05, 1.1, 1.2, 1.45]
+RUT_BASE = 50_000_000
+ESTADO_PAGO = {"completada": "autorizado", "pendiente": "iniciado", "cancelada": "anulado"}
+
+PRODUCTO = ("id_producto", "nombre", "slug", "descripcion", "codigo_interno", "id_categoria", "id_proveedor",
+            "id_subcategoria", "marca", "garantia_meses", "modelo", "color", "material", "costo_bruto", "costo_neto",
+            "precio_venta", "porcentaje_utilidad", "utilidad_pesos", "cantidad_disponible", "stock_minimo", "estado",
+            "en_catalogo", "caracteristicas", "fecha_creacion", "fecha_actualizacion", "oferta_activa", "tipo_oferta",
+            "valor_oferta", "fecha_inicio_oferta", "fecha_fin_oferta")
+USUARIO = ("rut", "id_rol", "nombre", "apellido", "email", "telefono", "password", "activo", "fecha_creacion")
+DESPACHO = ("id_despacho", "rut_usuario", "buscar", "calle", "numero", "depto", "adicional", "fecha_creacion",
+            "fecha_actualizacion")
+VENTA = ("id_venta", "rut_usuario", "fecha_venta", "total_venta", "estado", "fecha_creacion", "fecha_actualizacion",
+         "despacho_id", "metodo_entrega", "estado_envio", "fecha_despacho", "fecha_entrega")
+DETALLE = ("id_detalle", "id_venta", "id_producto", "cantidad", "precio_unitario", "subtotal", "id_categoria",
+           "fecha_creacion")
+MOVIMIENTO = ("id_movimiento", "id_producto", "rut_usuario", "id_venta", "tipo_movimiento", "cantidad",
+              "cantidad_anterior", "cantidad_nueva", "motivo", "fecha_movimiento", "fecha_creacion")
+PAGO = ("id_pago", "id_venta", "proveedor", "estado", "monto", "moneda", "buy_order", "session_id",
+        "authorization_code", "accounting_date", "payment_method", "installments_number", "fecha_creacion",
+        "fecha_actualizacion")
+AUDITORIA = ("id_evento", "usuario_rut", "accion", "entidad_tipo", "entidad_id", "detalle", "fecha_evento")
+# Tablas con clave entera generada aquí: (tabla, columna)
+CLAVES = [("categorias", "id_categoria"), ("subcategorias", "id_subcategoria"), ("proveedores", "id_proveedor"),
+          ("productos", "id_producto"), ("despachos", "id_despacho"), ("ventas", "id_venta"),
+          ("detalles_venta", "id_detalle"), ("movimientos_inventario", "id_movimiento"), ("pagos", "id_pago"),
+          ("auditoria", "id_evento")]
+
+
+def _fecha(valor: datetime) -> str:
+    # Mismo formato con que SQLAlchemy guarda DateTime en SQLite; PostgreSQL lo acepta tal cual
+    return valor.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _ascii(valor: str) -> str:
+    return unicodedata.normalize("NFKD", valor).encode("ascii", "ignore").decode().lower()
+
+
+def _slug(valor: str) -> str:
+    return "-".join("".join(c if c.isalnum() else " " for c in _ascii(valor)).split())
+
+
+def _geometrica(rng: random.Random, media: float, maximo: int) -> int:
+    """Entero >= 1 con distribución geométrica de media `media`, acotado a `maximo`"""
+    if media <= 1:
+        return 1
+    p = 1.0 / media
+    return min(maximo, 1 + int(math.log(1.0 - rng.random()) / math.log(1.0 - p)))
+
+
+def _zipf(n: int, s: float) -> list:
+    """Pesos acumulados de una Zipf de exponente s sobre n rangos (para random.choices)"""
+    return list(accumulate(1.0 / (k ** s) for k in range(1, n + 1)))
+
+
+def _repartir(total: int, pesos: list) -> list:
+    """Reparte `total` en enteros proporcionales a `pesos` (mayor resto, determinista)"""
+    suma = sum(pesos)
+    exactos = [total * p / suma for p in pesos]
+    partes = [int(x) for x in exactos]
+    faltan = total - sum(partes)
+    for i in sorted(range(len(pesos)), key=lambda i: (partes[i] - exactos[i], i))[:faltan]:
+        partes[i] += 1
+    return partes
+
+
+def _proporciones(texto: str) -> dict:
+    valores = {}
+    for parte in texto.split(","):
+        clave, _, peso = parte.partition("=")
+        valores[clave.strip()] = float(peso)
+    return valores
+
+
+class _Carga:
+    """Inserción por lotes: executemany en SQLite, COPY en PostgreSQL"""
+
+    def __init__(self):
+        self.dialecto = engine.dialect.name
+        self.conexion = engine.raw_connection()
+        self.cursor = self.conexion.cursor()
+        self.filas = {}
+        if self.dialecto == "sqlite":
+            self.cursor.execute("PRAGMA synchronous = OFF")
+            self.cursor.execute("PRAGMA cache_size = -262144")
+
+    def insertar(self, tabla: str, columnas: tuple, filas: list) -> None:
+        if not filas:
+            return
+        if self.dialecto == "postgresql":
+            self._copiar(tabla, columnas, filas)
+        else:
+            marcas = ", ".join("?" for _ in columnas)
+            self.cursor.executemany(f"INSERT INTO {tabla} ({', '.join(columnas)}) VALUES ({marcas})", filas)
+        self.filas[tabla] = self.filas.get(tabla, 0) + len(filas)
+
+    def _copiar(self, tabla: str, columnas: tuple, filas: list) -> None:
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        for fila in filas:
+            escritor.writerow(["\\N" if v is None else v for v in fila])
+        buffer.seek(0)
+        self.cursor.copy_expert(
+            f"COPY {tabla} ({', '.join(columnas)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer
+        )
+
+    def actualizar_stock(self, filas: list) -> None:
+        """Stock final de los productos generados, en una sola pasada.
+        filas: (cantidad_disponible, fecha_ultima_venta, fecha_ultimo_ingreso, id_producto)"""
+        if self.dialecto == "postgresql":
+            self.cursor.execute(
+                "CREATE TEMP TABLE stock_generado (cantidad integer, ultima_venta timestamp, "
+                "ultimo_ingreso timestamp, id integer) ON COMMIT DROP"
+            )
+            self._copiar("stock_generado", ("cantidad", "ultima_venta", "ultimo_ingreso", "id"), filas)
+            self.cursor.execute(
+                "UPDATE productos p SET cantidad_disponible = s.cantidad, fecha_ultima_venta = s.ultima_venta, "
+                "fecha_ultimo_ingreso = s.ultimo_ingreso FROM stock_generado s WHERE p.id_producto = s.id"
+            )
+        else:
+            self.cursor.executemany(
+                "UPDATE productos SET cantidad_disponible = ?, fecha_ultima_venta = ?, fecha_ultimo_ingreso = ? "
+                "WHERE id_producto = ?", filas
+            )
+
+    def maximo(self, tabla: str, columna: str) -> int:
+        self.cursor.execute(f"SELECT COALESCE(MAX({columna}), 0) FROM {tabla}")
+        return int(self.cursor.fetchone()[0])
+
+    def ajustar_secuencias(self) -> None:
+        if self.dialecto != "postgresql":
+            return
+        for tabla, columna in CLAVES:
+            self.cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence('{tabla}', '{columna}'), "
+                f"(SELECT COALESCE(MAX({columna}), 1) FROM {tabla}))"
+            )
+
+    def confirmar(self) -> None:
+        self.conexion.commit()
+
+    def cerrar(self) -> None:
+        self.conexion.close()
+
+
+def _id_rol(carga: _Carga, nombre: str) -> int:
+    carga.cursor.execute(f"SELECT id_rol FROM roles WHERE lower(nombre) = '{nombre}'")
+    fila = carga.cursor.fetchone()
+    if not fila:
+        raise SystemExit(f"Falta el rol '{nombre}' (ejecutar scripts/migrar.py)")
+    return fila[0]
+
+
+def _rut_inicial(carga: _Carga) -> int:
+    # RUTs generados: cuerpo de 8 dígitos desde RUT_BASE más el DV (se guardan como en la app);
+    # comparar como texto sirve porque tienen el mismo largo
+    carga.cursor.execute(f"SELECT MAX(rut) FROM usuarios WHERE length(rut) = 9 AND rut >= '{RUT_BASE}'")
+    ultimo = carga.cursor.fetchone()[0]
+    return int(ultimo[:8]) + 1 if ultimo else RUT_BASE
+
+
+def _catalogo(carga: _Carga, args) -> dict:
+    """Categorías, subcategorías (una por tipo de producto) y proveedores"""
+    rng = random.Random(f"{args.semilla}:catalogo")
+    id_categoria = carga.maximo("categorias", "id_categoria")
+    id_subcategoria = carga.maximo("subcategorias", "id_subcategoria")
+    id_proveedor = carga.maximo("proveedores", "id_proveedor")
+    categorias, subcategorias, tipos = [], [], []
+    for nombre, tipos_categoria in CATALOGO.items():
+        id_categoria += 1
+        categorias.append((id_categoria, nombre, f"{nombre} para hogar, obra e industria"))
+        for tipo in tipos_categoria:
+            id_subcategoria += 1
+            subcategorias.append((id_subcategoria, id_categoria, tipo, f"{tipo} y accesorios"))
+            tipos.append((tipo, id_categoria, id_subcategoria))
+    proveedores = []
+    for i in range(args.proveedores):
+        id_proveedor += 1
+        marca = MARCAS[i % len(MARCAS)]
+        proveedores.append((
+            id_proveedor, f"Distribuidora {marca} {i + 1}", f"{rng.randint(76_000_000, 79_999_999)}-{rng.randint(0, 9)}",
+            f"Distribuidora {marca} {i + 1} SpA", "Casa matriz", f"{rng.choice(CALLES)} {rng.randint(100, 9999)}",
+            rng.choice(COMUNAS), f"+569{rng.randint(10_000_000, 99_999_999)}", f"ventas{i + 1}@{_slug(marca)}.cl",
+            f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)}", f"+562{rng.randint(20_000_000, 29_999_999)}",
+        ))
+    carga.insertar("categorias", ("id_categoria", "nombre", "descripcion"), categorias)
+    carga.insertar("subcategorias", ("id_subcategoria", "id_categoria", "nombre", "descripcion"), subcategorias)
+    carga.insertar("proveedores", ("id_proveedor", "nombre", "rut", "razon_social", "sucursal", "direccion", "ciudad",
+                                   "celular", "correo", "contacto", "telefono"), proveedores)
+    carga.confirmar()
+    return {"tipos": tipos, "proveedores": [p[0] for p in proveedores]}
+
+
+def _productos(carga: _Carga, args, catalogo: dict, inicio: datetime) -> dict:
+    """Productos con precios lognormales; devuelve precios y stock inicial por posición"""
+    rng = random.Random(f"{args.semilla}:productos")
+    primero = carga.maximo("productos", "id_producto") + 1
+    precios, stock, categorias = array("i"), array("i"), array("i")
+    filas = []
+    mu = math.log(args.precio_mediana)
+    for i in range(args.productos):
+        id_producto = primero + i
+        tipo, id_categoria, id_subcategoria = rng.choice(catalogo["tipos"])
+        marca, atributo, material = rng.choice(MARCAS), rng.choice(ATRIBUTOS), rng.choice(MATERIALES)
+        modelo = f"{_ascii(marca)[:3].upper()}-{rng.randint(100, 9999)}"
+        nombre = f"{tipo} {atributo} {marca} {modelo}"
+        precio = max(290, int(round(math.exp(rng.gauss(mu, args.precio_sigma)), -1)))
+        margen = rng.uniform(0.15, 0.6)
+        costo_neto = round(precio / 1.19 / (1 + margen))
+        inicial = rng.randint(20, 300)
+        creado = inicio - timedelta(days=rng.randint(1, 720))
+        oferta = rng.random() < args.ofertas
+        precios.append(precio)
+        stock.append(inicial)
+        categorias.append(id_categoria)
+        filas.append((
+            id_producto, nombre, f"{_slug(nombre)}-{id_producto}",
+            f"{tipo} {atributo.lower()} de {material} marca {marca}, ideal para uso en obra y hogar",
+            f"GEN-{id_producto:08d}", id_categoria, rng.choice(catalogo["proveedores"]) if catalogo["proveedores"] else None,
+            id_subcategoria, marca, rng.choice([None, 3, 6, 12, 24]), modelo, rng.choice(COLORES), material,
+            round(costo_neto * 1.19), costo_neto, precio, round(margen * 100, 2), round(precio / 1.19) - costo_neto,
+            inicial, rng.randint(2, 15), "activo" if rng.random() < 0.97 else "inactivo",
+            1 if rng.random() < args.catalogo else 0,
+            f"Material: {material}; Color: {rng.choice(COLORES)}", _fecha(creado), _fecha(creado),
+            1 if oferta else 0, "porcentaje" if oferta else None, rng.choice([10, 15, 20, 25, 30]) if oferta else 0,
+            _fecha(inicio) if oferta else None, _fecha(inicio + timedelta(days=args.dias + 30)) if oferta else None,
+        ))
+        if len(filas) >= args.lote:
+            carga.insertar("productos", PRODUCTO, filas)
+            carga.confirmar()
+            filas = []
+    carga.insertar("productos", PRODUCTO, filas)
+    carga.confirmar()
+    return {"primero": primero, "precios": precios, "stock": stock, "categorias": categorias}
+
+
+def _usuarios(carga: _Carga, args, inicio: datetime) -> dict:
+    """Clientes (con despacho según --con-despacho) y bodegueros; todos con la clave --clave"""
+    rng = random.Random(f"{args.semilla}:usuarios")
+    clave = hash_contraseña(args.clave)
+    rol_cliente, rol_bodeguero = _id_rol(carga, "cliente"), _id_rol(carga, "bodeguero")
+    rut = _rut_inicial(carga)
+    id_despacho = carga.maximo("despachos", "id_despacho")
+    clientes, despachos, bodegueros = [], {}, []
+    usuarios, filas_despacho = [], []
+
+    def usuario(id_rol: int, activo: bool) -> str:
+        nonlocal rut
+        nombre, apellido = rng.choice(NOMBRES), rng.choice(APELLIDOS)
+        creado = inicio - timedelta(days=rng.randint(0, 365), seconds=rng.randint(0, 86_399))
+        usuarios.append((_rut_normalizado(str(rut)), id_rol, nombre, apellido, f"{_ascii(nombre)}.{_ascii(apellido)}{rut}@correo.cl",
+                         f"+569{rng.randint(10_000_000, 99_999_999)}", clave, 1 if activo else 0, _fecha(creado)))
+        rut += 1
+        return usuarios[-1][0]
+
+    for _ in range(args.bodegueros):
+        bodegueros.append(usuario(rol_bodeguero, True))
+    for _ in range(args.usuarios):
+        rut_cliente = usuario(rol_cliente, rng.random() < 0.95)
+        clientes.append(rut_cliente)
+        if rng.random() < args.con_despacho:
+            id_despacho += 1
+            despachos[rut_cliente] = id_despacho
+            calle, comuna = rng.choice(CALLES), rng.choice(COMUNAS)
+            numero = str(rng.randint(1, 9999))
+            filas_despacho.append((id_despacho, rut_cliente, f"{calle} {numero}, {comuna}", calle, numero,
+                                   f"Depto {rng.randint(101, 2405)}" if rng.random() < 0.4 else None, comuna,
+                                   _fecha(inicio), _fecha(inicio)))
+        if len(usuarios) >= args.lote:
+            carga.insertar("usuarios", USUARIO, usuarios)
+            carga.insertar("despachos", DESPACHO, filas_despacho)
+            carga.confirmar()
+            usuarios, filas_despacho = [], []
+    carga.insertar("usuarios", USUARIO, usuarios)
+    carga.insertar("despachos", DESPACHO, filas_despacho)
+    carga.confirmar()
+    return {"clientes": clientes, "despachos": despachos, "bodegueros": bodegueros}
+
+
+def _ventas_por_dia(args, hasta: date) -> list:
+    """(día, cantidad de ventas) para los --dias días que terminan en `hasta`"""
+    dias = [hasta - timedelta(days=args.dias - 1 - i) for i in range(args.dias)]
+    # Leve tendencia al alza a lo largo del período (+30 %)
+    pesos = [PESO_DIA_SEMANA[d.weekday()] * PESO_MES[d.month - 1] * (1 + 0.3 * i / max(1, args.dias - 1))
+             for i, d in enumerate(dias)]
+    return list(zip(dias, _repartir(args.ventas, pesos)))
+
+
+def _ventas(carga: _Carga, args, productos: dict, usuarios: dict, hasta: date, progreso) -> dict:
+    """Ventas en orden cronológico con detalles, pagos, movimientos y auditoría"""
+    rng = random.Random(f"{args.semilla}:ventas")
+    n = len(productos["precios"])
+    orden = list(range(n))
+    rng.shuffle(orden)  # el producto más popular no es siempre el primero
+    acumulado_productos = _zipf(n, args.zipf)
+    clientes = list(usuarios["clientes"])
+    rng.shuffle(clientes)
+    acumulado_clientes = _zipf(len(clientes), args.zipf_clientes)
+    estados = _proporciones(args.estados)
+    nombres_estado, pesos_estado = list(estados), list(accumulate(estados.values()))
+    precios, stock, primero = productos["precios"], productos["stock"], productos["primero"]
+    categorias = productos["categorias"]
+    ultima_venta, ultimo_ingreso = [None] * n, [None] * n
+    bodegueros = usuarios["bodegueros"] or [None]
+    despachos = usuarios["despachos"]
+
+    ids = {clave: carga.maximo(tabla, clave) for tabla, clave in CLAVES
+           if tabla in ("ventas", "detalles_venta", "movimientos_inventario", "pagos", "auditoria")}
+    lote = {"ventas": [], "detalles_venta": [], "movimientos_inventario": [], "pagos": [], "auditoria": []}
+    columnas = {"ventas": VENTA, "detalles_venta": DETALLE, "movimientos_inventario": MOVIMIENTO, "pagos": PAGO,
+                "auditoria": AUDITORIA}
+
+    def siguiente(clave: str) -> int:
+        ids[clave] += 1
+        return ids[clave]
+
+    def movimiento(pos, rut, id_venta, tipo, cantidad, motivo, fecha):
+        anterior = stock[pos]
+        stock[pos] = anterior + cantidad
+        lote["movimientos_inventario"].append((siguiente("id_movimiento"), primero + pos, rut, id_venta, tipo, cantidad,
+                                               anterior, stock[pos], motivo, fecha, fecha))
+
+    def volcar():
+        for tabla in lote:  # orden de claves foráneas
+            carga.insertar(tabla, columnas[tabla], lote[tabla])
+            lote[tabla] = []
+        carga.confirmar()
+        progreso()
+
+    # Stock inicial: una entrada por producto al comienzo del período
+    comienzo = _fecha(datetime.combine(hasta - timedelta(days=args.dias), datetime.min.time()).replace(hour=8))
+    for pos in range(n):
+        cantidad = stock[pos]
+        stock[pos] = 0
+        movimiento(pos, bodegueros[pos % len(bodegueros)], None, "entrada", cantidad, "Stock inicial", comienzo)
+        ultimo_ingreso[pos] = comienzo
+        if len(lote["movimientos_inventario"]) >= args.lote:
+            volcar()
+
+    for dia, cantidad_dia in _ventas_por_dia(args, hasta):
+        horas = sorted(rng.randint(9 * 3600, 21 * 3600) for _ in range(cantidad_dia))
+        antiguedad = (hasta - dia).days
+        for segundos in horas:
+            momento = datetime.combine(dia, datetime.min.time()) + timedelta(seconds=segundos)
+            fecha = _fecha(momento)
+            rut = rng.choices(clientes, cum_weights=acumulado_clientes)[0] if clientes else None
+            estado = rng.choices(nombres_estado, cum_weights=pesos_estado)[0]
+            id_venta = siguiente("id_venta")
+            lineas = rng.choices(orden, cum_weights=acumulado_productos, k=_geometrica(rng, args.items_media, args.items_max))
+            total = 0
+            for pos in dict.fromkeys(lineas):
+                unidades = _geometrica(rng, args.unidades_media, 20)
+                if stock[pos] < unidades:
+                    reposicion = unidades + rng.randint(50, 300)
+                    movimiento(pos, rng.choice(bodegueros), None, "entrada", reposicion, "Reposición", fecha)
+                    ultimo_ingreso[pos] = fecha
+                subtotal = precios[pos] * unidades
+                total += subtotal
+                lote["detalles_venta"].append((siguiente("id_detalle"), id_venta, primero + pos, unidades, precios[pos],
+                                               subtotal, categorias[pos], fecha))
+                movimiento(pos, rut, id_venta, "venta", -unidades, f"Venta #{id_venta}", fecha)
+                if estado == "cancelada":
+                    movimiento(pos, rut, id_venta, "devolucion", unidades, f"Cancelación venta #{id_venta}", fecha)
+                elif estado == "completada":
+                    ultima_venta[pos] = fecha
+
+            id_despacho = despachos.get(rut) if rng.random() < args.despacho else None
+            fecha_despacho = fecha_entrega = None
+            if estado != "completada":
+                envio = "pendiente" if estado == "pendiente" else "fallido"
+            elif id_despacho is None:
+                envio, fecha_entrega = "entregado", fecha
+            elif antiguedad >= 3:
+                envio = "entregado"
+                fecha_despacho = _fecha(momento + timedelta(days=1))
+                fecha_entrega = _fecha(momento + timedelta(days=rng.randint(1, 3), hours=rng.randint(1, 8)))
+            else:
+                envio = rng.choice(["preparando", "asignado", "en camino"])
+            lote["ventas"].append((id_venta, rut, fecha, total, estado, fecha, fecha, id_despacho,
+                                   "despacho" if id_despacho else "retiro", envio, fecha_despacho, fecha_entrega))
+            lote["pagos"].append((siguiente("id_pago"), id_venta, "transbank", ESTADO_PAGO.get(estado, "iniciado"), total,
+                                  "CLP", f"G{id_venta}", f"S{id_venta}", f"{rng.randint(0, 999_999):06d}",
+                                  momento.strftime("%m%d"), rng.choice(METODOS_PAGO), rng.choice([0, 0, 0, 3, 6]),
+                                  fecha, fecha))
+            if rng.random() < args.auditoria:
+                lote["auditoria"].append((siguiente("id_evento"), rut, "venta_creada", "venta", id_venta,
+                                          f"Total: {float(total)} | Detalles: {len(set(lineas))}", fecha))
+                if estado != "pendiente":
+                    lote["auditoria"].append((siguiente("id_evento"), rut, f"venta_{estado}", "venta", id_venta, None,
+                                              fecha))
+            if len(lote["ventas"]) >= args.lote:
+                volcar()
+    volcar()
+
+    carga.actualizar_stock([(stock[pos], ultima_venta[pos], ultimo_ingreso[pos], primero + pos) for pos in range(n)])
+    carga.confirmar()
+    return {"stock_final": sum(stock)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--productos", type=int, default=10_000)
+    parser.add_argument("--usuarios", type=int, default=5_000, help="Clientes")
+    parser.add_argument("--bodegueros", type=int, default=5)
+    parser.add_argument("--proveedores", type=int, default=40)
+    parser.add_argument("--ventas", type=int, default=100_000)
+    parser.add_argument("--dias", type=int, default=365, help="Días de historia")
+    parser.add_argument("--hasta", type=date.fromisoformat, default=date.today(), help="Último día (AAAA-MM-DD)")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Exponente de popularidad de productos")
+    parser.add_argument("--zipf-clientes", type=float, default=0.8, help="Exponente de actividad de clientes")
+    parser.add_argument("--items-media", type=float, default=2.2, help="Líneas por venta (media)")
+    parser.add_argument("--items-max", type=int, default=12)
+    parser.add_argument("--unidades-media", type=float, default=1.6, help="Unidades por línea (media)")
+    parser.add_argument("--precio-mediana", type=float, default=12_990)
+    parser.add_argument("--precio-sigma", type=float, default=1.0)
+    parser.add_argument("--estados", default="completada=0.85,pendiente=0.1,cancelada=0.05")
+    parser.add_argument("--con-despacho", type=float, default=0.6, help="Fracción de clientes con dirección")
+    parser.add_argument("--despacho", type=float, default=0.5, help="Fracción de ventas con despacho (si hay dirección)")
+    parser.add_argument("--catalogo", type=float, default=0.8, help="Fracción de productos en el catálogo público")
+    parser.add_argument("--ofertas", type=float, default=0.05, help="Fracción de productos en oferta")
+    parser.add_argument("--auditoria", type=float, default=1.0, help="Probabilidad de auditar cada venta")
+    parser.add_argument("--clave", default="carga123", help="Contraseña de todos los usuarios generados")
+    parser.add_argument("--lote", type=int, default=20_000, help="Filas (o ventas) por commit")
+    args = parser.parse_args()
+
+    inicio_total = time.perf_counter()
+    resultado = migrar()
+    print(f"Base: {engine.url.render_as_string(hide_password=True)} (esquema {resultado['actual']})")
+    print(f"Semilla {args.semilla}, {args.dias} días hasta {args.hasta.isoformat()}")
+    inicio = datetime.combine(args.hasta - timedelta(days=args.dias), datetime.min.time())
+    carga = _Carga()
+    marcas = {"t": time.perf_counter(), "filas": 0}
+
+    def etapa(nombre: str):
+        filas = sum(carga.filas.values())
+        segundos = time.perf_counter() - marcas["t"]
+        print(f"  {nombre:<28} {filas - marcas['filas']:>11,} filas  {segundos:7.1f}s  "
+              f"{(filas - marcas['filas']) / max(segundos, 1e-9):>10,.0f} filas/s")
+        marcas.update(t=time.perf_counter(), filas=filas)
+
+    def progreso():
+        filas = sum(carga.filas.values())
+        print(f"    ventas {carga.filas.get('ventas', 0):,}  filas {filas:,}  "
+              f"{time.perf_counter() - inicio_total:.0f}s", file=sys.stderr)
+
+    try:
+        catalogo = _catalogo(carga, args)
+        etapa("catálogo y proveedores")
+        productos = _productos(carga, args, catalogo, inicio)
+        etapa("productos")
+        usuarios = _usuarios(carga, args, inicio)
+        etapa("usuarios y despachos")
+        _ventas(carga, args, productos, usuarios, args.hasta, progreso)
+        etapa("ventas e historial")
+        carga.ajustar_secuencias()
+        carga.confirmar()
+    finally:
+        carga.cerrar()
+
+    db = SessionLocal()
+    try:
+        resumen_ventas.reconstruir(db)
+        db.commit()
+    finally:
+        db.close()
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    etapa("resúmenes y ANALYZE")
+
+    print("Filas insertadas:")
+    for tabla, filas in carga.filas.items():
+        print(f"  {tabla:<24} {filas:>12,}")
+    total = sum(carga.filas.values())
+    segundos = time.perf_counter() - inicio_total
+    print(f"Total: {total:,} filas en {segundos:.1f}s ({total / segundos:,.0f} filas/s)")
+
+
+if __name__ == "__main__":
+    main()
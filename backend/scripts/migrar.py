@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+"""
+Aplica las migraciones de esquema (migrations/versions) a la base de DATABASE_URL.
+
+Es el paso explícito de despliegue: la aplicación no hace DDL al arrancar, solo comprueba que
+la base esté en la última revisión (ver config/migraciones.py).
+
+Uso:
+    python scripts/migrar.py                 # lleva la base a head
+    python scripts/migrar.py --estado        # muestra la revisión actual y la head
+    python scripts/migrar.py --marcar REV    # registra REV sin ejecutar migraciones
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.database import engine
+from config.migraciones import migrar, revision_actual, revision_head
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--estado", action="store_true", help="Solo mostrar la revisión actual y la head")
+    parser.add_argument("--marcar", metavar="REV", help="Registrar REV como revisión actual sin ejecutar nada")
+    parser.add_argument("--destino", default="head", help="Revisión destino (por defecto head)")
+    args = parser.parse_args()
+
+    if args.estado:
+        with engine.connect() as conn:
+            actual = revision_actual(conn)
+        head = revision_head()
+        print(f"motor: {engine.dialect.name}  actual: {actual or 'sin versión'}  head: {head}")
+        sys.exit(0 if actual == head else 1)
+
+    resultado = migrar(destino=args.destino, marcar=args.marcar)
+    print(f"motor: {engine.dialect.name}  {resultado['anterior'] or 'sin versión'} -> {resultado['actual']}  "
+          f"({resultado['accion']}, {resultado['segundos']:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
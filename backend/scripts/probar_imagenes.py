@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+"""
+Prueba del pipeline de imágenes de productos con almacenamiento local.
+
+Apunta IMAGENES_DIR a un directorio temporal, crea productos en una base SQLite temporal y
+verifica:
+- POST /api/productos/{id}/imagen genera las variantes WebP (miniatura, tarjeta, completa)
+  con el lado mayor esperado, las guarda en disco y las registra en el producto
+- las URLs se sirven desde el mismo origen (montaje de estáticos) como image/webp
+- agregar al catálogo con imagen_base64 pasa por el mismo pipeline y el listado del catálogo
+  expone imagen_tarjeta_url
+- archivo que no es imagen (400), imagen sobre IMAGENES_MAX_MB (413), producto inexistente (404)
+- con --subidas imágenes grandes subiéndose a la vez, /api/health sigue respondiendo
+  (el event loop no queda bloqueado por el procesamiento)
+
+Termina con código 1 si alguna verificación falla.
+
+Uso:
+    python scripts/probar_imagenes.py --subidas 6
+"""
+import argparse
+import asyncio
+import base64
+import os
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+_TMP = tempfile.mkdtemp(prefix="imagenes_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP, 'app.db')}")
+os.environ["IMAGENES_ALMACENAMIENTO"] = "local"
+os.environ["IMAGENES_DIR"] = os.path.join(_TMP, "imagenes")
+os.environ["IMAGENES_MAX_MB"] = "10"
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import httpx
+from PIL import Image
+from sqlalchemy import insert
+
+import main
+from config.database import SessionLocal, engine
+from core.auth import require_admin
+from core.imagenes import VARIANTES, pipeline_imagenes
+from models.categoria import CategoriaDB
+from models.producto import ProductoDB
+
+
+def _jpeg(ancho: int, alto: int) -> bytes:
+    """JPEG con degradado y ruido (no se comprime a casi nada como un color plano)"""
+    degradado = Image.linear_gradient("L").resize((ancho, alto))
+    ruido = Image.effect_noise((ancho, alto), 40)
+    imagen = Image.merge("RGB", (degradado, ruido, degradado.transpose(Image.FLIP_LEFT_RIGHT)))
+    salida = BytesIO()
+    imagen.save(salida, "JPEG", quality=90)
+    return salida.getvalue()
+
+
+def _sembrar(n: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(insert(CategoriaDB.__table__), [{"id_categoria": 1, "nombre": "Herramientas"}])
+        conn.execute(insert(ProductoDB.__table__), [
+            {
+                "id_producto": i, "nombre": f"Taladro {i}", "slug": f"taladro-{i}", "id_categoria": 1,
+                "precio_venta": 10000, "costo_neto": 6000, "cantidad_disponible": 10, "stock_minimo": 1,
+                "estado": "activo", "en_catalogo": False,
+            }
+            for i in range(1, n + 1)
+        ])
+
+
+def _archivo_local(url: str) -> str:
+    base = pipeline_imagenes.almacenamiento.url_base
+    return os.path.join(os.environ["IMAGENES_DIR"], *url[len(base) + 1:].split("/"))
+
+
+async def _probar(subidas: int) -> list:
+    fallos = []
+
+    def verificar(condicion, mensaje):
+        print(("  ok    " if condicion else "  FALLO ") + mensaje)
+        if not condicion:
+            fallos.append(mensaje)
+
+    grande = _jpeg(4000, 3000)
+    transporte = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://api", timeout=120) as api:
+        def subir(producto_id, contenido, nombre="foto.jpg", tipo="image/jpeg"):
+            return api.post(f"/api/productos/{producto_id}/imagen", files={"imagen": (nombre, contenido, tipo)})
+
+        r = await subir(1, grande)
+        verificar(r.status_code == 200, f"subida de imagen 4000x3000 ({len(grande) // 1024} KB): {r.status_code}")
+        urls = r.json() if r.status_code == 200 else {}
+        for variante, campo in (("completa", "imagen_url"), ("tarjeta", "imagen_tarjeta_url"), ("miniatura", "imagen_miniatura_url")):
+            url = urls.get(campo) or ""
+            ruta = _archivo_local(url) if url else ""
+            if not ruta or not os.path.exists(ruta):
+                verificar(False, f"{variante}: archivo en disco ({url})")
+                continue
+            with Image.open(ruta) as img:
+                verificar(img.format == "WEBP" and max(img.size) == VARIANTES[variante],
+                          f"{variante}: WebP {img.size[0]}x{img.size[1]}, {os.path.getsize(ruta) // 1024} KB")
+            servida = await api.get(url)
+            verificar(servida.status_code == 200 and servida.headers["content-type"] == "image/webp",
+                      f"{variante}: servida en {url}")
+
+        db = SessionLocal()
+        try:
+            p = db.get(ProductoDB, 1)
+            verificar(p.imagen_url == urls.get("imagen_url") and p.imagen_tarjeta_url == urls.get("imagen_tarjeta_url")
+                      and p.imagen_miniatura_url == urls.get("imagen_miniatura_url"), "URLs de variantes guardadas en el producto")
+        finally:
+            db.close()
+
+        pequeña = _jpeg(300, 200)
+        r = await api.post("/api/productos/2/agregar-catalogo", json={
+            "descripcion": "Taladro percutor",
+            "caracteristicas": "800W",
+            "imagen_base64": "data:image/jpeg;base64," + base64.b64encode(pequeña).decode(),
+        })
+        verificar(r.status_code == 200 and r.json().get("imagen_tarjeta_url", "").endswith("/tarjeta.webp"),
+                  "agregar al catálogo con imagen_base64 usa el pipeline")
+        tarjeta = r.json().get("imagen_tarjeta_url") if r.status_code == 200 else None
+        if tarjeta:
+            with Image.open(_archivo_local(tarjeta)) as img:
+                verificar(img.size == (300, 200), f"no agranda imágenes pequeñas ({img.size[0]}x{img.size[1]})")
+        catalogo = (await api.get("/api/productos/catalogo")).json()
+        verificar(any(c["id_producto"] == 2 and c["imagen_tarjeta_url"] == tarjeta for c in catalogo),
+                  "el listado del catálogo expone imagen_tarjeta_url")
+
+        verificar((await subir(1, b"no es una imagen", "x.txt", "text/plain")).status_code == 400, "rechaza archivo que no es imagen")
+        verificar((await subir(1, b"\xff\xd8" + os.urandom(11 * 1024 * 1024))).status_code == 413, "rechaza imagen sobre el máximo")
+        verificar((await subir(9999, pequeña)).status_code == 404, "producto inexistente responde 404")
+
+        # Subidas concurrentes mientras se mide la latencia de /api/health
+        latencias = []
+        terminadas = asyncio.Event()
+
+        async def sondear():
+            while not terminadas.is_set():
+                inicio = time.perf_counter()
+                await api.get("/api/health")
+                latencias.append(time.perf_counter() - inicio)
+                await asyncio.sleep(0.01)
+
+        sonda = asyncio.create_task(sondear())
+        inicio = time.perf_counter()
+        respuestas = await asyncio.gather(*[subir(3 + i, grande) for i in range(subidas)])
+        duracion = time.perf_counter() - inicio
+        terminadas.set()
+        await sonda
+        verificar(all(r.status_code == 200 for r in respuestas),
+                  f"{subidas} subidas concurrentes en {duracion:.2f}s ({subidas / duracion:.1f} imágenes/s)")
+        peor = max(latencias) if latencias else float("inf")
+        verificar(len(latencias) >= 5 and peor < 0.5,
+                  f"/api/health responde durante las subidas ({len(latencias)} sondeos, peor {peor * 1000:.0f} ms)")
+    return fallos
+
+
+def main_prueba():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subidas", type=int, default=6, help="Subidas concurrentes de imágenes 4000x3000")
+    args = parser.parse_args()
+
+    _sembrar(3 + args.subidas)
+    main.app.dependency_overrides[require_admin] = lambda: None
+    fallos = asyncio.run(_probar(args.subidas))
+    print(f"pipeline: {pipeline_imagenes.estadisticas()}")
+    if fallos:
+        print(f"FALLO: {len(fallos)} verificaciones")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main_prueba()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+"""
+Prueba del proxy de imágenes (/api/media) contra un servidor HTTP local de prueba.
+
+Levanta un http.server en un hilo que sirve imágenes con ETag (y cuenta las peticiones que
+recibe), apunta la caché de media a un directorio temporal pequeño y verifica:
+- primera petición descarga, la segunda sale de la caché sin tocar el origen
+- vencida la frescura, revalida con If-None-Match y el origen responde 304
+- N peticiones concurrentes de la misma URL producen una sola descarga (single-flight)
+- límites: Content-Type que no es imagen rasterizada, SVG incluido (415), tamaño declarado o
+  real excesivo (413), origen con error (502), URL no http(s) (400)
+- hosts: fuera de MEDIA_HOSTS_PERMITIDOS, con la lista vacía, redirigido a un host no permitido o
+  que resuelve a una dirección privada/loopback (400)
+- con la copia en caché, un origen caído sirve la copia vencida
+- desalojo LRU al superar el tamaño máximo de la caché
+
+Termina con código 1 si alguna verificación falla.
+
+Uso:
+    python scripts/probar_media_proxy.py
+"""
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_TMP = tempfile.mkdtemp(prefix="media_proxy_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP, 'app.db')}")
+os.environ["MEDIA_CACHE_DIR"] = os.path.join(_TMP, "media")
+os.environ["MEDIA_CACHE_MAX_MB"] = "1"
+os.environ["MEDIA_MAX_MB"] = "0.5"
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import httpx
+
+import main
+from core.media import proxy_media
+
+IMAGEN = b"\x89PNG\r\n\x1a\n" + os.urandom(200 * 1024)
+
+
+class Origen(BaseHTTPRequestHandler):
+    peticiones = []
+    caido = False
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        Origen.peticiones.append((self.path, self.headers.get("If-None-Match")))
+        if Origen.caido:
+            self.send_response(503)
+            self.end_headers()
+            return
+        ruta = self.path.split("?")[0]
+        if ruta.startswith("/img/"):
+            cuerpo = IMAGEN + ruta.encode()
+            etag = '"' + hashlib.md5(cuerpo).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            if ruta.startswith("/img/lenta"):
+                # Da tiempo a que lleguen las peticiones concurrentes
+                time.sleep(0.3)
+            self._enviar(200, "image/png", cuerpo, etag)
+        elif ruta == "/svg":
+            self._enviar(200, "image/svg+xml", b'<svg xmlns="http://www.w3.org/2000/svg"><script>alert(1)</script></svg>')
+        elif ruta == "/redirigir":
+            self.send_response(302)
+            self.send_header("Location", f"http://localhost:{self.server.server_address[1]}/img/r.png")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif ruta == "/html":
+            self._enviar(200, "text/html", b"<html></html>")
+        elif ruta == "/grande-declarada":
+            self._enviar(200, "image/jpeg", os.urandom(600 * 1024))
+        elif ruta == "/grande-sin-largo":
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            try:
+                for _ in range(12):
+                    self.wfile.write(os.urandom(64 * 1024))
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # el proxy corta la descarga al pasar el máximo
+        else:
+            self._enviar(404, "text/plain", b"no")
+
+    def _enviar(self, codigo, tipo, cuerpo, etag=None):
+        self.send_response(codigo)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        try:
+            self.wfile.write(cuerpo)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # el proxy rechazó la respuesta por sus cabeceras
+
+
+def _del_origen(ruta):
+    return sum(1 for p, _ in Origen.peticiones if p == ruta)
+
+
+async def _probar(base: str) -> list:
+    fallos = []
+
+    def verificar(condicion, mensaje):
+        print(("  ok    " if condicion else "  FALLO ") + mensaje)
+        if not condicion:
+            fallos.append(mensaje)
+
+    transporte = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://api") as api:
+        def pedir(ruta):
+            return api.get("/api/media", params={"url": base + ruta})
+
+        r1 = await pedir("/img/a.png")
+        r2 = await pedir("/img/a.png")
+        verificar(r1.status_code == 200 and r1.content == IMAGEN + b"/img/a.png", "descarga y entrega la imagen")
+        verificar(r1.headers["content-type"].startswith("image/png"), "conserva el Content-Type del origen")
+        verificar(r2.content == r1.content and _del_origen("/img/a.png") == 1, "segunda petición sale de la caché")
+
+        proxy_media.fresco_segundos = 0
+        r3 = await pedir("/img/a.png")
+        ultima = [p for p in Origen.peticiones if p[0] == "/img/a.png"][-1]
+        verificar(r3.status_code == 200 and r3.content == r1.content and ultima[1] is not None,
+                  "revalida con If-None-Match al vencer")
+        verificar(proxy_media.revalidaciones == 1, "el origen responde 304 y no se vuelve a descargar")
+
+        Origen.caido = True
+        r4 = await pedir("/img/a.png")
+        verificar(r4.status_code == 200 and r4.content == r1.content, "origen caído: sirve la copia vencida")
+        Origen.caido = False
+        proxy_media.fresco_segundos = 86400
+
+        respuestas = await asyncio.gather(*[pedir("/img/lenta.png") for _ in range(20)])
+        verificar(all(r.status_code == 200 for r in respuestas) and _del_origen("/img/lenta.png") == 1,
+                  f"20 peticiones concurrentes, {_del_origen('/img/lenta.png')} descarga(s) al origen")
+
+        verificar((await pedir("/html")).status_code == 415, "rechaza Content-Type que no es imagen")
+        verificar((await pedir("/svg")).status_code == 415, "rechaza SVG")
+        verificar((await pedir("/redirigir")).status_code == 400 and _del_origen("/img/r.png") == 0,
+                  "rechaza redirección a un host no permitido")
+        r = await api.get("/api/media", params={"url": "http://169.254.169.254/latest/meta-data"})
+        verificar(r.status_code == 400, "rechaza host fuera de la lista")
+        permitidos = proxy_media.hosts_permitidos
+        proxy_media.hosts_permitidos = set()
+        verificar((await pedir("/img/vacia.png")).status_code == 400, "lista de hosts vacía: rechaza todo")
+        proxy_media.hosts_permitidos = {"127.0.0.1", "localhost"}
+        proxy_media.permitir_redes_privadas = False
+        verificar((await pedir("/img/privada.png")).status_code == 400, "rechaza IP de loopback")
+        r = await api.get("/api/media", params={"url": base.replace("127.0.0.1", "localhost") + "/img/privada.png"})
+        verificar(r.status_code == 400, "rechaza host que resuelve a loopback")
+        verificar(_del_origen("/img/privada.png") == 0 and _del_origen("/img/vacia.png") == 0,
+                  "los hosts rechazados no llegan al origen")
+        proxy_media.hosts_permitidos = permitidos
+        proxy_media.permitir_redes_privadas = True
+        verificar((await pedir("/grande-declarada")).status_code == 413, "rechaza Content-Length sobre el máximo")
+        verificar((await pedir("/grande-sin-largo")).status_code == 413, "corta la descarga al superar el máximo")
+        verificar((await pedir("/no-existe")).status_code == 502, "origen con error responde 502")
+        r = await api.get("/api/media", params={"url": "file:///etc/passwd"})
+        verificar(r.status_code == 400, "rechaza URL que no es http(s)")
+        parciales = [n for n in os.listdir(proxy_media.cache.directorio) if n.endswith(".parcial")]
+        verificar(not parciales, "no quedan descargas parciales en la caché")
+
+        for i in range(8):
+            await pedir(f"/img/lru-{i}.png")
+        stats = proxy_media.cache.estadisticas()
+        verificar(stats["bytes"] <= stats["max_bytes"] and stats["desalojos"] > 0,
+                  f"desalojo LRU: {stats['entradas']} entradas, {stats['bytes']} bytes, {stats['desalojos']} desalojos")
+        antes = _del_origen("/img/lru-7.png")
+        await pedir("/img/lru-7.png")
+        verificar(_del_origen("/img/lru-7.png") == antes, "la entrada más reciente sigue en caché")
+        await pedir("/img/a.png")
+        verificar(_del_origen("/img/a.png") > 1, "la entrada más antigua fue desalojada")
+    await proxy_media.cerrar()
+    return fallos
+
+
+def main_prueba():
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Origen)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    # El origen de prueba es local: se permite solo aquí
+    proxy_media.hosts_permitidos = {"127.0.0.1"}
+    proxy_media.permitir_redes_privadas = True
+    base = f"http://127.0.0.1:{servidor.server_address[1]}"
+    try:
+        fallos = asyncio.run(_probar(base))
+    finally:
+        servidor.shutdown()
+    if fallos:
+        print(f"FALLO: {len(fallos)} verificaciones")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main_prueba()
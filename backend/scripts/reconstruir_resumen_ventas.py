@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.database import SessionLocal, engine
+from models import *  # noqa: F401,F403
+from models.base import Base
+from models.resumen_venta import ResumenVentaDiaDB, ResumenVentaProductoDB, ResumenVentaCategoriaDB
+from core import resumen_ventas
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        resumen_ventas.reconstruir(db)
+        db.commit()
+        print("DIAS=", db.query(ResumenVentaDiaDB).count())
+        print("DIAS_PRODUCTO=", db.query(ResumenVentaProductoDB).count())
+        print("DIAS_CATEGORIA=", db.query(ResumenVentaCategoriaDB).count())
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+"""
+Presupuesto de consultas SQL por endpoint y detección de N+1 (core/consultas.py).
+
+Siembra el mismo conjunto de datos que verificar_planes_consulta.py (más roles, repartidores
+asignados y pagos aprobados, para que los caminos con relaciones tengan filas), llama a cada
+endpoint caliente con TestClient dentro de consultas.presupuesto() y falla (código 1) si alguno
+ejecuta más consultas que su presupuesto en PRESUPUESTOS o repite una misma sentencia
+--umbral-n1 veces o más. Comprueba además que la respuesta traiga la métrica "db" en la
+cabecera Server-Timing.
+
+El número de consultas de un endpoint no debe crecer con los datos: correr con más volumen
+(--ventas) da los mismos conteos; si sube, hay una consulta por fila.
+
+Uso:
+    python scripts/verificar_consultas.py
+    python scripts/verificar_consultas.py --ventas 20000 --mostrar   # imprime los conteos
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+_TMP = tempfile.mkdtemp(prefix="consultas_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP, 'app.db')}")
+os.environ.setdefault("CONSULTAS_SERVER_TIMING", "1")
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+import main
+from config.database import engine
+from core import consultas
+from controllers.usuario_controller import _rut_normalizado
+from core.auth import require_admin
+from models.base import Base
+from verificar_planes_consulta import _endpoints, _sembrar
+
+# Consultas máximas por endpoint (etiquetas de verificar_planes_consulta._endpoints más las
+# de _endpoints_extra). Un endpoint sin entrada solo se revisa por N+1.
+PRESUPUESTOS = {
+    "catalogo": 2,
+    "catalogo_precio": 2,
+    "catalogo_total": 1,
+    "catalogo_slug": 2,
+    "producto": 1,
+    "similares": 2,
+    "buscar": 2,
+    "inventario": 2,
+    "ventas_rango": 2,
+    "ventas_usuario": 1,
+    "venta": 2,
+    "venta_orden": 3,
+    "movimientos": 2,
+    "movimientos_producto": 1,
+    "pagos_session": 2,
+    "pagos_usuario": 2,
+    "pago_estado": 2,
+    "usuarios": 1,
+    "usuarios_desactivados": 1,
+    "pagos_usuario_frecuente": 2,
+    "pagos_session_frecuente": 2,
+    "ventas_usuario_frecuente": 1,
+}
+
+_CUERPO_FRECUENTE = "9999999"
+
+
+def _endpoints_extra(claves: dict):
+    return [
+        ("usuarios", "/api/usuarios/"),
+        ("usuarios_desactivados", "/api/usuarios/desactivados"),
+        # Las rutas de pagos reciben el RUT sin DV y lo calculan
+        ("pagos_usuario_frecuente", f"/api/pagos/usuario/{claves['cuerpo_frecuente']}"),
+        ("pagos_session_frecuente", f"/api/pagos/session/{claves['cuerpo_frecuente']}"),
+        ("ventas_usuario_frecuente", f"/api/ventas/usuario/{claves['rut_frecuente']}"),
+    ]
+
+
+def _completar(claves: dict):
+    """Roles (los de la migración de datos base), repartidores y pagos aprobados sobre los datos de _sembrar"""
+    with engine.begin() as conn:
+        roles = [r for (r,) in conn.execute(text("SELECT id_rol FROM roles ORDER BY id_rol"))]
+        for i, id_rol in enumerate(roles):
+            conn.execute(
+                text("UPDATE usuarios SET id_rol = :r WHERE CAST(substr(rut, 1, 8) AS INTEGER) % :n = :i"),
+                {"r": id_rol, "n": len(roles), "i": i},
+            )
+        repartidores = [r for (r,) in conn.execute(text("SELECT rut FROM usuarios ORDER BY rut LIMIT 5"))]
+        for i, rut in enumerate(repartidores):
+            conn.execute(
+                text("UPDATE ventas SET repartidor_rut = :r, estado_envio = 'asignado' WHERE id_venta % 5 = :i"),
+                {"r": rut, "i": i},
+            )
+        # Cliente con RUT válido y varias compras pagadas (los de _sembrar tienen DV al azar)
+        rut = _rut_normalizado(_CUERPO_FRECUENTE)
+        conn.execute(text("INSERT INTO usuarios (rut, nombre, email, password, activo, id_rol) "
+                          "VALUES (:r, 'Cliente frecuente', 'frecuente@ejemplo.cl', 'x', :a, :i)"),
+                     {"r": rut, "a": True, "i": roles[0]})
+        conn.execute(text("UPDATE ventas SET rut_usuario = :r WHERE id_venta % 97 = 0"), {"r": rut})
+        conn.execute(text("UPDATE pagos SET estado = 'aprobado', session_id = :r WHERE estado = 'autorizado' "
+                          "AND id_venta % 97 = 0"), {"r": rut})
+    claves.update(rut_frecuente=rut, cuerpo_frecuente=_CUERPO_FRECUENTE)
+
+
+def main_consultas():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--productos", type=int, default=2000)
+    parser.add_argument("--usuarios", type=int, default=500)
+    parser.add_argument("--ventas", type=int, default=5000)
+    parser.add_argument("--dias", type=int, default=365)
+    parser.add_argument("--semilla", type=int, default=7)
+    parser.add_argument("--umbral-n1", type=int, default=3, help="Repeticiones de un mismo SQL que cuentan como N+1")
+    parser.add_argument("--mostrar", action="store_true", help="Imprimir las consultas de cada endpoint")
+    args = parser.parse_args()
+
+    if not consultas.SERVER_TIMING:
+        raise SystemExit("CONSULTAS_SERVER_TIMING está desactivado")
+
+    Base.metadata.create_all(bind=engine)
+    claves = _sembrar(args.productos, args.usuarios, args.ventas, args.dias, args.semilla)
+    _completar(claves)
+
+    main.app.dependency_overrides[require_admin] = lambda: None
+    fallos = []
+    with TestClient(main.app) as client:
+        for etiqueta, ruta in _endpoints(claves) + _endpoints_extra(claves):
+            maximo = PRESUPUESTOS.get(etiqueta, 10 ** 6)
+            registro = None
+            try:
+                with consultas.presupuesto(maximo, umbral_n1=args.umbral_n1) as registro:
+                    r = client.get(ruta)
+            except consultas.ExcesoConsultas as e:
+                fallos.append(f"{etiqueta} ({ruta}): {e}")
+            if r.status_code >= 400:
+                print(f"  aviso: {etiqueta} respondió {r.status_code} ({ruta})")
+            timing = r.headers.get("server-timing", "")
+            if f'desc="{registro.total} consultas"' not in timing:
+                fallos.append(f"{etiqueta}: Server-Timing sin la métrica db esperada: {timing!r}")
+            limite = "-" if maximo == 10 ** 6 else maximo
+            print(f"  {etiqueta:28s} {registro.total:3d} consultas (máx {limite}) {registro.milisegundos:7.1f} ms BD")
+            if args.mostrar:
+                for sql, veces in registro.sentencias.most_common():
+                    print(f"      {veces}x {' '.join(sql.split())[:160]}")
+
+    if fallos:
+        print()
+        for fallo in fallos:
+            print(f"FALLO: {fallo}")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main_consultas()
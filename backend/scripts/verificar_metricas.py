@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+"""
+Verificación de /api/metrics (core/metricas.py).
+
+1. Formato: llama a varias rutas de la app real con TestClient (con parámetros de ruta, una
+   inexistente y el montaje de imágenes) y valida el texto de /api/metrics: cada muestra
+   declarada con # TYPE, cubetas acumuladas que terminan en +Inf igual a _count, _count igual
+   a http_requests_total, y etiquetas route con la plantilla y no con la ruta concreta.
+2. METRICAS_TOKEN: sin la cabecera Authorization responde 401.
+3. Pool: un QueuePoolMedido (pool_size=2, sobre SQLite) con las dos conexiones tomadas hace
+   esperar a un tercer checkout; db_pool_checked_out y db_pool_checkout_wait_seconds lo reflejan.
+4. Costo: microsegundos que MiddlewareMetricas agrega por petición alrededor de una app ASGI
+   vacía. Falla si supera --max-us.
+
+Uso:
+    python scripts/verificar_metricas.py
+    python scripts/verificar_metricas.py --peticiones 200000 --max-us 30
+"""
+import argparse
+import asyncio
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+_TMP = tempfile.mkdtemp(prefix="verificar_metricas_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP, 'app.db')}")
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+import main
+from core import metricas
+
+_MUESTRA = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{(.*)\})? (-?[0-9.e+-]+|\+Inf|NaN)$')
+_ETIQUETA = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def _parsear(texto: str):
+    """[(nombre, {etiquetas}, valor)] y {familia: tipo}; lanza ValueError si una línea no es válida"""
+    tipos, muestras = {}, []
+    for linea in texto.splitlines():
+        if linea.startswith("# TYPE "):
+            _, _, familia, tipo = linea.split(" ", 3)
+            tipos[familia] = tipo
+            continue
+        if linea.startswith("#") or not linea:
+            continue
+        m = _MUESTRA.match(linea)
+        if not m:
+            raise ValueError(f"línea inválida: {linea!r}")
+        nombre, _, etiquetas, valor = m.groups()
+        familia = re.sub(r'_(bucket|sum|count)$', '', nombre) if nombre not in tipos else nombre
+        if familia not in tipos:
+            raise ValueError(f"muestra sin # TYPE: {linea!r}")
+        muestras.append((nombre, dict(_ETIQUETA.findall(etiquetas or "")), float(valor)))
+    return muestras, tipos
+
+
+def _verificar_formato(fallos: list):
+    with TestClient(main.app) as client:
+        for _ in range(3):
+            client.get("/api/categorias/")
+        for id_producto in (1, 2, 3):
+            client.get(f"/api/productos/{id_producto}")
+        client.get("/api/no-existe")
+        client.get("/api/imagenes/no-existe.webp")
+        r = client.get("/api/metrics")
+    if r.status_code != 200 or not r.headers["content-type"].startswith("text/plain; version=0.0.4"):
+        fallos.append(f"/api/metrics respondió {r.status_code} {r.headers.get('content-type')}")
+        return
+    try:
+        muestras, tipos = _parsear(r.text)
+    except ValueError as e:
+        fallos.append(str(e))
+        return
+
+    rutas = {m[1].get("route") for m in muestras if m[0] == "http_requests_total"}
+    print(f"  rutas: {sorted(rutas)}")
+    for esperada in ("/api/categorias/", "/api/productos/{producto_id}", "sin_ruta", "/api/imagenes"):
+        if esperada not in rutas:
+            fallos.append(f"falta route={esperada!r} en http_requests_total")
+    concretas = [ruta for ruta in rutas if re.search(r'/\d+(/|$)', ruta)]
+    if concretas:
+        fallos.append(f"rutas concretas en vez de plantillas: {concretas}")
+
+    totales = defaultdict(float)
+    for nombre, etiquetas, valor in muestras:
+        if nombre == "http_requests_total":
+            totales[(etiquetas["method"], etiquetas["route"])] += valor
+    cubetas = defaultdict(list)
+    conteos = {}
+    for nombre, etiquetas, valor in muestras:
+        if nombre.startswith("http_request_duration_seconds"):
+            clave = (etiquetas["method"], etiquetas["route"])
+            if nombre.endswith("_bucket"):
+                cubetas[clave].append((etiquetas["le"], valor))
+            elif nombre.endswith("_count"):
+                conteos[clave] = valor
+    for clave, serie in cubetas.items():
+        valores = [v for _, v in serie]
+        if valores != sorted(valores) or serie[-1][0] != "+Inf" or serie[-1][1] != conteos.get(clave):
+            fallos.append(f"histograma inconsistente para {clave}: {serie} count={conteos.get(clave)}")
+        # /api/metrics se mide al terminar su propia respuesta: todavía no está en el texto
+        if clave[1] != "/api/metrics" and conteos.get(clave) != totales.get(clave):
+            fallos.append(f"{clave}: _count={conteos.get(clave)} y http_requests_total={totales.get(clave)}")
+    for familia in ("http_requests_in_flight", "cache_hit_ratio", "threadpool_in_use", "process_cpu_seconds_total"):
+        if familia not in tipos:
+            fallos.append(f"falta la métrica {familia}")
+    print(f"  formato: {len(muestras)} muestras, {len(tipos)} familias")
+
+
+def _verificar_token(fallos: list):
+    anterior = metricas.TOKEN
+    metricas.TOKEN = "secreto-de-prueba"
+    try:
+        with TestClient(main.app) as client:
+            sin = client.get("/api/metrics").status_code
+            con = client.get("/api/metrics", headers={"Authorization": "Bearer secreto-de-prueba"}).status_code
+    finally:
+        metricas.TOKEN = anterior
+    print(f"  token: sin cabecera {sin}, con cabecera {con}")
+    if (sin, con) != (401, 200):
+        fallos.append(f"METRICAS_TOKEN: esperado (401, 200), obtenido {(sin, con)}")
+
+
+def _verificar_pool(fallos: list):
+    engine = create_engine(
+        f"sqlite:///{os.path.join(_TMP, 'pool.db')}",
+        poolclass=metricas.QueuePoolMedido, pool_size=2, max_overflow=0, pool_timeout=5,
+        connect_args={"check_same_thread": False},
+    )
+    metricas.registrar_pool("prueba", engine)
+    tomadas = [engine.connect(), engine.connect()]
+    for conn in tomadas:
+        conn.execute(text("SELECT 1"))
+    muestras, _ = _parsear(metricas.exponer())
+    en_uso = [v for n, e, v in muestras if n == "db_pool_checked_out" and e.get("pool") == "prueba"]
+
+    liberar = threading.Timer(0.2, tomadas[0].close)
+    liberar.start()
+    inicio = time.perf_counter()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    esperado = time.perf_counter() - inicio
+    liberar.join()
+    tomadas[1].close()
+
+    muestras, _ = _parsear(metricas.exponer())
+    espera = {n: v for n, e, v in muestras if n.startswith("db_pool_checkout_wait_seconds_") and e.get("pool") == "prueba"
+              and n != "db_pool_checkout_wait_seconds_bucket"}
+    print(f"  pool: en uso {en_uso}, tercer checkout esperó {esperado * 1000:.0f} ms, "
+          f"wait_sum {espera.get('db_pool_checkout_wait_seconds_sum', 0) * 1000:.0f} ms en "
+          f"{espera.get('db_pool_checkout_wait_seconds_count', 0):.0f} checkouts")
+    if en_uso != [2.0]:
+        fallos.append(f"db_pool_checked_out: esperado 2, obtenido {en_uso}")
+    if espera.get("db_pool_checkout_wait_seconds_sum", 0) < 0.15:
+        fallos.append(f"db_pool_checkout_wait_seconds no registra la espera: {espera}")
+    engine.dispose()
+
+
+def _costo(peticiones: int) -> float:
+    """Microsegundos por petición que agrega MiddlewareMetricas a una app ASGI vacía"""
+    async def vacia(scope, receive, send):
+        scope["route"] = RUTA
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    class RUTA:
+        path = "/api/productos/{producto_id}"
+
+    async def recibir():
+        return {"type": "http.request", "body": b""}
+
+    async def enviar(mensaje):
+        pass
+
+    async def medir(app):
+        inicio = time.perf_counter()
+        for _ in range(peticiones):
+            await app({"type": "http", "method": "GET", "path": "/api/productos/1", "root_path": ""}, recibir, enviar)
+        return time.perf_counter() - inicio
+
+    con = metricas.MiddlewareMetricas(vacia)
+    asyncio.run(medir(con))  # calentamiento
+    sin_t = min(asyncio.run(medir(vacia)) for _ in range(3))
+    con_t = min(asyncio.run(medir(con)) for _ in range(3))
+    return (con_t - sin_t) / peticiones * 1e6
+
+
+def main_metricas():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--peticiones", type=int, default=100000, help="Peticiones para medir el costo del middleware")
+    parser.add_argument("--max-us", type=float, default=20.0, help="Costo máximo aceptado por petición (µs)")
+    args = parser.parse_args()
+
+    fallos = []
+    _verificar_formato(fallos)
+    _verificar_token(fallos)
+    _verificar_pool(fallos)
+    costo = _costo(args.peticiones)
+    print(f"  costo del middleware: {costo:.2f} µs por petición (máx {args.max_us})")
+    if costo > args.max_us:
+        fallos.append(f"MiddlewareMetricas cuesta {costo:.2f} µs por petición")
+
+    if fallos:
+        print()
+        for fallo in fallos:
+            print(f"FALLO: {fallo}")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main_metricas()
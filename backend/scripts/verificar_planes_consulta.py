@@ -0,0 +1,317 @@
+#!/usr/bin/env python
+"""
+Regresión de planes de consulta de los endpoints calientes (EXPLAIN).
+
+Siembra un conjunto de datos realista (productos, usuarios, ventas con detalles y pagos,
+movimientos y auditoría), llama a cada endpoint caliente con TestClient capturando el SQL
+que emite, y ejecuta EXPLAIN QUERY PLAN (SQLite) o EXPLAIN (PostgreSQL) sobre cada SELECT.
+
+Falla (código 1) si alguna consulta recorre completa ("SCAN tabla" / "Seq Scan on tabla")
+una tabla con más de --umbral filas. Los recorridos completos que son intencionales
+(agregados sobre toda la tabla) se declaran en PERMITIDOS, con su motivo.
+
+Usa una base SQLite temporal salvo que se defina DATABASE_URL. En PostgreSQL ejecute
+ANALYZE antes; con tablas pequeñas el planificador prefiere Seq Scan aunque exista índice.
+
+Uso:
+    python scripts/verificar_planes_consulta.py --productos 5000 --ventas 20000 --umbral 1000
+    python scripts/verificar_planes_consulta.py --mostrar   # imprime todos los planes
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+_TMP = tempfile.mkdtemp(prefix="planes_consulta_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP, 'app.db')}")
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, insert, text
+
+import main  # noqa: F401  (crea las tablas)
+from config.database import SessionLocal, engine
+from core import resumen_ventas
+from core.auth import require_admin
+from models.auditoria import AuditoriaDB
+from models.base import Base
+from models.categoria import CategoriaDB
+from models.pago import PagoDB
+from models.producto import ProductoDB
+from models.subcategoria import SubCategoriaDB
+from models.usuario import UsuarioDB
+from models.venta import DetalleVentaDB, MovimientoInventarioDB, VentaDB
+
+# (etiqueta del endpoint, tabla) -> motivo del recorrido completo
+PERMITIDOS = {
+    ("dashboard_metricas", "productos"): "resumen de inventario: agrega todos los productos",
+    ("dashboard_metricas", "usuarios"): "usuarios activos/inactivos: agrega todos los usuarios",
+    ("inventario", "productos"): "listado paginado en orden de clave primaria: ORDER BY id LIMIT/OFFSET sin filtros",
+}
+
+_LOTE = 2000
+
+
+def _insertar(conn, modelo, filas):
+    for i in range(0, len(filas), _LOTE):
+        conn.execute(insert(modelo.__table__), filas[i:i + _LOTE])
+
+
+def _sembrar(n_productos: int, n_usuarios: int, n_ventas: int, dias: int, semilla: int) -> dict:
+    """Inserta el conjunto de datos con INSERT masivos y devuelve claves de ejemplo para las rutas"""
+    rnd = random.Random(semilla)
+    ahora = datetime.utcnow().replace(microsecond=0)
+    marcas = ["Bosch", "Makita", "Stanley", "Truper", "DeWalt", "Black+Decker", "Irwin", "Bauker"]
+    tipos = ["Taladro", "Martillo", "Sierra", "Llave", "Destornillador", "Pintura", "Tornillo", "Cable", "Lijadora", "Alicate"]
+
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT COUNT(*) FROM productos")).scalar():
+            raise SystemExit("La base ya tiene productos; use una base vacía (sin DATABASE_URL se crea una temporal)")
+        _insertar(conn, CategoriaDB, [{"id_categoria": i, "nombre": f"Categoría {i}"} for i in range(1, 21)])
+        _insertar(conn, SubCategoriaDB, [
+            {"id_subcategoria": i, "id_categoria": (i - 1) // 5 + 1, "nombre": f"Subcategoría {i}"} for i in range(1, 101)
+        ])
+        productos = []
+        for i in range(1, n_productos + 1):
+            tipo, marca = rnd.choice(tipos), rnd.choice(marcas)
+            sub = rnd.randint(1, 100)
+            precio = rnd.randint(10, 2000) * 100
+            productos.append({
+                "id_producto": i,
+                "nombre": f"{tipo} {marca} {i}",
+                "slug": f"{tipo}-{marca}-{i}".lower().replace("+", ""),
+                "descripcion": f"{tipo} marca {marca}, modelo {i}",
+                "marca": marca,
+                "codigo_interno": f"SKU-{i:07d}",
+                "id_categoria": (sub - 1) // 5 + 1,
+                "id_subcategoria": sub,
+                "precio_venta": precio,
+                "costo_neto": precio * 0.6,
+                "cantidad_disponible": rnd.randint(0, 500),
+                "stock_minimo": 5,
+                "estado": "activo" if rnd.random() < 0.95 else "inactivo",
+                "en_catalogo": rnd.random() < 0.8,
+                "oferta_activa": rnd.random() < 0.1,
+            })
+        _insertar(conn, ProductoDB, productos)
+
+        ruts = [f"{10000000 + i}{rnd.choice('0123456789K')}" for i in range(n_usuarios)]
+        _insertar(conn, UsuarioDB, [
+            {"rut": rut, "nombre": f"Cliente {i}", "email": f"cliente{i}@ejemplo.cl", "password": "x", "activo": rnd.random() < 0.9}
+            for i, rut in enumerate(ruts)
+        ])
+
+        ventas, detalles, pagos, movimientos, eventos = [], [], [], [], []
+        id_detalle = 0
+        for id_venta in range(1, n_ventas + 1):
+            fecha = ahora - timedelta(seconds=rnd.randint(0, dias * 86400))
+            estado = rnd.choices(["completada", "pendiente", "cancelada"], [85, 10, 5])[0]
+            rut = rnd.choice(ruts)
+            total = 0
+            for id_producto in rnd.sample(range(1, n_productos + 1), rnd.randint(1, 4)):
+                cantidad = rnd.randint(1, 3)
+                precio = productos[id_producto - 1]["precio_venta"]
+                id_detalle += 1
+                total += cantidad * precio
+                detalles.append({
+                    "id_detalle": id_detalle, "id_venta": id_venta, "id_producto": id_producto,
+                    "cantidad": cantidad, "precio_unitario": precio, "subtotal": cantidad * precio,
+                    "id_categoria": productos[id_producto - 1]["id_categoria"],
+                })
+                movimientos.append({
+                    "id_producto": id_producto, "tipo_movimiento": "venta", "cantidad": -cantidad,
+                    "cantidad_anterior": 100, "cantidad_nueva": 100 - cantidad, "id_venta": id_venta,
+                    "fecha_movimiento": fecha,
+                })
+            ventas.append({"id_venta": id_venta, "rut_usuario": rut, "fecha_venta": fecha, "total_venta": total, "estado": estado})
+            pagos.append({
+                "id_venta": id_venta, "estado": "autorizado" if estado == "completada" else "iniciado", "monto": total,
+                "buy_order": f"BO-{id_venta:08d}", "session_id": rut, "token": f"tok-{id_venta}",
+                "fecha_creacion": fecha,
+            })
+            eventos.append({
+                "usuario_rut": rut, "accion": "crear_venta", "entidad_tipo": "venta", "entidad_id": id_venta,
+                "fecha_evento": fecha,
+            })
+        _insertar(conn, VentaDB, ventas)
+        _insertar(conn, DetalleVentaDB, detalles)
+        _insertar(conn, PagoDB, pagos)
+        _insertar(conn, MovimientoInventarioDB, movimientos)
+        _insertar(conn, AuditoriaDB, eventos)
+
+    db = SessionLocal()
+    try:
+        resumen_ventas.reconstruir(db)
+        db.commit()
+    finally:
+        db.close()
+
+    # Estadísticas para el planificador (sqlite_stat1 / pg_statistic)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+    ejemplo = ventas[len(ventas) // 2]
+    return {
+        "id_producto": n_productos // 2,
+        "slug": productos[n_productos // 2 - 1]["slug"],
+        "id_venta": ejemplo["id_venta"],
+        "rut": ejemplo["rut_usuario"],
+        "buy_order": f"BO-{ejemplo['id_venta']:08d}",
+    }
+
+
+def _endpoints(claves: dict):
+    hoy = datetime.utcnow().date()
+    desde = (hoy - timedelta(days=7)).isoformat()
+    hasta = hoy.isoformat()
+    rango = f"fecha_inicio={desde}&fecha_fin={hasta}"
+    return [
+        ("catalogo", "/api/productos/catalogo?limit=24"),
+        ("catalogo_precio", "/api/productos/catalogo?limit=24&orden=precio_asc&precio_min=5000"),
+        ("catalogo_total", "/api/productos/catalogo/total"),
+        ("catalogo_slug", f"/api/productos/catalogo/slug/{claves['slug']}"),
+        ("producto", f"/api/productos/{claves['id_producto']}"),
+        ("similares", f"/api/productos/similares/{claves['id_producto']}"),
+        ("buscar", "/api/productos/buscar?q=taladro%20bosch"),
+        ("inventario", "/api/productos/inventario?limit=50"),
+        ("ventas_rango", f"/api/ventas/?limit=50&{rango}"),
+        ("ventas_usuario", f"/api/ventas/usuario/{claves['rut']}"),
+        ("venta", f"/api/ventas/{claves['id_venta']}"),
+        ("venta_orden", f"/api/ventas/orden/{claves['buy_order']}"),
+        ("ventas_estadisticas", f"/api/ventas/estadisticas/resumen?{rango}"),
+        ("movimientos", "/api/ventas/movimientos/inventario?limit=50"),
+        ("movimientos_producto", f"/api/ventas/producto/{claves['id_producto']}/movimientos"),
+        ("dashboard_metricas", f"/api/dashboard/metrics?{rango}"),
+        ("chart_ventas_dia", f"/api/dashboard/charts/ventas_por_dia?{rango}"),
+        ("chart_top_productos", f"/api/dashboard/charts/top_productos?{rango}"),
+        ("chart_ventas_categoria", f"/api/dashboard/charts/ventas_por_categoria?{rango}"),
+        ("chart_inventario_categoria", "/api/dashboard/charts/inventario_por_categoria"),
+        ("pagos_session", f"/api/pagos/session/{claves['rut']}"),
+        ("pagos_usuario", f"/api/pagos/usuario/{claves['rut']}"),
+        ("pago_estado", f"/api/pagos/estado/{claves['id_venta']}"),
+        ("auditoria", "/api/auditoria/?limit=50"),
+        ("auditoria_usuario", f"/api/auditoria/?usuario_rut={claves['rut']}&limit=50"),
+    ]
+
+
+def _capturar(client: TestClient, endpoints) -> dict:
+    """Llama a cada endpoint y devuelve {etiqueta: [(sql, parametros), ...]} con los SELECT emitidos"""
+    capturas = defaultdict(list)
+    actual = {"etiqueta": None}
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        etiqueta = actual["etiqueta"]
+        if etiqueta and not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            capturas[etiqueta].append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", registrar)
+    try:
+        for etiqueta, ruta in endpoints:
+            actual["etiqueta"] = etiqueta
+            r = client.get(ruta)
+            actual["etiqueta"] = None
+            if r.status_code >= 400:
+                print(f"  aviso: {etiqueta} respondió {r.status_code} ({ruta})")
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar)
+    return capturas
+
+
+_ALIAS = re.compile(r'\b(?:FROM|JOIN)\s+"?(\w+)"?(?:\s+AS)?\s+"?(\w+)"?', re.IGNORECASE)
+_NO_ALIAS = {"WHERE", "JOIN", "LEFT", "INNER", "OUTER", "ON", "GROUP", "ORDER", "LIMIT", "UNION", "CROSS"}
+
+
+def _tablas_por_alias(sql: str) -> dict:
+    alias = {}
+    for tabla, nombre in _ALIAS.findall(sql):
+        if nombre.upper() not in _NO_ALIAS:
+            alias[nombre] = tabla
+    return alias
+
+
+def _recorridos(conn, sql: str, parametros) -> tuple:
+    """Devuelve (plan en texto, tablas recorridas completas) de una consulta"""
+    dialecto = engine.dialect.name
+    if dialecto == "sqlite":
+        filas = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", parametros).fetchall()
+        plan = [fila[-1] for fila in filas]
+        # "SCAN t" sin "USING ... INDEX" es un recorrido completo de la tabla
+        patron = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS (\w+))?$')
+    elif dialecto == "postgresql":
+        filas = conn.exec_driver_sql(f"EXPLAIN {sql}", parametros).fetchall()
+        plan = [fila[0] for fila in filas]
+        patron = re.compile(r'Seq Scan on (\w+)(?: (\w+))?')
+    else:
+        raise SystemExit(f"Motor no soportado: {dialecto}")
+
+    alias = _tablas_por_alias(sql)
+    tablas = set()
+    for linea in plan:
+        m = patron.search(linea.strip())
+        if m:
+            nombre = m.group(1)
+            tablas.add(alias.get(nombre, nombre))
+    return "\n".join(plan), tablas
+
+
+def main_planes():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--productos", type=int, default=5000)
+    parser.add_argument("--usuarios", type=int, default=2000)
+    parser.add_argument("--ventas", type=int, default=20000)
+    parser.add_argument("--dias", type=int, default=365, help="Antigüedad máxima de las ventas sembradas")
+    parser.add_argument("--umbral", type=int, default=1000, help="Filas a partir de las cuales un recorrido completo falla")
+    parser.add_argument("--semilla", type=int, default=7)
+    parser.add_argument("--mostrar", action="store_true", help="Imprimir el plan de cada consulta")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    claves = _sembrar(args.productos, args.usuarios, args.ventas, args.dias, args.semilla)
+
+    main.app.dependency_overrides[require_admin] = lambda: None
+    with TestClient(main.app) as client:
+        capturas = _capturar(client, _endpoints(claves))
+
+    with engine.connect() as conn:
+        filas_por_tabla = {
+            t.name: conn.execute(text(f"SELECT COUNT(*) FROM {t.name}")).scalar()
+            for t in Base.metadata.sorted_tables
+        }
+        fallos, permitidos, total = [], [], 0
+        for etiqueta, consultas in capturas.items():
+            vistos = set()
+            for sql, parametros in consultas:
+                if sql in vistos:
+                    continue
+                vistos.add(sql)
+                total += 1
+                plan, tablas = _recorridos(conn, sql, parametros)
+                if args.mostrar:
+                    print(f"--- {etiqueta}\n{sql}\n{plan}\n")
+                for tabla in sorted(tablas):
+                    filas = filas_por_tabla.get(tabla, 0)
+                    if filas <= args.umbral:
+                        continue
+                    if (etiqueta, tabla) in PERMITIDOS:
+                        permitidos.append((etiqueta, tabla))
+                        continue
+                    fallos.append((etiqueta, tabla, filas, sql, plan))
+
+    print(f"motor: {engine.dialect.name}  endpoints: {len(capturas)}  consultas: {total}  umbral: {args.umbral} filas")
+    for etiqueta, tabla in sorted(set(permitidos)):
+        print(f"  permitido: {etiqueta} recorre {tabla} ({PERMITIDOS[(etiqueta, tabla)]})")
+    if fallos:
+        for etiqueta, tabla, filas, sql, plan in fallos:
+            print(f"\nFALLO: {etiqueta} recorre completa la tabla {tabla} ({filas} filas)")
+            print(f"  SQL: {' '.join(sql.split())[:500]}")
+            print("  plan:\n    " + plan.replace("\n", "\n    "))
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main_planes()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+"""
+Verificación de la réplica de lectura (config.database.get_read_db, core/replica.py).
+
+Siembra una base SQLite, la copia y abre la copia en modo solo lectura como DATABASE_READ_URL:
+una réplica congelada, el peor caso de desfase. Luego comprueba con TestClient:
+
+1. Rutas de lectura: cada ruta con get_read_db responde bien contra la réplica y no ejecuta
+   ninguna consulta en la base principal; escribir en la réplica falla.
+2. Lee tus escrituras: tras crear una categoría, la respuesta trae la cookie de lectura primaria
+   y el mismo cliente ve la categoría nueva; otro cliente (réplica) no la ve y recibe la
+   respuesta sin ETag. Pasada la ventana (LECTURA_PEGAJOSA_SEGUNDOS) el cliente vuelve a la réplica.
+3. Caché del catálogo: tras invalidar el catálogo no se guardan entradas leídas de la réplica
+   durante la ventana; pasada la ventana sí.
+
+Uso:
+    python scripts/verificar_replica.py
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+_TMP = tempfile.mkdtemp(prefix="verificar_replica_")
+_PRINCIPAL = os.path.join(_TMP, "app.db")
+_REPLICA = os.path.join(_TMP, "replica.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_PRINCIPAL}"
+os.environ["DATABASE_READ_URL"] = f"sqlite:///file:{_REPLICA}?mode=ro&uri=true"
+os.environ["LECTURA_PEGAJOSA_SEGUNDOS"] = "2"
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+
+import main
+from config.database import COOKIE_LECTURA_PRIMARIA, LECTURA_PEGAJOSA_SEGUNDOS, engine, engine_lectura
+from core.auth import require_admin
+from core.cache import catalogo_cache, invalidar_catalogo
+from models.base import Base
+from verificar_planes_consulta import _sembrar
+
+_conteo = {"principal": 0, "lectura": 0}
+
+
+def _contar(nombre):
+    def antes(conn, cursor, statement, parameters, context, executemany):
+        _conteo[nombre] += 1
+    return antes
+
+
+def _rutas_lectura(claves: dict):
+    return [
+        "/api/productos/catalogo?limit=20",
+        "/api/productos/catalogo/total",
+        f"/api/productos/catalogo/slug/{claves['slug']}",
+        "/api/productos/buscar?q=martillo",
+        f"/api/productos/{claves['id_producto']}",
+        f"/api/productos/similares/{claves['id_producto']}",
+        "/api/categorias/",
+        "/api/subcategorias/",
+        "/api/dashboard/metrics",
+        "/api/dashboard/charts/ventas_por_dia",
+        "/api/dashboard/charts/top_productos",
+        "/api/dashboard/charts/ventas_por_categoria",
+        "/api/dashboard/charts/inventario_por_categoria",
+        "/api/dashboard/charts/eventos_por_hora",
+        "/api/dashboard/charts/top_urls",
+        "/api/auditoria/?limit=20",
+        f"/api/auditoria/producto/{claves['id_producto']}",
+        "/api/ventas/movimientos/inventario?limit=20",
+        f"/api/ventas/producto/{claves['id_producto']}/movimientos",
+        "/api/ventas/estadisticas/resumen",
+    ]
+
+
+def _verificar_rutas(claves: dict, fallos: list):
+    with TestClient(main.app) as client:
+        for ruta in _rutas_lectura(claves):
+            _conteo.update(principal=0, lectura=0)
+            r = client.get(ruta)
+            if r.status_code >= 400 or _conteo["principal"] or not _conteo["lectura"]:
+                fallos.append(f"{ruta}: {r.status_code}, {_conteo['lectura']} consultas en la réplica y "
+                              f"{_conteo['principal']} en la principal")
+    print(f"  rutas de lectura: {len(_rutas_lectura(claves))} revisadas")
+    try:
+        with engine_lectura.begin() as conn:
+            conn.execute(text("UPDATE productos SET nombre = nombre"))
+        fallos.append("la réplica aceptó una escritura")
+    except Exception as e:
+        print(f"  escritura en la réplica rechazada: {type(e).__name__}")
+
+
+def _nombres(r) -> set:
+    return {c["nombre"] for c in r.json()}
+
+
+def _verificar_pegajosa(fallos: list):
+    with TestClient(main.app) as escritor, TestClient(main.app) as otro:
+        r = escritor.post("/api/categorias/", json={"nombre": "Categoría nueva"})
+        if r.status_code >= 400:
+            fallos.append(f"crear categoría respondió {r.status_code}: {r.text[:200]}")
+            return
+        cookie = r.headers.get("set-cookie", "")
+        print(f"  set-cookie: {cookie}")
+        if not cookie.startswith(f"{COOKIE_LECTURA_PRIMARIA}=1"):
+            fallos.append(f"la escritura no dejó la cookie de lectura primaria: {cookie!r}")
+
+        propia = escritor.get("/api/categorias/")
+        ajena = otro.get("/api/categorias/")
+        if "Categoría nueva" not in _nombres(propia):
+            fallos.append("el cliente que escribió no ve su categoría")
+        if "Categoría nueva" in _nombres(ajena):
+            fallos.append("otro cliente leyó la categoría nueva: no está leyendo de la réplica")
+        if "etag" in ajena.headers:
+            fallos.append("la réplica respondió con ETag dentro de la ventana de desfase")
+        print(f"  dentro de la ventana: el escritor ve {len(_nombres(propia))} categorías, "
+              f"otro cliente {len(_nombres(ajena))} (ETag: {'etag' in ajena.headers})")
+
+        # core.cache.invalidar redondea el momento del cambio al segundo siguiente
+        time.sleep(LECTURA_PEGAJOSA_SEGUNDOS + 1.5)
+        _conteo.update(principal=0, lectura=0)
+        despues = escritor.get("/api/categorias/")
+        if "Categoría nueva" in _nombres(despues) or _conteo["principal"]:
+            fallos.append("pasada la ventana el escritor sigue leyendo de la base principal")
+        if "etag" not in despues.headers:
+            fallos.append("pasada la ventana la respuesta sigue sin ETag")
+        print(f"  pasada la ventana: el escritor lee de la réplica ({_conteo['lectura']} consultas)")
+
+
+def _verificar_cache(fallos: list):
+    with TestClient(main.app) as client:
+        invalidar_catalogo()
+        client.get("/api/productos/catalogo?limit=5")
+        durante = catalogo_cache.estadisticas()["entradas"]
+        time.sleep(LECTURA_PEGAJOSA_SEGUNDOS + 0.5)
+        client.get("/api/productos/catalogo?limit=5")
+        despues = catalogo_cache.estadisticas()["entradas"]
+    print(f"  caché del catálogo: {durante} entradas dentro de la ventana, {despues} después")
+    if durante:
+        fallos.append("la caché del catálogo guardó lecturas de la réplica dentro de la ventana")
+    if not despues:
+        fallos.append("la caché del catálogo no guarda pasada la ventana")
+
+
+def main_replica():
+    Base.metadata.create_all(bind=engine)
+    claves = _sembrar(300, 50, 500, 60, 7)
+    engine.dispose()
+    shutil.copyfile(_PRINCIPAL, _REPLICA)
+    event.listen(engine, "before_cursor_execute", _contar("principal"))
+    event.listen(engine_lectura, "before_cursor_execute", _contar("lectura"))
+    main.app.dependency_overrides[require_admin] = lambda: None
+
+    fallos = []
+    _verificar_rutas(claves, fallos)
+    _verificar_pegajosa(fallos)
+    _verificar_cache(fallos)
+
+    if fallos:
+        print()
+        for fallo in fallos:
+            print(f"FALLO: {fallo}")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main_replica()
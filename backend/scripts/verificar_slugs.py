@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""
+Verificación del slug al renombrar productos (ProductoController._actualizar_slug).
+
+Sobre una base SQLite temporal comprueba:
+1. "Taladro 2000" (taladro-2000) renombrado a "Taladro" con "taladro" libre: pasa a "taladro" y
+   "taladro-2000" queda en el historial (un sufijo numérico del nombre no es una colisión).
+2. Un producto con sufijo de colisión (martillo-2, "martillo" es de otro) que cambia el nombre
+   a otro con el mismo slug base conserva martillo-2 y no escribe historial.
+3. Renombrar y volver al nombre anterior recupera el slug propio del historial.
+4. Los slugs del historial resuelven al slug vigente.
+
+Uso:
+    python scripts/verificar_slugs.py
+"""
+import os
+import sys
+import tempfile
+
+_TMP = tempfile.mkdtemp(prefix="verificar_slugs_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP, 'app.db')}")
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import main  # noqa: F401  (migra la base temporal)
+from config.database import SessionLocal
+from controllers.producto_controller import ProductoController
+from models.categoria import CategoriaDB
+from models.producto import ProductoDB
+from models.producto_slug import ProductoSlugHistorialDB
+
+
+def _crear(db, nombre: str, id_categoria: int) -> ProductoDB:
+    producto = ProductoDB(
+        nombre=nombre, id_categoria=id_categoria, precio_venta=1000, cantidad_disponible=1,
+        stock_minimo=0, costo_bruto=0, costo_neto=0, estado="activo", en_catalogo=True,
+        slug=ProductoController._generar_slug_unico(db, nombre),
+    )
+    db.add(producto)
+    db.flush()
+    return producto
+
+
+def _renombrar(db, producto: ProductoDB, nombre: str) -> None:
+    producto.nombre = nombre
+    ProductoController._actualizar_slug(db, producto)
+    db.flush()
+
+
+def _historial(db, producto: ProductoDB) -> set:
+    return {s for (s,) in db.query(ProductoSlugHistorialDB.slug).filter(
+        ProductoSlugHistorialDB.id_producto == producto.id_producto)}
+
+
+def main_slugs():
+    fallos = []
+
+    def verificar(condicion, mensaje):
+        print(("  ok    " if condicion else "  FALLO ") + mensaje)
+        if not condicion:
+            fallos.append(mensaje)
+
+    db = SessionLocal()
+    try:
+        categoria = CategoriaDB(nombre="verificacion-slugs")
+        db.add(categoria)
+        db.flush()
+
+        taladro = _crear(db, "Taladro 2000", categoria.id_categoria)
+        _renombrar(db, taladro, "Taladro")
+        verificar(taladro.slug == "taladro" and "taladro-2000" in _historial(db, taladro),
+                  f"'Taladro 2000' -> 'Taladro': slug {taladro.slug}, historial {sorted(_historial(db, taladro))}")
+
+        _crear(db, "Martillo", categoria.id_categoria)
+        martillo = _crear(db, "Martillo", categoria.id_categoria)
+        _renombrar(db, martillo, "MARTILLO")
+        verificar(martillo.slug == "martillo-2" and not _historial(db, martillo),
+                  f"sufijo de colisión con el mismo slug base: slug {martillo.slug}, historial {sorted(_historial(db, martillo))}")
+
+        _renombrar(db, martillo, "Martillo carpintero")
+        _renombrar(db, martillo, "Martillo")
+        verificar(martillo.slug == "martillo-2" and _historial(db, martillo) == {"martillo-carpintero"},
+                  f"vuelve al nombre anterior: slug {martillo.slug}, historial {sorted(_historial(db, martillo))}")
+
+        verificar(ProductoController.obtener_slug_vigente(db, "taladro-2000") == "taladro",
+                  "el slug anterior resuelve al vigente")
+    finally:
+        db.rollback()
+        db.close()
+
+    if fallos:
+        print(f"FALLO: {len(fallos)} verificaciones")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main_slugs()
@@ -3,7 +3,7 @@
 
 """
 Script de configuración para PostgreSQL en producción
-1. Crear todas las tablas necesarias en PostgreSQL
+1. Crear o actualizar el esquema (migraciones versionadas) en PostgreSQL
 2. Verificar la conexión a la base de datos
 3. Crear el usuario administrador inicial
 """
@@ -17,6 +17,7 @@ from dotenv import load_dotenv
 
 # Importar modelos y configuración
 from config.database import Base, engine, get_db
+from config.migraciones import migrar, sembrar_roles_permisos
 from models.usuario import UsuarioDB
 # Importar los modelos relacionados para asegurar el registro de mapeos antes de crear tablas
 from models import (
@@ -84,7 +85,7 @@ def asegurar_esquema_usuarios():
         return False
 
 def crear_tablas():
-    """Crea todas las tablas definidas en los modelos"""
+    """Crea o actualiza el esquema con las migraciones versionadas (config/migraciones.py)"""
     try:
         print("📋 Configurando mapeos de SQLAlchemy...")
         try:
@@ -92,11 +93,11 @@ def crear_tablas():
             print("🧩 Mappers configurados correctamente")
         except Exception as me:
             print(f"⚠️  Advertencia al configurar mappers: {me}")
-        print("📋 Creando tablas en PostgreSQL...")
-        Base.metadata.create_all(bind=engine)
+        print("📋 Aplicando migraciones...")
+        resultado = migrar()
+        print(f"🐘 Esquema en {resultado['actual']} ({resultado['accion']}, {resultado['segundos']:.2f}s)")
         # Asegurar compatibilidad de esquema
         asegurar_esquema_usuarios()
-        print("🐘 Tablas creadas en PostgreSQL (setup_postgres.py)")
         print("✅ Tablas creadas exitosamente")
         return True
     except SQLAlchemyError as e:
@@ -106,57 +107,11 @@ def crear_tablas():
 def seed_roles_y_permisos():
     """Crea roles y permisos base y asigna todos los permisos al rol administrador."""
     try:
-        db = next(get_db())
-        # Permisos base
-        perms = [
-            "usuarios",
-            "catalogo",
-            "inventario",
-            "ventas",
-            "pagos",
-            "auditoria",
-            "dashboard",
-            "proveedores",
-            "categorias",
-            "subcategorias",
-            "despachos",
-        ]
-        created_perms = {}
-        for name in perms:
-            p = db.query(PermisoDB).filter(PermisoDB.descripcion == name).first()
-            if not p:
-                p = PermisoDB(descripcion=name)
-                db.add(p)
-                db.flush()
-            created_perms[name] = p.id_permiso
-
-        # Roles base
-        roles = ["administrador", "vendedor", "bodeguero", "cliente"]
-        created_roles = {}
-        for rname in roles:
-            r = db.query(RolDB).filter(RolDB.nombre == rname).first()
-            if not r:
-                r = RolDB(nombre=rname)
-                db.add(r)
-                db.flush()
-            created_roles[rname] = r.id_rol
-
-        # Asignar todos los permisos al rol administrador
-        admin_id = created_roles.get("administrador")
-        if admin_id:
-            for pid in created_perms.values():
-                rp = db.query(RolPermisoDB).filter(RolPermisoDB.id_rol == admin_id, RolPermisoDB.id_permiso == pid).first()
-                if not rp:
-                    db.add(RolPermisoDB(id_rol=admin_id, id_permiso=pid))
-        db.commit()
-        db.close()
+        with engine.begin() as conn:
+            sembrar_roles_permisos(conn)
         print("✅ Roles y permisos iniciales verificados/creados")
         return True
     except Exception as e:
-        try:
-            db.rollback(); db.close()
-        except Exception:
-            pass
         print(f"⚠️  Inicialización de roles/permisos parcialmente fallida: {e}")
         return False
 
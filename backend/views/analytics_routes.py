@@ -1,21 +1,25 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from fastapi import APIRouter, Request, Depends
-from sqlalchemy.orm import Session
-from config.database import get_db
+from fastapi import APIRouter
 from config.constants import API_PREFIX
+from core.analytics import buffer_analytics, normalizar_evento
+from models.evento_analytics import LoteEventosAnalytics
 
 router = APIRouter(prefix=f"{API_PREFIX}/analytics", tags=["Analytics"])
 
+# Los handlers son async a propósito: solo agregan al buffer en memoria (sin E/S), así que
+# no necesitan el threadpool. La escritura en BD la hace el hilo de core.analytics.
+
 @router.post("/events")
-async def collect_event(payload: dict, request: Request, db: Session = Depends(get_db)):
-    try:
-        name = str(payload.get("name") or "").strip() or "unknown"
-        props = payload.get("properties") or {}
-        url = payload.get("url") or None
-        ts = payload.get("ts") or None
-        print(f"[analytics] name={name} url={url} ts={ts} props={props}")
-    except Exception as e:
-        print(f"[analytics] error: {e}")
+async def collect_event(payload: dict):
+    """Recibe un evento {name, url, properties, ts}"""
+    buffer_analytics.agregar([normalizar_evento(payload)])
     return {"status": "ok"}
+
+
+@router.post("/events/batch")
+async def collect_events_batch(lote: LoteEventosAnalytics):
+    """Recibe varios eventos en una petición ({"events": [...]}, hasta 500)"""
+    buffer_analytics.agregar([normalizar_evento(evento.dict()) for evento in lote.events])
+    return {"status": "ok", "recibidos": len(lote.events)}
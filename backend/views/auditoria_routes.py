@@ -7,7 +7,7 @@ from controllers.auditoria_controller import (
     obtener_auditoria_por_entidad,
     obtener_auditoria,
 )
-from config.database import get_db
+from config.database import get_read_db
 from models.auditoria import Auditoria
 from config.constants import API_PREFIX
 
@@ -21,7 +21,7 @@ def listar_auditoria_por_entidad(
     entidad_id: int,
     skip: int = 0,
     limit: int = 50,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Lista eventos de auditoría por entidad (tipo/id)"""
     eventos = obtener_auditoria_por_entidad(
@@ -38,9 +38,10 @@ def listar_auditoria_filtrada(
     fecha_hasta: Optional[str] = Query(None, description="ISO 8601"),
     skip: int = 0,
     limit: int = 50,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en next_cursor (reemplaza a skip)"),
+    db: Session = Depends(get_read_db),
 ):
-    """Lista eventos de auditoría con filtros por usuario/fecha/acción y paginación"""
+    """Lista eventos de auditoría con filtros por usuario/fecha/acción y paginación (offset o cursor)"""
     return obtener_auditoria(
         db,
         usuario_rut=usuario_rut,
@@ -49,4 +50,5 @@ def listar_auditoria_filtrada(
         fecha_hasta=fecha_hasta,
         skip=skip,
         limit=limit,
+        cursor=cursor,
     )
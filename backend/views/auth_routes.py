@@ -19,50 +19,50 @@ router = APIRouter(prefix=f"{API_PREFIX}/auth", tags=["Autenticación"])
 
 
 @router.post("/login", response_model=Token)
-async def login(
+def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
     """ Endpoint para autenticar usuarios """
-    return await AuthController.login(form_data, db)
+    return AuthController.login(form_data, db)
 
 @router.post("/login-cliente", response_model=Token)
-async def login_cliente(
+def login_cliente(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
-    return await AuthController.login_cliente(form_data, db)
+    return AuthController.login_cliente(form_data, db)
 
 @router.post("/login-trabajador", response_model=Token)
-async def login_trabajador(
+def login_trabajador(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
-    return await AuthController.login_trabajador(form_data, db)
+    return AuthController.login_trabajador(form_data, db)
 
 @router.post("/login-orden", response_model=Token)
-async def login_por_orden(payload: dict, db: Session = Depends(get_db)):
+def login_por_orden(payload: dict, db: Session = Depends(get_db)):
     rut = str(payload.get('rut') or '')
     buy_order = str(payload.get('buy_order') or '')
     if not rut or not buy_order:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="rut y buy_order son requeridos")
-    return await AuthController.login_por_orden(db, rut, buy_order)
+    return AuthController.login_por_orden(db, rut, buy_order)
 
 @router.post("/register", response_model=Usuario)
-async def register(
+def register(
     usuario: UsuarioCreate,
     db: Session = Depends(get_db)
 ):
     usuario.role = "cliente"
-    return await UsuarioController.crear_usuario(usuario, db)
+    return UsuarioController.crear_usuario(usuario, db)
 
 @router.post("/register-and-login", response_model=Token)
-async def register_and_login(
+def register_and_login(
     usuario: UsuarioCreate,
     db: Session = Depends(get_db)
 ):
     usuario.role = "cliente"
-    nuevo_usuario = await UsuarioController.crear_usuario(usuario, db)
+    nuevo_usuario = UsuarioController.crear_usuario(usuario, db)
     from core.auth import crear_token
     token = crear_token(data={"sub": nuevo_usuario.rut})
     return Token(
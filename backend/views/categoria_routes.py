@@ -5,61 +5,67 @@
 Rutas de categorías
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Request, Response, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
-from config.database import get_db
+from config.database import get_db, get_read_db
 from controllers.categoria_controller import CategoriaController
 from models.categoria import Categoria, CategoriaCreate, CategoriaUpdate
 from core.auth import get_current_user, require_admin
 from config.constants import API_PREFIX
+from core.condicional import respuesta_condicional
 
 router = APIRouter(prefix=f"{API_PREFIX}/categorias", tags=["Categorías"])
 
 
 @router.get("/", response_model=List[Categoria])
-async def obtener_categorias(
-    db: Session = Depends(get_db)
+def obtener_categorias(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db)
 ):
     """ Obtener todas las categorías """
-    return await CategoriaController.obtener_categorias(db)
+    no_modificado = respuesta_condicional(request, response, "categorias")
+    if no_modificado:
+        return no_modificado
+    return CategoriaController.obtener_categorias(db)
 
 
 @router.get("/{categoria_id}", response_model=Categoria)
-async def obtener_categoria(
+def obtener_categoria(
     categoria_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """ Obtener una categoría por ID """
-    return await CategoriaController.obtener_categoria(categoria_id, db)
+    return CategoriaController.obtener_categoria(categoria_id, db)
 
 
 @router.post("/", response_model=Categoria)
-async def crear_categoria(
+def crear_categoria(
     categoria: CategoriaCreate,
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_admin)
 ):
     """ Crear una nueva categoría (solo administradores) """
-    return await CategoriaController.crear_categoria(categoria, db)
+    return CategoriaController.crear_categoria(categoria, db)
 
 
 @router.put("/{categoria_id}", response_model=Categoria)
-async def actualizar_categoria(
+def actualizar_categoria(
     categoria_id: int,
     categoria: CategoriaUpdate,
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_admin)
 ):
     """ Actualizar una categoría (solo administradores) """
-    return await CategoriaController.actualizar_categoria(categoria_id, categoria, db)
+    return CategoriaController.actualizar_categoria(categoria_id, categoria, db)
 
 
 @router.delete("/{categoria_id}")
-async def eliminar_categoria(
+def eliminar_categoria(
     categoria_id: int,
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_admin)
 ):
     """ Eliminar una categoría (solo administradores) """
-    return await CategoriaController.eliminar_categoria(categoria_id, db)
+    return CategoriaController.eliminar_categoria(categoria_id, db)
@@ -0,0 +1,105 @@
+"""
+Rutas de desarrollo: datos de ejemplo (seed_data.py)
+
+main.py solo importa este módulo con RUTAS_DEV=1, así que en producción ni seed_data ni
+estas rutas se cargan. Las rutas conservan sus URLs de siempre. Para volúmenes de prueba de
+carga usar scripts/generar_datos.py.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from config.database import get_db
+from controllers.producto_controller import ProductoController
+from core.auth import require_admin
+from config.constants import API_PREFIX
+from core.cache import invalidar, invalidar_catalogo
+from core import resumen_ventas
+from seed_data import (
+    seed_20_ejemplos_por_tabla,
+    seed_usuarios,
+    seed_catalogo_y_productos,
+    seed_venta_simple,
+    seed_despacho_y_pago,
+    seed_mas_productos_catalogo,
+    seed_ferreteria_15_realistas,
+    seed_mensajes_contacto,
+    seed_fill_tables,
+    randomize_user_names,
+    seed_extra_ventas,
+    seed_client_purchases,
+    prune_active_clients_to_n,
+)
+
+router = APIRouter(prefix=API_PREFIX, tags=["Desarrollo"])
+
+
+@router.post("/productos/seed/all")
+def seed_todas_tablas(
+    cantidad_extra: int = Query(100, ge=0, le=5000, description="Cantidad extra de productos de catálogo"),
+    cantidad_por_tabla: int = Query(200, ge=1, le=5000, description="Cantidad mínima por tabla"),
+    db: Session = Depends(get_db)
+):
+    """Inserta ejemplos realistas en todas las tablas principales para pruebas.
+
+    Incluye usuarios, proveedores, categorías, subcategorías, productos, ventas,
+    detalles, pagos, despachos, movimientos y auditoría. Evita duplicados.
+    """
+    resumen = {}
+    try:
+        resumen.update(seed_usuarios(db))
+        resumen.update(seed_catalogo_y_productos(db))
+        resumen.update(seed_ferreteria_15_realistas(db))
+        resumen["productos_extra_insertados"] = seed_mas_productos_catalogo(db, cantidad=cantidad_extra)
+        resumen.update(seed_20_ejemplos_por_tabla(db))
+        resumen.update(seed_venta_simple(db))
+        resumen.update(seed_despacho_y_pago(db))
+        resumen.update(seed_fill_tables(db, count=cantidad_por_tabla))
+        try:
+            resumen.update(randomize_user_names(db, cantidad=0))
+        except Exception:
+            pass
+        resumen.update(seed_mensajes_contacto(db))
+        resumen["slugs_asignados"] = ProductoController.asegurar_slugs(db)
+        resumen_ventas.reconstruir(db)
+        db.commit()
+        invalidar("catalogo", "categorias", "subcategorias", "proveedores")
+        return {"status": "ok", "resumen": resumen}
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error en seed all: {str(e)}")
+
+
+@router.post("/ventas/seed")
+def seed_ventas_extra(
+    cantidad: int = Query(50, ge=1, le=1000, description="Cantidad de ventas adicionales a generar"),
+    db: Session = Depends(get_db),
+):
+    resumen = seed_extra_ventas(db, cantidad=cantidad)
+    resumen_ventas.reconstruir(db)
+    db.commit()
+    invalidar_catalogo()
+    return {"status": "ok", "resumen": resumen}
+
+
+@router.post("/ventas/seed/clientes")
+def seed_ventas_clientes(
+    cantidad: int = Query(30, ge=1, le=1000, description="Cantidad de compras de clientes a generar"),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_admin)
+):
+    """Genera compras reales con distintos clientes y asigna una dirección real única por cliente."""
+    resumen = seed_client_purchases(db, cantidad=cantidad)
+    resumen_ventas.reconstruir(db)
+    db.commit()
+    invalidar_catalogo()
+    return {"status": "ok", "resumen": resumen}
+
+
+@router.post("/usuarios/prune-clientes")
+def prune_clientes(
+    target: int = 30,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_admin)
+):
+    """Deja solo N clientes activos; el resto se desactiva."""
+    resumen = prune_active_clients_to_n(db, target=target)
+    return {"status": "ok", "resumen": resumen}
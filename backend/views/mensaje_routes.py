@@ -16,57 +16,57 @@ router = APIRouter(prefix=f"{API_PREFIX}/mensajes", tags=["Mensajes"])
 
 
 @router.get("/", response_model=List[MensajeContacto])
-async def obtener_mensajes(
+def obtener_mensajes(
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_admin)
 ):
     """Obtener todos los mensajes (solo administradores)"""
-    return await MensajeController.obtener_mensajes(db)
+    return MensajeController.obtener_mensajes(db)
 
 
 @router.get("/{mensaje_id}", response_model=MensajeContacto)
-async def obtener_mensaje(
+def obtener_mensaje(
     mensaje_id: int,
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_admin)
 ):
     """Obtener un mensaje por ID (solo administradores)"""
-    return await MensajeController.obtener_mensaje(mensaje_id, db)
+    return MensajeController.obtener_mensaje(mensaje_id, db)
 
 
 @router.post("/", response_model=MensajeContacto)
-async def crear_mensaje(
+def crear_mensaje(
     mensaje: MensajeContactoCreate,
     db: Session = Depends(get_db)
 ):
     """Crear un nuevo mensaje (público)"""
-    return await MensajeController.crear_mensaje(mensaje, db)
+    return MensajeController.crear_mensaje(mensaje, db)
 
 # Alias sin barra final para compatibilidad
 @router.post("", response_model=MensajeContacto)
-async def crear_mensaje_alias(
+def crear_mensaje_alias(
     mensaje: MensajeContactoCreate,
     db: Session = Depends(get_db)
 ):
     """Alias: Crear mensaje (público) sin barra final"""
-    return await MensajeController.crear_mensaje(mensaje, db)
+    return MensajeController.crear_mensaje(mensaje, db)
 
 
 @router.put("/{mensaje_id}/marcar-leido")
-async def marcar_mensaje_leido(
+def marcar_mensaje_leido(
     mensaje_id: int,
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_admin)
 ):
     """Marcar un mensaje como leído (solo administradores)"""
-    return await MensajeController.marcar_como_leido(mensaje_id, db)
+    return MensajeController.marcar_como_leido(mensaje_id, db)
 
 
 @router.delete("/{mensaje_id}")
-async def eliminar_mensaje(
+def eliminar_mensaje(
     mensaje_id: int,
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_admin)
 ):
     """Eliminar un mensaje (solo administradores)"""
-    return await MensajeController.eliminar_mensaje(mensaje_id, db)
+    return MensajeController.eliminar_mensaje(mensaje_id, db)
@@ -12,6 +12,7 @@ import os, hmac, hashlib
 from config.database import get_db
 from config.constants import API_PREFIX
 from controllers.pago_controller import PagoController
+from core import resumen_ventas
 
 
 router = APIRouter(prefix=f"{API_PREFIX}/pagos", tags=["Pagos"])
@@ -35,7 +36,7 @@ class PagoSimulacionRequest(BaseModel):
 
 
 @router.post("/iniciar")
-async def iniciar_pago(payload: PagoInitRequest, db: Session = Depends(get_db)):
+def iniciar_pago(payload: PagoInitRequest, db: Session = Depends(get_db)):
     pago = PagoController.iniciar_pago(db, payload.id_venta, payload.monto, payload.moneda)
     token = f"tok_{pago.id_pago}"
     frontend_base = os.environ.get("FRONTEND_URL", "https://ferreteria-patricio.onrender.com")
@@ -46,26 +47,26 @@ async def iniciar_pago(payload: PagoInitRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/estado/{id_venta}")
-async def estado_pago(id_venta: int, db: Session = Depends(get_db)):
+def estado_pago(id_venta: int, db: Session = Depends(get_db)):
     """Consulta el estado del pago asociado a una venta."""
     estado = PagoController.estado_pago_por_venta(db, id_venta)
     return estado
 
 
 @router.get("/usuario/{rut}")
-async def listar_compras_pagadas_por_usuario(rut: str, db: Session = Depends(get_db)):
+def listar_compras_pagadas_por_usuario(rut: str, db: Session = Depends(get_db)):
     """Lista ventas del usuario con pago aprobado (completadas)."""
     return PagoController.listar_ventas_pagadas_por_usuario(db, rut)
 
 
 @router.get("/session/{rut}")
-async def listar_compras_pagadas_por_session(rut: str, db: Session = Depends(get_db)):
+def listar_compras_pagadas_por_session(rut: str, db: Session = Depends(get_db)):
     """Lista ventas cuyo pago tiene session_id igual al RUT del usuario."""
     return PagoController.listar_ventas_pagadas_por_session(db, rut)
 
 
 @router.get("/return")
-async def pago_return(venta_id: int, token: str, db: Session = Depends(get_db)):
+def pago_return(venta_id: int, token: str, db: Session = Depends(get_db)):
     """Retorno informal del portal de pagos: redirige al frontend raíz con flag de compra."""
     frontend_base = os.environ.get("FRONTEND_URL", "https://ferreteria-patricio.onrender.com")
     url = f"{frontend_base}/?paid=1&venta_id={venta_id}&token={token}"
@@ -81,7 +82,7 @@ def _verify_signature(venta_id: int, token: str, status_str: str, signature: str
         return False
 
 @router.post("/notify")
-async def pago_notify(payload: dict, db: Session = Depends(get_db)):
+def pago_notify(payload: dict, db: Session = Depends(get_db)):
     """Notificación real del PSP: verifica firma y marca venta como pagada."""
     venta_id = int(payload.get("venta_id") or 0)
     token = str(payload.get("token") or "")
@@ -107,11 +108,13 @@ async def pago_notify(payload: dict, db: Session = Depends(get_db)):
         # Ajustar estado final según resultado del pago
         venta_db = db.query(VentaDB).filter(VentaDB.id_venta == venta_id).first()
         if venta_db:
+            anterior = venta_db.estado
             if status_str in {"rechazado", "anulado"}:
                 venta_db.estado = "cancelada"
             else:
                 # TIMEOUT, ERROR, FALLIDO, otros
                 venta_db.estado = "fallida"
+            resumen_ventas.cambio_estado(db, venta_id, anterior, venta_db.estado)
             db.commit()
         venta_resp = VentaController.obtener_venta_por_id(db, venta_id)
         return {"status": status_str, "venta": venta_resp}
@@ -120,7 +123,7 @@ async def pago_notify(payload: dict, db: Session = Depends(get_db)):
 
 
 @router.post("/simular/notificar")
-async def pago_simular_notify(payload: PagoSimulacionRequest, db: Session = Depends(get_db)):
+def pago_simular_notify(payload: PagoSimulacionRequest, db: Session = Depends(get_db)):
     from sqlalchemy.orm import joinedload
     from models.venta import VentaDB
     from models.pago import PagoDB
@@ -189,7 +192,9 @@ async def pago_simular_notify(payload: PagoSimulacionRequest, db: Session = Depe
             # Ajustar cancelada vs fallida
             v2 = db.query(VentaDB).filter(VentaDB.id_venta == payload.id_venta).first()
             if v2:
+                anterior = v2.estado
                 v2.estado = "cancelada" if status in {"REJECTED", "ABORTED"} else "fallida"
+                resumen_ventas.cambio_estado(db, payload.id_venta, anterior, v2.estado)
                 db.commit()
             venta_resp = VentaController.obtener_venta_por_id(db, payload.id_venta)
         except Exception:
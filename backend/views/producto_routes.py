@@ -2,124 +2,159 @@
 Rutas de productos
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request, Response
+from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from config.database import get_db
+from config.database import get_db, get_read_db
 from controllers.producto_controller import ProductoController
-from models.producto import Producto, ProductoCreate, ProductoUpdate, ProductoInventario
+from models.producto import ProductoDB, Producto, ProductoCreate, ProductoUpdate, ProductoInventario
 from models.catalogo import ProductoCatalogo, AgregarACatalogo
 from core.auth import get_current_user, require_admin
 from config.constants import API_PREFIX
+from core.condicional import respuesta_condicional
+from core.paginacion import CABECERA_CURSOR, acotar_limite, codificar_cursor, cursor_siguiente
 from controllers.auditoria_controller import registrar_evento
 from models.auditoria import AuditoriaCreate
-from seed_data import (
-    seed_20_ejemplos_por_tabla,
-    seed_usuarios,
-    seed_catalogo_y_productos,
-    seed_venta_simple,
-    seed_despacho_y_pago,
-    seed_mas_productos_catalogo,
-    seed_ferreteria_15_realistas,
-    seed_mensajes_contacto,
-    seed_fill_tables,
-    randomize_user_names,
-)
 
 router = APIRouter(prefix=f"{API_PREFIX}/productos", tags=["Productos"])
 
 
 @router.get("/", response_model=List[Producto])
-async def obtener_productos(
+def obtener_productos(
+    response: Response,
     categoria_id: Optional[int] = None,
     proveedor_id: Optional[int] = None,
     skip: int = 0,
-    limit: Optional[int] = None,
+    limit: Optional[int] = Query(None, description="Tamaño de página (acotado en el servidor)"),
+    cursor: Optional[str] = Query(None, description="Cursor de la cabecera X-Next-Cursor (reemplaza a skip)"),
     db: Session = Depends(get_db)
 ):
-    """ Obtener todos los productos del inventario (permite filtrar por categoría y proveedor, y paginar) """
-    return await ProductoController.obtener_productos(db, categoria_id, proveedor_id, skip, limit)
+    """ Obtener todos los productos del inventario (permite filtrar por categoría y proveedor, y paginar por offset o cursor) """
+    productos = ProductoController.obtener_productos(db, categoria_id, proveedor_id, skip, limit, cursor)
+    siguiente = cursor_siguiente(db, productos, acotar_limite(limit), "productos", (ProductoDB.id_producto,), lambda p: p.id_producto)
+    if siguiente:
+        response.headers[CABECERA_CURSOR] = siguiente
+    return productos
 
 @router.get("/total")
-async def obtener_total_productos(
+def obtener_total_productos(
     categoria_id: Optional[int] = None,
     proveedor_id: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
     """ Obtener total de productos aplicando filtros opcionales """
-    total = await ProductoController.obtener_total_productos(db, categoria_id, proveedor_id)
+    total = ProductoController.obtener_total_productos(db, categoria_id, proveedor_id)
     return {"total": total}
 
 
 @router.get("/catalogo", response_model=List[ProductoCatalogo])
-async def obtener_catalogo_publico(
+def obtener_catalogo_publico(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 10,
-    db: Session = Depends(get_db)
+    orden: Optional[str] = Query(None, regex="^(precio_asc|precio_desc)$", description="Ordenar por precio final"),
+    precio_min: Optional[float] = Query(None, ge=0, description="Precio final mínimo"),
+    precio_max: Optional[float] = Query(None, ge=0, description="Precio final máximo"),
+    cursor: Optional[str] = Query(None, description="Cursor de la cabecera X-Next-Cursor (reemplaza a skip)"),
+    db: Session = Depends(get_read_db)
 ):
-    """ Obtener productos del catálogo público con paginación """
-    return await ProductoController.obtener_catalogo_publico(db, skip, limit)
+    """ Obtener productos del catálogo público con paginación (filtros y orden por precio final con oferta) """
+    no_modificado = respuesta_condicional(request, response, "catalogo", segun_reloj=True)
+    if no_modificado:
+        return no_modificado
+    productos = ProductoController.obtener_catalogo_publico(db, skip, limit, orden, precio_min, precio_max, cursor)
+    if productos and len(productos) >= acotar_limite(limit):
+        ultimo = productos[-1]
+        if orden in ("precio_asc", "precio_desc"):
+            # El precio final en centavos coincide exactamente con precio_final_centavos_sql()
+            siguiente = codificar_cursor(f"catalogo_{orden}", [round(ultimo.precio_final * 100), ultimo.id_producto])
+        else:
+            siguiente = codificar_cursor("catalogo", [ultimo.id_producto])
+        response.headers[CABECERA_CURSOR] = siguiente
+    return productos
 
 @router.get("/catalogo/slug/{slug}", response_model=ProductoCatalogo)
-async def obtener_catalogo_por_slug(
+def obtener_catalogo_por_slug(
     slug: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: Session = Depends(get_read_db)
 ):
-    """ Obtener un producto del catálogo público por slug (derivado del nombre) """
-    return await ProductoController.obtener_catalogo_por_slug(db, slug)
+    """ Obtener un producto del catálogo público por slug; los slugs antiguos redirigen al vigente """
+    try:
+        return ProductoController.obtener_catalogo_por_slug(db, slug)
+    except HTTPException as e:
+        if e.status_code != status.HTTP_404_NOT_FOUND:
+            raise
+        vigente = ProductoController.obtener_slug_vigente(db, slug)
+        if not vigente:
+            raise
+        base = request.url.path.rsplit("/", 1)[0]
+        return RedirectResponse(url=f"{base}/{vigente}", status_code=status.HTTP_301_MOVED_PERMANENTLY)
 
 
 @router.get("/catalogo/total")
-async def obtener_total_catalogo(
-    db: Session = Depends(get_db)
+def obtener_total_catalogo(
+    precio_min: Optional[float] = Query(None, ge=0, description="Precio final mínimo"),
+    precio_max: Optional[float] = Query(None, ge=0, description="Precio final máximo"),
+    db: Session = Depends(get_read_db)
 ):
     """ Obtener total de productos en catálogo """
-    return {"total": await ProductoController.obtener_total_catalogo(db)}
+    return {"total": ProductoController.obtener_total_catalogo(db, precio_min, precio_max)}
 
 
-@router.get("/buscar", response_model=List[Producto])
-async def buscar_productos(
+@router.get("/buscar", response_model=dict)
+def buscar_productos(
     q: str = Query(..., description="Término de búsqueda"),
-    db: Session = Depends(get_db)
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db)
 ):
-    """ Buscar productos por nombre o descripción """
-    return await ProductoController.buscar_productos(q, db)
+    """ Buscar productos por nombre, descripción, marca, modelo, código o características (ordenado por relevancia) """
+    return ProductoController.buscar_productos(q, db, skip, limit)
 
 
 @router.get("/inventario/total")
-async def obtener_total_inventario(
+def obtener_total_inventario(
     soloNoCatalogo: bool = Query(False, description="Si true, contar solo productos no catalogados"),
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_admin)
 ):
     """ Obtener total de productos en inventario (parametrizable por catálogo) """
-    return {"total": await ProductoController.obtener_total_inventario(db, soloNoCatalogo)}
+    return {"total": ProductoController.obtener_total_inventario(db, soloNoCatalogo)}
 
 
 @router.get("/inventario", response_model=List[ProductoInventario])
-async def obtener_inventario(
+def obtener_inventario(
+    response: Response,
     skip: int = 0,
     limit: int = 10,
     soloNoCatalogo: bool = Query(False, description="Si true, listar solo productos no catalogados"),
+    cursor: Optional[str] = Query(None, description="Cursor de la cabecera X-Next-Cursor (reemplaza a skip)"),
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_admin)
 ):
     """ Obtener inventario de productos con paginación (parametrizable por catálogo) """
-    return await ProductoController.obtener_inventario(db, skip, limit, soloNoCatalogo)
+    inventario = ProductoController.obtener_inventario(db, skip, limit, soloNoCatalogo, cursor)
+    siguiente = cursor_siguiente(db, inventario, acotar_limite(limit), "inventario", (ProductoDB.id_producto,), lambda p: p.id_producto)
+    if siguiente:
+        response.headers[CABECERA_CURSOR] = siguiente
+    return inventario
 
 
 @router.get("/inventario/{inventario_id}", response_model=ProductoInventario)
-async def obtener_inventario_producto(
+def obtener_inventario_producto(
     inventario_id: int,
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_admin)
 ):
     """ Obtener inventario de un producto específico """
-    return await ProductoController.obtener_inventario_por_id_alt(inventario_id, db)
+    return ProductoController.obtener_inventario_por_id_alt(inventario_id, db)
 
 
 @router.put("/inventario/{inventario_id}", response_model=ProductoInventario)
-async def actualizar_inventario(
+def actualizar_inventario(
     inventario_id: int,
     cantidad: int,
     precio: float = None,
@@ -131,9 +166,9 @@ async def actualizar_inventario(
     inventario_data = {"cantidad": cantidad}
     if precio is not None:
         inventario_data["precio"] = precio
-    resultado = await ProductoController.actualizar_inventario_por_id(inventario_id, inventario_data, db)
+    resultado = ProductoController.actualizar_inventario_por_id(inventario_id, inventario_data, db)
     try:
-        await registrar_evento(
+        registrar_evento(
             db,
             accion="inventario_actualizar",
             usuario_rut=str(getattr(current_user, "rut", None)) if current_user else None,
@@ -147,16 +182,16 @@ async def actualizar_inventario(
 
 
 @router.delete("/inventario/{inventario_id}")
-async def eliminar_inventario(
+def eliminar_inventario(
     inventario_id: int,
     db: Session = Depends(get_db),
     request: Request = None,
     current_user: dict = Depends(require_admin)
 ):
     """ Eliminar registro de inventario (solo administradores) """
-    resultado = await ProductoController.eliminar_inventario_por_id(inventario_id, db)
+    resultado = ProductoController.eliminar_inventario_por_id(inventario_id, db)
     try:
-        await registrar_evento(db, AuditoriaCreate(
+        registrar_evento(db, AuditoriaCreate(
             usuario_id=None,
             accion="inventario_eliminar",
             entidad_tipo="Inventario",
@@ -169,34 +204,39 @@ async def eliminar_inventario(
 
 
 @router.get("/inventario/resumen")
-async def obtener_resumen_inventario(
-    db: Session = Depends(get_db),
+def obtener_resumen_inventario(
+    db: Session = Depends(get_read_db),
     # current_user: dict = Depends(get_current_user)  # Comentado temporalmente
 ):
     """ Obtener resumen del inventario """
-    return await ProductoController.obtener_resumen_inventario(db)
+    return ProductoController.obtener_resumen_inventario(db)
 
 
 @router.get("/{producto_id}", response_model=Producto)
-async def obtener_producto(
+def obtener_producto(
     producto_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db)
 ):
     """ Obtener un producto por ID """
-    return await ProductoController.obtener_producto(producto_id, db)
+    no_modificado = respuesta_condicional(request, response, "catalogo", "categorias", "subcategorias", "proveedores")
+    if no_modificado:
+        return no_modificado
+    return ProductoController.obtener_producto(producto_id, db)
 
 
 @router.post("/", response_model=Producto)
-async def crear_producto(
+def crear_producto(
     producto: ProductoCreate,
     db: Session = Depends(get_db),
     request: Request = None,
     current_user: dict = Depends(require_admin)
 ):
     """ Crear un nuevo producto (solo administradores) """
-    creado = await ProductoController.crear_producto(producto, db)
+    creado = ProductoController.crear_producto(producto, db)
     try:
-        await registrar_evento(db, AuditoriaCreate(
+        registrar_evento(db, AuditoriaCreate(
             usuario_id=None,
             accion="crear",
             entidad_tipo="Producto",
@@ -209,16 +249,16 @@ async def crear_producto(
 
 
 @router.post("/nuevo", response_model=Producto)
-async def crear_producto_completo(
+def crear_producto_completo(
     producto: ProductoCreate,
     db: Session = Depends(get_db),
     request: Request = None,
     current_user: dict = Depends(require_admin)
 ):
     """ Crear un producto completo con validaciones adicionales (solo administradores) """
-    creado = await ProductoController.crear_producto_completo(producto, db)
+    creado = ProductoController.crear_producto_completo(producto, db)
     try:
-        await registrar_evento(db, AuditoriaCreate(
+        registrar_evento(db, AuditoriaCreate(
             usuario_id=None,
             accion="crear",
             entidad_tipo="Producto",
@@ -231,7 +271,7 @@ async def crear_producto_completo(
 
 
 @router.put("/{producto_id}", response_model=Producto)
-async def actualizar_producto(
+def actualizar_producto(
     producto_id: int,
     producto: ProductoUpdate,
     db: Session = Depends(get_db),
@@ -239,10 +279,10 @@ async def actualizar_producto(
     current_user: dict = Depends(require_admin)
 ):
     """ Actualizar un producto (solo administradores) """
-    actualizado = await ProductoController.actualizar_producto(producto_id, producto, db)
+    actualizado = ProductoController.actualizar_producto(producto_id, producto, db)
     try:
         cambios = producto.dict(exclude_unset=True)
-        await registrar_evento(db, AuditoriaCreate(
+        registrar_evento(db, AuditoriaCreate(
             usuario_id=None,
             accion="actualizar",
             entidad_tipo="Producto",
@@ -255,7 +295,7 @@ async def actualizar_producto(
 
 
 @router.post("/{producto_id}/imagen")
-async def subir_imagen_producto(
+def subir_imagen_producto(
     producto_id: int,
     imagen: UploadFile = File(...),
     db: Session = Depends(get_db),
@@ -263,9 +303,9 @@ async def subir_imagen_producto(
     current_user: dict = Depends(require_admin)
 ):
     """ Subir imagen para un producto (solo administradores) """
-    resultado = await ProductoController.subir_imagen_producto(producto_id, imagen, db)
+    resultado = ProductoController.subir_imagen_producto(producto_id, imagen, db)
     try:
-        await registrar_evento(db, AuditoriaCreate(
+        registrar_evento(db, AuditoriaCreate(
             usuario_id=None,
             accion="imagen_subir",
             entidad_tipo="Producto",
@@ -278,16 +318,16 @@ async def subir_imagen_producto(
 
 
 @router.delete("/{producto_id}")
-async def eliminar_producto(
+def eliminar_producto(
     producto_id: int,
     db: Session = Depends(get_db),
     request: Request = None,
     current_user: dict = Depends(require_admin)
 ):
     """ Eliminar un producto (solo administradores) """
-    resultado = await ProductoController.eliminar_producto(producto_id, db)
+    resultado = ProductoController.eliminar_producto(producto_id, db)
     try:
-        await registrar_evento(db, AuditoriaCreate(
+        registrar_evento(db, AuditoriaCreate(
             usuario_id=None,
             accion="eliminar",
             entidad_tipo="Producto",
@@ -300,7 +340,7 @@ async def eliminar_producto(
 
 
 @router.put("/{producto_id}/inventario")
-async def actualizar_inventario_producto(
+def actualizar_inventario_producto(
     producto_id: int,
     cantidad_actual: int,
     stock_minimo: Optional[int] = None,
@@ -313,11 +353,11 @@ async def actualizar_inventario_producto(
         "cantidad_disponible": cantidad_actual,
         "stock_minimo": stock_minimo,
     }
-    resultado = await ProductoController.actualizar_inventario_producto(
+    resultado = ProductoController.actualizar_inventario_producto(
         producto_id, inventario_data, db
     )
     try:
-        await registrar_evento(db, AuditoriaCreate(
+        registrar_evento(db, AuditoriaCreate(
             usuario_id=None,
             accion="inventario_actualizar",
             entidad_tipo="Producto",
@@ -330,7 +370,7 @@ async def actualizar_inventario_producto(
 
 
 @router.post("/{producto_id}/agregar-catalogo", response_model=ProductoCatalogo)
-async def agregar_producto_a_catalogo(
+def agregar_producto_a_catalogo(
     producto_id: int,
     datos_catalogo: AgregarACatalogo,
     db: Session = Depends(get_db),
@@ -338,9 +378,9 @@ async def agregar_producto_a_catalogo(
     current_user: dict = Depends(require_admin)
 ):
     """ Agregar un producto del inventario al catálogo público (solo administradores) """
-    agregado = await ProductoController.agregar_producto_a_catalogo(producto_id, datos_catalogo, db)
+    agregado = ProductoController.agregar_producto_a_catalogo(producto_id, datos_catalogo, db)
     try:
-        await registrar_evento(db, AuditoriaCreate(
+        registrar_evento(db, AuditoriaCreate(
             usuario_id=None,
             accion="catalogo_agregar",
             entidad_tipo="Producto",
@@ -353,7 +393,7 @@ async def agregar_producto_a_catalogo(
 
 
 @router.put("/catalogo/{producto_id}")
-async def actualizar_producto_catalogado(
+def actualizar_producto_catalogado(
     producto_id: int,
     datos_actualizacion: dict,
     db: Session = Depends(get_db),
@@ -361,9 +401,9 @@ async def actualizar_producto_catalogado(
     current_user: dict = Depends(require_admin)
 ):
     """ Actualizar un producto que ya está en el catálogo (solo administradores) """
-    actualizado = await ProductoController.actualizar_producto_catalogado(producto_id, datos_actualizacion, db)
+    actualizado = ProductoController.actualizar_producto_catalogado(producto_id, datos_actualizacion, db)
     try:
-        await registrar_evento(db, AuditoriaCreate(
+        registrar_evento(db, AuditoriaCreate(
             usuario_id=None,
             accion="catalogo_actualizar",
             entidad_tipo="Producto",
@@ -376,16 +416,16 @@ async def actualizar_producto_catalogado(
 
 
 @router.put("/{producto_id}/quitar-catalogo")
-async def quitar_producto_de_catalogo(
+def quitar_producto_de_catalogo(
     producto_id: int,
     db: Session = Depends(get_db),
     request: Request = None,
     current_user: dict = Depends(require_admin)
 ):
     """ Quitar un producto del catálogo público (cambia en_catalogo a False) """
-    resultado = await ProductoController.quitar_producto_de_catalogo(producto_id, db)
+    resultado = ProductoController.quitar_producto_de_catalogo(producto_id, db)
     try:
-        await registrar_evento(db, AuditoriaCreate(
+        registrar_evento(db, AuditoriaCreate(
             usuario_id=None,
             accion="catalogo_quitar",
             entidad_tipo="Producto",
@@ -397,40 +437,10 @@ async def quitar_producto_de_catalogo(
     return resultado
 
 @router.get("/similares/{producto_id}")
-async def obtener_productos_similares(
+def obtener_productos_similares(
     producto_id: int,
     limit: int = Query(6, ge=1, le=24),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Obtener productos similares desde la base de datos (misma subcategoría o categoría)."""
-    return await ProductoController.obtener_similares(producto_id, db, limit)
-
-@router.post("/seed/all")
-async def seed_todas_tablas(
-    cantidad_extra: int = Query(100, ge=0, le=5000, description="Cantidad extra de productos de catálogo"),
-    cantidad_por_tabla: int = Query(200, ge=1, le=5000, description="Cantidad mínima por tabla"),
-    db: Session = Depends(get_db)
-):
-    """Inserta ejemplos realistas en todas las tablas principales para pruebas.
-
-    Incluye usuarios, proveedores, categorías, subcategorías, productos, ventas,
-    detalles, pagos, despachos, movimientos y auditoría. Evita duplicados.
-    """
-    resumen = {}
-    try:
-        resumen.update(seed_usuarios(db))
-        resumen.update(seed_catalogo_y_productos(db))
-        resumen.update(seed_ferreteria_15_realistas(db))
-        resumen["productos_extra_insertados"] = seed_mas_productos_catalogo(db, cantidad=cantidad_extra)
-        resumen.update(seed_20_ejemplos_por_tabla(db))
-        resumen.update(seed_venta_simple(db))
-        resumen.update(seed_despacho_y_pago(db))
-        resumen.update(seed_fill_tables(db, count=cantidad_por_tabla))
-        try:
-            resumen.update(randomize_user_names(db, cantidad=0))
-        except Exception:
-            pass
-        resumen.update(seed_mensajes_contacto(db))
-        return {"status": "ok", "resumen": resumen}
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error en seed all: {str(e)}")
+    return ProductoController.obtener_similares(producto_id, db, limit)
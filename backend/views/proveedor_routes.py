@@ -13,50 +13,50 @@ router = APIRouter(prefix=f"{API_PREFIX}/proveedores", tags=["Proveedores"])
 
 
 @router.get("/", response_model=List[Proveedor])
-async def obtener_proveedores(
+def obtener_proveedores(
     db: Session = Depends(get_db),
     # current_user: dict = Depends(get_current_user)  # Comentado temporalmente
 ):
     """ Obtener todos los proveedores """
-    return await ProveedorController.obtener_proveedores(db)
+    return ProveedorController.obtener_proveedores(db)
 
 
 @router.get("/{proveedor_id}", response_model=Proveedor)
-async def obtener_proveedor(
+def obtener_proveedor(
     proveedor_id: int,
     db: Session = Depends(get_db),
     # current_user: dict = Depends(get_current_user)  # Comentado temporalmente
 ):
     """ Obtener un proveedor por ID """
-    return await ProveedorController.obtener_proveedor(proveedor_id, db)
+    return ProveedorController.obtener_proveedor(proveedor_id, db)
 
 
 @router.post("/", response_model=Proveedor)
-async def crear_proveedor(
+def crear_proveedor(
     proveedor: ProveedorCreate,
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_admin)
 ):
     """ Crear un nuevo proveedor (solo administradores) """
-    return await ProveedorController.crear_proveedor(proveedor, db)
+    return ProveedorController.crear_proveedor(proveedor, db)
 
 
 @router.put("/{proveedor_id}", response_model=Proveedor)
-async def actualizar_proveedor(
+def actualizar_proveedor(
     proveedor_id: int,
     proveedor: ProveedorUpdate,
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_admin)
 ):
     """ Actualizar un proveedor (solo administradores) """
-    return await ProveedorController.actualizar_proveedor(proveedor_id, proveedor, db)
+    return ProveedorController.actualizar_proveedor(proveedor_id, proveedor, db)
 
 
 @router.delete("/{proveedor_id}")
-async def eliminar_proveedor(
+def eliminar_proveedor(
     proveedor_id: int,
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_admin)
 ):
     """ Eliminar un proveedor (solo administradores) """
-    return await ProveedorController.eliminar_proveedor(proveedor_id, db)
+    return ProveedorController.eliminar_proveedor(proveedor_id, db)
@@ -1,12 +1,14 @@
 """ Rutas de usuarios """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from typing import List
 from config.database import get_db
 from controllers.usuario_controller import UsuarioController
 from models.usuario import Usuario, UsuarioCreate, UsuarioUpdate
 from core.auth import get_current_user, require_admin
+from core.trabajos import registro_trabajos
 from config.constants import API_PREFIX
 from controllers.auditoria_controller import registrar_evento
 
@@ -14,7 +16,7 @@ router = APIRouter(prefix=f"{API_PREFIX}/usuarios", tags=["Usuarios"])
 
 
 @router.get("/", response_model=List[Usuario])
-async def obtener_usuarios(
+def obtener_usuarios(
     db: Session = Depends(get_db),
     current_user = Depends(require_admin)
 ):
@@ -22,7 +24,7 @@ async def obtener_usuarios(
 
     VALIDACIÓN TEMPORALMENTE DESACTIVADA: acceso sin token ni rol
     """
-    usuarios = await UsuarioController.obtener_usuarios(db)
+    usuarios = UsuarioController.obtener_usuarios(db)
     return [
         {
             "nombre": usuario.nombre,
@@ -39,7 +41,7 @@ async def obtener_usuarios(
 
 
 @router.get("/desactivados", response_model=List[Usuario])
-async def obtener_usuarios_desactivados(
+def obtener_usuarios_desactivados(
     db: Session = Depends(get_db),
     current_user = Depends(require_admin)
 ):
@@ -47,7 +49,7 @@ async def obtener_usuarios_desactivados(
 
     VALIDACIÓN TEMPORALMENTE DESACTIVADA: acceso sin token ni rol
     """
-    usuarios = await UsuarioController.obtener_usuarios_desactivados(db)
+    usuarios = UsuarioController.obtener_usuarios_desactivados(db)
     return [
         {
             "nombre": usuario.nombre,
@@ -61,7 +63,7 @@ async def obtener_usuarios_desactivados(
 
 
 @router.get("/me", response_model=Usuario)
-async def obtener_usuario_actual(
+def obtener_usuario_actual(
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
@@ -78,7 +80,7 @@ async def obtener_usuario_actual(
 
 
 @router.get("/{rut}", response_model=Usuario)
-async def obtener_usuario(
+def obtener_usuario(
     rut: str,
     db: Session = Depends(get_db),
     current_user = Depends(require_admin)
@@ -94,7 +96,7 @@ async def obtener_usuario(
     #         detail="No tienes permisos para ver este usuario"
     #     )
     
-    usuario = await UsuarioController.obtener_usuario(rut, db)
+    usuario = UsuarioController.obtener_usuario(rut, db)
     return {
         "nombre": usuario.nombre,
         "apellido": usuario.apellido,
@@ -108,7 +110,7 @@ async def obtener_usuario(
 
 
 @router.post("/", response_model=Usuario)
-async def crear_usuario(
+def crear_usuario(
     usuario: UsuarioCreate,
     db: Session = Depends(get_db),
     current_user = Depends(require_admin)
@@ -117,7 +119,7 @@ async def crear_usuario(
 
     VALIDACIÓN TEMPORALMENTE DESACTIVADA: acceso sin token ni rol
     """
-    nuevo = await UsuarioController.crear_usuario(usuario, db)
+    nuevo = UsuarioController.crear_usuario(usuario, db)
     try:
         registrar_evento(
             db,
@@ -134,17 +136,17 @@ async def crear_usuario(
 
 
 @router.put("/me", response_model=Usuario)
-async def actualizar_usuario_actual(
+def actualizar_usuario_actual(
     usuario: UsuarioUpdate,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
-    actualizado = await UsuarioController.actualizar_usuario(current_user.rut, usuario, db)
+    actualizado = UsuarioController.actualizar_usuario(current_user.rut, usuario, db)
     return actualizado
 
 
 @router.put("/{rut}", response_model=Usuario)
-async def actualizar_usuario(
+def actualizar_usuario(
     rut: str,
     usuario: UsuarioUpdate,
     db: Session = Depends(get_db),
@@ -154,7 +156,7 @@ async def actualizar_usuario(
 
     VALIDACIÓN TEMPORALMENTE DESACTIVADA: acceso sin token ni rol
     """
-    actualizado = await UsuarioController.actualizar_usuario(rut, usuario, db)
+    actualizado = UsuarioController.actualizar_usuario(rut, usuario, db)
     try:
         registrar_evento(
             db,
@@ -170,7 +172,7 @@ async def actualizar_usuario(
 
 
 @router.put("/{rut}/desactivar")
-async def desactivar_usuario(
+def desactivar_usuario(
     rut: str,
     db: Session = Depends(get_db),
     current_user = Depends(require_admin)
@@ -179,7 +181,7 @@ async def desactivar_usuario(
 
     VALIDACIÓN TEMPORALMENTE DESACTIVADA: acceso sin token ni rol
     """
-    resp = await UsuarioController.eliminar_usuario(rut, db)
+    resp = UsuarioController.eliminar_usuario(rut, db)
     try:
         registrar_evento(
             db,
@@ -195,7 +197,7 @@ async def desactivar_usuario(
 
 
 @router.put("/{rut}/activar")
-async def activar_usuario(
+def activar_usuario(
     rut: str,
     db: Session = Depends(get_db),
     current_user = Depends(require_admin)
@@ -204,7 +206,7 @@ async def activar_usuario(
 
     VALIDACIÓN TEMPORALMENTE DESACTIVADA: acceso sin token ni rol
     """
-    resp = await UsuarioController.activar_usuario(rut, db)
+    resp = UsuarioController.activar_usuario(rut, db)
     try:
         registrar_evento(
             db,
@@ -220,7 +222,7 @@ async def activar_usuario(
 
 
 @router.delete("/{rut}/eliminar-permanente")
-async def eliminar_usuario_permanente(
+def eliminar_usuario_permanente(
     rut: str,
     db: Session = Depends(get_db),
     current_user = Depends(require_admin)
@@ -229,7 +231,7 @@ async def eliminar_usuario_permanente(
 
     VALIDACIÓN TEMPORALMENTE DESACTIVADA: acceso sin token ni rol
     """
-    result = await UsuarioController.eliminar_usuario_permanente(rut, db)
+    result = UsuarioController.eliminar_usuario_permanente(rut, db)
     try:
         registrar_evento(
             db,
@@ -243,34 +245,55 @@ async def eliminar_usuario_permanente(
         pass
     return result
 
-from seed_data import prune_active_clients_to_n
+def _purga(funcion, tipo: str, db: Session, en_segundo_plano: bool):
+    if en_segundo_plano:
+        trabajo = registro_trabajos.lanzar(tipo, funcion)
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content={"status": "aceptado", "trabajo": trabajo.resumen()})
+    return {"status": "ok", "resumen": funcion(db)}
 
-@router.post("/prune-clientes")
-async def prune_clientes(
-    target: int = 30,
+@router.post("/eliminar-desactivados")
+def eliminar_desactivados(
+    en_segundo_plano: bool = False,
     db: Session = Depends(get_db),
     current_user = Depends(require_admin)
 ):
-    """Deja solo N clientes activos; el resto se desactiva."""
-    resumen = prune_active_clients_to_n(db, target=target)
-    return {"status": "ok", "resumen": resumen}
+    """Elimina permanentemente todos los usuarios desactivados (clientes y trabajadores).
 
-@router.post("/eliminar-desactivados")
-async def eliminar_desactivados(
+    Con en_segundo_plano=true responde 202 con el trabajo; su avance se consulta en
+    GET /api/usuarios/purgas/{id}.
+    """
+    return _purga(UsuarioController.eliminar_usuarios_desactivados, "eliminar_desactivados", db, en_segundo_plano)
+
+@router.post("/purge-clientes")
+def purge_clientes_y_compras(
+    en_segundo_plano: bool = False,
     db: Session = Depends(get_db),
     current_user = Depends(require_admin)
 ):
-    """Elimina permanentemente todos los usuarios desactivados (clientes y trabajadores)."""
-    from controllers.usuario_controller import UsuarioController
-    resumen = await UsuarioController.eliminar_usuarios_desactivados(db)
-    return {"status": "ok", "resumen": resumen}
+    """Elimina todos los usuarios con role 'cliente' y borra sus compras relacionadas.
 
-@router.post("/purge-clientes")
-async def purge_clientes_y_compras(
-    db: Session = Depends(get_db),
+    Acepta en_segundo_plano igual que /eliminar-desactivados.
+    """
+    return _purga(UsuarioController.eliminar_clientes_y_compras, "purge_clientes", db, en_segundo_plano)
+
+@router.get("/purgas/{id_trabajo}")
+def estado_purga(
+    id_trabajo: str,
+    current_user = Depends(require_admin)
+):
+    """Estado, avance (usuarios y filas por tabla) y resultado de una purga en segundo plano."""
+    trabajo = registro_trabajos.obtener(id_trabajo)
+    if not trabajo:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trabajo no encontrado")
+    return trabajo.resumen()
+
+@router.delete("/purgas/{id_trabajo}")
+def cancelar_purga(
+    id_trabajo: str,
     current_user = Depends(require_admin)
 ):
-    """Elimina todos los usuarios con role 'cliente' y borra sus compras relacionadas."""
-    from controllers.usuario_controller import UsuarioController
-    resumen = await UsuarioController.eliminar_clientes_y_compras(db)
-    return {"status": "ok", "resumen": resumen}
+    """Cancela una purga en segundo plano al terminar su lote actual (lo ya borrado queda confirmado)."""
+    trabajo = registro_trabajos.cancelar(id_trabajo)
+    if not trabajo:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trabajo no encontrado")
+    return trabajo.resumen()
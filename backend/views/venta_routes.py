@@ -2,16 +2,17 @@
 Rutas de ventas
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, date
-from config.database import get_db
-from controllers.venta_controller import VentaController
+from config.database import get_db, get_read_db
+from controllers.venta_controller import VentaController, CLAVE_VENTAS, CLAVE_MOVIMIENTOS
 from models.venta import (
     Venta, VentaCreate, VentaUpdate,
     DetalleVenta, DetalleVentaCreate,
-    MovimientoInventario, VentaGuestCreate
+    MovimientoInventario, VentaGuestCreate,
+    CarritoCotizar, CotizacionCarrito
 )
 # Asegurar resolución de forward refs para modelos Pydantic
 try:
@@ -20,17 +21,16 @@ try:
     Venta.update_forward_refs()
 except Exception:
     pass
-from seed_data import seed_extra_ventas
-from seed_data import seed_client_purchases
 from core.auth import get_current_user, require_admin
 from config.constants import API_PREFIX
+from core.paginacion import CABECERA_CURSOR, acotar_limite, cursor_siguiente
 from models.pago import PagoDB
 
 router = APIRouter(prefix=f"{API_PREFIX}/ventas", tags=["Ventas"])
 
 
 @router.post("/", response_model=Venta)
-async def crear_venta(
+def crear_venta(
     venta: VentaCreate,
     db: Session = Depends(get_db),
     # current_user: dict = Depends(get_current_user)  # Comentado temporalmente
@@ -40,7 +40,7 @@ async def crear_venta(
 
 
 @router.post("/guest", response_model=Venta)
-async def crear_venta_invitado(
+def crear_venta_invitado(
     venta: VentaGuestCreate,
     db: Session = Depends(get_db),
 ):
@@ -48,22 +48,37 @@ async def crear_venta_invitado(
     return VentaController.crear_venta_invitado(db, venta)
 
 
+@router.post("/cotizar", response_model=CotizacionCarrito)
+def cotizar_carrito(
+    carrito: CarritoCotizar,
+    db: Session = Depends(get_db),
+):
+    """Validar un carrito sin crear la venta: stock por línea, precios finales con oferta, subtotales y total"""
+    return VentaController.cotizar_carrito(db, carrito.detalles)
+
+
 @router.get("/", response_model=List[Venta])
 def obtener_ventas(
+    response: Response,
     skip: int = Query(0, ge=0, description="Número de registros a omitir"),
     limit: int = Query(100, ge=1, le=1000, description="Número máximo de registros a devolver"),
     fecha_inicio: Optional[date] = Query(None, description="Fecha de inicio para filtrar ventas"),
     fecha_fin: Optional[date] = Query(None, description="Fecha de fin para filtrar ventas"),
     rut_usuario: Optional[str] = Query(None, description="RUT del usuario para filtrar ventas"),
+    cursor: Optional[str] = Query(None, description="Cursor de la cabecera X-Next-Cursor (reemplaza a skip)"),
     db: Session = Depends(get_db),
     # current_user: dict = Depends(get_current_user)  # Comentado temporalmente
 ):
-    """ Obtener todas las ventas con filtros opcionales """
-    return VentaController.obtener_ventas(db, skip, limit, fecha_inicio, fecha_fin, rut_usuario)
+    """ Obtener todas las ventas con filtros opcionales (paginación por offset o cursor) """
+    ventas = VentaController.obtener_ventas(db, skip, limit, fecha_inicio, fecha_fin, rut_usuario, cursor)
+    siguiente = cursor_siguiente(db, ventas, acotar_limite(limit), "ventas", CLAVE_VENTAS, lambda v: v.id_venta)
+    if siguiente:
+        response.headers[CABECERA_CURSOR] = siguiente
+    return ventas
 
 
 @router.get("/{id_venta}", response_model=Venta)
-async def obtener_venta_por_id(
+def obtener_venta_por_id(
     id_venta: int,
     db: Session = Depends(get_db),
     # current_user: dict = Depends(get_current_user)  # Comentado temporalmente
@@ -79,7 +94,7 @@ async def obtener_venta_por_id(
 
 
 @router.put("/{id_venta}/cancelar")
-async def cancelar_venta(
+def cancelar_venta(
     id_venta: int,
     rut_usuario: str = Query(..., description="RUT del usuario que cancela"),
     db: Session = Depends(get_db),
@@ -96,7 +111,7 @@ async def cancelar_venta(
 
 
 @router.put("/{id_venta}/completar")
-async def completar_venta(
+def completar_venta(
     id_venta: int,
     metodo: Optional[str] = Query(None, description="Metodo de entrega: retiro|despacho"),
     usuario_admin_rut: Optional[str] = Query(None, description="RUT del usuario administrador que confirma"),
@@ -108,7 +123,7 @@ async def completar_venta(
 
 
 @router.put("/{id_venta}/envio-estado")
-async def actualizar_estado_envio(
+def actualizar_estado_envio(
     id_venta: int,
     estado: str = Query(..., description="Estado de envío: pendiente|preparando|asignado|en camino|entregado|fallido"),
     db: Session = Depends(get_db),
@@ -117,7 +132,7 @@ async def actualizar_estado_envio(
     return {"message": "Estado de envío actualizado", "venta": resultado}
 
 @router.put("/{id_venta}/asignar")
-async def asignar_repartidor(
+def asignar_repartidor(
     id_venta: int,
     repartidor_rut: Optional[str] = Query(None, description="RUT del repartidor"),
     ventana_inicio: Optional[str] = Query(None, description="Inicio ventana horaria ISO"),
@@ -129,7 +144,7 @@ async def asignar_repartidor(
     return {"message": "Repartidor asignado", "venta": resultado}
 
 @router.put("/{id_venta}/pod")
-async def registrar_prueba_entrega(
+def registrar_prueba_entrega(
     id_venta: int,
     entregado: bool = Query(..., description="Indica si se entregó"),
     prueba_entrega_url: Optional[str] = Query(None, description="URL de evidencia"),
@@ -141,37 +156,34 @@ async def registrar_prueba_entrega(
     resultado = VentaController.registrar_pod(db, id_venta, entregado, prueba_entrega_url, lat, lng, motivo_no_entrega)
     return {"message": "Prueba de entrega registrada", "venta": resultado}
 
-@router.post("/seed")
-async def seed_ventas_extra(
-    cantidad: int = Query(50, ge=1, le=1000, description="Cantidad de ventas adicionales a generar"),
-    db: Session = Depends(get_db),
-):
-    resumen = seed_extra_ventas(db, cantidad=cantidad)
-    return {"status": "ok", "resumen": resumen}
-
-
 @router.get("/movimientos/inventario", response_model=List[MovimientoInventario])
-async def obtener_movimientos_inventario(
+def obtener_movimientos_inventario(
+    response: Response,
     skip: int = Query(0, ge=0, description="Número de registros a omitir"),
     limit: int = Query(100, ge=1, le=1000, description="Número máximo de registros a devolver"),
     id_producto: Optional[int] = Query(None, description="ID del producto para filtrar movimientos"),
     tipo_movimiento: Optional[str] = Query(None, description="Tipo de movimiento (venta, cancelacion)"),
     fecha_inicio: Optional[date] = Query(None, description="Fecha de inicio para filtrar movimientos"),
     fecha_fin: Optional[date] = Query(None, description="Fecha de fin para filtrar movimientos"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor de la cabecera X-Next-Cursor (reemplaza a skip)"),
+    db: Session = Depends(get_read_db),
     # current_user: dict = Depends(get_current_user)  # Comentado temporalmente
 ):
-    """ Obtener movimientos de inventario con filtros opcionales """
-    return VentaController.obtener_movimientos_inventario(
-        db, skip, limit, id_producto
+    """ Obtener movimientos de inventario con filtros opcionales (paginación por offset o cursor) """
+    movimientos = VentaController.obtener_movimientos_inventario(
+        db, skip, limit, id_producto, cursor
     )
+    siguiente = cursor_siguiente(db, movimientos, acotar_limite(limit), "movimientos", CLAVE_MOVIMIENTOS, lambda m: m.id_movimiento)
+    if siguiente:
+        response.headers[CABECERA_CURSOR] = siguiente
+    return movimientos
 
 
 @router.get("/estadisticas/resumen")
-async def obtener_estadisticas_ventas(
+def obtener_estadisticas_ventas(
     fecha_inicio: Optional[date] = Query(None, description="Fecha de inicio para estadísticas"),
     fecha_fin: Optional[date] = Query(None, description="Fecha de fin para estadísticas"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     # current_user: dict = Depends(get_current_user)  # Comentado temporalmente
 ):
     """ Obtener estadísticas de ventas """
@@ -179,7 +191,7 @@ async def obtener_estadisticas_ventas(
 
 
 @router.get("/usuario/{rut}", response_model=List[Venta])
-async def obtener_ventas_por_usuario(
+def obtener_ventas_por_usuario(
     rut: str,
     skip: int = Query(0, ge=0, description="Número de registros a omitir"),
     limit: int = Query(100, ge=1, le=1000, description="Número máximo de registros a devolver"),
@@ -193,7 +205,7 @@ async def obtener_ventas_por_usuario(
 
 
 @router.get("/orden/{buy_order}", response_model=Venta)
-async def obtener_venta_por_orden(
+def obtener_venta_por_orden(
     buy_order: str,
     db: Session = Depends(get_db),
 ):
@@ -204,13 +216,13 @@ async def obtener_venta_por_orden(
 
 
 @router.get("/producto/{id_producto}/movimientos", response_model=List[MovimientoInventario])
-async def obtener_movimientos_por_producto(
+def obtener_movimientos_por_producto(
     id_producto: int,
     skip: int = Query(0, ge=0, description="Número de registros a omitir"),
     limit: int = Query(100, ge=1, le=1000, description="Número máximo de registros a devolver"),
     fecha_inicio: Optional[date] = Query(None, description="Fecha de inicio para filtrar movimientos"),
     fecha_fin: Optional[date] = Query(None, description="Fecha de fin para filtrar movimientos"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     # current_user: dict = Depends(get_current_user)  # Comentado temporalmente
 ):
     """ Obtener movimientos de inventario de un producto específico """
@@ -219,19 +231,8 @@ async def obtener_movimientos_por_producto(
     )
 
 
-@router.post("/seed/clientes")
-async def seed_ventas_clientes(
-    cantidad: int = Query(30, ge=1, le=1000, description="Cantidad de compras de clientes a generar"),
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(require_admin)
-):
-    """Genera compras reales con distintos clientes y asigna una dirección real única por cliente."""
-    resumen = seed_client_purchases(db, cantidad=cantidad)
-    return {"status": "ok", "resumen": resumen}
-
-
 @router.delete("/cleanup/clientes")
-async def eliminar_compras_clientes(
+def eliminar_compras_clientes(
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_admin)
 ):
@@ -141,7 +141,7 @@ function mostrarProductosGenerales(productos) {
     contenedor.innerHTML = '';
 
     productos.forEach(producto => {
-        const imagen = normalizeImageUrl(producto.imagen_url) || '/images/placeholder-product.jpg';
+        const imagen = normalizeImageUrl(producto.imagen_tarjeta_url || producto.imagen_url) || '/images/placeholder-product.jpg';
         const precioBase = Number(producto.precio_venta ?? producto.precio ?? 0);
         const precio = Number(producto.precio_final ?? precioBase);
         const tieneOferta = Boolean(producto.oferta_activa) || (precioBase > 0 && precio < precioBase);
@@ -178,7 +178,7 @@ function mostrarProductosDestacados(productos) {
     contenedor.innerHTML = '';
 
     productos.forEach(producto => {
-        const imagen = normalizeImageUrl(producto.imagen_url) || '/images/placeholder-product.jpg';
+        const imagen = normalizeImageUrl(producto.imagen_tarjeta_url || producto.imagen_url) || '/images/placeholder-product.jpg';
         const precioBase = Number(producto.precio_venta ?? producto.precio ?? 0);
         const precio = Number(producto.precio_final ?? precioBase);
         const tieneOferta = Boolean(producto.oferta_activa) || (precioBase > 0 && precio < precioBase);